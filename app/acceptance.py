@@ -0,0 +1,98 @@
+"""
+Capacity-safe acceptance of applications
+
+Accepting an application approves it, starts the student's internship and
+notifies them. All three happen in one transaction, and the position row is
+locked first, so two mentors (or two tabs) accepting applicants for the last
+spot at the same time serialize on the position: the second one sees the
+first approval and is turned away. On PostgreSQL the lock is SELECT ... FOR
+UPDATE; SQLite has no row locks, but its IMMEDIATE transactions hold the
+database write lock from the first statement, which serializes accepts the
+same way. Approved applications are counted live under the lock rather than
+read from the denormalized counter, which may not be backfilled yet.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Application, Internship, Notification, Position
+
+ACCEPTABLE_STATUSES = ('pending', 'under_review')
+
+# Internship length in months when the position does not set one
+DEFAULT_DURATION_MONTHS = 3
+
+
+class AcceptanceError(Exception):
+    """Raised when an application cannot be accepted"""
+
+
+class PositionFull(AcceptanceError):
+    """Raised when every spot of the position is already taken"""
+
+
+def internship_dates(position, start_date=None):
+    """
+    Get the (start, end) dates of an internship starting today for a position
+
+    Months are approximated as 30 days.
+    """
+    start_date = start_date or timezone.localdate()
+    try:
+        duration_months = int(position.duration) if position and position.duration else DEFAULT_DURATION_MONTHS
+    except (ValueError, TypeError):
+        duration_months = DEFAULT_DURATION_MONTHS
+    return start_date, start_date + timedelta(days=duration_months * 30)
+
+
+@transaction.atomic
+def accept(application, notes=''):
+    """
+    Approve an application and create its internship, unless the position is full
+
+    Args:
+        application: Application to accept; it is re-read under the lock
+        notes: Reviewer notes stored on the application
+
+    Returns:
+        Internship: The internship created for the student
+
+    Raises:
+        PositionFull: No spots are left on the position
+        AcceptanceError: The application is no longer pending or under review
+    """
+    position = Position.objects.select_for_update().filter(pk=application.position_id).first()
+    if position is None:
+        raise AcceptanceError('This application is not linked to a position.')
+    application = Application.objects.select_for_update(of=('self',)).select_related(
+        'student__user', 'position__company', 'position__mentor'
+    ).get(pk=application.pk)
+
+    if application.status not in ACCEPTABLE_STATUSES:
+        status_display = dict(Application.STATUS_CHOICES).get(application.status or 'unknown', 'Unknown')
+        raise AcceptanceError(f'Cannot accept application with status: {status_display}')
+    max_students = position.max_students or 1
+    if position.applications.filter(status='approved').count() >= max_students:
+        raise PositionFull(f'All {max_students} spot(s) of {position.title or "this position"} are already filled.')
+
+    application.status = 'approved'
+    application.reviewed_at = timezone.now()
+    application.reviewer_notes = notes
+    application.save(update_fields=['status', 'reviewed_at', 'reviewer_notes'])
+
+    start_date, end_date = internship_dates(position)
+    internship = Internship.objects.create(
+        application=application,
+        student=application.student,
+        mentor=position.mentor,
+        teacher=None,  # Teacher assignment can be done separately
+        start_date=start_date,
+        end_date=end_date,
+        status='active',
+    )
+    Notification.objects.fan_out(
+        [application.notification_recipient()], 'application_approved',
+        {'next_steps': ' Check your email for next steps.'}
+    )
+    return internship
@@ -0,0 +1,110 @@
+"""
+Saving weekly activity logs together with their daily entries
+
+Creating a log is one INSERT of the log and one bulk INSERT of its entries.
+Editing one compares each submitted entry with the value it was shown with
+and issues only the writes the differences need: one bulk DELETE for removed
+entries, one bulk UPDATE for entries whose text changed and one bulk INSERT
+for new ones. An entry moved to another day is deleted and inserted again, so
+the deletes free every day before the inserts claim them and swapping two
+days never trips the one-entry-per-day constraint part way through.
+
+A second log for the same internship and week is turned away by the unique
+constraint on (internship, week_starting) rather than a SELECT beforehand,
+which also closes the window between such a check and the insert. Only when a
+save fails is the week looked up, once the transaction has been rolled back,
+so that other integrity errors are raised as they are.
+"""
+from django.db import IntegrityError, transaction
+
+from .models import Entry, Log
+
+
+class DuplicateLog(Exception):
+    """Raised when the internship already has a log for the week"""
+
+    def __init__(self, week_starting):
+        self.week_starting = week_starting
+        super().__init__(f'An activity log already exists for the week starting {week_starting:%Y-%m-%d}.')
+
+
+def entry_changes(formset):
+    """
+    Work out the writes a valid EntryFormSet makes to the entries it was built from
+
+    Returns:
+        tuple: (new Entry instances to insert, changed Entry instances to
+        update, pks of entries to delete)
+    """
+    deleted = set(formset.deleted_forms)
+    to_create, to_update, to_delete = [], [], []
+    for form in formset.initial_forms:
+        entry = form.instance
+        if entry.pk is None:
+            continue
+        if form in deleted:
+            to_delete.append(entry.pk)
+        elif 'date' in form.changed_data:
+            to_delete.append(entry.pk)
+            to_create.append(Entry(date=entry.date, description=entry.description))
+        elif form.has_changed():
+            to_update.append(entry)
+    for form in formset.extra_forms:
+        if form.has_changed() and form not in deleted:
+            to_create.append(form.instance)
+    return to_create, to_update, to_delete
+
+
+def _week_taken(log):
+    """Whether another log of the internship already covers the log's week"""
+    return Log.objects.filter(
+        internship_id=log.internship_id, week_starting=log.week_starting
+    ).exclude(pk=log.pk).exists()
+
+
+def create_log(internship, week_starting, entry_formset):
+    """
+    Create a log with the entries of a valid EntryFormSet in one transaction
+
+    Raises:
+        DuplicateLog: When the internship already has a log for the week
+    """
+    entries, _, _ = entry_changes(entry_formset)
+    log = Log(internship=internship, week_starting=week_starting)
+    try:
+        with transaction.atomic():
+            log.save()
+            for entry in entries:
+                entry.log = log
+            Entry.objects.bulk_create(entries)
+    except IntegrityError:
+        if _week_taken(log):
+            raise DuplicateLog(week_starting) from None
+        raise
+    return log, len(entries)
+
+
+def update_log(log, entry_formset):
+    """
+    Save an edited log and the differences of its EntryFormSet in one transaction
+
+    Raises:
+        DuplicateLog: When the log was moved to a week that already has one
+    """
+    to_create, to_update, to_delete = entry_changes(entry_formset)
+    try:
+        with transaction.atomic():
+            log.save()
+            if to_delete:
+                Entry.objects.filter(log=log, pk__in=to_delete).delete()
+            if to_update:
+                Entry.objects.bulk_update(to_update, ['description'])
+            if to_create:
+                for entry in to_create:
+                    entry.log = log
+                Entry.objects.bulk_create(to_create)
+    except IntegrityError:
+        if _week_taken(log):
+            raise DuplicateLog(log.week_starting) from None
+        raise
+    return log
@@ -1,14 +1,20 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import User
+from django.db import transaction
 from django.utils.html import format_html
 from django.urls import reverse
+from django.utils import timezone
+from django.http import FileResponse, Http404
+from django.template.response import TemplateResponse
 from .models import (
     Institute, Company, Student, Mentor, 
     Teacher, Official, Position, 
     Application, Interview, Internship, Evaluation,
-    Payment, Notification
+    Payment, Notification, OutgoingEmail, RosterImport
 )
+from . import matching, profiling, stats
+from .utils import invalidate_available_organizations
 
 @admin.register(Institute)
 class InstituteAdmin(admin.ModelAdmin):
@@ -28,22 +34,26 @@ class InstituteAdmin(admin.ModelAdmin):
     domain_verification_status.short_description = 'Domain Status'
     
     def approve_institutes(self, request, queryset):
-        updated = queryset.update(registration_status='approved')
+        updated = stats.update(queryset, registration_status='approved')
+        invalidate_available_organizations(Institute)
         self.message_user(request, f"{updated} institutes approved successfully.")
     approve_institutes.short_description = "✓ Approve selected institutes"
     
     def reject_institutes(self, request, queryset):
-        updated = queryset.update(registration_status='rejected')
+        updated = stats.update(queryset, registration_status='rejected')
+        invalidate_available_organizations(Institute)
         self.message_user(request, f"{updated} institutes rejected successfully.")
     reject_institutes.short_description = "✗ Reject selected institutes"
     
     def verify_domain(self, request, queryset):
-        updated = queryset.filter(email_domain__isnull=False).exclude(email_domain='').update(domain_verified=True)
+        updated = stats.update(queryset.filter(email_domain__isnull=False).exclude(email_domain=''), domain_verified=True)
+        invalidate_available_organizations(Institute)
         self.message_user(request, f"{updated} institute domains verified successfully.")
     verify_domain.short_description = "✓ Verify domain for selected institutes"
     
     def unverify_domain(self, request, queryset):
-        updated = queryset.update(domain_verified=False)
+        updated = stats.update(queryset, domain_verified=False)
+        invalidate_available_organizations(Institute)
         self.message_user(request, f"{updated} institute domains unverified successfully.")
     unverify_domain.short_description = "✗ Unverify domain for selected institutes"
 
@@ -65,22 +75,26 @@ class CompanyAdmin(admin.ModelAdmin):
     domain_verification_status.short_description = 'Domain Status'
     
     def approve_companies(self, request, queryset):
-        updated = queryset.update(registration_status='approved')
+        updated = stats.update(queryset, registration_status='approved')
+        invalidate_available_organizations(Company)
         self.message_user(request, f"{updated} companies approved successfully.")
     approve_companies.short_description = "✓ Approve selected companies"
     
     def reject_companies(self, request, queryset):
-        updated = queryset.update(registration_status='rejected')
+        updated = stats.update(queryset, registration_status='rejected')
+        invalidate_available_organizations(Company)
         self.message_user(request, f"{updated} companies rejected successfully.")
     reject_companies.short_description = "✗ Reject selected companies"
     
     def verify_domain(self, request, queryset):
-        updated = queryset.filter(email_domain__isnull=False).exclude(email_domain='').update(domain_verified=True)
+        updated = stats.update(queryset.filter(email_domain__isnull=False).exclude(email_domain=''), domain_verified=True)
+        invalidate_available_organizations(Company)
         self.message_user(request, f"{updated} company domains verified successfully.")
     verify_domain.short_description = "✓ Verify domain for selected companies"
     
     def unverify_domain(self, request, queryset):
-        updated = queryset.update(domain_verified=False)
+        updated = stats.update(queryset, domain_verified=False)
+        invalidate_available_organizations(Company)
         self.message_user(request, f"{updated} company domains unverified successfully.")
     unverify_domain.short_description = "✗ Unverify domain for selected companies"
 
@@ -92,16 +106,9 @@ class StudentAdmin(admin.ModelAdmin):
     actions = ['send_welcome_notification']
     
     def send_welcome_notification(self, request, queryset):
-        from .models import Notification
-        count = 0
-        for student in queryset:
-            Notification.objects.create(
-                recipient=student.user,
-                notification_type='general',
-                title='Welcome to Tarbiyat!',
-                message=f'Welcome {student.user.get_full_name()}! Your student profile has been reviewed. You can now browse and apply for internship positions.'
-            )
-            count += 1
+        count = Notification.objects.fan_out(
+            (student.user for student in queryset.select_related('user')), 'student_welcome'
+        )
         self.message_user(request, f"Welcome notifications sent to {count} students.")
     send_welcome_notification.short_description = "📧 Send welcome notifications"
 
@@ -179,13 +186,24 @@ class PositionAdmin(admin.ModelAdmin):
             return format_html('<span >✗ Inactive</span>')
     position_status.short_description = 'Status'
     
+    def set_active(self, queryset, is_active):
+        """Bulk update skips rematch_position, so tell the skill matching index about each position"""
+        pks = list(queryset.values_list('pk', flat=True))
+        updated = stats.update(queryset, is_active=is_active)
+
+        def rematch():
+            for pk in pks:
+                matching.position_changed(pk)
+        transaction.on_commit(rematch)
+        return updated
+    
     def activate_positions(self, request, queryset):
-        updated = queryset.update(is_active=True)
+        updated = self.set_active(queryset, True)
         self.message_user(request, f"{updated} positions activated successfully.")
     activate_positions.short_description = "✓ Activate positions"
     
     def deactivate_positions(self, request, queryset):
-        updated = queryset.update(is_active=False)
+        updated = self.set_active(queryset, False)
         self.message_user(request, f"{updated} positions deactivated successfully.")
     deactivate_positions.short_description = "✗ Deactivate positions"
     
@@ -221,41 +239,45 @@ class ApplicationAdmin(admin.ModelAdmin):
         return format_html('<span >● {}</span>', color, obj.get_status_display())
     application_status.short_description = 'Status'
     
+    def _update_status(self, queryset, status):
+        """
+        Set the status of the selected applications
+        
+        Returns the updated count and the applications by primary key, since a
+        changelist filtered by status no longer matches them after the update.
+        """
+        applications = Application.objects.filter(pk__in=list(queryset.values_list('pk', flat=True)))
+        updated = stats.update(applications, status=status)
+        Position.objects.filter(pk__in=applications.values('position')).reconcile_application_counters()
+        return updated, applications
+    
     def approve_applications(self, request, queryset):
-        updated = queryset.update(status='approved')
-        # Create notifications
-        from .models import Notification
-        for app in queryset:
-            Notification.objects.create(
-                recipient=app.student.user,
-                notification_type='application_status',
-                title='Application Approved!',
-                message=f'Congratulations! Your application for {app.position.title} at {app.position.company.name} has been approved.'
-            )
+        updated, applications = self._update_status(queryset, 'approved')
+        Notification.objects.fan_out(
+            (application.notification_recipient()
+             for application in applications.select_related('student__user', 'position__company')),
+            'application_approved'
+        )
         self.message_user(request, f"{updated} applications approved and notifications sent.")
     approve_applications.short_description = "✓ Approve applications"
     
     def reject_applications(self, request, queryset):
-        updated = queryset.update(status='rejected')
-        # Create notifications
-        from .models import Notification
-        for app in queryset:
-            Notification.objects.create(
-                recipient=app.student.user,
-                notification_type='application_status',
-                title='Application Status Update',
-                message=f'Thank you for your interest in {app.position.title} at {app.position.company.name}. Unfortunately, your application was not selected at this time.'
-            )
+        updated, applications = self._update_status(queryset, 'rejected')
+        Notification.objects.fan_out(
+            (application.notification_recipient()
+             for application in applications.select_related('student__user', 'position__company')),
+            'application_rejected'
+        )
         self.message_user(request, f"{updated} applications rejected and notifications sent.")
     reject_applications.short_description = "✗ Reject applications"
     
     def mark_under_review(self, request, queryset):
-        updated = queryset.update(status='under_review')
+        updated, _ = self._update_status(queryset, 'under_review')
         self.message_user(request, f"{updated} applications marked as under review.")
     mark_under_review.short_description = "👁 Mark as under review"
     
     def schedule_interviews(self, request, queryset):
-        updated = queryset.update(status='interview_scheduled')
+        updated, _ = self._update_status(queryset, 'interview_scheduled')
         self.message_user(request, f"{updated} applications marked for interview scheduling.")
     schedule_interviews.short_description = "📅 Schedule interviews"
 
@@ -301,11 +323,75 @@ class NotificationAdmin(admin.ModelAdmin):
     read_status.short_description = 'Read Status'
     
     def mark_as_read(self, request, queryset):
-        updated = queryset.update(is_read=True)
+        updated = queryset.mark_read()
         self.message_user(request, f"{updated} notifications marked as read.")
     mark_as_read.short_description = "✓ Mark as read"
     
     def mark_as_unread(self, request, queryset):
-        updated = queryset.update(is_read=False)
+        updated = queryset.mark_read(is_read=False)
         self.message_user(request, f"{updated} notifications marked as unread.")
     mark_as_unread.short_description = "● Mark as unread"
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipients', 'status', 'attempts', 'provider', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status', 'provider', 'created_at')
+    search_fields = ('subject', 'to_emails')
+    readonly_fields = ('attempts', 'last_error', 'provider', 'created_at', 'sent_at')
+    date_hierarchy = 'created_at'
+    actions = ['retry_emails']
+    
+    def recipients(self, obj):
+        return ', '.join(obj.to_emails)
+    
+    def retry_emails(self, request, queryset):
+        updated = queryset.exclude(status='sent').update(status='pending', attempts=0, next_attempt_at=timezone.now())
+        self.message_user(request, f"{updated} emails queued for another attempt.")
+    retry_emails.short_description = "↻ Retry selected emails"
+
+
+@admin.register(RosterImport)
+class RosterImportAdmin(admin.ModelAdmin):
+    list_display = ('file_name', 'institute', 'role', 'status', 'total_rows', 'created_count', 'error_count', 'uploaded_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'role', 'created_at')
+    search_fields = ('file_name', 'institute__name', 'uploaded_by__email')
+    readonly_fields = ('nanoid', 'total_rows', 'created_count', 'error_count', 'errors', 'last_error', 'created_at', 'started_at', 'finished_at', 'attempts')
+    date_hierarchy = 'created_at'
+    actions = ['queue_again']
+    
+    def queue_again(self, request, queryset):
+        # Rows imported the first time are reported as existing accounts on the next run
+        updated = queryset.exclude(status='pending').update(status='pending', started_at=None, finished_at=None, attempts=0)
+        self.message_user(request, f"{updated} roster imports queued again.")
+    queue_again.short_description = "↻ Queue selected imports again"
+
+
+def profiling_captures(request):
+    """Staff page listing recent profiler captures and issuing profiling links"""
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Profiling captures',
+        'captures': profiling.recent_captures(),
+        'param': profiling.PROFILE_PARAM,
+    }
+    username = request.GET.get('username')
+    if username is not None:
+        user = User.objects.filter(username=username).first()
+        path = request.GET.get('path') or '/'
+        if not path.startswith('/') or path.startswith('//'):
+            path = '/'
+        if user and profiling.can_profile(user):
+            separator = '&' if '?' in path else '?'
+            context['link'] = f"{path}{separator}{profiling.PROFILE_PARAM}={profiling.make_token(user)}"
+            context['link_user'] = user
+        else:
+            context['error'] = f'{username!r} is not an active staff or official account.'
+    return TemplateResponse(request, 'admin/profiling_captures.html', context)
+
+
+def profiling_capture_download(request, capture_id):
+    """Download the .prof file of a capture"""
+    path = profiling.capture_file(capture_id)
+    if path is None:
+        raise Http404('Unknown capture')
+    return FileResponse(path.open('rb'), as_attachment=True, filename=path.name)
@@ -0,0 +1,260 @@
+"""
+Query-count and latency benchmarks for every named URL
+
+The busiest generated user of each role requests every route in app/urls.py
+through the test client, and each endpoint's query count, duplicated queries,
+p50/p95 latency and response size are recorded. Every request runs in a
+savepoint that is rolled back, so views that write on GET see the same data
+on each repeat. The benchmark_urls command prints a ranked report of every
+metric. Only the deterministic ones (status, query count and duplicated
+queries) are kept in the JSON baseline and checked against its budget, by the
+command and by the test suite; latency and size vary from run to run.
+"""
+import json
+import logging
+import math
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, reset_queries, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from . import urls
+from .management.commands.generate_load_data import USERNAME_PREFIX
+from .models import (
+    Institute, Company, Student, Mentor, Teacher, Official, Position,
+    Application, Internship, Report, Log,
+)
+from .roles import USER_TYPES
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'tests' / 'url_baseline.json'
+
+# How far an endpoint may drift from its baseline before it counts as a regression
+DEFAULT_BUDGET = {
+    'queries': 2,
+    'duplicates': 2,
+}
+
+METRICS = ('status', 'queries', 'duplicates', 'p50_ms', 'p95_ms', 'bytes')
+
+# The metrics recorded in the baseline and checked against it
+BASELINE_METRICS = ('status', 'queries', 'duplicates')
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def duplicate_queries(queries):
+    """Number of captured queries that repeat an earlier query's SQL and parameters"""
+    return len(queries) - len({query['sql'] for query in queries})
+
+
+def role_users():
+    """
+    Get the generated profile with the most activity for each role
+
+    Returns:
+        dict: Role mapped to its profile, for roles with generated users
+    """
+    generated = {'user__username__startswith': USERNAME_PREFIX}
+    profiles = {
+        'student': Student.objects.filter(internship__isnull=False, **generated)
+            .annotate(activity=Count('application', distinct=True)).order_by('-activity', 'pk'),
+        'mentor': Mentor.objects.filter(**generated).annotate(activity=Count('internship')).order_by('-activity', 'pk'),
+        'teacher': Teacher.objects.filter(**generated).annotate(activity=Count('internship')).order_by('-activity', 'pk'),
+        'official': Official.objects.filter(**generated).order_by('pk'),
+    }
+    busiest = {}
+    for role, queryset in profiles.items():
+        profile = queryset.select_related('user').first()
+        if profile:
+            busiest[role] = profile
+    return busiest
+
+
+def route_kwargs(role, profile):
+    """
+    Values for the URL parameters of every route, picked from data the profile can see
+
+    Returns:
+        dict: Parameter name mapped to its value, None when nothing fits
+    """
+    def nanoid(queryset):
+        return queryset.order_by('pk').values_list('nanoid', flat=True).first()
+
+    internships = Internship.objects.all()
+    applications = Application.objects.filter(status='pending')
+    positions = Position.objects.filter(is_active=True)
+    companies = Company.objects.filter(registration_status='approved')
+    institutes = Institute.objects.filter(registration_status='approved')
+    if role == 'student':
+        internships = internships.filter(student=profile)
+        applications = applications.filter(student=profile)
+        institutes = institutes.filter(pk=profile.institute_id)
+    elif role == 'mentor':
+        internships = internships.filter(mentor=profile)
+        applications = applications.filter(position__mentor=profile)
+        positions = positions.filter(mentor=profile)
+        companies = companies.filter(pk=profile.company_id)
+    elif role == 'teacher':
+        internships = internships.filter(teacher=profile)
+        institutes = institutes.filter(pk=profile.institute_id)
+
+    internship = internships.order_by('pk').first()
+    application = nanoid(applications)
+    return {
+        'application_nanoid': application,
+        'application_id': application,
+        'internship_nanoid': internship.nanoid if internship else None,
+        'log_nanoid': nanoid(Log.objects.filter(internship=internship)),
+        'report_nanoid': nanoid(Report.objects.filter(internship=internship)),
+        'student_nanoid': nanoid(Student.objects.filter(pk=internship.student_id) if internship else Student.objects.all()),
+        'position_nanoid': nanoid(positions),
+        'company_nanoid': nanoid(companies),
+        'institute_nanoid': nanoid(institutes),
+        'user_type': f'{role}s',
+        'topic': 'dashboard',
+    }
+
+
+def endpoints(role, profile):
+    """
+    Every named route of the app, reversed with parameters fitting the profile
+
+    Yields:
+        tuple: (route name, url); routes needing data the profile lacks are skipped
+    """
+    values = route_kwargs(role, profile)
+    for pattern in urls.urlpatterns:
+        parameters = list(pattern.pattern.converters)
+        if any(values.get(parameter) is None for parameter in parameters):
+            continue
+        yield pattern.name, reverse(pattern.name, kwargs={parameter: values[parameter] for parameter in parameters})
+
+
+def measure(client, url, repeat):
+    """
+    Request a URL once to warm caches, then repeat times while recording
+
+    Returns:
+        dict: The METRICS of the endpoint
+    """
+    timings = []
+    queries = duplicates = 0
+    for run in range(repeat + 1):
+        # A full query log (it keeps the last 9000) would leave nothing to capture
+        reset_queries()
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                response = client.get(url, secure=settings.SECURE_SSL_REDIRECT)
+                size = len(b''.join(response.streaming_content) if response.streaming else response.content)
+                elapsed = (time.perf_counter() - start) * 1000
+            transaction.set_rollback(True)
+        if run:
+            timings.append(elapsed)
+            queries = max(queries, len(context.captured_queries))
+            duplicates = max(duplicates, duplicate_queries(context.captured_queries))
+    return {
+        'status': response.status_code,
+        'queries': queries,
+        'duplicates': duplicates,
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'bytes': size,
+    }
+
+
+def run(repeat=5, roles=USER_TYPES, routes=None):
+    """
+    Benchmark every route as every role
+
+    Args:
+        repeat: Recorded requests per endpoint
+        roles: Roles to log in as
+        routes: Optional route names to limit the run to
+
+    Returns:
+        dict: '<role> <route name>' mapped to the endpoint's metrics
+    """
+    results = {}
+    profiles = role_users()
+    # Measure production behaviour, and keep the error pages and tracebacks of failing views out of the way
+    request_logger = logging.getLogger('django.request')
+    level = request_logger.level
+    request_logger.setLevel(logging.CRITICAL)
+    try:
+        with override_settings(DEBUG=False, ALLOWED_HOSTS=['testserver']):
+            for role in roles:
+                profile = profiles.get(role)
+                if profile is None:
+                    continue
+                client = Client(raise_request_exception=False)
+                client.force_login(profile.user)
+                for name, url in endpoints(role, profile):
+                    if routes and name not in routes:
+                        continue
+                    results[f'{role} {name}'] = {'url': url, **measure(client, url, repeat)}
+    finally:
+        request_logger.setLevel(level)
+    return results
+
+
+def regressions(results, baseline):
+    """
+    Compare results with a baseline and its budget
+
+    Args:
+        results: Output of run()
+        baseline: Loaded baseline document
+
+    Returns:
+        list: (endpoint, metric, baseline value, limit, measured value) for every breach;
+        a server error is always a breach, even when the baseline recorded one
+    """
+    budget = {**DEFAULT_BUDGET, **baseline.get('budget', {})}
+    breaches = []
+    for key, expected in sorted(baseline['endpoints'].items()):
+        actual = results.get(key)
+        if actual is None:
+            continue
+        limits = {
+            'queries': expected['queries'] + budget['queries'],
+            'duplicates': expected['duplicates'] + budget['duplicates'],
+        }
+        if actual['status'] != expected['status'] or actual['status'] >= 500:
+            breaches.append((key, 'status', expected['status'], expected['status'], actual['status']))
+        for metric, limit in limits.items():
+            if actual[metric] > limit:
+                breaches.append((key, metric, expected[metric], limit, actual[metric]))
+    return breaches
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path, encoding='utf-8') as baseline_file:
+        return json.load(baseline_file)
+
+
+def save_baseline(results, scale, seed, path=BASELINE_PATH, budget=None):
+    """
+    Write the BASELINE_METRICS of results as the new baseline, keeping the
+    budget of the one it replaces. Each endpoint takes one line, so a
+    re-record only shows the endpoints whose numbers moved.
+    """
+    budget = {metric: limit for metric, limit in (budget or DEFAULT_BUDGET).items() if metric in DEFAULT_BUDGET}
+    endpoints = ',\n'.join(
+        f'    {json.dumps(key)}: {json.dumps({metric: result[metric] for metric in BASELINE_METRICS}, sort_keys=True)}'
+        for key, result in sorted(results.items())
+    )
+    with open(path, 'w', encoding='utf-8') as baseline_file:
+        baseline_file.write(
+            f'{{\n  "scale": {json.dumps(scale)},\n  "seed": {json.dumps(seed)},\n'
+            f'  "budget": {json.dumps(budget, sort_keys=True)},\n  "endpoints": {{\n{endpoints}\n  }}\n}}\n'
+        )
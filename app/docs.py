@@ -0,0 +1,163 @@
+"""
+Pre-rendered documentation bundle
+
+The guides are static, so build_docs renders each of them once, as an
+anonymous visitor sees them, into STATIC_ROOT/docs. File names carry a hash
+of their content, WhiteNoise's compressor writes gzip (and, with the brotli
+package, brotli) variants next to them, and docs/manifest.json maps each page
+to its current file. The documentation views stream the prebuilt file to
+anonymous visitors instead of running the template engine. Signed-in users
+get a sidebar for their role, so they, DEBUG and a missing bundle fall back
+to rendering live.
+"""
+import hashlib
+import json
+import shutil
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import FileResponse, HttpRequest
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from whitenoise.compress import Compressor
+
+from .public import is_anonymous_view
+
+INDEX_TEMPLATE = 'docs/index.html'
+
+# Guide templates by user type and topic
+GUIDES = {
+    'getting-started': {
+        'overview': 'docs/getting-started/overview.html',
+        'account-setup': 'docs/getting-started/account-setup.html',
+    },
+    'students': {
+        'dashboard': 'docs/students/dashboard.html',
+        'profile-management': 'docs/students/profile-management.html',
+        'finding-internships': 'docs/students/finding-internships.html',
+        'applying-positions': 'docs/students/applying-positions.html',
+        'managing-applications': 'docs/students/managing-applications.html',
+        'application-progress': 'docs/students/application-progress.html',
+    },
+    'mentors': {
+        'dashboard': 'docs/mentors/dashboard.html',
+        'creating-positions': 'docs/mentors/creating-positions.html',
+        'managing-applications': 'docs/mentors/managing-applications.html',
+        'intern-supervision': 'docs/mentors/intern-supervision.html',
+        'company-registration': 'docs/mentors/company-registration.html',
+    },
+    'teachers': {
+        'dashboard': 'docs/teachers/dashboard.html',
+        'student-supervision': 'docs/teachers/student-supervision.html',
+        'progress-monitoring': 'docs/teachers/progress-monitoring.html',
+        'institute-registration': 'docs/teachers/institute-registration.html',
+    },
+    'officials': {
+        'dashboard': 'docs/officials/dashboard.html',
+        'managing-organizations': 'docs/officials/managing-organizations.html',
+        'system-administration': 'docs/officials/system-administration.html',
+    },
+}
+
+# Directory under STATIC_ROOT holding the bundle
+BUNDLE_DIR = 'docs'
+MANIFEST_NAME = 'manifest.json'
+
+# Content-Encoding of each compressed variant, most preferred first
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+def pages():
+    """
+    Every documentation page
+
+    Yields:
+        tuple: (bundle key, URL, template name)
+    """
+    yield 'index', reverse('documentation_index'), INDEX_TEMPLATE
+    for user_type, topics in GUIDES.items():
+        for topic, template_name in topics.items():
+            yield f'{user_type}/{topic}', reverse('documentation_guide', args=[user_type, topic]), template_name
+
+
+def bundle_root(static_root=None):
+    return Path(static_root or settings.STATIC_ROOT) / BUNDLE_DIR
+
+
+def render_anonymous(template_name, path):
+    """Render a page the way an anonymous visitor without flash messages sees it"""
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = path
+    request.user = AnonymousUser()
+    return render_to_string(template_name, request=request)
+
+
+def build(static_root=None, compress=True):
+    """
+    Render every page into a fresh bundle
+
+    Args:
+        static_root: Directory to build under, STATIC_ROOT by default
+        compress: Write gzip/brotli variants of each page
+
+    Returns:
+        dict: Bundle key mapped to the page's file, relative to the bundle
+    """
+    root = bundle_root(static_root)
+    shutil.rmtree(root, ignore_errors=True)
+    compressor = Compressor(quiet=True)
+    manifest = {}
+    for key, path, template_name in pages():
+        content = render_anonymous(template_name, path).encode('utf-8')
+        name = f'{key}.{hashlib.md5(content).hexdigest()[:12]}.html'
+        target = root / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+        if compress:
+            compressor.compress(str(target))
+        manifest[key] = name
+    (root / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+    load_manifest.cache_clear()
+    return manifest
+
+
+@lru_cache(maxsize=None)
+def load_manifest(root):
+    """Read a bundle's manifest once per process, or None when the bundle was not built"""
+    try:
+        with open(Path(root) / MANIFEST_NAME, encoding='utf-8') as manifest_file:
+            return json.load(manifest_file)
+    except FileNotFoundError:
+        return None
+
+
+def prebuilt_response(request, key):
+    """
+    Stream the prebuilt page for a bundle key, in the best encoding the client accepts
+
+    Returns:
+        FileResponse, or None when the page has to be rendered live
+    """
+    if settings.DEBUG or not is_anonymous_view(request):
+        return None
+    root = bundle_root()
+    name = (load_manifest(str(root)) or {}).get(key)
+    if name is None or not (root / name).is_file():
+        return None
+
+    path, encoding = root / name, None
+    accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    for candidate, suffix in ENCODINGS:
+        variant = path.with_name(path.name + suffix)
+        if candidate in accepted and variant.is_file():
+            path, encoding = variant, candidate
+            break
+    response = FileResponse(open(path, 'rb'), content_type='text/html; charset=utf-8')
+    if encoding:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
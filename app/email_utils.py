@@ -1,18 +1,50 @@
 """
 Email utilities for Tarbiyat platform using SendGrid
+
+Emails are not sent during the request. EmailService.send_email renders the
+message and stores it in the OutgoingEmail outbox, and the send_queued_email
+worker delivers it later through SendGrid, falling back to Django's email
+backend. The worker claims due emails in batches, reuses pooled backend
+connections, limits how many sends each provider handles at once,
+and retries failures with exponential backoff until they are dead-lettered.
 """
 
 import logging
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 from typing import List, Optional, Dict, Any
 from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection as db_connection, transaction
+from django.db.models import F
 from django.template.loader import render_to_string
+from django.utils import timezone
 from django.utils.html import strip_tags
-from django.core.mail import send_mail
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail, To, From, Subject, PlainTextContent, HtmlContent
 
+from .models import OutgoingEmail
+
 logger = logging.getLogger(__name__)
 
+# Defaults for the EMAIL_OUTBOX_* settings
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_CONCURRENCY = {'sendgrid': 4, 'django': 2}
+
+# Retry delays double from RETRY_BASE up to RETRY_MAX, plus up to 10% jitter
+RETRY_BASE = timedelta(minutes=1)
+RETRY_MAX = timedelta(hours=2)
+
+# A claimed email whose worker died becomes due again after this long
+CLAIM_LEASE = timedelta(minutes=10)
+
+
+class EmailDeliveryError(Exception):
+    """Raised when an email provider does not accept a message"""
+
 
 class EmailService:
     """Email service class for sending various types of emails"""
@@ -36,7 +68,7 @@ class EmailService:
         context: Optional[Dict[str, Any]] = None
     ) -> bool:
         """
-        Send email using SendGrid or Django's email backend as fallback
+        Queue an email in the outbox for the send_queued_email worker
         
         Args:
             to_emails: List of recipient email addresses
@@ -48,7 +80,7 @@ class EmailService:
             context: Context for template rendering (optional)
         
         Returns:
-            bool: True if email was sent successfully, False otherwise
+            bool: True if email was queued successfully, False otherwise
         """
         
         try:
@@ -69,20 +101,18 @@ class EmailService:
             if not from_email:
                 from_email = settings.DEFAULT_FROM_EMAIL
             
-            # Try SendGrid first if available
-            if self.sendgrid_client:
-                success = self._send_with_sendgrid(to_emails, subject, html_content, plain_content, from_email)
-                if success:
-                    return True
-                else:
-                    logger.warning("SendGrid failed, falling back to Django email backend")
-                    # Fall through to Django backend
-            
-            # Use Django's email backend (either as fallback or primary)
-            return self._send_with_django(to_emails, subject, html_content, plain_content, from_email)
+            # Queued in the caller's transaction, so a rolled back request sends nothing
+            OutgoingEmail.objects.create(
+                to_emails=list(to_emails),
+                subject=subject,
+                html_content=html_content,
+                plain_content=plain_content,
+                from_email=from_email,
+            )
+            return True
                 
         except Exception as e:
-            logger.error(f"Failed to send email: {e}")
+            logger.error(f"Failed to queue email: {e}")
             return False
     
     def _send_with_sendgrid(
@@ -92,7 +122,7 @@ class EmailService:
         html_content: str,
         plain_content: str,
         from_email: str
-    ) -> bool:
+    ) -> None:
         """Send email using SendGrid API"""
         try:
             message = Mail()
@@ -109,21 +139,14 @@ class EmailService:
             
             # Send the email
             response = self.sendgrid_client.send(message)
-            
-            if response.status_code in [200, 202]:
-                logger.info(f"Email sent successfully via SendGrid to {to_emails}")
-                return True
-            else:
-                logger.error(f"SendGrid returned status code {response.status_code}: {response.body}")
-                return False
-                
         except Exception as e:
-            logger.error(f"SendGrid email sending failed: {e}")
-            # Log more details for debugging
-            logger.error(f"From email: {from_email}")
-            logger.error(f"To emails: {to_emails}")
-            logger.error(f"Subject: {subject}")
-            return False
+            logger.error(f"SendGrid email sending failed for {to_emails}: {e}")
+            raise EmailDeliveryError(f"SendGrid: {e}") from e
+        
+        if response.status_code not in [200, 202]:
+            logger.error(f"SendGrid returned status code {response.status_code}: {response.body}")
+            raise EmailDeliveryError(f"SendGrid returned status code {response.status_code}")
+        logger.info(f"Email sent successfully via SendGrid to {to_emails}")
     
     def _send_with_django(
         self,
@@ -131,31 +154,195 @@ class EmailService:
         subject: str,
         html_content: str,
         plain_content: str,
-        from_email: str
-    ) -> bool:
+        from_email: str,
+        connection=None
+    ) -> None:
         """Send email using Django's email backend"""
         try:
-            from django.core.mail import EmailMultiAlternatives
-            
             msg = EmailMultiAlternatives(
                 subject=subject,
                 body=plain_content,
                 from_email=from_email,
-                to=to_emails
+                to=to_emails,
+                connection=connection
             )
             msg.attach_alternative(html_content, "text/html")
-            
             result = msg.send()
-            if result:
-                logger.info(f"Email sent successfully via Django backend to {to_emails}")
-                return True
-            else:
-                logger.error("Django email backend failed to send email")
-                return False
-                
         except Exception as e:
-            logger.error(f"Django email sending failed: {e}")
-            return False
+            logger.error(f"Django email sending failed for {to_emails}: {e}")
+            raise EmailDeliveryError(f"Django email backend: {e}") from e
+        
+        if not result:
+            logger.error("Django email backend failed to send email")
+            raise EmailDeliveryError("Django email backend did not send the email")
+        logger.info(f"Email sent successfully via Django backend to {to_emails}")
+
+
+class OutboxWorker:
+    """
+    Deliver queued emails in batches
+    
+    Django email backend connections (SMTP sessions in production) are pooled
+    and reused across batches for as long as the worker runs, one per send
+    slot at most. Use the worker as a context manager so they are closed
+    afterwards.
+    
+    Args:
+        service: EmailService used to deliver (defaults to the global instance)
+        batch_size: Emails claimed per batch (EMAIL_OUTBOX_BATCH_SIZE)
+        max_attempts: Attempts before an email is dead-lettered (EMAIL_OUTBOX_MAX_ATTEMPTS)
+        concurrency: Simultaneous sends per provider (EMAIL_OUTBOX_CONCURRENCY)
+    """
+    
+    def __init__(self, service=None, batch_size=None, max_attempts=None, concurrency=None):
+        self.service = service or email_service
+        self.batch_size = batch_size or getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', OUTBOX_BATCH_SIZE)
+        self.max_attempts = max_attempts or getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', OUTBOX_MAX_ATTEMPTS)
+        limits = {**OUTBOX_CONCURRENCY, **(concurrency or getattr(settings, 'EMAIL_OUTBOX_CONCURRENCY', {}))}
+        self.limits = {provider: threading.BoundedSemaphore(limit) for provider, limit in limits.items()}
+        self.executor = ThreadPoolExecutor(max_workers=sum(limits.values()), thread_name_prefix='outbox')
+        self._connections = []
+        self._idle = []
+        self._connections_lock = threading.Lock()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        """Stop the worker threads and close their backend connections"""
+        self.executor.shutdown(wait=True)
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+            self._idle.clear()
+    
+    def _checkout_connection(self):
+        """Take an idle Django email backend connection, opening one if none is free"""
+        with self._connections_lock:
+            if self._idle:
+                return self._idle.pop()
+        connection = get_connection()
+        connection.open()
+        with self._connections_lock:
+            self._connections.append(connection)
+        return connection
+    
+    def _checkin_connection(self, connection, broken=False):
+        """Return a connection to the pool, or close it if it may be broken"""
+        with self._connections_lock:
+            if not broken:
+                self._idle.append(connection)
+                return
+            self._connections.remove(connection)
+        try:
+            connection.close()
+        except Exception:
+            pass
+    
+    def dead_letter_abandoned(self):
+        """
+        Give up on claimed emails whose lease ran out after their last attempt
+        
+        A worker that hangs or dies while sending never reports back, so every
+        claim counts as an attempt and such an email cannot be retried forever.
+        
+        Returns:
+            int: Number of emails dead-lettered
+        """
+        return OutgoingEmail.objects.filter(
+            status='sending', next_attempt_at__lte=timezone.now(), attempts__gte=self.max_attempts,
+        ).update(status='dead', last_error=f'No result after {self.max_attempts} claims, the worker stopped while sending')
+    
+    def claim(self):
+        """
+        Mark a batch of due emails as being sent by this worker, counting an attempt for each
+        
+        Returns:
+            list: Claimed OutgoingEmail instances
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            # Claimed emails are due again once their lease runs out
+            due = OutgoingEmail.objects.filter(
+                status__in=['pending', 'sending'], next_attempt_at__lte=now, attempts__lt=self.max_attempts,
+            )
+            if db_connection.features.has_select_for_update_skip_locked:
+                due = due.select_for_update(skip_locked=True)
+            ids = list(due.order_by('next_attempt_at', 'pk').values_list('pk', flat=True)[:self.batch_size])
+            OutgoingEmail.objects.filter(pk__in=ids).update(
+                status='sending', next_attempt_at=now + CLAIM_LEASE, attempts=F('attempts') + 1,
+            )
+        return list(OutgoingEmail.objects.filter(pk__in=ids).order_by('pk'))
+    
+    def _deliver(self, email):
+        """Deliver one email, holding a slot of each provider it uses"""
+        if self.service.sendgrid_client:
+            with self.limits['sendgrid']:
+                try:
+                    self.service._send_with_sendgrid(
+                        email.to_emails, email.subject, email.html_content, email.plain_content, email.from_email
+                    )
+                    return 'sendgrid'
+                except EmailDeliveryError:
+                    logger.warning("SendGrid failed, falling back to Django email backend")
+        with self.limits['django']:
+            # At most one connection per slot, so the pool never exceeds the provider's limit
+            connection = self._checkout_connection()
+            try:
+                self.service._send_with_django(
+                    email.to_emails, email.subject, email.html_content, email.plain_content, email.from_email,
+                    connection=connection
+                )
+            except Exception:
+                self._checkin_connection(connection, broken=True)
+                raise
+            self._checkin_connection(connection)
+        return 'django'
+    
+    def retry_delay(self, attempts):
+        """Backoff before the next attempt after a number of failed attempts"""
+        delay = min(RETRY_BASE * 2 ** (attempts - 1), RETRY_MAX)
+        return delay + delay * random.uniform(0, 0.1)
+    
+    def run_batch(self):
+        """
+        Claim and deliver one batch of due emails
+        
+        Returns:
+            dict: Number of emails 'sent', 'retrying' and 'dead' (dead-lettered)
+        """
+        results = {'sent': 0, 'retrying': 0, 'dead': self.dead_letter_abandoned()}
+        batch = self.claim()
+        futures = [(email, self.executor.submit(self._deliver, email)) for email in batch]
+        
+        sent = {}
+        for email, future in futures:
+            try:
+                provider = future.result()
+            except Exception as e:
+                email.last_error = str(e)
+                if email.attempts >= self.max_attempts:
+                    email.status = 'dead'
+                    results['dead'] += 1
+                    logger.error(f"Giving up on email {email.pk} after {email.attempts} attempts: {e}")
+                else:
+                    email.status = 'pending'
+                    email.next_attempt_at = timezone.now() + self.retry_delay(email.attempts)
+                    results['retrying'] += 1
+                email.save(update_fields=['last_error', 'status', 'next_attempt_at'])
+            else:
+                sent.setdefault(provider, []).append(email.pk)
+        
+        now = timezone.now()
+        for provider, ids in sent.items():
+            results['sent'] += OutgoingEmail.objects.filter(pk__in=ids).update(
+                status='sent', provider=provider, sent_at=now, last_error='',
+            )
+        return results
 
 
 # Global email service instance
@@ -0,0 +1,293 @@
+"""
+Streaming CSV and XLSX exports of list views
+
+Rows are read with QuerySet.iterator(chunk_size=...) and written out as they
+arrive, so an export holds one chunk of model instances and one chunk of
+encoded output at a time whether it has a hundred rows or a million. XLSX
+files are written straight into a ZIP stream: the worksheet uses inline
+strings, so no shared string table has to be kept, and zipfile writes data
+descriptors instead of seeking back, so every compressed chunk can be sent
+as soon as it is produced.
+"""
+import csv
+import io
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import content_disposition_header
+
+CHUNK_SIZE = 2000
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Spreadsheet applications run CSV cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# Characters XML 1.0 does not allow
+XML_ILLEGAL_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+SHEET_PATH = 'xl/worksheets/sheet1.xml'
+SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+SHEET_END = '</sheetData></worksheet>'
+
+
+def attr(path):
+    """
+    Column value getter following a dotted path of attributes
+
+    Gives None past a missing relation, and calls the last attribute when it
+    is a method, as in 'user.get_full_name' or 'get_status_display'.
+    """
+    names = path.split('.')
+
+    def get(obj):
+        for name in names:
+            obj = getattr(obj, name, None)
+            if obj is None:
+                return None
+        return obj() if callable(obj) else obj
+    return get
+
+
+def plain(value):
+    """Convert a column value to what both formats write: text, a number, a bool or None"""
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime('%Y-%m-%d %H:%M')
+    if isinstance(value, date):
+        return value.isoformat()
+    if value is None or isinstance(value, (bool, int, float, Decimal, str)):
+        return value
+    return str(value)
+
+
+def table_rows(queryset, columns, chunk_size=CHUNK_SIZE):
+    """Yield the header and then one list of plain values per object"""
+    yield [header for header, _ in columns]
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        yield [plain(value(obj)) for _, value in columns]
+
+
+def csv_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'Yes' if value else 'No'
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_chunks(rows, chunk_size=CHUNK_SIZE):
+    """Encode rows as UTF-8 CSV, a chunk of rows at a time"""
+    buffer = io.StringIO()
+    # The byte order mark makes Excel read the file as UTF-8
+    buffer.write('\ufeff')
+    writer = csv.writer(buffer)
+    for number, row in enumerate(rows, start=1):
+        writer.writerow([csv_cell(value) for value in row])
+        if number % chunk_size == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def column_letter(index):
+    """Spreadsheet column name of a zero-based index: A, B, ..., Z, AA, ..."""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def xlsx_row(number, values, letters):
+    cells = []
+    for letter, value in zip(letters, values):
+        ref = f'{letter}{number}'
+        if value is None or value == '':
+            continue
+        if isinstance(value, bool):
+            cells.append(f'<c r="{ref}" t="b"><v>{int(value)}</v></c>')
+        elif isinstance(value, (int, float, Decimal)):
+            cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        else:
+            text = escape(XML_ILLEGAL_RE.sub('', str(value)))
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row r="{number}">{"".join(cells)}</row>'
+
+
+class ChunkSink:
+    """Write-only file that holds what was written to it until drained"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def xlsx_chunks(rows, sheet_name='Export', chunk_size=CHUNK_SIZE):
+    """Encode rows as a one-sheet XLSX workbook, a chunk of rows at a time"""
+    sink = ChunkSink()
+    # Without tell() and seek() on the sink, zipfile streams each member with a data descriptor
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_PARTS.items():
+            archive.writestr(name, content.replace('{sheet_name}', escape(sheet_name[:31], {'"': '&quot;'})))
+        with archive.open(SHEET_PATH, 'w', force_zip64=True) as sheet:
+            sheet.write(SHEET_START.encode('utf-8'))
+            letters = None
+            for number, row in enumerate(rows, start=1):
+                if letters is None:
+                    letters = [column_letter(index) for index in range(len(row))]
+                sheet.write(xlsx_row(number, row, letters).encode('utf-8'))
+                if number % chunk_size == 0:
+                    yield sink.drain()
+            sheet.write(SHEET_END.encode('utf-8'))
+    yield sink.drain()
+
+
+def export_response(queryset, columns, filename, file_format='csv', title='Export'):
+    """
+    Stream a queryset as a CSV or XLSX download
+
+    Args:
+        queryset: Rows to export, with the relations the columns read selected
+        columns: List of (header, value getter) pairs
+        filename: Download name without the extension; today's date is appended
+        file_format: 'csv' or 'xlsx'
+        title: Worksheet name of an XLSX export
+
+    Raises:
+        Http404: For an unknown format
+    """
+    if file_format not in CONTENT_TYPES:
+        raise Http404('Unknown export format')
+    rows = table_rows(queryset, columns, CHUNK_SIZE)
+    if file_format == 'csv':
+        content = csv_chunks(rows, CHUNK_SIZE)
+    else:
+        content = xlsx_chunks(rows, sheet_name=title, chunk_size=CHUNK_SIZE)
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[file_format])
+    response['Content-Disposition'] = content_disposition_header(
+        True, f'{filename}-{timezone.localdate().isoformat()}.{file_format}'
+    )
+    return response
+
+
+COMPANY_COLUMNS = [
+    ('Name', attr('name')),
+    ('Industry', attr('industry')),
+    ('Contact email', attr('contact_email')),
+    ('Phone', attr('phone')),
+    ('Website', attr('website')),
+    ('Email domain', attr('email_domain')),
+    ('Domain verified', attr('domain_verified')),
+    ('Registration status', attr('get_registration_status_display')),
+    ('Approved by', attr('approved_by.user.get_full_name')),
+    ('Approved at', attr('approved_at')),
+    ('Registered at', attr('created_at')),
+]
+
+INSTITUTE_COLUMNS = [
+    ('Name', attr('name')),
+    ('Address', attr('address')),
+    ('Contact email', attr('contact_email')),
+    ('Phone', attr('phone')),
+    ('Website', attr('website')),
+    ('Email domain', attr('email_domain')),
+    ('Domain verified', attr('domain_verified')),
+    ('Registration status', attr('get_registration_status_display')),
+    ('Approved by', attr('approved_by.user.get_full_name')),
+    ('Approved at', attr('approved_at')),
+    ('Registered at', attr('created_at')),
+]
+
+STATISTIC_COLUMNS = [
+    ('Day', attr('day')),
+    ('Entity', attr('entity')),
+    ('Status', attr('status')),
+    ('Count', attr('count')),
+]
+
+STUDENT_COLUMNS = [
+    ('Name', attr('user.get_full_name')),
+    ('Email', attr('user.email')),
+    ('Student ID', attr('student_id')),
+    ('Major', attr('major')),
+    ('Semester', attr('get_semester_of_study_display')),
+    ('GPA', attr('gpa')),
+    ('Expected graduation', attr('expected_graduation')),
+    ('Latest internship', attr('latest_internship_status')),
+]
+
+REPORT_COLUMNS = [
+    ('Student', attr('internship.student.user.get_full_name')),
+    ('Student ID', attr('internship.student.student_id')),
+    ('Company', attr('internship.mentor.company.name')),
+    ('Report month', attr('report_month')),
+    ('Tasks performed score', attr('tasks_performed_score')),
+    ('Learning experience score', attr('learning_experience_score')),
+    ('Challenges score', attr('challenges_score')),
+    ('Total score', attr('total_score')),
+    ('Reviewed by', attr('teacher.user.get_full_name')),
+]
@@ -1,13 +1,13 @@
 from allauth.account.forms import SignupForm
 from django import forms
 from django.contrib.auth.models import User, Group
-from django.forms import modelformset_factory
+from django.forms import BaseModelFormSet, modelformset_factory
 from typing import TYPE_CHECKING
 from .models import (
     Log, Entry, Student, Mentor,
     Teacher, Official, Institute, Company, Position,
     Application, Internship, Report,
-    Assessment, Notification, Evaluation
+    Assessment, Notification, Evaluation, RosterImport
 )
 
 if TYPE_CHECKING:
@@ -423,7 +423,8 @@ class AssessmentForm(forms.ModelForm):
             'technical_skills', 'work_quality', 'problem_solving', 'teamwork',
             'professionalism', 'performance_benefits', 'observed_development',
             'intern_strengths', 'areas_for_improvement', 'intern_rating',
-            'program_rating', 'program_improvement_suggestions'
+            'program_rating', 'program_improvement_suggestions', 'would_recommend',
+            'additional_comments'
         ]
         widgets = {
             'technical_skills': TailwindSelect(),
@@ -438,6 +439,7 @@ class AssessmentForm(forms.ModelForm):
             'intern_rating': TailwindSelect(),
             'program_rating': TailwindSelect(),
             'program_improvement_suggestions': TailwindTextarea(attrs={'rows': 4}),
+            'additional_comments': TailwindTextarea(attrs={'rows': 3}),
         }
 
 # Evaluation Forms
@@ -500,9 +502,60 @@ class NotificationForm(forms.ModelForm):
             'notification_type': TailwindSelect(),
         }
 
+class StoredEntryField(forms.Field):
+    """Hidden id of an entry, looked up among the entries its formset was built from"""
+    widget = forms.HiddenInput
+    
+    def __init__(self, entries, **kwargs):
+        self.entries = entries
+        super().__init__(required=False, **kwargs)
+    
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            entry = self.entries().get(int(value))
+        except (TypeError, ValueError):
+            entry = None
+        if entry is None:
+            raise forms.ValidationError("This entry no longer exists.", code='invalid_choice')
+        return entry
+    
+    def has_changed(self, initial, data):
+        return str(initial or '') != str(data or '')
+
+
+class BaseEntryFormSet(BaseModelFormSet):
+    """Daily entries of one weekly log, at most one per day"""
+    
+    def stored_entries(self):
+        """The entries the formset was built from, by pk, read with the formset's own query"""
+        if not hasattr(self, '_stored_entries'):
+            self._stored_entries = {entry.pk: entry for entry in self.get_queryset()}
+        return self._stored_entries
+    
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        # The default id field runs a query per form to check the submitted id
+        pk_name = self.model._meta.pk.name
+        form.fields[pk_name] = StoredEntryField(self.stored_entries, initial=form.fields[pk_name].initial)
+    
+    def clean(self):
+        super().clean()
+        dates = set()
+        for form in self.forms:
+            if not form.cleaned_data or form.cleaned_data.get('DELETE'):
+                continue
+            date = form.cleaned_data.get('date')
+            if date in dates:
+                raise forms.ValidationError(f"There is more than one entry for {date:%A, %B %d}; combine them into one.")
+            dates.add(date)
+
+
 EntryFormSet = modelformset_factory(
     Entry,
     form=EntryForm,
+    formset=BaseEntryFormSet,
     extra=1,  # Start with just one entry
     min_num=1,  # At least 1 activity required
     validate_min=True,
@@ -547,6 +600,12 @@ class PositionSearchForm(forms.Form):
         widget=TailwindNumberInput(attrs={'placeholder': 'Min stipend'}),
         label="Minimum Stipend"
     )
+    sort = forms.ChoiceField(
+        choices=[('relevance', 'Best match'), ('newest', 'Newest first')],
+        required=False,
+        widget=TailwindSelect(),
+        label="Sort by"
+    )
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -717,3 +776,37 @@ class InstituteAdminForm(forms.Form):
         else:
             cleaned_data['domain_verified'] = None
         return cleaned_data
+
+
+class RosterImportForm(forms.Form):
+    """Upload form for a roster of student or teacher accounts"""
+    institute = forms.ModelChoiceField(
+        queryset=Institute.objects.filter(
+            registration_status='approved', domain_verified=True, email_domain__isnull=False
+        ).exclude(email_domain='').order_by('name'),
+        widget=TailwindSelect(),
+        help_text="Only approved institutes with a verified email domain are listed"
+    )
+    role = forms.ChoiceField(
+        choices=RosterImport.ROLE_CHOICES,
+        widget=TailwindSelect(),
+        label="Accounts to create"
+    )
+    file = forms.FileField(
+        widget=TailwindFileInput(attrs={'accept': '.csv,.xlsx'}),
+        help_text="CSV (UTF-8) or XLSX with an email column, and optionally first_name, last_name and profile columns"
+    )
+    
+    def __init__(self, *args, institute=None, roles=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Teachers import into their own institute
+        if institute is not None:
+            del self.fields['institute']
+        if roles is not None:
+            self.fields['role'].choices = [choice for choice in RosterImport.ROLE_CHOICES if choice[0] in roles]
+    
+    def clean_file(self):
+        file = self.cleaned_data['file']
+        if not file.name.lower().endswith(('.csv', '.xlsx')):
+            raise forms.ValidationError("Upload a .csv or .xlsx file.")
+        return file
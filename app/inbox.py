@@ -0,0 +1,93 @@
+"""
+Unread notification counters for the navbar badge
+
+Counting a user's unread notifications on every page would add a query to
+each request, so the count is kept in the cache framework. It is computed
+once with an indexed COUNT, incremented as notifications are created, and
+dropped whenever notifications are read, bulk-created or deleted so the next
+read recounts. The badge endpoint long-polls on the cached value and answers
+304 Not Modified while it is unchanged.
+
+Those changes only reach the cache of the process making them. With the
+default per-process cache, notifications created by another gunicorn worker,
+the email worker or a management command are not seen elsewhere, so counters
+expire after NOTIFICATION_COUNT_CACHE_SECONDS, one badge poll interval by
+default, and are counted again.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+# Seconds between cache checks while a badge request long-polls
+LONG_POLL_STEP = 0.5
+
+
+def _unread_key(user_id):
+    return f'unread_notifications:{user_id}'
+
+
+def unread_count(user):
+    """
+    Get the number of unread notifications of a user, querying only on a cache miss
+
+    Args:
+        user: User instance (or request.user)
+
+    Returns:
+        int: Unread notifications, 0 for anonymous users
+    """
+    if not user or not user.is_authenticated:
+        return 0
+    key = _unread_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = user.notifications.filter(is_read=False).count()
+        cache.set(key, count, unread_timeout())
+    return count
+
+
+def unread_timeout():
+    """Seconds a counted unread total is served from the cache before it is counted again"""
+    return getattr(settings, 'NOTIFICATION_COUNT_CACHE_SECONDS', getattr(settings, 'NOTIFICATION_POLL_INTERVAL', 30))
+
+
+def cached_unread_count(user_id):
+    """Get a user's cached unread count without querying, or None when not cached"""
+    return cache.get(_unread_key(user_id))
+
+
+def count_new_notification(user_id):
+    """Add a newly created unread notification to a cached counter"""
+    try:
+        cache.incr(_unread_key(user_id))
+    except ValueError:
+        # Not cached, the next read counts from the database
+        pass
+
+
+def forget_unread(user_ids):
+    """Drop the cached counters of users whose notifications changed in bulk"""
+    keys = [_unread_key(user_id) for user_id in set(user_ids) if user_id is not None]
+    if keys:
+        cache.delete_many(keys)
+
+
+def long_poll_seconds():
+    """How long the badge endpoint waits for a change before answering 304"""
+    return getattr(settings, 'NOTIFICATION_LONG_POLL_SECONDS', 0)
+
+
+def badge_etag(user_id, count):
+    return f'"unread-{user_id}-{count}"'
+
+
+def badge_context(count):
+    """
+    Context for the navbar badge partial
+
+    While long-polling the server does the waiting, so the badge asks again
+    right away; otherwise it polls every NOTIFICATION_POLL_INTERVAL seconds.
+    """
+    return {
+        'unread_count': count,
+        'poll_delay': 1 if long_poll_seconds() else getattr(settings, 'NOTIFICATION_POLL_INTERVAL', 30),
+    }
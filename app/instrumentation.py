@@ -0,0 +1,108 @@
+"""
+Query instrumentation for requests
+
+A QueryRecorder is installed with connection.execute_wrapper() and sees every
+query its connection runs. It keeps running totals per SQL fingerprint
+rather than a list of queries, so a request costs a dictionary update per
+query. QueryInstrumentationMiddleware uses it to emit Server-Timing headers
+and to log slow requests, slow queries and repeated query fingerprints
+(the signature of N+1 loops).
+"""
+import hashlib
+import json
+import logging
+import re
+import time
+from functools import lru_cache
+
+logger = logging.getLogger('app.queries')
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql):
+    """
+    Normalize SQL so queries that differ only in their values group together
+
+    Literals and placeholders become ?, and IN lists of any length become
+    IN (...), so an N+1 loop produces one fingerprint however many times it runs.
+    """
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _IN_LIST.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def fingerprint_id(normalized):
+    """Short stable id of a fingerprint, for grouping log lines"""
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+class QueryRecorder:
+    """
+    Execute wrapper that times queries and groups them by fingerprint
+
+    Args:
+        slow_query_ms: Queries at least this slow are kept for the slow-query log
+    """
+
+    def __init__(self, slow_query_ms=None):
+        self.slow_query_ms = slow_query_ms
+        self.count = 0
+        self.duration_ms = 0.0
+        self.duplicates = 0
+        self.slow_queries = []
+        # fingerprint -> [count, total ms]
+        self.fingerprints = {}
+        self._seen = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.count += 1
+            self.duration_ms += elapsed
+            key = (sql, None if many else repr(params))
+            if key in self._seen:
+                self.duplicates += 1
+            else:
+                self._seen.add(key)
+            normalized = fingerprint(sql)
+            totals = self.fingerprints.setdefault(normalized, [0, 0.0])
+            totals[0] += 1
+            totals[1] += elapsed
+            if self.slow_query_ms is not None and elapsed >= self.slow_query_ms:
+                self.slow_queries.append((normalized, elapsed))
+
+    def repeated(self, threshold):
+        """
+        Fingerprints that ran at least threshold times, most frequent first
+
+        Returns:
+            list: (fingerprint, count, total ms) tuples
+        """
+        return sorted(
+            ((normalized, count, total) for normalized, (count, total) in self.fingerprints.items() if count >= threshold),
+            key=lambda item: (-item[1], item[0]),
+        )
+
+    def server_timing(self, total_ms):
+        """Server-Timing header value with database and total time"""
+        return (
+            f'db;dur={self.duration_ms:.1f};desc="{self.count} queries, {self.duplicates} duplicated", '
+            f'total;dur={total_ms:.1f}'
+        )
+
+
+def log_event(event, level=logging.WARNING, **fields):
+    """Log one instrumentation event as a JSON line, also attached as record.instrumentation"""
+    payload = {'event': event, **fields}
+    logger.log(level, '%s %s', event, json.dumps(payload, sort_keys=True, default=str), extra={'instrumentation': payload})
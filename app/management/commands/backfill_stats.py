@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app import stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily statistics rollup used by official reports'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Recompute live counts and report differences without writing',
+        )
+        parser.add_argument(
+            '--entity',
+            action='append',
+            dest='entities',
+            help='Limit to an entity (repeatable), e.g. --entity application',
+        )
+
+    def handle(self, *args, **options):
+        entities = options['entities']
+        known = {rollup.entity for rollup in stats.ROLLUPS} | {stats.USER_ENTITY}
+        if entities:
+            unknown = set(entities) - known
+            if unknown:
+                raise CommandError(f'Unknown entities: {", ".join(sorted(unknown))}. Choose from: {", ".join(sorted(known))}')
+
+        if options['verify']:
+            mismatches = stats.verify(entities)
+            if not mismatches:
+                self.stdout.write(self.style.SUCCESS('✓ Statistics rollup matches live counts'))
+                return
+            for entity, status, day, stored, live in mismatches:
+                self.stdout.write(
+                    self.style.WARNING(f'⚠ {entity}/{status} on {day}: rollup={stored} live={live}')
+                )
+            raise CommandError(f'{len(mismatches)} statistics buckets have drifted. Run backfill_stats to repair them.')
+
+        buckets = stats.rebuild(entities)
+        self.stdout.write(self.style.SUCCESS(f'✓ Rebuilt {buckets} statistics buckets'))
@@ -0,0 +1,151 @@
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
+
+from app.models import (
+    Student, Mentor, Company, Institute, Position, Application, Internship
+)
+
+
+class Command(BaseCommand):
+    help = 'Compare dashboard stat blocks built from separate counts against single-pass aggregation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='Total rows to seed (default: 100000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per measurement (default: 5)')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            mentor = self.seed(options['rows'])
+            self.stdout.write(f"{'Dashboard':<18} {'Queries':>15} {'Median ms':>21}")
+            self.stdout.write(f"{'':<18} {'before':>7} {'after':>7} {'before':>10} {'after':>10}")
+            for name, before, after in self.dashboards(mentor):
+                before_queries, before_ms = self.measure(before, options['repeat'])
+                after_queries, after_ms = self.measure(after, options['repeat'])
+                if before() != after():
+                    self.stdout.write(self.style.ERROR(f'✗ {name}: results differ'))
+                self.stdout.write(
+                    f'{name:<18} {before_queries:>7} {after_queries:>7} {before_ms:>10.1f} {after_ms:>10.1f}'
+                )
+            # Never keep the benchmark rows
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('✓ Benchmark complete, seeded rows rolled back'))
+
+    def seed(self, rows):
+        """Seed rows split across the dashboard tables, attached to one mentor"""
+        self.stdout.write(f'Seeding {rows} rows...')
+        user = User.objects.create_user(username='benchmark_mentor', email='benchmark@example.com')
+        company = Company.objects.create(name='Benchmark Company', registration_status='approved')
+        mentor = Mentor.objects.create(user=user, company=company)
+        Student.objects.create(user=User.objects.create_user(username='benchmark_student'))
+
+        statuses = ['pending', 'approved', 'rejected', 'suspended']
+        Company.objects.bulk_create(
+            [Company(name=f'Company {i}', registration_status=statuses[i % 4],
+                     domain_verified=i % 3 == 0, is_verified=i % 2 == 0)
+             for i in range(rows // 10)],
+            batch_size=1000,
+        )
+        Institute.objects.bulk_create(
+            [Institute(name=f'Institute {i}', registration_status=statuses[i % 4], domain_verified=i % 3 == 0)
+             for i in range(rows // 10)],
+            batch_size=1000,
+        )
+        positions = Position.objects.bulk_create(
+            [Position(title=f'Position {i}', company=company, mentor=mentor, is_active=i % 4 != 0)
+             for i in range(rows // 5)],
+            batch_size=1000,
+        )
+        application_statuses = [choice for choice, label in Application.STATUS_CHOICES]
+        Application.objects.bulk_create(
+            [Application(position=positions[i % len(positions)], status=application_statuses[i % len(application_statuses)])
+             for i in range(rows * 2 // 5)],
+            batch_size=1000,
+        )
+        internship_statuses = [choice for choice, label in Internship.STATUS_CHOICES]
+        Internship.objects.bulk_create(
+            [Internship(mentor=mentor, status=internship_statuses[i % len(internship_statuses)])
+             for i in range(rows // 5)],
+            batch_size=1000,
+        )
+        return mentor
+
+    def measure(self, func, repeat):
+        """Run func repeatedly and return its query count and median wall time"""
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                func()
+                timings.append((time.perf_counter() - start) * 1000)
+        return len(context.captured_queries), statistics.median(timings)
+
+    def dashboards(self, mentor):
+        """Stat blocks of each dashboard, as (name, before, after) callables"""
+
+        def organization_before(model):
+            return lambda: {
+                'total': model.objects.count(),
+                'pending': model.objects.filter(registration_status='pending').count(),
+                'approved': model.objects.filter(registration_status='approved').count(),
+                'rejected': model.objects.filter(registration_status='rejected').count(),
+                'domain_verified': model.objects.filter(domain_verified=True).count(),
+            }
+
+        def organization_after(model):
+            def run():
+                counts = model.objects.status_breakdown()
+                return {key: counts[key] for key in ('total', 'pending', 'approved', 'rejected', 'domain_verified')}
+            return run
+
+        def official_before():
+            return {
+                'total_companies': Company.objects.count(),
+                'verified_companies': Company.objects.filter(is_verified=True).count(),
+                'total_positions': Position.objects.count(),
+                'active_positions': Position.objects.filter(is_active=True).count(),
+                'total_applications': Application.objects.count(),
+                'pending_applications': Application.objects.filter(status='pending').count(),
+                'active_internships': Internship.objects.filter(status='active').count(),
+                'completed_internships': Internship.objects.filter(status='completed').count(),
+            }
+
+        def official_after():
+            companies = Company.objects.counts_by(total=None, verified=Q(is_verified=True))
+            positions = Position.objects.counts_by(total=None, active=Q(is_active=True))
+            applications = Application.objects.counts_by(total=None, pending=Q(status='pending'))
+            internships = Internship.objects.counts_by(active=Q(status='active'), completed=Q(status='completed'))
+            return {
+                'total_companies': companies['total'],
+                'verified_companies': companies['verified'],
+                'total_positions': positions['total'],
+                'active_positions': positions['active'],
+                'total_applications': applications['total'],
+                'pending_applications': applications['pending'],
+                'active_internships': internships['active'],
+                'completed_internships': internships['completed'],
+            }
+
+        def mentor_interns_before():
+            internships = Internship.objects.filter(mentor=mentor)
+            return {
+                'total': internships.count(),
+                'active': internships.filter(status='active').count(),
+                'completed': internships.filter(status='completed').count(),
+            }
+
+        def mentor_interns_after():
+            counts = Internship.objects.filter(mentor=mentor).status_breakdown()
+            return {key: counts[key] for key in ('total', 'active', 'completed')}
+
+        return [
+            ('official_dashboard', official_before, official_after),
+            ('manage_companies', organization_before(Company), organization_after(Company)),
+            ('manage_institutes', organization_before(Institute), organization_after(Institute)),
+            ('mentor_interns', mentor_interns_before, mentor_interns_after),
+        ]
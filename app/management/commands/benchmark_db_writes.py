@@ -0,0 +1,215 @@
+"""
+Measure lock waits of concurrent writers, before and after the database tuning
+
+Each writer is a forked process with its own connection, like a gunicorn
+worker, and repeats the writes of apply_position (an application plus its
+position counter updates) and create_activity_log (a weekly log and its daily
+entries) in transactions. The "before" profile is the old configuration: the
+rollback journal, default pragmas, deferred transactions and a new connection
+per transaction. The "after" profile is DATABASES and SQLITE_PRAGMAS as
+configured. Runs happen in a scratch database created like the test database,
+so the configured database is never written to.
+
+Lock wait is the time a transaction took beyond the median of the same
+transactions run by a single writer.
+"""
+import multiprocessing
+import shutil
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.test.utils import override_settings
+
+from app.benchmarks import percentile
+from app.models import Application, Entry, Internship, Log, Position, Student
+
+PROFILES = ('before', 'after')
+
+# Logs are written for weeks no generated internship reaches
+FIRST_WEEK = date(2100, 1, 4)
+ENTRIES_PER_LOG = 5
+
+
+def write(task):
+    """Run one apply_position or create_activity_log transaction"""
+    kind, index, first, second = task
+    with transaction.atomic():
+        if kind == 'apply':
+            Application.objects.create(
+                student_id=first, position_id=second, status='pending', cover_letter='Stress test application',
+            )
+        else:
+            week_starting = FIRST_WEEK + timedelta(weeks=index)
+            log = Log.objects.create(internship_id=first, week_starting=week_starting)
+            for day in range(ENTRIES_PER_LOG):
+                Entry.objects.create(log=log, date=week_starting + timedelta(days=day), description='Stress test entry')
+
+
+def run_writer(arguments):
+    """
+    Run a writer's transactions in a forked process
+
+    Returns:
+        tuple: (milliseconds per transaction, number that failed on a lock)
+    """
+    tasks, reconnect = arguments
+    durations = []
+    locked = 0
+    for task in tasks:
+        start = time.perf_counter()
+        try:
+            write(task)
+        except OperationalError as error:
+            if 'locked' not in str(error) and 'busy' not in str(error):
+                raise
+            locked += 1
+        finally:
+            durations.append((time.perf_counter() - start) * 1000)
+            if reconnect:
+                connection.close()
+    connection.close()
+    return durations, locked
+
+
+class Command(BaseCommand):
+    help = 'Measure lock waits of concurrent writers before and after the database tuning'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8, help='Concurrent writer processes (default: 8)')
+        parser.add_argument(
+            '--transactions',
+            type=int,
+            default=50,
+            help='Transactions per writer (default: 50)',
+        )
+        parser.add_argument(
+            '--scale',
+            type=int,
+            default=50,
+            help='Students in the scratch database, see generate_load_data (default: 50)',
+        )
+        parser.add_argument('--profile', choices=PROFILES, action='append', dest='profiles', help='Only run a profile (repeatable)')
+
+    def handle(self, *args, **options):
+        writers, per_writer = options['writers'], options['transactions']
+        profiles = options['profiles'] or PROFILES
+        self.stdout.write(f'Creating a scratch {connection.vendor} database with {options["scale"]} students...')
+
+        with self.scratch_database():
+            call_command('generate_load_data', scale=options['scale'], stdout=StringIO())
+            # Each profile needs fresh rows: a serial pass and the concurrent run
+            tasks = self.tasks(len(profiles) * (per_writer + writers * per_writer))
+            self.stdout.write(
+                f"{'Profile':<8} {'Writers':>7} {'Txns':>6} {'Locked':>6} {'Txn/s':>7} "
+                f"{'p50 ms':>8} {'p95 ms':>8} {'Max ms':>8} {'Wait ms/txn':>11}"
+            )
+            for name in profiles:
+                serial, tasks = tasks[:per_writer], tasks[per_writer:]
+                concurrent, tasks = tasks[:writers * per_writer], tasks[writers * per_writer:]
+                with self.profile(name) as reconnect:
+                    [(serial_durations, _)] = self.run([serial], reconnect)
+                    batches = [concurrent[writer::writers] for writer in range(writers)]
+                    start = time.perf_counter()
+                    results = self.run(batches, reconnect)
+                    elapsed = time.perf_counter() - start
+                self.report(name, writers, statistics.median(serial_durations), results, elapsed)
+
+        self.stdout.write(self.style.SUCCESS('✓ Benchmark complete, scratch database removed'))
+
+    @contextmanager
+    def scratch_database(self):
+        """Create and migrate a throwaway database next to the configured one, like the test runner does"""
+        test_settings = connection.settings_dict['TEST']
+        original_test_name = test_settings.get('NAME')
+        directory = tempfile.mkdtemp()
+        if connection.vendor == 'sqlite':
+            # The test runner's default is in memory, which other processes cannot open
+            test_settings['NAME'] = str(Path(directory) / 'benchmark.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            yield
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings['NAME'] = original_test_name
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def tasks(self, count):
+        """
+        Alternate new applications and activity logs, with rows the database can take
+
+        Applications pair students with positions they have no active
+        application for, so the unique constraint never fires.
+        """
+        positions = list(Position.objects.order_by('pk').values_list('pk', flat=True))
+        students = list(Student.objects.order_by('pk').values_list('pk', flat=True))
+        internships = list(Internship.objects.order_by('pk').values_list('pk', flat=True))
+        taken = set(Application.objects.filter(
+            status__in=['pending', 'under_review', 'interview_scheduled', 'approved'],
+        ).values_list('student_id', 'position_id'))
+        pairs = ((student, position) for position in positions for student in students if (student, position) not in taken)
+
+        tasks = []
+        for index in range(count):
+            if index % 2:
+                tasks.append(('log', index, internships[index % len(internships)], None))
+            else:
+                pair = next(pairs, None)
+                if pair is None:
+                    raise CommandError('Not enough students and positions for that many applications, raise --scale')
+                tasks.append(('apply', index, *pair))
+        return tasks
+
+    @contextmanager
+    def profile(self, name):
+        """
+        Configure new connections for a profile
+
+        Yields:
+            bool: Whether writers reconnect for every transaction
+        """
+        options = connection.settings_dict['OPTIONS']
+        saved = dict(options)
+        if name == 'before':
+            options.pop('transaction_mode', None)
+            options.pop('pool', None)
+            pragmas = override_settings(SQLITE_PRAGMAS={'journal_mode': 'delete'})
+        else:
+            pragmas = override_settings()
+        try:
+            with pragmas:
+                # Open one connection first, so the journal mode is switched before writers start
+                connections.close_all()
+                connection.ensure_connection()
+                connection.close()
+                yield name == 'before'
+        finally:
+            options.clear()
+            options.update(saved)
+
+    def run(self, batches, reconnect):
+        """Run each batch of tasks in its own forked writer process"""
+        connections.close_all()
+        if hasattr(connection, 'close_pool'):
+            # Forked processes must not share the parent's pooled connections
+            connection.close_pool()
+        with multiprocessing.get_context('fork').Pool(len(batches)) as pool:
+            return pool.map(run_writer, [(batch, reconnect) for batch in batches], chunksize=1)
+
+    def report(self, name, writers, serial_median, results, elapsed):
+        durations = [duration for writer_durations, locked in results for duration in writer_durations]
+        locked = sum(locked for writer_durations, locked in results)
+        wait = sum(max(0.0, duration - serial_median) for duration in durations) / len(durations)
+        line = (
+            f'{name:<8} {writers:>7} {len(durations):>6} {locked:>6} {len(durations) / elapsed:>7.1f} '
+            f'{percentile(durations, 50):>8.1f} {percentile(durations, 95):>8.1f} {max(durations):>8.1f} {wait:>11.1f}'
+        )
+        self.stdout.write(self.style.ERROR(line) if locked else line)
@@ -0,0 +1,67 @@
+"""
+Measure building the skill matching index and scoring students against it
+
+Profiles are generated in memory, with skills drawn from a vocabulary whose
+word frequencies follow Zipf's law like real skill lists, so the database is
+never touched. Every student is scored against every indexed position.
+"""
+import random
+import statistics
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from app.benchmarks import percentile
+from app.matching import MatchIndex
+
+
+def profiles(count, vocabulary, skills, rng):
+    """Generate term counts with about `skills` words each"""
+    words = [f'skill{rank}' for rank in range(vocabulary)]
+    weights = [1 / (rank + 1) for rank in range(vocabulary)]
+    for _ in range(count):
+        yield Counter(rng.choices(words, weights, k=rng.randint(1, 2 * skills)))
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the skill matching index on generated students and positions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=100_000, help='Students to score (default 100000)')
+        parser.add_argument('--positions', type=int, default=10_000, help='Positions to index (default 10000)')
+        parser.add_argument('--vocabulary', type=int, default=2_000, help='Distinct skills (default 2000)')
+        parser.add_argument('--skills', type=int, default=6, help='Average skills per profile (default 6)')
+        parser.add_argument('--limit', type=int, default=5, help='Matches kept per student (default 5)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        vocabulary, skills = options['vocabulary'], options['skills']
+
+        start = time.perf_counter()
+        index = MatchIndex()
+        for pk, counts in enumerate(profiles(options['positions'], vocabulary, skills, rng)):
+            index.add(pk, counts)
+        index.matrix  # Compile the arrays
+        build_seconds = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Indexed {len(index)} positions over {len(index.postings)} skills in {build_seconds:.2f}s'
+        ))
+
+        durations = []
+        matched = 0
+        for counts in profiles(options['students'], vocabulary, skills, rng):
+            start = time.perf_counter()
+            matched += bool(index.top(counts, options['limit']))
+            durations.append((time.perf_counter() - start) * 1000)
+        total = sum(durations) / 1000
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Scored {len(durations)} students × {len(index)} positions in {total:.2f}s '
+            f'({len(durations) / total:.0f} students/s)'
+        ))
+        self.stdout.write(
+            f'  per student: median {statistics.median(durations):.3f}ms, '
+            f'p95 {percentile(durations, 95):.3f}ms, max {max(durations):.3f}ms; '
+            f'{matched} students had at least one match'
+        )
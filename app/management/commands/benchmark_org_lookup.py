@@ -0,0 +1,99 @@
+import json
+import statistics
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from app.models import Institute
+from app.utils import get_available_institutes_for_user, invalidate_available_organizations
+
+FIXTURE = Path(__file__).resolve().parents[2] / 'fixtures' / 'institutes.json'
+
+# Every Nth copy of an institute gets a verified domain of its own
+VERIFIED_EVERY = 10
+
+
+class User:
+    """Just enough of a user for the lookup functions"""
+
+    def __init__(self, email):
+        self.email = email
+
+
+class Command(BaseCommand):
+    help = 'Compare the per-institute eligibility loop against the indexed, cached domain lookup'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=100, help='Copies of the institutes fixture (default: 100)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per measurement (default: 5)')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options['scale'])
+            users = {
+                'verified domain': User('student@campus10.edu.pk'),
+                'other domain': User('student@gmail.com'),
+            }
+            self.stdout.write(f"{'User':<16} {'Institutes':>10} {'Queries':>23} {'Median ms':>33}")
+            self.stdout.write(
+                f"{'':<16} {'':>10} {'before':>7} {'cold':>7} {'cached':>7} "
+                f"{'before':>10} {'cold':>10} {'cached':>10}"
+            )
+            for label, user in users.items():
+                before = lambda: list(self.loop_lookup(user))
+
+                def cold():
+                    invalidate_available_organizations(Institute)
+                    return list(get_available_institutes_for_user(user))
+
+                cached = lambda: list(get_available_institutes_for_user(user))
+
+                if {i.pk for i in before()} != {i.pk for i in cold()}:
+                    self.stdout.write(self.style.ERROR(f'✗ {label}: results differ'))
+                results = [self.measure(func, options['repeat']) for func in (before, cold, cached)]
+                self.stdout.write(
+                    f'{label:<16} {len(cached()):>10} '
+                    + ' '.join(f'{queries:>7}' for queries, _ in results) + ' '
+                    + ' '.join(f'{ms:>10.1f}' for _, ms in results)
+                )
+            # Never keep the benchmark rows
+            transaction.set_rollback(True)
+        invalidate_available_organizations(Institute)
+        self.stdout.write(self.style.SUCCESS('✓ Benchmark complete, seeded rows rolled back'))
+
+    def seed(self, scale):
+        """Copy the institutes fixture scale times, verifying a domain on some copies"""
+        records = [record['fields'] for record in json.loads(FIXTURE.read_text())]
+        self.stdout.write(f'Seeding {len(records) * scale} institutes...')
+        skip = {'nanoid', 'registered_by', 'approved_by'}
+        institutes = []
+        for copy in range(scale):
+            for fields in records:
+                institute = Institute(**{name: value for name, value in fields.items() if name not in skip})
+                if copy % VERIFIED_EVERY == 0:
+                    institute.email_domain = f'campus{copy}.edu.pk'
+                    institute.domain_verified = True
+                institutes.append(institute)
+        Institute.objects.bulk_create(institutes, batch_size=1000)
+
+    def loop_lookup(self, user):
+        """The lookup profile pages used before the indexed domain column"""
+        available = []
+        for institute in Institute.objects.filter(registration_status='approved'):
+            if not institute.domain_verified or institute.is_email_from_institute(user.email):
+                available.append(institute.pk)
+        return Institute.objects.filter(pk__in=available)
+
+    def measure(self, func, repeat):
+        """Run func repeatedly and return its query count and median wall time"""
+        with CaptureQueriesContext(connection) as context:
+            func()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return len(context.captured_queries), statistics.median(timings)
@@ -0,0 +1,95 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from app import search
+from app.models import Company, Position
+
+ROLES = ['Software', 'Data', 'Marketing', 'Design', 'Finance', 'Research', 'Operations', 'Content']
+TITLES = ['Intern', 'Developer', 'Analyst', 'Engineer', 'Associate', 'Assistant']
+SKILLS = [
+    'python', 'django', 'react', 'javascript', 'sql', 'excel', 'figma', 'seo', 'accounting',
+    'statistics', 'machine learning', 'communication', 'writing', 'flutter', 'kotlin', 'aws',
+]
+CITIES = ['Lahore', 'Karachi', 'Islamabad', 'Peshawar', 'Quetta', 'Multan']
+TERMS = ['python', 'data analyst', 'react developer', 'marketing lahore', 'machine learning engineer', 'blockchain']
+
+
+class Command(BaseCommand):
+    help = 'Compare icontains position search against the full-text index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000, help='Positions to seed (default: 50000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per term (default: 5)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Search backend: {search.get_backend().name}')
+        with transaction.atomic():
+            self.seed(options['rows'])
+            self.stdout.write(f"{'Term':<26} {'Matches':>15} {'Median ms':>21}")
+            self.stdout.write(f"{'':<26} {'before':>7} {'after':>7} {'before':>10} {'after':>10}")
+            for term in TERMS:
+                before_count, before_ms = self.measure(lambda: self.icontains(term), options['repeat'])
+                after_count, after_ms = self.measure(lambda: self.full_text(term), options['repeat'])
+                self.stdout.write(
+                    f'{term:<26} {before_count:>7} {after_count:>7} {before_ms:>10.1f} {after_ms:>10.1f}'
+                )
+            # Never keep the benchmark rows
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('✓ Benchmark complete, seeded rows rolled back'))
+
+    def seed(self, rows):
+        """Seed positions with generated titles and descriptions, then index them"""
+        self.stdout.write(f'Seeding {rows} positions...')
+        rng = random.Random(42)
+        companies = Company.objects.bulk_create(
+            [Company(name=f'{rng.choice(ROLES)} Company {i}', registration_status='approved')
+             for i in range(max(rows // 50, 1))]
+        )
+        positions = []
+        for i in range(rows):
+            skills = rng.sample(SKILLS, 3)
+            city = rng.choice(CITIES)
+            positions.append(Position(
+                title=f'{rng.choice(ROLES)} {rng.choice(TITLES)}',
+                company=rng.choice(companies),
+                skills_required=', '.join(skills),
+                description=(
+                    f'Join our team in {city} to work on {skills[0]} projects. '
+                    f'You will use {skills[1]} and {skills[2]} every day alongside experienced mentors.'
+                ),
+            ))
+        Position.objects.bulk_create(positions, batch_size=1000)
+        start = time.perf_counter()
+        indexed = search.rebuild(Position.objects.all())
+        self.stdout.write(f'Indexed {indexed} positions in {time.perf_counter() - start:.1f}s')
+
+    def icontains(self, term):
+        """The search browse_positions used before the full-text index"""
+        positions = Position.objects.filter(is_active=True).filter(
+            Q(title__icontains=term) |
+            Q(company__name__icontains=term) |
+            Q(description__icontains=term)
+        ).order_by('-created_at')
+        return positions.count(), list(positions[:12])
+
+    def full_text(self, term):
+        positions = search.search_positions(
+            Position.objects.filter(is_active=True), term
+        ).order_by('-search_rank', '-created_at')
+        page = list(positions[:12])
+        search.attach_snippets(page, term)
+        return positions.count(), page
+
+    def measure(self, func, repeat):
+        """Run func repeatedly and return its match count and median wall time"""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            count, page = func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return count, statistics.median(timings)
@@ -0,0 +1,104 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from app import benchmarks
+from app.management.commands.generate_load_data import USERNAME_PREFIX
+from app.roles import USER_TYPES
+
+SORT_METRICS = ('p95_ms', 'p50_ms', 'queries', 'duplicates', 'bytes')
+
+
+class Command(BaseCommand):
+    help = 'Benchmark every URL as each role and rank the slowest endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=int,
+            default=200,
+            help='Students to generate when the database has no load data, as in the committed baseline (default: 200)',
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Seed for generated load data (default: 42)')
+        parser.add_argument('--repeat', type=int, default=5, help='Recorded requests per endpoint (default: 5)')
+        parser.add_argument('--role', action='append', dest='roles', choices=USER_TYPES, help='Limit to a role (repeatable)')
+        parser.add_argument('--route', action='append', dest='routes', help='Limit to a route name (repeatable)')
+        parser.add_argument('--sort', choices=SORT_METRICS, default='p95_ms', help='Metric to rank endpoints by (default: p95_ms)')
+        parser.add_argument('--limit', type=int, default=20, help='Endpoints to show, 0 for all (default: 20)')
+        parser.add_argument('--baseline', default=str(benchmarks.BASELINE_PATH), help='Baseline JSON file')
+        parser.add_argument(
+            '--update-baseline',
+            action='store_true',
+            help='Record the results as the new baseline',
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Fail when an endpoint regresses past the baseline budget',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            scale = User.objects.filter(username__startswith=f'{USERNAME_PREFIX}student_').count()
+            seed = None
+            if scale:
+                self.stdout.write(f'Benchmarking against the existing load data ({scale} students)...')
+            else:
+                scale, seed = options['scale'], options['seed']
+                self.stdout.write(f'Generating load data for {scale} students...')
+                call_command('generate_load_data', scale=scale, seed=seed, stdout=StringIO())
+            results = benchmarks.run(options['repeat'], options['roles'] or USER_TYPES, options['routes'])
+            # Never keep the generated rows or anything a view wrote
+            transaction.set_rollback(True)
+
+        self.report(results, options['sort'], options['limit'])
+
+        if options['update_baseline']:
+            budget = None
+            try:
+                budget = benchmarks.load_baseline(options['baseline']).get('budget')
+            except FileNotFoundError:
+                pass
+            benchmarks.save_baseline(results, scale, seed, options['baseline'], budget)
+            self.stdout.write(self.style.SUCCESS(f'✓ Recorded {len(results)} endpoints in {options["baseline"]}'))
+
+        if options['check']:
+            self.check_baseline(results, options['baseline'], scale, seed)
+
+    def report(self, results, sort, limit):
+        """Print endpoints from worst to best by the chosen metric"""
+        ranked = sorted(results.items(), key=lambda item: item[1][sort], reverse=True)
+        if limit:
+            ranked = ranked[:limit]
+        self.stdout.write(
+            f"{'#':>3} {'Endpoint':<48} {'Status':>6} {'Queries':>7} {'Dupes':>5} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'KB':>7}"
+        )
+        for rank, (key, result) in enumerate(ranked, 1):
+            line = (
+                f"{rank:>3} {key:<48} {result['status']:>6} {result['queries']:>7} {result['duplicates']:>5} "
+                f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['bytes'] / 1024:>7.1f}"
+            )
+            self.stdout.write(self.style.ERROR(line) if result['status'] >= 500 else line)
+
+    def check_baseline(self, results, path, scale, seed):
+        try:
+            baseline = benchmarks.load_baseline(path)
+        except FileNotFoundError:
+            raise CommandError(f'No baseline at {path}. Record one with --update-baseline.')
+        if (baseline['scale'], baseline['seed']) != (scale, seed):
+            raise CommandError(
+                f'The baseline was recorded at scale {baseline["scale"]} with seed {baseline["seed"]}. '
+                f'Benchmark the same data to compare.'
+            )
+
+        breaches = benchmarks.regressions(results, baseline)
+        if not breaches:
+            self.stdout.write(self.style.SUCCESS(f'✓ {len(results)} endpoints are within the baseline budget'))
+            return
+        for key, metric, expected, limit, actual in breaches:
+            self.stdout.write(self.style.ERROR(f'✗ {key}: {metric} {actual} (baseline {expected}, budget {limit})'))
+        raise CommandError(f'{len(breaches)} budget breaches. Fix the regressions or record a new baseline with --update-baseline.')
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from app import docs
+
+
+class Command(BaseCommand):
+    help = 'Pre-render the documentation pages into STATIC_ROOT, run after collectstatic'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--static-root', help='Directory to build under (default: STATIC_ROOT)')
+        parser.add_argument('--no-compress', action='store_true', help='Skip the gzip/brotli variants')
+
+    def handle(self, *args, **options):
+        manifest = docs.build(options['static_root'], compress=not options['no_compress'])
+        root = docs.bundle_root(options['static_root'])
+        for key, name in manifest.items():
+            variants = [suffix for encoding, suffix in docs.ENCODINGS if (root / (name + suffix)).is_file()]
+            self.stdout.write(f'  {key:<40} {name}{" " + " ".join(variants) if variants else ""}')
+        self.stdout.write(self.style.SUCCESS(f'✓ Built {len(manifest)} documentation pages in {root}'))
@@ -0,0 +1,629 @@
+"""
+Generate a large, deterministic dataset for performance testing
+
+Rows are produced by generators and written with bulk_create in chunks, so
+memory stays flat however large --scale is: only the keys that later tables
+point at are kept, and dependent rows are streamed back from the database.
+bulk_create skips save() and signals, so the position counters, statistics
+rollup and search index are rebuilt once at the end instead of row by row.
+"""
+import random
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, time as day_time, timedelta
+from decimal import Decimal
+from itertools import accumulate, islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from nanoid.resources import alphabet as NANOID_ALPHABET
+
+from app import search, stats
+from app.models import (
+    Institute, Company, Student, Mentor, Teacher, Official, Position,
+    Application, Internship, Report, Log, Entry, Assessment, Evaluation,
+    Notification, NOTIFICATION_TEMPLATES,
+)
+from app.roles import USER_TYPES
+from app.utils import invalidate_available_organizations
+
+# Every generated username starts with this, which is how reruns are detected
+USERNAME_PREFIX = 'load_'
+PASSWORD = 'loadtest123'
+
+# Rows are spread over this many days before now
+HISTORY_DAYS = 365
+
+# Table sizes relative to --scale, the number of students
+STUDENTS_PER_INSTITUTE = 500
+STUDENTS_PER_COMPANY = 100
+STUDENTS_PER_POSITION = 10
+STUDENTS_PER_OFFICIAL = 20000
+TEACHERS_PER_INSTITUTE = 5
+APPLICATIONS_PER_STUDENT = 10
+
+# Districts with the most institutes first, weights fall off with rank
+MAJOR_DISTRICTS = ['Peshawar', 'Mardan', 'Swat', 'Abbottabad', 'Mansehra', 'D.I.Khan', 'Kohat', 'Nowshera']
+
+ORGANIZATION_STATUSES = {'approved': 70, 'pending': 15, 'rejected': 10, 'suspended': 5}
+APPLICATION_STATUSES = {
+    'pending': 35, 'under_review': 15, 'interview_scheduled': 5,
+    'approved': 15, 'rejected': 25, 'withdrawn': 5,
+}
+MAX_STUDENTS = {1: 45, 2: 25, 3: 15, 5: 10, 10: 5}
+FINISHED_INTERNSHIP_STATUSES = {'completed': 85, 'terminated': 10, 'on_hold': 5}
+ASSESSMENT_RATINGS = {1: 5, 2: 20, 3: 50, 4: 25}
+EXPERIENCE_RATINGS = {'excellent': 30, 'good': 45, 'average': 20, 'poor': 5}
+
+FIRST_NAMES = [
+    'Ahmed', 'Ali', 'Ayesha', 'Bilal', 'Fatima', 'Hamza', 'Hina', 'Imran', 'Iqra', 'Junaid',
+    'Khadija', 'Maryam', 'Naveed', 'Omar', 'Rabia', 'Saad', 'Sana', 'Usman', 'Zainab', 'Zubair',
+]
+LAST_NAMES = [
+    'Afridi', 'Bangash', 'Durrani', 'Gul', 'Jadoon', 'Khan', 'Khattak', 'Marwat', 'Mohmand',
+    'Orakzai', 'Qureshi', 'Shah', 'Swati', 'Tareen', 'Wazir', 'Yousafzai',
+]
+MAJORS = [
+    'Computer Science', 'Software Engineering', 'Electrical Engineering', 'Business Administration',
+    'Accounting and Finance', 'Civil Engineering', 'Data Science', 'Mass Communication',
+]
+INDUSTRIES = [
+    'Information Technology', 'Telecommunications', 'Banking', 'Energy', 'Construction',
+    'Healthcare', 'Marketing', 'Manufacturing', 'Education', 'Logistics',
+]
+POSITION_TITLES = [
+    'Software Developer', 'Web Developer', 'Data Analyst', 'Network Engineer', 'Marketing Associate',
+    'Finance Assistant', 'HR Assistant', 'Site Engineer', 'QA Engineer', 'Content Writer',
+    'Mobile App Developer', 'Business Analyst',
+]
+SKILLS = [
+    'Python', 'Django', 'JavaScript', 'React', 'SQL', 'Excel', 'Accounting', 'AutoCAD', 'Networking',
+    'Linux', 'Communication', 'Teamwork', 'Writing', 'Data Analysis', 'Machine Learning', 'Flutter',
+]
+DEPARTMENTS = ['Engineering', 'Computer Science', 'Management Sciences', 'Electrical Engineering', 'Economics']
+ACTIVITIES = [
+    'Attended the team stand-up and planned tasks for the day',
+    'Fixed reported bugs and wrote tests for the changes',
+    'Shadowed my mentor during a client meeting',
+    'Prepared a report on last week\'s progress',
+    'Worked on the assigned feature and opened it for review',
+    'Completed training on internal tools and processes',
+    'Collected and cleaned data for the monthly analysis',
+]
+
+
+def weighted(weights):
+    """Precompute (values, cumulative weights) for repeated weighted picks"""
+    return list(weights), list(accumulate(weights.values()))
+
+
+def ranked(values, exponent=1.0):
+    """Weight values by rank so a few of them are picked far more often than the rest"""
+    return weighted({value: 1 / (rank + 1) ** exponent for rank, value in enumerate(values)})
+
+
+def month_starts(start, end):
+    """First day of every month from start's month through end"""
+    month = start.replace(day=1)
+    while month <= end:
+        yield month
+        month = (month + timedelta(days=32)).replace(day=1)
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let bulk_create keep generated values of auto_now_add fields instead of stamping now"""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = 'Generate a large deterministic dataset for performance benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            type=int,
+            default=1000,
+            help='Number of students; the other tables are sized from it (default: 1000)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed, the same seed and scale always generate the same rows (default: 42)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Rows written per INSERT (default: 2000)',
+        )
+
+    def handle(self, *args, **options):
+        scale = options['scale']
+        if scale < 1:
+            raise CommandError('--scale must be at least 1')
+        if User.objects.filter(username__startswith=USERNAME_PREFIX).exists():
+            raise CommandError('Load data already exists. Generate it into a fresh database so benchmarks stay comparable.')
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.today = timezone.localdate(self.now)
+        # Hashing is deliberately slow, so every generated user shares one hash
+        self.password = make_password(PASSWORD)
+        self.groups = {name: Group.objects.get_or_create(name=name)[0].pk for name in USER_TYPES}
+        self.counts = defaultdict(int)
+
+        self.stdout.write(f'Generating load data for {scale} students (seed {options["seed"]})...')
+        started = time.perf_counter()
+        timestamped = (Institute, Company, Position, Application, Internship, Report, Log, Assessment, Evaluation, Notification)
+        with transaction.atomic(), explicit_timestamps(*timestamped):
+            self.generate(scale)
+            self.stdout.write('Rebuilding position counters, statistics and search index...')
+            self.rebuild_derived_data()
+
+        for name, count in self.counts.items():
+            self.stdout.write(f'  {count:>10} {name}')
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ Generated {sum(self.counts.values())} rows in {time.perf_counter() - started:.1f}s'
+        ))
+
+    def generate(self, scale):
+        """Write every table in dependency order"""
+        institutes = self.keep(Institute, self.institutes(max(3, scale // STUDENTS_PER_INSTITUTE)),
+                               lambda institute: (institute.pk, institute.email_domain, institute.registration_status))
+        companies = self.keep(Company, self.companies(max(3, scale // STUDENTS_PER_COMPANY)),
+                              lambda company: (company.pk, company.email_domain, company.registration_status))
+        # Students and staff belong to approved organizations, unless a tiny scale approved none
+        institutes = [row[:2] for row in institutes if row[2] == 'approved'] or [row[:2] for row in institutes]
+        companies = [row[:2] for row in companies if row[2] == 'approved'] or [row[:2] for row in companies]
+
+        students = self.keep_people('student', Student, self.students(scale, institutes), lambda student: student.pk)
+        teachers = defaultdict(list)
+        for institute_id, teacher_id in self.keep_people('teacher', Teacher, self.teachers(institutes),
+                                                         lambda teacher: (teacher.institute_id, teacher.pk)):
+            teachers[institute_id].append(teacher_id)
+        mentors = defaultdict(list)
+        for company_id, mentor_id in self.keep_people('mentor', Mentor, self.mentors(companies),
+                                                      lambda mentor: (mentor.company_id, mentor.pk)):
+            mentors[company_id].append(mentor_id)
+        self.keep_people('official', Official, self.officials(max(2, scale // STUDENTS_PER_OFFICIAL)), lambda official: None)
+
+        positions = self.keep(Position, self.positions(max(10, scale // STUDENTS_PER_POSITION), companies, mentors),
+                              lambda position: (position.pk, position.created_at, position.max_students))
+        self.insert_all(Application, self.applications(students, positions))
+        del students, positions
+
+        self.insert_all(Internship, self.internships(teachers))
+        for logs in self.insert(Log, self.logs()):
+            self.insert_all(Entry, self.entries(logs))
+        self.insert_all(Report, self.reports())
+        self.insert_all(Assessment, self.assessments())
+        self.insert_all(Evaluation, self.evaluations())
+        self.insert_all(Notification, self.notifications())
+
+    def rebuild_derived_data(self):
+        """Recompute what signal handlers would have maintained for rows saved one at a time"""
+        Position.objects.reconcile_application_counters()
+        stats.rebuild()
+        if not isinstance(search.get_backend(), search.FallbackBackend):
+            search.rebuild(Position.objects.all())
+        invalidate_available_organizations(Institute)
+        invalidate_available_organizations(Company)
+
+    # Writing
+
+    def insert(self, model, objects):
+        """Bulk insert a stream of unsaved instances, yielding each saved chunk"""
+        objects = iter(objects)
+        while chunk := list(islice(objects, self.batch_size)):
+            model.objects.bulk_create(chunk)
+            self.counts[model._meta.verbose_name_plural] += len(chunk)
+            yield chunk
+
+    def insert_all(self, model, objects):
+        for chunk in self.insert(model, objects):
+            pass
+
+    def keep(self, model, objects, key):
+        """Bulk insert a stream of instances and return key(instance) of each saved one"""
+        return [key(instance) for chunk in self.insert(model, objects) for instance in chunk]
+
+    def keep_people(self, role, model, people, key):
+        """
+        Bulk insert profiles together with their users and role group
+
+        Args:
+            role: Group the users join
+            model: Profile model
+            people: Iterable of unsaved (User, profile) pairs
+            key: Function of a saved profile whose results are returned
+
+        Returns:
+            list: key(profile) of every saved profile
+        """
+        memberships = User.groups.through
+        people = iter(people)
+        kept = []
+        while chunk := list(islice(people, self.batch_size)):
+            users = User.objects.bulk_create([user for user, profile in chunk])
+            memberships.objects.bulk_create([memberships(user_id=user.pk, group_id=self.groups[role]) for user in users])
+            for user, profile in chunk:
+                profile.user = user
+            model.objects.bulk_create([profile for user, profile in chunk])
+            self.counts[User._meta.verbose_name_plural] += len(chunk)
+            self.counts[model._meta.verbose_name_plural] += len(chunk)
+            kept.extend(key(profile) for user, profile in chunk)
+        return kept
+
+    # Random values
+
+    def pick(self, table):
+        values, cum_weights = table
+        return self.rng.choices(values, cum_weights=cum_weights)[0]
+
+    def nanoid(self, size=12):
+        return ''.join(self.rng.choices(NANOID_ALPHABET, k=size))
+
+    def moment(self, after=None, days=HISTORY_DAYS):
+        """A random time within days after the given time, or within the history window, never in the future"""
+        start = after or self.now - timedelta(days=days)
+        return min(self.now, start + timedelta(seconds=self.rng.randrange(days * 24 * 60 * 60)))
+
+    def day_moment(self, day):
+        """A random time during the working hours of a day, never in the future"""
+        start = timezone.make_aware(datetime.combine(day, day_time(9)))
+        return min(self.now, start + timedelta(seconds=self.rng.randrange(9 * 60 * 60)))
+
+    def person(self, role, number, domain):
+        first_name = self.rng.choice(FIRST_NAMES)
+        last_name = self.rng.choice(LAST_NAMES)
+        username = f'{USERNAME_PREFIX}{role}_{number}'
+        return User(
+            username=username,
+            email=f'{username}@{domain}',
+            first_name=first_name,
+            last_name=last_name,
+            password=self.password,
+            date_joined=self.moment(),
+        )
+
+    def phone(self):
+        return f'03{self.rng.randrange(10 ** 9):09d}'
+
+    # Rows
+
+    def institutes(self, count):
+        districts = [value for value, label in Institute._meta.get_field('district').choices]
+        districts = ranked(MAJOR_DISTRICTS + [district for district in districts if district not in MAJOR_DISTRICTS], 0.8)
+        statuses = weighted(ORGANIZATION_STATUSES)
+        for i in range(count):
+            district = self.pick(districts)
+            status = self.pick(statuses)
+            male = self.rng.randint(200, 20000)
+            yield Institute(
+                nanoid=self.nanoid(10),
+                name=f'{district} {self.rng.choice(["University", "College", "Institute of Technology"])} {i}',
+                district=district,
+                address=f'{self.rng.randint(1, 500)} University Road, {district}',
+                website=f'https://institute{i}.edu.pk',
+                contact_email=f'info@institute{i}.edu.pk',
+                phone=self.phone(),
+                email_domain=f'institute{i}.edu.pk',
+                domain_verified=self.rng.random() < 0.4,
+                registration_status=status,
+                approved_at=self.now if status == 'approved' else None,
+                male_students_count=male,
+                female_students_count=int(male * self.rng.uniform(0.3, 1.2)),
+                degree_programs=True,
+                postgraduate_programs=self.rng.random() < 0.5,
+                management_programs=self.rng.random() < 0.3,
+                primary_education_level=self.rng.choice(['Degree', 'PostGraduate', 'Management']),
+                created_at=self.moment(),
+            )
+
+    def companies(self, count):
+        statuses = weighted(ORGANIZATION_STATUSES)
+        for i in range(count):
+            industry = self.rng.choice(INDUSTRIES)
+            status = self.pick(statuses)
+            yield Company(
+                nanoid=self.nanoid(10),
+                name=f'{self.rng.choice(LAST_NAMES)} {industry} {i}',
+                description=f'{industry} company offering internships to students across the province.',
+                industry=industry,
+                address=f'{self.rng.randint(1, 500)} Business Avenue, Peshawar',
+                website=f'https://company{i}.com.pk',
+                contact_email=f'careers@company{i}.com.pk',
+                phone=self.phone(),
+                email_domain=f'company{i}.com.pk',
+                domain_verified=self.rng.random() < 0.4,
+                registration_status=status,
+                approved_at=self.now if status == 'approved' else None,
+                is_verified=status == 'approved',
+                created_at=self.moment(),
+            )
+
+    def students(self, count, institutes):
+        institutes = ranked(institutes, 0.8)
+        for i in range(count):
+            institute_id, domain = self.pick(institutes)
+            yield self.person('student', i, domain), Student(
+                nanoid=self.nanoid(),
+                institute_id=institute_id,
+                student_id=f'{institute_id}-{i:06d}',
+                semester_of_study=self.rng.choice(['4', '5', '6', '7', '8']),
+                major=self.rng.choice(MAJORS),
+                gpa=Decimal(self.rng.randint(200, 400)) / 100,
+                skills=', '.join(self.rng.sample(SKILLS, self.rng.randint(3, 6))),
+                expected_graduation=self.today + timedelta(days=self.rng.randint(90, 730)),
+                phone=self.phone(),
+            )
+
+    def teachers(self, institutes):
+        number = 0
+        for institute_id, domain in institutes:
+            for _ in range(TEACHERS_PER_INSTITUTE):
+                yield self.person('teacher', number, domain), Teacher(
+                    nanoid=self.nanoid(),
+                    institute_id=institute_id,
+                    department=self.rng.choice(DEPARTMENTS),
+                    title=self.rng.choice(['Lecturer', 'Assistant Professor', 'Associate Professor', 'Professor']),
+                    employee_id=f'T-{number:06d}',
+                    phone=self.phone(),
+                )
+                number += 1
+
+    def mentors(self, companies):
+        number = 0
+        for company_id, domain in companies:
+            for index in range(self.rng.randint(1, 3)):
+                yield self.person('mentor', number, domain), Mentor(
+                    nanoid=self.nanoid(),
+                    company_id=company_id,
+                    job_title=self.rng.choice(['Team Lead', 'Senior Engineer', 'HR Manager', 'Project Manager']),
+                    department=self.rng.choice(DEPARTMENTS),
+                    experience_years=self.rng.randint(3, 20),
+                    specialization=self.rng.choice(SKILLS),
+                    is_verified=True,
+                    phone=self.phone(),
+                    is_admin_contact=index == 0,
+                )
+                number += 1
+
+    def officials(self, count):
+        for i in range(count):
+            yield self.person('official', i, 'kp.gov.pk'), Official(
+                nanoid=self.nanoid(),
+                department='Higher Education Department',
+                job_title='Internship Program Officer',
+                employee_id=f'O-{i:06d}',
+                phone=self.phone(),
+            )
+
+    def positions(self, count, companies, mentors):
+        companies = ranked([company_id for company_id, domain in companies], 0.8)
+        max_students = weighted(MAX_STUDENTS)
+        for i in range(count):
+            company_id = self.pick(companies)
+            title = self.rng.choice(POSITION_TITLES)
+            skills = self.rng.sample(SKILLS, self.rng.randint(2, 5))
+            duration = self.rng.choice(['2', '3', '4', '6'])
+            created_at = self.moment()
+            start_date = timezone.localdate(created_at) + timedelta(days=self.rng.randint(14, 60))
+            yield Position(
+                nanoid=self.nanoid(),
+                company_id=company_id,
+                mentor_id=self.rng.choice(mentors[company_id]),
+                title=f'{title} Intern',
+                description=f'Join our team as a {title.lower()} intern and work on real projects using {", ".join(skills)}.',
+                requirements=f'Students of semester 5 or above with an interest in {skills[0]}.',
+                skills_required=', '.join(skills),
+                duration=duration,
+                start_date=start_date,
+                end_date=start_date + timedelta(days=30 * int(duration)),
+                stipend=Decimal(self.rng.randrange(0, 60001, 5000)),
+                max_students=self.pick(max_students),
+                is_active=self.rng.random() < 0.75,
+                created_at=created_at,
+            )
+
+    def applications(self, students, positions):
+        """Applications of every student; popular positions get far more, and approvals stop at capacity"""
+        popular = ranked(range(len(positions)), 0.5)
+        statuses = weighted(APPLICATION_STATUSES)
+        approved = [0] * len(positions)
+        for student_id in students:
+            count = min(self.rng.randint(0, 2 * APPLICATIONS_PER_STUDENT), len(positions))
+            chosen = []
+            while len(chosen) < count:
+                index = self.pick(popular)
+                if index not in chosen:
+                    chosen.append(index)
+            for index in chosen:
+                position_id, created_at, max_students = positions[index]
+                status = self.pick(statuses)
+                if status == 'approved':
+                    if approved[index] < max_students:
+                        approved[index] += 1
+                    else:
+                        status = 'rejected'
+                applied_at = self.moment(created_at, days=60)
+                yield Application(
+                    nanoid=self.nanoid(14),
+                    student_id=student_id,
+                    position_id=position_id,
+                    cover_letter='I would like to apply for this internship to gain practical experience in my field.',
+                    status=status,
+                    applied_at=applied_at,
+                    reviewed_at=None if status == 'pending' else self.moment(applied_at, days=14),
+                )
+
+    def internships(self, teachers):
+        """An internship for every approved application, supervised by a teacher from the student's institute"""
+        approved = Application.objects.filter(
+            status='approved', student__user__username__startswith=USERNAME_PREFIX,
+        ).order_by('pk').values_list(
+            'pk', 'student_id', 'student__institute_id', 'position__mentor_id', 'position__duration', 'reviewed_at',
+        )
+        finished_statuses = weighted(FINISHED_INTERNSHIP_STATUSES)
+        for application_id, student_id, institute_id, mentor_id, duration, reviewed_at in approved.iterator(self.batch_size):
+            start_date = timezone.localdate(reviewed_at) + timedelta(days=self.rng.randint(7, 30))
+            end_date = start_date + timedelta(days=30 * int(duration or 2))
+            if end_date < self.today:
+                status = self.pick(finished_statuses)
+            else:
+                status = 'on_hold' if self.rng.random() < 0.05 else 'active'
+            completed = status == 'completed'
+            certificate_issued = completed and self.rng.random() < 0.8
+            yield Internship(
+                nanoid=self.nanoid(),
+                application_id=application_id,
+                student_id=student_id,
+                mentor_id=mentor_id,
+                teacher_id=self.rng.choice(teachers[institute_id]) if teachers[institute_id] else None,
+                start_date=start_date,
+                end_date=end_date,
+                status=status,
+                final_grade=self.rng.choice(['A', 'B+', 'B', 'C+', 'C']) if completed else '',
+                certificate_issued=certificate_issued,
+                certificate_date=end_date + timedelta(days=self.rng.randint(1, 14)) if certificate_issued else None,
+                created_at=reviewed_at,
+            )
+
+    def generated_internships(self, *fields):
+        return Internship.objects.filter(
+            student__user__username__startswith=USERNAME_PREFIX,
+        ).order_by('pk').values_list('pk', 'start_date', 'end_date', 'status', *fields).iterator(self.batch_size)
+
+    def logs(self):
+        """Weekly logs for most weeks an internship has run"""
+        for internship_id, start_date, end_date, status in self.generated_internships():
+            week = start_date - timedelta(days=start_date.weekday())
+            last_week = min(end_date, self.today - timedelta(days=7))
+            while week <= last_week:
+                if self.rng.random() < 0.9:
+                    yield Log(
+                        nanoid=self.nanoid(),
+                        internship_id=internship_id,
+                        week_starting=week,
+                        submitted_at=self.day_moment(week + timedelta(days=self.rng.randint(4, 8))),
+                    )
+                week += timedelta(days=7)
+
+    def entries(self, logs):
+        for log in logs:
+            for weekday in sorted(self.rng.sample(range(5), self.rng.randint(3, 5))):
+                yield Entry(
+                    log=log,
+                    date=log.week_starting + timedelta(days=weekday),
+                    description=self.rng.choice(ACTIVITIES),
+                )
+
+    def reports(self):
+        """A monthly report for every month an internship has run"""
+        for internship_id, start_date, end_date, status, teacher_id in self.generated_internships('teacher_id'):
+            for month in month_starts(start_date, min(end_date, self.today)):
+                yield Report(
+                    nanoid=self.nanoid(),
+                    internship_id=internship_id,
+                    teacher_id=teacher_id,
+                    report_month=month,
+                    tasks_performed='Worked on assigned project tasks and took part in team meetings.',
+                    tasks_performed_score=self.rng.randint(5, 10),
+                    learning_experience='Learned the tools and processes the team uses every day.',
+                    learning_experience_score=self.rng.randint(5, 10),
+                    challenges='Getting used to the codebase and deadlines, solved with help from my mentor.',
+                    challenges_score=self.rng.randint(4, 10),
+                    submitted_at=self.day_moment(min(self.today, month + timedelta(days=self.rng.randint(25, 35)))),
+                )
+
+    def assessments(self):
+        """A mentor assessment for every completed internship"""
+        ratings = weighted(ASSESSMENT_RATINGS)
+        experience = weighted(EXPERIENCE_RATINGS)
+        for internship_id, start_date, end_date, status, mentor_id in self.generated_internships('mentor_id'):
+            if status != 'completed':
+                continue
+            yield Assessment(
+                nanoid=self.nanoid(),
+                internship_id=internship_id,
+                mentor_id=mentor_id,
+                technical_skills=self.pick(ratings),
+                work_quality=self.pick(ratings),
+                problem_solving=self.pick(ratings),
+                teamwork=self.pick(ratings),
+                professionalism=self.pick(ratings),
+                performance_benefits='Delivered useful work on the projects assigned to them.',
+                observed_development='Grew more confident and independent over the internship.',
+                intern_strengths='Quick to learn and reliable.',
+                areas_for_improvement='Communicating progress more often.',
+                intern_rating=self.pick(experience),
+                program_rating=self.pick(experience),
+                program_improvement_suggestions='Longer internships would allow bigger projects.',
+                would_recommend=self.rng.random() < 0.85,
+                submitted_at=self.day_moment(min(self.today, end_date + timedelta(days=self.rng.randint(1, 14)))),
+            )
+
+    def evaluations(self):
+        """A teacher evaluation for every completed internship that has a teacher"""
+        for internship_id, start_date, end_date, status, teacher_id in self.generated_internships('teacher_id'):
+            if status != 'completed' or not teacher_id:
+                continue
+            yield Evaluation(
+                nanoid=self.nanoid(),
+                internship_id=internship_id,
+                teacher_id=teacher_id,
+                evaluation_date=end_date,
+                discussion_notes='Discussed the internship with the student and their mentor.',
+                academic_alignment='The work matched the objectives of the degree program.',
+                recommendations='Encourage the student to continue in this field.',
+                overall_rating=self.rng.randint(2, 5),
+                created_at=self.day_moment(end_date),
+            )
+
+    def notifications(self):
+        """Welcome notifications for students and status updates for reviewed applications"""
+        students = User.objects.filter(
+            username__startswith=f'{USERNAME_PREFIX}student_',
+        ).order_by('pk').values_list('pk', 'first_name', 'date_joined')
+        for user_id, first_name, date_joined in students.iterator(self.batch_size):
+            yield self.notification(user_id, 'student_welcome', {'recipient_name': first_name}, date_joined)
+
+        reviewed = Application.objects.filter(
+            status__in=['approved', 'rejected'], student__user__username__startswith=USERNAME_PREFIX,
+        ).order_by('pk').values_list(
+            'student__user_id', 'status', 'position__title', 'position__company__name', 'reviewed_at',
+        )
+        for user_id, status, position, company, reviewed_at in reviewed.iterator(self.batch_size):
+            context = {'position': position, 'company': company, 'next_steps': '', 'feedback': ''}
+            yield self.notification(user_id, f'application_{status}', context, reviewed_at)
+
+    def notification(self, user_id, template, context, created_at):
+        template = NOTIFICATION_TEMPLATES[template]
+        # Most older notifications have been read
+        is_read = self.rng.random() < (0.9 if self.now - created_at > timedelta(days=14) else 0.3)
+        return Notification(
+            nanoid=self.nanoid(),
+            recipient_id=user_id,
+            notification_type=template['notification_type'],
+            title=template['title'].format(**context),
+            message=template['message'].format(**context),
+            is_read=is_read,
+            created_at=created_at,
+        )
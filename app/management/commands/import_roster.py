@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.models import Institute
+from app.rosters import RosterError, import_rows, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Create student or teacher accounts for an institute from a CSV or XLSX roster'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='Path of the .csv or .xlsx roster')
+        parser.add_argument('--institute', required=True, help='Nanoid or exact name of the institute')
+        parser.add_argument('--role', choices=['student', 'teacher'], default='student', help='Accounts to create (default: student)')
+        parser.add_argument('--errors', type=int, default=20, help='Row errors to print (default: 20)')
+
+    def handle(self, *args, **options):
+        institute = (
+            Institute.objects.filter(nanoid=options['institute']).first()
+            or Institute.objects.filter(name=options['institute']).first()
+        )
+        if institute is None:
+            raise CommandError(f"Institute '{options['institute']}' not found")
+
+        try:
+            with open(options['file'], 'rb') as file:
+                report = import_rows(institute, options['role'], read_rows(file, options['file']))
+        except OSError as e:
+            raise CommandError(f'Cannot read {options["file"]}: {e.strerror}')
+        except RosterError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Created {report.created} of {report.rows} {options['role']} accounts for {institute.name}"
+        ))
+        if report.error_count:
+            self.stdout.write(self.style.WARNING(f'⚠ {report.error_count} rows were not imported'))
+            for error in report.errors[:options['errors']]:
+                self.stdout.write(f"  row {error['row']}: {error['email'] or '-'}: {error['error']}")
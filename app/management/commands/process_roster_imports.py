@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.rosters import claim_next, run_import
+
+
+class Command(BaseCommand):
+    help = 'Import queued student and teacher roster uploads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once no roster is queued')
+        parser.add_argument('--interval', type=float, default=10.0, help='Seconds to wait when the queue is empty (default: 10)')
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                roster_import = claim_next()
+                if roster_import is not None:
+                    self.report(run_import(roster_import))
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping, an interrupted import can be queued again from the admin')
+
+    def report(self, roster_import):
+        if roster_import.status == 'failed':
+            self.stdout.write(self.style.ERROR(f'✗ {roster_import.file_name}: {roster_import.last_error}'))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'✓ {roster_import.file_name}: created {roster_import.created_count} of {roster_import.total_rows} accounts '
+            f'for {roster_import.institute.name}'
+        ))
+        if roster_import.error_count:
+            self.stdout.write(self.style.WARNING(f'⚠ {roster_import.error_count} rows were not imported'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from app import search
+from app.models import Position
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for internship positions'
+
+    def handle(self, *args, **options):
+        backend = search.get_backend()
+        if isinstance(backend, search.FallbackBackend):
+            self.stdout.write(self.style.WARNING('⚠ This database has no full-text index, searches use icontains filters'))
+            return
+
+        indexed = search.rebuild(Position.objects.all())
+        self.stdout.write(self.style.SUCCESS(f'✓ Indexed {indexed} positions ({backend.name})'))
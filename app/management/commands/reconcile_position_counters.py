@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app.models import Position, APPLICATION_COUNTERS
+
+
+class Command(BaseCommand):
+    help = 'Repair the denormalized application counters on positions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Report positions whose counters have drifted without writing',
+        )
+
+    def handle(self, *args, **options):
+        drifted = list(Position.objects.drifted().order_by('pk'))
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('✓ Position counters match live application counts'))
+            return
+
+        for position in drifted:
+            counters = ', '.join(
+                f'{field}={getattr(position, field)} (live {getattr(position, "live_" + field)})'
+                for field in APPLICATION_COUNTERS
+            )
+            self.stdout.write(self.style.WARNING(f'⚠ {position.nanoid} {position.title}: {counters}'))
+
+        if options['check']:
+            raise CommandError(
+                f'{len(drifted)} positions have drifted counters. Run reconcile_position_counters to repair them.'
+            )
+
+        updated = Position.objects.filter(pk__in=[position.pk for position in drifted]).reconcile_application_counters()
+        self.stdout.write(self.style.SUCCESS(f'✓ Reconciled counters on {updated} positions'))
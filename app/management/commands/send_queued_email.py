@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.email_utils import OutboxWorker
+
+
+class Command(BaseCommand):
+    help = 'Deliver emails from the outbox, retrying failures with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once no queued email is due')
+        parser.add_argument('--batch-size', type=int, help='Emails claimed per batch (default: EMAIL_OUTBOX_BATCH_SIZE)')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to wait when the outbox is empty (default: 5)')
+
+    def handle(self, *args, **options):
+        with OutboxWorker(batch_size=options['batch_size']) as worker:
+            try:
+                while True:
+                    results = worker.run_batch()
+                    if any(results.values()):
+                        self.report(results)
+                    elif options['once']:
+                        break
+                    else:
+                        time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                self.stdout.write('Stopping, claimed emails will be retried when their lease expires')
+
+    def report(self, results):
+        self.stdout.write(self.style.SUCCESS(f"✓ Sent {results['sent']} emails"))
+        if results['retrying']:
+            self.stdout.write(self.style.WARNING(f"⚠ {results['retrying']} emails will be retried"))
+        if results['dead']:
+            self.stdout.write(self.style.ERROR(f"✗ {results['dead']} emails moved to the dead letter queue"))
@@ -0,0 +1,344 @@
+"""
+Skill matching between students and positions
+
+Skills, majors and requirements are free text, so both sides are reduced to
+words from one shared vocabulary. Every active position is a sparse TF-IDF
+vector, and the index stores that matrix by column: for each word, the
+positions using it and how often. Scoring a student against every position is
+one sparse matrix-vector product over the postings of the student's own
+words, so its cost grows with the postings touched rather than with the
+number of positions. The postings are kept in dicts, so adding or removing a
+position only changes its own entries, and are compiled into NumPy arrays on
+the first lookup after a change; a lookup then gathers the arrays of the
+student's words and sums them per position with bincount. Ranking the
+applicants of a position runs the same product the other way round, with the
+applicants as the rows of a matrix and the position as the vector.
+
+Each process keeps its index in memory. Saving or deleting a position records
+its id under a new generation number in the cache, and a process whose index
+is behind replays just those positions on its next lookup. A change log that
+has been evicted, or a cache that was cleared, makes it rebuild from scratch.
+"""
+import heapq
+import math
+import random
+import re
+import threading
+from collections import Counter
+from datetime import date
+
+import numpy as np
+from django.core.cache import cache
+
+from .models import Application, Position
+
+# Text fields making up each side's vector, with the weight of their words
+POSITION_FIELDS = {'skills_required': 2, 'title': 1, 'requirements': 1}
+STUDENT_FIELDS = {'skills': 2, 'major': 1}
+
+# Keeps the symbols of names like C++, C# and Node.js
+WORD_RE = re.compile(r'[a-z0-9][a-z0-9+#.]*')
+STOP_WORDS = frozenset(
+    'a an and are as at be basic by etc experience for from good in is knowledge of on or '
+    'skills strong the to understanding with working'.split()
+)
+
+GENERATION_KEY = 'matching:generation'
+CHANGE_KEY = 'matching:change:{}'
+CHANGE_TIMEOUT = 60 * 60 * 24
+
+# Past this many changes a rebuild is cheaper than replaying them
+MAX_REPLAY = 500
+
+
+def skill_tokens(text):
+    """Split free text into vocabulary words"""
+    words = (word.rstrip('.') for word in WORD_RE.findall((text or '').lower()))
+    return [word for word in words if word and word not in STOP_WORDS]
+
+
+def term_counts(values, fields):
+    """
+    Count the weighted vocabulary words of an object
+
+    Args:
+        values: Object or dict holding the text fields
+        fields: Field names mapped to the weight of their words
+    """
+    counts = Counter()
+    for field, weight in fields.items():
+        text = values.get(field) if isinstance(values, dict) else getattr(values, field, None)
+        for word in skill_tokens(text):
+            counts[word] += weight
+    return counts
+
+
+def student_terms(student):
+    return term_counts(student, STUDENT_FIELDS) if student else Counter()
+
+
+def position_terms(position):
+    return term_counts(position, POSITION_FIELDS) if position else Counter()
+
+
+class MatchIndex:
+    """Sparse TF-IDF matrix of positions, stored as an inverted index"""
+
+    def __init__(self):
+        self.postings = {}  # word -> {position pk: term count}
+        self.documents = {}  # position pk -> term counts
+        self._matrix = None
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, pk, counts):
+        """Add a position's term counts, replacing any it had"""
+        self.remove(pk)
+        if not counts:
+            return
+        self.documents[pk] = counts
+        for word, count in counts.items():
+            self.postings.setdefault(word, {})[pk] = count
+        self._matrix = None
+
+    def remove(self, pk):
+        counts = self.documents.pop(pk, None)
+        if counts is None:
+            return
+        for word in counts:
+            postings = self.postings[word]
+            del postings[pk]
+            if not postings:
+                del self.postings[word]
+        self._matrix = None
+
+    def idf(self, word):
+        """Smoothed inverse document frequency, so words no position uses still count"""
+        return math.log((1 + len(self.documents)) / (1 + len(self.postings.get(word, ())))) + 1
+
+    def vector(self, counts):
+        return {word: count * self.idf(word) for word, count in counts.items()}
+
+    @property
+    def matrix(self):
+        """
+        The postings as arrays, compiled after the last change
+
+        Returns:
+            tuple: (position pks by row, row by position pk, word mapped to the
+            rows of its positions and their TF-IDF weights over the row norms)
+        """
+        if self._matrix is None:
+            pks = list(self.documents)
+            rows = {pk: row for row, pk in enumerate(pks)}
+            norms = np.zeros(len(pks))
+            columns = {}
+            for word, postings in self.postings.items():
+                word_rows = np.fromiter((rows[pk] for pk in postings), dtype=np.intp, count=len(postings))
+                weights = np.fromiter(postings.values(), dtype=float, count=len(postings)) * self.idf(word)
+                norms[word_rows] += weights ** 2
+                columns[word] = (word_rows, weights)
+            norms = np.sqrt(norms)
+            for word_rows, weights in columns.values():
+                weights /= norms[word_rows]
+            self._matrix = (pks, rows, columns)
+        return self._matrix
+
+    def scores(self, counts):
+        """
+        Cosine similarity of term counts to every position
+
+        Returns:
+            numpy.ndarray: Scores between 0 and 1, in row order
+        """
+        pks, rows, columns = self.matrix
+        query = self.vector(counts)
+        query_norm = math.sqrt(sum(weight * weight for weight in query.values()))
+        hits = [(columns[word], weight) for word, weight in query.items() if word in columns]
+        if not hits:
+            return np.zeros(len(pks))
+        word_rows = np.concatenate([column[0] for column, _ in hits])
+        weights = np.concatenate([column[1] * weight for column, weight in hits])
+        return np.bincount(word_rows, weights=weights, minlength=len(pks)) / query_norm
+
+    def top(self, counts, limit, exclude=()):
+        """Get the (pk, score) pairs of the best matching positions, best first"""
+        pks, rows, _ = self.matrix
+        scores = self.scores(counts)
+        for pk in exclude:
+            if pk in rows:
+                scores[rows[pk]] = 0
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(scores[candidates], -limit)[-limit:]]
+        best = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [(pks[row], float(scores[row])) for row in best]
+
+    def applicant_scores(self, applicants, counts):
+        """
+        Cosine similarity of many students' term counts to one position's
+
+        The reverse of scores(): the applicants are the rows of a sparse
+        matrix built for the call, multiplied by the position's vector.
+
+        Args:
+            applicants: Term counts of each applicant
+            counts: Term counts of the position
+
+        Returns:
+            numpy.ndarray: Scores between 0 and 1, in applicant order
+        """
+        query = self.vector(counts)
+        query_norm = math.sqrt(sum(weight * weight for weight in query.values()))
+        entries = [
+            (row, weight, query.get(word, 0.0))
+            for row, applicant in enumerate(applicants)
+            for word, weight in self.vector(applicant).items()
+        ]
+        if not entries or not query_norm:
+            return np.zeros(len(applicants))
+        rows, weights, query_weights = (np.array(column) for column in zip(*entries))
+        norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=len(applicants)))
+        dots = np.bincount(rows, weights=weights * query_weights, minlength=len(applicants))
+        return np.divide(dots, norms * query_norm, out=np.zeros(len(applicants)), where=norms > 0)
+
+    def similarity(self, counts, other_counts):
+        """Cosine similarity of two sets of term counts, weighted by this index's IDF"""
+        first, second = self.vector(counts), self.vector(other_counts)
+        dot = sum(weight * second[word] for word, weight in first.items() if word in second)
+        norms = math.sqrt(sum(w * w for w in first.values())) * math.sqrt(sum(w * w for w in second.values()))
+        return dot / norms if norms else 0.0
+
+
+def _index_rows(positions, index):
+    """Add the given positions to an index, dropping those no longer active"""
+    rows = positions.filter(is_active=True).values('pk', *POSITION_FIELDS)
+    active = set()
+    for row in rows.iterator(chunk_size=2000):
+        index.add(row['pk'], term_counts(row, POSITION_FIELDS))
+        active.add(row['pk'])
+    return active
+
+
+def build_index():
+    """Build a new index of every active position"""
+    index = MatchIndex()
+    _index_rows(Position.objects.all(), index)
+    return index
+
+
+_lock = threading.Lock()
+_local = {'index': None, 'generation': None}
+
+
+def _generation():
+    """Read the shared generation, starting a missing one at a random value"""
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # A random start keeps a process from taking a cleared cache for one it has caught up with
+        cache.add(GENERATION_KEY, random.randrange(1 << 40), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def get_index():
+    """Get this process's index, caught up with the positions changed since it was built"""
+    with _lock:
+        generation = _generation()
+        index, seen = _local['index'], _local['generation']
+        if index is not None and generation == seen:
+            return index
+        changed = None
+        if index is not None and seen is not None and 0 < generation - seen <= MAX_REPLAY:
+            keys = [CHANGE_KEY.format(number) for number in range(seen + 1, generation + 1)]
+            logged = cache.get_many(keys)
+            if len(logged) == len(keys):
+                changed = set(logged.values())
+        if changed is None:
+            index = build_index()
+        else:
+            active = _index_rows(Position.objects.filter(pk__in=changed), index)
+            for pk in changed - active:
+                index.remove(pk)
+        _local.update(index=index, generation=generation)
+        return index
+
+
+def position_changed(pk):
+    """Record that a position was saved or deleted, so every process re-reads it"""
+    if cache.add(GENERATION_KEY, random.randrange(1 << 40), timeout=None):
+        return  # A new generation, so every process rebuilds
+    try:
+        generation = cache.incr(GENERATION_KEY)
+    except ValueError:
+        return  # Evicted since, and the next lookup starts a new one
+    cache.set(CHANGE_KEY.format(generation), pk, CHANGE_TIMEOUT)
+
+
+def recommend_positions(student, limit=5):
+    """
+    Get the open positions best matching a student's skills and major
+
+    Positions the student applied to are left out, as are those that already
+    started. Each position gets a match_score attribute, a percentage.
+
+    Returns:
+        list: Up to limit positions, best first; empty when the profile names no skills
+    """
+    counts = student_terms(student)
+    if not counts:
+        return []
+    applied = set(Application.objects.filter(student=student).values_list('position_id', flat=True))
+    # Ask for more than needed, since some of the best may have started already
+    ranked = get_index().top(counts, limit * 4, exclude=applied)
+    positions = Position.objects.filter(
+        pk__in=[pk for pk, _ in ranked], is_active=True, start_date__gte=date.today()
+    ).select_related('company').in_bulk()
+    matches = []
+    for pk, score in ranked:
+        position = positions.get(pk)
+        if position is not None:
+            position.match_score = round(score * 100)
+            matches.append(position)
+            if len(matches) == limit:
+                break
+    return matches
+
+
+def rank_applications(applications, limit=5):
+    """
+    Rank applications by how well each applicant matches their position
+
+    The applicants of each position are scored together against its vector
+    with MatchIndex.applicant_scores(). Each ranked application gets a
+    match_score attribute, a percentage.
+
+    Args:
+        applications: Queryset of every application to consider
+        limit: Number of applications to return
+
+    Returns:
+        list: Up to limit applications with a non-zero score, best first
+    """
+    by_position = {}
+    rows = applications.order_by().values('pk', 'position_id', 'student__skills', 'student__major')
+    for row in rows.iterator(chunk_size=2000):
+        terms = term_counts({field: row[f'student__{field}'] for field in STUDENT_FIELDS}, STUDENT_FIELDS)
+        pks, applicants = by_position.setdefault(row['position_id'], ([], []))
+        pks.append(row['pk'])
+        applicants.append(terms)
+    if not by_position:
+        return []
+    index = get_index()
+    positions = Position.objects.filter(pk__in=by_position).values('pk', *POSITION_FIELDS)
+    scored = []
+    for position in positions:
+        pks, applicants = by_position[position['pk']]
+        scores = index.applicant_scores(applicants, term_counts(position, POSITION_FIELDS))
+        scored.extend((score, pk) for pk, score in zip(pks, scores.tolist()) if score > 0)
+    best = heapq.nlargest(limit, scored)
+    ranked = applications.model.objects.select_related('student__user', 'position').in_bulk([pk for _, pk in best])
+    for score, pk in best:
+        ranked[pk].match_score = round(score * 100)
+    return [ranked[pk] for _, pk in best]
@@ -0,0 +1,255 @@
+"""
+Protected delivery of uploaded files
+
+Everything under MEDIA_URL is served by protected_media rather than as
+static files. A request is matched to the row that owns the file, by looking
+the path up in the file fields of PROTECTED_FILES, and is served only when
+the owner's rule lets the user see it: students their own resume, mentors the
+resumes of their applicants and interns, teachers those of their institute's
+students, officials the registration documents of organizations, and staff
+everything. Other requests get a 404, so the existence of a file is not given
+away either.
+
+Files are streamed with FileResponse and answer conditional requests from an
+ETag and Last-Modified made of the file's size and modification time, so a
+viewer reopening a resume gets a 304. Single byte ranges are answered with
+206 Partial Content, which lets PDF viewers fetch pages on demand and
+interrupted downloads resume. With PROTECTED_MEDIA_OFFLOAD set, Django only
+checks permissions and the web server sends the bytes itself, through
+X-Accel-Redirect (nginx) or X-Sendfile (Apache, lighttpd), so large
+downloads do not hold a Python worker for their whole transfer.
+"""
+import mimetypes
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.functional import cached_property
+from django.utils.http import content_disposition_header, http_date
+from django.views.decorators.http import require_safe
+
+from .models import Application, Company, Institute, Internship, RosterImport, Student, Teacher
+from .roles import resolve_user_type
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised for a byte range that starts past the end of the file"""
+
+
+def can_view_resume(user, student):
+    user_type = resolve_user_type(user)
+    if user_type == 'student':
+        return student.user_id == user.pk
+    if user_type == 'mentor':
+        return (
+            Application.objects.filter(student=student, position__mentor__user=user).exists()
+            or Internship.objects.filter(student=student, mentor__user=user).exists()
+        )
+    if user_type == 'teacher':
+        return student.institute_id is not None and Teacher.objects.filter(
+            user=user, institute_id=student.institute_id
+        ).exists()
+    return False
+
+
+def can_view_org_documents(user, organization):
+    user_type = resolve_user_type(user)
+    if user_type == 'official':
+        return True
+    registered_by = organization.registered_by
+    return user_type in ('teacher', 'mentor') and registered_by is not None and registered_by.user_id == user.pk
+
+
+def can_view_roster(user, roster_import):
+    user_type = resolve_user_type(user)
+    if user_type == 'official':
+        return True
+    return user_type == 'teacher' and Teacher.objects.filter(
+        user=user, institute_id=roster_import.institute_id
+    ).exists()
+
+
+class ProtectedFiles:
+    """The file fields of a model, with the rule deciding who may read them"""
+
+    def __init__(self, model, fields, can_view, related=()):
+        self.model = model
+        self.fields = fields
+        self.can_view = can_view
+        self.related = related
+
+    @cached_property
+    def prefixes(self):
+        return tuple({self.model._meta.get_field(field).upload_to for field in self.fields})
+
+    def find(self, name):
+        """
+        Find the row holding a stored file
+
+        Returns:
+            tuple: (owner, FieldFile), or None when no row of this model has it
+        """
+        if not name.startswith(self.prefixes):
+            return None
+        query = Q()
+        for field in self.fields:
+            query |= Q(**{field: name})
+        owner = self.model.objects.filter(query).select_related(*self.related).first()
+        if owner is None:
+            return None
+        for field in self.fields:
+            field_file = getattr(owner, field)
+            if field_file.name == name:
+                return owner, field_file
+        return None
+
+
+PROTECTED_FILES = [
+    ProtectedFiles(Student, ['resume'], can_view_resume),
+    ProtectedFiles(Institute, ['registration_certificate', 'authorization_letter'], can_view_org_documents, ['registered_by']),
+    ProtectedFiles(Company, ['registration_certificate', 'authorization_letter'], can_view_org_documents, ['registered_by']),
+    ProtectedFiles(RosterImport, ['file'], can_view_roster),
+]
+
+
+def byte_range(header, size):
+    """
+    Parse a Range header asking for a single range of bytes
+
+    Multiple ranges and malformed headers are ignored, which the HTTP spec
+    allows, and get the whole file.
+
+    Returns:
+        tuple: (first byte, last byte), or None to send the whole file
+
+    Raises:
+        RangeNotSatisfiable: When the range lies past the end of the file
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if match is None or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        if int(last) == 0:
+            raise RangeNotSatisfiable
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if start >= size:
+        raise RangeNotSatisfiable
+    end = min(int(last), size - 1) if last else size - 1
+    return (start, end) if end >= start else None
+
+
+class FileRange:
+    """Read-only view of length bytes of a file from start"""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def offloaded_response(field_file, filename):
+    """
+    Hand the file to the web server, when PROTECTED_MEDIA_OFFLOAD is set
+
+    Returns:
+        HttpResponse: Empty response with the offload header, or None to stream it from Django
+    """
+    offload = getattr(settings, 'PROTECTED_MEDIA_OFFLOAD', '')
+    if offload == 'nginx':
+        header, target = 'X-Accel-Redirect', settings.PROTECTED_MEDIA_INTERNAL_URL + quote(field_file.name)
+    elif offload == 'sendfile':
+        try:
+            header, target = 'X-Sendfile', field_file.path
+        except NotImplementedError:
+            return None  # Remote storage, which the web server cannot read
+    else:
+        return None
+    content_type, _ = mimetypes.guess_type(filename)
+    response = HttpResponse(content_type=content_type or 'application/octet-stream')
+    response[header] = target
+    response['Content-Disposition'] = content_disposition_header(False, filename)
+    return response
+
+
+def serve_file(request, field_file):
+    """
+    Send a stored file, answering conditional and range requests
+
+    Raises:
+        Http404: When the file is missing from storage
+    """
+    filename = posixpath.basename(field_file.name)
+    response = offloaded_response(field_file, filename)
+    if response is not None:
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    storage, name = field_file.storage, field_file.name
+    try:
+        size = storage.size(name)
+        modified = int(storage.get_modified_time(name).timestamp())
+    except (OSError, NotImplementedError):
+        raise Http404('File not found')
+    etag = f'"{size:x}-{modified:x}"'
+
+    response = get_conditional_response(request, etag=etag, last_modified=modified)
+    if response is None:
+        if_range = request.headers.get('If-Range')
+        wanted = request.headers.get('Range') if if_range in (None, etag, http_date(modified)) else None
+        try:
+            span = byte_range(wanted, size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        file = storage.open(name, 'rb')
+        if span is None:
+            response = FileResponse(file, filename=filename)
+        else:
+            start, end = span
+            response = FileResponse(FileRange(file, start, end - start + 1), filename=filename, status=206)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = end - start + 1
+        response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@require_safe
+def protected_media(request, path):
+    """Serve an uploaded file to a user allowed to see it"""
+    if not request.user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+    name = posixpath.normpath(path)
+    if name != path or name.startswith(('/', '../')):
+        raise Http404('File not found')
+
+    for files in PROTECTED_FILES:
+        found = files.find(name)
+        if found is not None:
+            owner, field_file = found
+            if request.user.is_staff or files.can_view(request.user, owner):
+                return serve_file(request, field_file)
+            break
+    raise Http404('File not found')
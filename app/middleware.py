@@ -1,18 +1,19 @@
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 
-User = get_user_model()
+from . import profiling
+from .instrumentation import QueryRecorder, fingerprint_id, log_event
+from .roles import get_request_user_type
 
-def get_user_type(user):
-    """Helper function to get user type from groups"""
-    if not user.is_authenticated:
-        return None
-    user_groups = user.groups.values_list('name', flat=True)
-    for group_name in ['student', 'mentor', 'teacher', 'official']:
-        if group_name in user_groups:
-            return group_name
-    return None
+User = get_user_model()
 
 class ProfileCompletionMiddleware:
     """
@@ -32,10 +33,89 @@ class ProfileCompletionMiddleware:
         
         # Check if user is authenticated and has incomplete profile
         if (request.user.is_authenticated and 
-            not get_user_type(request.user) and 
+            not get_request_user_type(request) and 
             not any(request.path.startswith(path) for path in allowed_paths)):
             
             return redirect('complete_profile')
         
         response = self.get_response(request)
         return response
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Middleware to measure the queries and database time of sampled requests
+
+    Adds a Server-Timing header and logs slow requests, slow queries and
+    repeated query fingerprints to the app.queries logger. Only loaded when
+    QUERY_INSTRUMENTATION is enabled.
+    """
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'QUERY_INSTRUMENTATION_SAMPLE_RATE', 1.0)
+        self.slow_request_ms = getattr(settings, 'SLOW_REQUEST_MS', 500)
+        self.slow_query_ms = getattr(settings, 'SLOW_QUERY_MS', 100)
+        self.repeated_query_threshold = getattr(settings, 'REPEATED_QUERY_THRESHOLD', 10)
+
+    def __call__(self, request):
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        recorder = QueryRecorder(self.slow_query_ms)
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        response['Server-Timing'] = recorder.server_timing(total_ms)
+        self.log(request, response, recorder, total_ms)
+        return response
+
+    def log(self, request, response, recorder, total_ms):
+        match = getattr(request, 'resolver_match', None)
+        context = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+        }
+        for normalized, duration in recorder.slow_queries:
+            log_event('slow_query', **context, duration_ms=round(duration, 1),
+                      fingerprint_id=fingerprint_id(normalized), fingerprint=normalized)
+
+        repeated = recorder.repeated(self.repeated_query_threshold)
+        for normalized, count, duration in repeated:
+            log_event('repeated_query', **context, count=count, duration_ms=round(duration, 1),
+                      fingerprint_id=fingerprint_id(normalized), fingerprint=normalized)
+
+        if total_ms >= self.slow_request_ms:
+            log_event(
+                'slow_request', **context,
+                duration_ms=round(total_ms, 1),
+                db_ms=round(recorder.duration_ms, 1),
+                queries=recorder.count,
+                duplicates=recorder.duplicates,
+                repeated=[fingerprint_id(normalized) for normalized, count, duration in repeated],
+            )
+
+
+class ProfilingMiddleware:
+    """
+    Middleware to run requests carrying a signed profiling token under cProfile
+
+    The token only counts for the signed-in staff or official user it was
+    issued to, see app.profiling. Disabled with PROFILING_ENABLED = False.
+    """
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if profiling.requested(request):
+            return profiling.profile_request(request, self.get_response)
+        return self.get_response(request)
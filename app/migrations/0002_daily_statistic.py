@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(help_text='Counted entity (e.g. application, company_domain)', max_length=30)),
+                ('status', models.CharField(help_text='Status bucket within the entity', max_length=30)),
+                ('day', models.DateField(help_text='Day the counted rows were created')),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Daily Statistic',
+                'verbose_name_plural': 'Daily Statistics',
+                'indexes': [models.Index(fields=['entity', 'day'], name='daily_stat_entity_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('entity', 'status', 'day'), name='unique_daily_statistic')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:47
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_existing_applications(apps, schema_editor):
+    Position = apps.get_model('app', 'Position')
+    Application = apps.get_model('app', 'Application')
+
+    def live_count(status=None):
+        applications = Application.objects.filter(position=OuterRef('pk'))
+        if status:
+            applications = applications.filter(status=status)
+        return Coalesce(Subquery(
+            applications.order_by().values('position').annotate(total=Count('pk')).values('total')
+        ), 0)
+
+    Position.objects.update(
+        application_count=live_count(),
+        pending_application_count=live_count('pending'),
+        approved_application_count=live_count('approved'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_daily_statistic'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='position',
+            name='application_count',
+            field=models.PositiveIntegerField(blank=True, default=0, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='position',
+            name='approved_application_count',
+            field=models.PositiveIntegerField(blank=True, default=0, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='position',
+            name='pending_application_count',
+            field=models.PositiveIntegerField(blank=True, default=0, editable=False, null=True),
+        ),
+        migrations.RunPython(count_existing_applications, migrations.RunPython.noop),
+    ]
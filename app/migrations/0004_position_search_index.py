@@ -0,0 +1,66 @@
+from django.db import migrations
+
+# The search index as it was created at this point, frozen here so that later
+# changes to app.search do not change what this migration does
+
+SQLITE_CREATE = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS app_position_search USING fts5('
+    "title, company, skills, description, tokenize='porter unicode61')"
+)
+SQLITE_INSERT = (
+    'INSERT INTO app_position_search (rowid, title, company, skills, description) VALUES (%s, %s, %s, %s, %s)'
+)
+
+POSTGRES_CREATE = (
+    'CREATE TABLE IF NOT EXISTS app_position_search ('
+    'position_id bigint PRIMARY KEY REFERENCES app_position (id) ON DELETE CASCADE, '
+    'document tsvector NOT NULL, '
+    'body text NOT NULL)'
+)
+POSTGRES_INDEX = 'CREATE INDEX IF NOT EXISTS app_position_search_document_idx ON app_position_search USING GIN (document)'
+POSTGRES_INSERT = (
+    'INSERT INTO app_position_search (position_id, document, body) VALUES (%s, '
+    "setweight(to_tsvector('english', %s), 'A') || "
+    "setweight(to_tsvector('english', %s), 'B') || "
+    "setweight(to_tsvector('english', %s), 'C') || "
+    "setweight(to_tsvector('english', %s), 'D'), %s)"
+)
+
+
+def has_fts5(cursor):
+    cursor.execute('PRAGMA compile_options')
+    return 'ENABLE_FTS5' in {row[0] for row in cursor.fetchall()}
+
+
+def install_search_index(apps, schema_editor):
+    Position = apps.get_model('app', 'Position')
+    rows = [
+        (pk, *(value or '' for value in fields))
+        for pk, *fields in Position.objects.values_list('pk', 'title', 'company__name', 'skills_required', 'description')
+    ]
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'sqlite' and has_fts5(cursor):
+            cursor.execute(SQLITE_CREATE)
+            cursor.executemany(SQLITE_INSERT, rows)
+        elif vendor == 'postgresql':
+            cursor.execute(POSTGRES_CREATE)
+            cursor.execute(POSTGRES_INDEX)
+            cursor.executemany(POSTGRES_INSERT, [(*row, row[-1]) for row in rows])
+
+
+def uninstall_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute('DROP TABLE IF EXISTS app_position_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_position_application_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
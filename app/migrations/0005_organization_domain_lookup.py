@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:01
+
+from django.db import migrations, models
+
+
+def normalize_email_domains(apps, schema_editor):
+    # Mirrors models.normalize_email_domain, which historical models don't have
+    for model_name in ('Institute', 'Company'):
+        model = apps.get_model('app', model_name)
+        for pk, domain in model.objects.exclude(email_domain=None).values_list('pk', 'email_domain'):
+            normalized = domain.strip().lstrip('@').lower() or None
+            if normalized != domain:
+                model.objects.filter(pk=pk).update(email_domain=normalized)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_position_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_email_domains, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='company',
+            name='email_domain',
+            field=models.CharField(blank=True, db_index=True, help_text='Official email domain (e.g., company.com)', max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name='institute',
+            name='email_domain',
+            field=models.CharField(blank=True, db_index=True, help_text='Official email domain (e.g., university.edu.pk)', max_length=100, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['registration_status', 'domain_verified'], name='company_status_domain_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='institute',
+            index=models.Index(fields=['registration_status', 'domain_verified'], name='institute_status_domain_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-18 15:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_organization_domain_lookup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('to_emails', models.JSONField(help_text='Recipient email addresses')),
+                ('subject', models.CharField(max_length=255)),
+                ('html_content', models.TextField()),
+                ('plain_content', models.TextField()),
+                ('from_email', models.CharField(max_length=254)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('dead', 'Dead Letter')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, help_text='When a pending email is due, or when a claimed one may be retried')),
+                ('last_error', models.TextField(blank=True)),
+                ('provider', models.CharField(blank=True, help_text='Provider that delivered the email', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Outgoing Email',
+                'verbose_name_plural': 'Outgoing Emails',
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='outgoing_email_due_idx')],
+            },
+        ),
+    ]
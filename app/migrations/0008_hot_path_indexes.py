@@ -0,0 +1,51 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_notification_unread_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='notification',
+            name='notification_unread_idx',
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['student', 'status'], name='application_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['position', 'status'], name='application_position_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='internship',
+            index=models.Index(fields=['student', 'status'], name='internship_student_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='internship',
+            index=models.Index(fields=['mentor', 'status'], name='internship_mentor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', '-created_at'], name='notification_inbox_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['recipient', '-created_at'], name='notification_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='position',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='position_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='position',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['start_date'], name='position_active_start_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:47
+
+import app.models
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_hot_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RosterImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nanoid', models.CharField(db_index=True, default=app.models.generate_nanoid, editable=False, max_length=12, unique=True)),
+                ('role', models.CharField(choices=[('student', 'Students'), ('teacher', 'Teachers')], default='student', max_length=10)),
+                ('file', models.FileField(upload_to='roster_imports/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['csv', 'xlsx'])])),
+                ('file_name', models.CharField(help_text='Name of the file as uploaded', max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Queued'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('total_rows', models.PositiveIntegerField(default=0)),
+                ('created_count', models.PositiveIntegerField(default=0)),
+                ('error_count', models.PositiveIntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list, help_text='Rows that were not imported, with the reason')),
+                ('last_error', models.TextField(blank=True, help_text='Why the whole import failed')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('institute', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='roster_imports', to='app.institute')),
+                ('uploaded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='roster_imports', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Roster Import',
+                'verbose_name_plural': 'Roster Imports',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='roster_import_queue_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:03
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_roster_imports'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='student',
+            name='resume',
+            field=models.FileField(blank=True, db_index=True, help_text='Upload your resume in PDF, DOC, or DOCX format', null=True, upload_to='resumes/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['pdf', 'doc', 'docx'])]),
+        ),
+    ]
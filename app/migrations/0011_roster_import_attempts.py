@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_student_resume_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rosterimport',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Times a worker claimed the import'),
+        ),
+        migrations.AlterField(
+            model_name='rosterimport',
+            name='started_at',
+            field=models.DateTimeField(blank=True, help_text='When the current attempt started; a processing import is claimed again once its lease runs out', null=True),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.5 on 2026-10-18 18:06
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_unknown_counters(apps, schema_editor):
+    """Recount the counters that were cleared to NULL before they become NOT NULL"""
+    Position = apps.get_model('app', 'Position')
+    Application = apps.get_model('app', 'Application')
+
+    def live_count(status=None):
+        applications = Application.objects.filter(position=OuterRef('pk'))
+        if status:
+            applications = applications.filter(status=status)
+        return Coalesce(Subquery(
+            applications.order_by().values('position').annotate(total=Count('pk')).values('total')
+        ), 0)
+
+    for field, status in [
+        ('application_count', None),
+        ('pending_application_count', 'pending'),
+        ('approved_application_count', 'approved'),
+    ]:
+        Position.objects.filter(**{f'{field}__isnull': True}).update(**{field: live_count(status)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_roster_import_attempts'),
+    ]
+
+    operations = [
+        migrations.RunPython(count_unknown_counters, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='position',
+            name='application_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='position',
+            name='approved_application_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='position',
+            name='pending_application_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
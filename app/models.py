@@ -1,11 +1,17 @@
 from django.db import models
+from django.db.models import Case, Count, F, FloatField, Func, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce, Greatest, Round
 from django.contrib.auth.models import User, Group
 from django.core.validators import FileExtensionValidator, MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from datetime import date
 from decimal import Decimal
+from itertools import islice
 from typing import TYPE_CHECKING
 from nanoid import generate
 
+from . import inbox
+
 if TYPE_CHECKING:
     from django.db.models.manager import RelatedManager
 
@@ -30,12 +36,219 @@ def generate_application_id():
     """Generate a unique nanoid for application IDs"""
     return generate(size=14)
 
+
+class CountsQuerySet(models.QuerySet):
+    """QuerySet that computes several filtered counts in a single query"""
+    
+    def counts_by(self, **buckets):
+        """
+        Count rows in several buckets with one aggregate round trip
+        
+        Args:
+            **buckets: Bucket name mapped to a Q filter, or None to count every row
+        
+        Returns:
+            dict: Bucket name mapped to its count
+        """
+        return self.aggregate(**{
+            name: Count('pk', filter=condition) if condition is not None else Count('pk')
+            for name, condition in buckets.items()
+        })
+    
+    def status_breakdown(self, field='status'):
+        """Count all rows and the rows in each choice of a status field"""
+        buckets = {'total': None}
+        for value, label in self.model._meta.get_field(field).choices:
+            buckets[value] = Q(**{field: value})
+        return self.counts_by(**buckets)
+
+
+def normalize_email_domain(domain):
+    """Store email domains lower-cased and without a leading @, so lookups can use the index"""
+    domain = (domain or '').strip().lstrip('@').lower()
+    return domain or None
+
+
+class OrganizationQuerySet(CountsQuerySet):
+    """QuerySet for organizations with registration and domain verification"""
+    
+    def available_to(self, domain):
+        """
+        Approved organizations a user with an email at domain may join
+        
+        Organizations without a verified domain are open to everyone; verified
+        ones only to users from their own domain.
+        """
+        open_or_matching = Q(domain_verified=False)
+        domain = normalize_email_domain(domain)
+        if domain:
+            open_or_matching |= Q(email_domain=domain)
+        return self.filter(open_or_matching, registration_status='approved')
+    
+    def status_breakdown(self, field='registration_status'):
+        """Count organizations per registration status and verified domains"""
+        buckets = {'total': None, 'domain_verified': Q(domain_verified=True)}
+        for value, label in self.model._meta.get_field(field).choices:
+            buckets[value] = Q(**{field: value})
+        return self.counts_by(**buckets)
+
+
+# Counter column on Position -> application status it counts (None counts every application)
+APPLICATION_COUNTERS = {
+    'application_count': None,
+    'pending_application_count': 'pending',
+    'approved_application_count': 'approved',
+}
+
+
+class PositionQuerySet(CountsQuerySet):
+    """QuerySet for positions and their denormalized application counters"""
+    
+    def with_live_application_counts(self):
+        """Annotate live_<counter> with the application counts computed from scratch"""
+        return self.annotate(**{
+            f'live_{field}': Count('applications', filter=Q(applications__status=status) if status else None)
+            for field, status in APPLICATION_COUNTERS.items()
+        })
+    
+    def drifted(self):
+        """Positions whose stored counters differ from their live application counts"""
+        mismatch = Q()
+        for field in APPLICATION_COUNTERS:
+            mismatch |= ~Q(**{field: F(f'live_{field}')})
+        return self.with_live_application_counts().filter(mismatch)
+    
+    def reconcile_application_counters(self):
+        """
+        Recompute the application counters of every position in the queryset
+        
+        Returns:
+            int: Number of positions updated
+        """
+        def live_count(status):
+            applications = Application.objects.filter(position=OuterRef('pk'))
+            if status:
+                applications = applications.filter(status=status)
+            return Coalesce(Subquery(
+                applications.order_by().values('position').annotate(total=Count('pk')).values('total')
+            ), 0)
+        
+        return self.update(**{field: live_count(status) for field, status in APPLICATION_COUNTERS.items()})
+
+
+class DaysBetween(Func):
+    """Days from the second date expression to the first"""
+    arity = 2
+    arg_joiner = ' - '
+    template = '(%(expressions)s)'
+    output_field = FloatField()
+    
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template='(julianday(%(expressions)s))', arg_joiner=') - julianday(',
+            **extra_context,
+        )
+    
+    def as_postgresql(self, compiler, connection, **extra_context):
+        # date - date is a whole number of days
+        return self.as_sql(compiler, connection, template='CAST(%(expressions)s AS double precision)', **extra_context)
+
+
+def _filled(field, blank=''):
+    """1 when a field holds a truthy value (not NULL and not blank), else 0"""
+    condition = Q(**{f'{field}__isnull': False})
+    if blank is not None:
+        condition &= ~Q(**{field: blank})
+    return Case(When(condition, then=Value(1)), default=Value(0), output_field=IntegerField())
+
+
+# Profile fields counted by Student.get_profile_completion, with the value that
+# also counts as empty (None when only NULL does)
+STUDENT_REQUIRED_FIELDS = [
+    ('user__first_name', ''),
+    ('user__last_name', ''),
+    ('user__email', ''),
+    ('institute', None),
+    ('semester_of_study', ''),
+    ('major', ''),
+    ('gpa', 0),
+    ('skills', ''),
+    ('expected_graduation', None),
+]
+STUDENT_OPTIONAL_FIELDS = [
+    ('student_id', ''),
+    ('portfolio_url', ''),
+    ('resume', ''),
+    ('phone', ''),
+]
+
+
+class StudentQuerySet(models.QuerySet):
+    """QuerySet for students"""
+    
+    def with_completion(self):
+        """Annotate profile_completion, the percentage Student.get_profile_completion computes"""
+        required = sum((_filled(field, blank) for field, blank in STUDENT_REQUIRED_FIELDS), Value(0))
+        optional = sum((_filled(field, blank) for field, blank in STUDENT_OPTIONAL_FIELDS), Value(0))
+        completion = (
+            required * Value(80.0) / Value(len(STUDENT_REQUIRED_FIELDS))
+            + optional * Value(20.0) / Value(len(STUDENT_OPTIONAL_FIELDS))
+        )
+        return self.annotate(profile_completion=Cast(Round(completion), IntegerField()))
+
+
+class InternshipQuerySet(CountsQuerySet):
+    """QuerySet for internships"""
+    
+    def with_progress(self, today=None):
+        """Annotate progress, the percentage Internship.get_progress_percentage computes"""
+        today = Value(today or date.today())
+        return self.annotate(progress=Case(
+            When(Q(start_date__isnull=True) | Q(end_date__isnull=True), then=Value(0.0)),
+            When(start_date__gt=today, then=Value(0.0)),
+            When(end_date__lte=today, then=Value(100.0)),
+            default=DaysBetween(today, F('start_date')) * Value(100.0) / DaysBetween(F('end_date'), F('start_date')),
+            output_field=FloatField(),
+        ))
+
+
+class ReportQuerySet(models.QuerySet):
+    """QuerySet for student reports"""
+    
+    def with_total_score(self):
+        """Annotate total_score, the score out of 30 Report.get_total_score computes"""
+        return self.annotate(
+            total_score=F('tasks_performed_score') + F('learning_experience_score') + F('challenges_score'),
+        )
+
+
+# Performance indicators averaged by Assessment.get_average_rating
+ASSESSMENT_RATINGS = ['technical_skills', 'work_quality', 'problem_solving', 'teamwork', 'professionalism']
+
+
+class AssessmentQuerySet(models.QuerySet):
+    """QuerySet for supervisor assessments"""
+    
+    def with_average_rating(self):
+        """Annotate average_rating, the mean Assessment.get_average_rating computes"""
+        total = sum((F(field) for field in ASSESSMENT_RATINGS[1:]), F(ASSESSMENT_RATINGS[0]))
+        return self.annotate(
+            average_rating=Cast(total, FloatField()) / Value(float(len(ASSESSMENT_RATINGS))),
+        )
+
+
 class Institute(models.Model):
     """Institute model for universities and colleges"""
 
     class Meta:
         verbose_name_plural = "Institutes"
+        indexes = [
+            models.Index(fields=['registration_status', 'domain_verified'], name='institute_status_domain_idx'),
+        ]
 
+    objects = OrganizationQuerySet.as_manager()
+    
     nanoid = models.CharField(max_length=10, default=generate_institute_id, unique=True, db_index=True, editable=False)
     name = models.CharField(max_length=200, null=True, blank=True)
     address = models.TextField(null=True, blank=True)
@@ -43,7 +256,7 @@ class Institute(models.Model):
     contact_email = models.EmailField(null=True, blank=True)
     phone = models.CharField(max_length=15, null=True, blank=True, help_text="Contact phone number")
     # Email domain verification
-    email_domain = models.CharField(max_length=100, null=True, blank=True, help_text="Official email domain (e.g., university.edu.pk)")
+    email_domain = models.CharField(max_length=100, null=True, blank=True, db_index=True, help_text="Official email domain (e.g., university.edu.pk)")
     domain_verified = models.BooleanField(default=False, help_text="Whether the email domain has been verified")
     # Registration and approval
     registered_by = models.ForeignKey('Teacher', on_delete=models.PROTECT, null=True, blank=True, related_name='registered_institutes')
@@ -155,6 +368,10 @@ class Institute(models.Model):
         help_text="Primary level of education offered"
     )
     
+    def save(self, *args, **kwargs):
+        self.email_domain = normalize_email_domain(self.email_domain)
+        super().save(*args, **kwargs)
+    
     def is_email_from_institute(self, email):
         """Check if email belongs to this institute's domain"""
         if not self.email_domain or not email:
@@ -215,7 +432,7 @@ class Company(models.Model):
     contact_email = models.EmailField(null=True, blank=True)
     phone = models.CharField(max_length=15, null=True, blank=True)
     # Email domain verification
-    email_domain = models.CharField(max_length=100, null=True, blank=True, help_text="Official email domain (e.g., company.com)")
+    email_domain = models.CharField(max_length=100, null=True, blank=True, db_index=True, help_text="Official email domain (e.g., company.com)")
     domain_verified = models.BooleanField(default=False, help_text="Whether the email domain has been verified")
     # Registration and approval
     registered_by = models.ForeignKey('Mentor', on_delete=models.PROTECT, null=True, blank=True, related_name='registered_companies')
@@ -249,8 +466,17 @@ class Company(models.Model):
         help_text="Authorization letter proving you can represent this company"
     )
     
+    objects = OrganizationQuerySet.as_manager()
+    
     class Meta:
         verbose_name_plural = "Companies"
+        indexes = [
+            models.Index(fields=['registration_status', 'domain_verified'], name='company_status_domain_idx'),
+        ]
+    
+    def save(self, *args, **kwargs):
+        self.email_domain = normalize_email_domain(self.email_domain)
+        super().save(*args, **kwargs)
     
     def is_email_from_company(self, email):
         """Check if email belongs to this company's domain"""
@@ -289,6 +515,7 @@ class Student(models.Model):
         upload_to='resumes/', 
         null=True, 
         blank=True,
+        db_index=True,
         validators=[FileExtensionValidator(allowed_extensions=['pdf', 'doc', 'docx'])],
         help_text="Upload your resume in PDF, DOC, or DOCX format"
     )
@@ -297,8 +524,14 @@ class Student(models.Model):
     # Contact information
     phone = models.CharField(max_length=15, null=True, blank=True, help_text="Contact phone number")
     
+    objects = StudentQuerySet.as_manager()
+    
     def get_profile_completion(self):
-        """Calculate profile completion percentage"""
+        """Calculate profile completion percentage, or read it from StudentQuerySet.with_completion"""
+        annotated = getattr(self, 'profile_completion', None)
+        if annotated is not None:
+            return annotated
+        
         # Required fields for a complete profile
         required_fields = [
             # User fields (always considered required)
@@ -509,31 +742,82 @@ class Position(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    # Denormalized application counters, kept current by the Application signal handlers.
+    # Writes that skip the signals leave them drifted until reconcile_position_counters runs
+    application_count = models.PositiveIntegerField(default=0, editable=False)
+    pending_application_count = models.PositiveIntegerField(default=0, editable=False)
+    approved_application_count = models.PositiveIntegerField(default=0, editable=False)
+    
+    objects = PositionQuerySet.as_manager()
+    
     if TYPE_CHECKING:
         applications: 'RelatedManager[Application]'
     
+    class Meta:
+        indexes = [
+            # browse_positions (newest first) and the student dashboard (starting soonest).
+            # Partial, because SQLite only uses an index for the bare boolean
+            # filter Django writes ("WHERE is_active") when it matches the condition
+            models.Index(fields=['-created_at'], condition=Q(is_active=True), name='position_active_created_idx'),
+            models.Index(fields=['start_date'], condition=Q(is_active=True), name='position_active_start_idx'),
+        ]
+    
     def __str__(self):
         company_name = self.company.name if self.company else "No Company"
         return f"{self.title or 'Untitled Position'} at {company_name}"
     
+    def save(self, *args, **kwargs):
+        # Saving a stored position leaves its counters alone, so the in-memory
+        # values never overwrite increments made since the row was loaded
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in APPLICATION_COUNTERS
+            ]
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def adjust_application_counters(cls, changes):
+        """
+        Atomically apply application count changes to the stored counters
+        
+        Counters stop at zero, so one that drifted low is left for
+        reconcile_position_counters instead of failing the write that
+        decrements it.
+        
+        Args:
+            changes: Iterable of (position_id, application_status, delta) tuples
+        """
+        deltas = {}
+        for position_id, status, delta in changes:
+            if position_id is None:
+                continue
+            position_deltas = deltas.setdefault(position_id, dict.fromkeys(APPLICATION_COUNTERS, 0))
+            for field, counted_status in APPLICATION_COUNTERS.items():
+                if counted_status is None or counted_status == status:
+                    position_deltas[field] += delta
+        
+        for position_id, position_deltas in deltas.items():
+            updates = {field: Greatest(F(field) + delta, 0) for field, delta in position_deltas.items() if delta}
+            if updates:
+                cls.objects.filter(pk=position_id).update(**updates)
+    
     @property
     def available_spots(self):
-        # Django creates the 'applications' reverse relation automatically
-        approved_applications = self.applications.filter(status='approved').count()  # type: ignore
         max_students = self.max_students or 1
-        return max_students - approved_applications
+        return max_students - self.approved_applications_count
 
     @property
     def approved_applications_count(self):
-        return self.applications.filter(status='approved').count()  # type: ignore
+        return self.approved_application_count
     
     @property
     def pending_applications_count(self):
-        return self.applications.filter(status='pending').count()  # type: ignore
+        return self.pending_application_count
     
     @property
     def total_applications_count(self):
-        return self.applications.count()  # type: ignore
+        return self.application_count
 
 class Application(models.Model):
     """Student applications for internship positions"""
@@ -555,6 +839,8 @@ class Application(models.Model):
     reviewed_at = models.DateTimeField(null=True, blank=True)
     reviewer_notes = models.TextField(null=True, blank=True)
     
+    objects = CountsQuerySet.as_manager()
+    
     class Meta:
         # Allow reapplication after rejection/withdrawal by only preventing duplicate active applications
         constraints = [
@@ -564,6 +850,23 @@ class Application(models.Model):
                 name='unique_active_application'
             )
         ]
+        indexes = [
+            models.Index(fields=['student', 'status'], name='application_student_idx'),
+            models.Index(fields=['position', 'status'], name='application_position_idx'),
+        ]
+    
+    def notification_recipient(self):
+        """
+        Get the (user, context) pair that notifies the applicant about this application
+        
+        Reads student__user and position__company, so select_related them when
+        notifying many applications.
+        """
+        user = self.student.user if self.student else None
+        return user, {
+            'position': self.position.title if self.position else 'Position',
+            'company': self.position.company.name if self.position and self.position.company else 'Company',
+        }
     
     def __str__(self):
         student_name = self.student.user.get_full_name() if self.student else "No Student"
@@ -617,6 +920,14 @@ class Internship(models.Model):
     certificate_date = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = InternshipQuerySet.as_manager()
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', 'status'], name='internship_student_idx'),
+            models.Index(fields=['mentor', 'status'], name='internship_mentor_idx'),
+        ]
+    
     def __str__(self):
         student_name = self.student.user.get_full_name() if self.student else "No Student"
         company_name = "No Company"
@@ -632,16 +943,19 @@ class Internship(models.Model):
         return None
     
     def get_progress_percentage(self):
-        """Calculate progress percentage based on time elapsed"""
+        """Calculate progress percentage based on time elapsed, or read it from InternshipQuerySet.with_progress"""
+        annotated = getattr(self, 'progress', None)
+        if annotated is not None:
+            return annotated
+        
         if not self.start_date or not self.end_date:
             return 0
         
-        from datetime import date
         today = date.today()
         
         if today < self.start_date:
             return 0
-        elif today > self.end_date:
+        elif today >= self.end_date:
             return 100
         else:
             total_days = (self.end_date - self.start_date).days
@@ -749,13 +1063,18 @@ class Report(models.Model):
     submitted_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ReportQuerySet.as_manager()
+    
     class Meta:
         # Note: unique_together with nullable fields may allow multiple null combinations
         unique_together = ['internship', 'report_month']
         ordering = ['-report_month']
         
     def get_total_score(self):
-        """Calculate total score out of 30"""
+        """Calculate total score out of 30, or read it from ReportQuerySet.with_total_score"""
+        annotated = getattr(self, 'total_score', None)
+        if annotated is not None:
+            return annotated
         return self.tasks_performed_score + self.learning_experience_score + self.challenges_score
     
     def __str__(self):
@@ -880,19 +1199,18 @@ class Assessment(models.Model):
         help_text="Do you have any other comments that will help the institute and our students?"
     )
     
+    objects = AssessmentQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Internship Supervisor Evaluation"
         verbose_name_plural = "Internship Supervisor Evaluations"
     
     def get_average_rating(self):
-        """Calculate average score across all performance indicators"""
-        scores = [
-            self.technical_skills,
-            self.work_quality,
-            self.problem_solving,
-            self.teamwork,
-            self.professionalism
-        ]
+        """Calculate average score across all performance indicators, or read it from AssessmentQuerySet.with_average_rating"""
+        annotated = getattr(self, 'average_rating', None)
+        if annotated is not None:
+            return annotated
+        scores = [getattr(self, field) for field in ASSESSMENT_RATINGS]
         return sum(scores) / len(scores)
     
     def __str__(self):
@@ -902,6 +1220,99 @@ class Assessment(models.Model):
             student_name = "No Student"
         return f"Supervisor Evaluation for {student_name} - {self.submitted_at.strftime('%Y-%m-%d')}"
 
+# Notification kinds sent with Notification.objects.fan_out(); title and message
+# are str.format templates, and placeholders missing from the context render empty
+NOTIFICATION_TEMPLATES = {
+    'student_welcome': {
+        'notification_type': 'general',
+        'title': 'Welcome to Tarbiyat!',
+        'message': 'Welcome {recipient_name}! Your student profile has been reviewed. You can now browse and apply for internship positions.',
+    },
+    'application_received': {
+        'notification_type': 'general',
+        'title': 'New Application Received',
+        'message': 'New application received for {position} from {student}',
+    },
+    'application_approved': {
+        'notification_type': 'application_status',
+        'title': 'Application Approved!',
+        'message': 'Congratulations! Your application for {position} at {company} has been approved.{next_steps}',
+    },
+    'application_rejected': {
+        'notification_type': 'application_status',
+        'title': 'Application Status Update',
+        'message': 'Thank you for your interest in {position} at {company}. Unfortunately, your application was not selected at this time.{feedback}',
+    },
+}
+
+
+class _BlankMissing(dict):
+    def __missing__(self, key):
+        return ''
+
+
+class NotificationQuerySet(models.QuerySet):
+    """QuerySet for notifications, with bulk creation for many recipients"""
+    
+    def fan_out(self, recipients, template, context=None, batch_size=1000):
+        """
+        Send the same kind of notification to many users with bulk inserts
+        
+        Messages are rendered in Python, so callers should select_related
+        whatever the recipients and their contexts are read from.
+        
+        Args:
+            recipients: Users, or (user, context) pairs for per-recipient values
+            template: Key of NOTIFICATION_TEMPLATES
+            context: Values shared by every message; recipient_name is added
+                for each recipient, and per-recipient values win over both
+            batch_size: Notifications per INSERT
+        
+        Returns:
+            int: Number of notifications created
+        """
+        spec = NOTIFICATION_TEMPLATES[template]
+        shared = context or {}
+        
+        def render():
+            for recipient in recipients:
+                user, own = recipient if isinstance(recipient, tuple) else (recipient, {})
+                if user is None:
+                    continue
+                values = _BlankMissing({'recipient_name': user.get_full_name() or user.username, **shared, **own})
+                yield self.model(
+                    recipient=user,
+                    notification_type=spec['notification_type'],
+                    title=spec['title'].format_map(values),
+                    message=spec['message'].format_map(values),
+                )
+        
+        created = 0
+        notifications = render()
+        while batch := list(islice(notifications, batch_size)):
+            self.bulk_create(batch)
+            # bulk_create skips the signals that keep unread counters current
+            inbox.forget_unread(notification.recipient_id for notification in batch)
+            created += len(batch)
+        return created
+    
+    def unread(self):
+        return self.filter(is_read=False)
+    
+    def mark_read(self, is_read=True):
+        """
+        Mark these notifications read (or unread) with one UPDATE
+        
+        Returns:
+            int: Number of notifications changed
+        """
+        changing = self.exclude(is_read=is_read)
+        recipient_ids = list(changing.order_by().values_list('recipient', flat=True).distinct())
+        updated = changing.update(is_read=is_read)
+        inbox.forget_unread(recipient_ids)
+        return updated
+
+
 class Notification(models.Model):
     """System notifications for users"""
     NOTIFICATION_TYPES = (
@@ -920,10 +1331,119 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = NotificationQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # The inbox, and unread notifications (see the partial index note on Position)
+            models.Index(fields=['recipient', '-created_at'], name='notification_inbox_idx'),
+            models.Index(fields=['recipient', '-created_at'], condition=Q(is_read=False), name='notification_unread_idx'),
+        ]
     
     def __str__(self):
         title = self.title or "No Title"
         username = self.recipient.username if self.recipient else "No Recipient"
         return f"{title} - {username}"
+
+class DailyStatistic(models.Model):
+    """Daily row counts per entity and status, rolled up for official reports"""
+    entity = models.CharField(max_length=30, help_text="Counted entity (e.g. application, company_domain)")
+    status = models.CharField(max_length=30, help_text="Status bucket within the entity")
+    day = models.DateField(help_text="Day the counted rows were created")
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['entity', 'status', 'day'], name='unique_daily_statistic'),
+        ]
+        indexes = [
+            models.Index(fields=['entity', 'day'], name='daily_stat_entity_day_idx'),
+        ]
+        verbose_name = "Daily Statistic"
+        verbose_name_plural = "Daily Statistics"
+    
+    def __str__(self):
+        return f"{self.entity}/{self.status} on {self.day}: {self.count}"
+
+
+class OutgoingEmail(models.Model):
+    """An email waiting in the outbox for the send_queued_email worker"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('dead', 'Dead Letter'),
+    ]
+    
+    to_emails = models.JSONField(help_text="Recipient email addresses")
+    subject = models.CharField(max_length=255)
+    html_content = models.TextField()
+    plain_content = models.TextField()
+    from_email = models.CharField(max_length=254)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, help_text="When a pending email is due, or when a claimed one may be retried")
+    last_error = models.TextField(blank=True)
+    provider = models.CharField(max_length=20, blank=True, help_text="Provider that delivered the email")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outgoing_email_due_idx'),
+        ]
+        verbose_name = "Outgoing Email"
+        verbose_name_plural = "Outgoing Emails"
+    
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to_emails)} ({self.get_status_display()})"
+
+
+class RosterImport(models.Model):
+    """An uploaded student or teacher roster and the outcome of importing it"""
+    STATUS_CHOICES = [
+        ('pending', 'Queued'),
+        ('processing', 'Processing'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    ROLE_CHOICES = [
+        ('student', 'Students'),
+        ('teacher', 'Teachers'),
+    ]
+    
+    nanoid = models.CharField(max_length=12, default=generate_nanoid, unique=True, db_index=True, editable=False)
+    institute = models.ForeignKey(Institute, on_delete=models.CASCADE, related_name='roster_imports')
+    role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='student')
+    file = models.FileField(
+        upload_to='roster_imports/',
+        validators=[FileExtensionValidator(allowed_extensions=['csv', 'xlsx'])],
+    )
+    file_name = models.CharField(max_length=255, help_text="Name of the file as uploaded")
+    uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='roster_imports')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    total_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True, help_text="Rows that were not imported, with the reason")
+    last_error = models.TextField(blank=True, help_text="Why the whole import failed")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True, help_text="When the current attempt started; a processing import is claimed again once its lease runs out")
+    finished_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0, help_text="Times a worker claimed the import")
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='roster_import_queue_idx'),
+        ]
+        verbose_name = "Roster Import"
+        verbose_name_plural = "Roster Imports"
+    
+    def __str__(self):
+        return f"{self.file_name} for {self.institute.name} ({self.get_status_display()})"
+    
+    @property
+    def is_finished(self):
+        return self.status in ('done', 'failed')
@@ -0,0 +1,269 @@
+"""
+Keyset (cursor) pagination for the large list views
+
+Django's Paginator counts every matching row and then skips to a page with
+OFFSET, so deep pages get slower the further in they are. CursorPaginator
+instead remembers the sort key of the last row shown and asks for the rows
+after it, which an index on the ordering can answer directly no matter how
+deep the page is. Pages are addressed by opaque signed tokens; the total count
+can be computed exactly, estimated with a capped count, or skipped.
+"""
+import math
+from datetime import date, datetime, time
+from decimal import Decimal
+from uuid import UUID
+
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Q
+from django.utils.functional import cached_property
+
+CURSOR_SALT = 'app.pagination.cursor'
+
+# Estimated counts stop counting after this many rows
+ESTIMATE_LIMIT = 1000
+
+
+def _encode(value):
+    """Make a sort key value JSON serializable without losing precision"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+class SortKey:
+    """One column of a keyset ordering"""
+
+    def __init__(self, model, name):
+        self.descending = name.startswith('-')
+        self.path = name.lstrip('-')
+        if self.path == 'pk':
+            self.path = model._meta.pk.name
+        self.field, self.nullable = self._resolve(model, self.path)
+
+    @staticmethod
+    def _resolve(model, path):
+        """Get the model field a path points to and whether it can be NULL"""
+        field = None
+        nullable = False
+        opts = model._meta
+        for part in path.split('__'):
+            try:
+                field = opts.get_field(part)
+            except FieldDoesNotExist:
+                # An annotation, such as a search rank
+                return None, False
+            nullable = nullable or field.null
+            if field.is_relation:
+                opts = field.related_model._meta
+        if field is not None and field.is_relation:
+            # Ordering by a relation orders by its primary key
+            field = field.target_field
+        return field, nullable
+
+    def value(self, obj):
+        """Read this key from a row"""
+        for part in self.path.split('__'):
+            if obj is None:
+                return None
+            obj = getattr(obj, part)
+        # Related objects sort by their primary key
+        return getattr(obj, 'pk', obj)
+
+    def to_python(self, value):
+        if value is None or self.field is None:
+            return value
+        return self.field.to_python(value)
+
+    def order_by(self, reverse=False):
+        """Order by this key, keeping NULLs at the end of forward scans"""
+        descending = self.descending != reverse
+        expression = F(self.path)
+        nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+        if not self.nullable:
+            nulls = {}
+        return expression.desc(**nulls) if descending else expression.asc(**nulls)
+
+    def beyond(self, value, reverse=False):
+        """Q for rows strictly after value in scan order (before it when reverse)"""
+        if value is None:
+            # NULLs sort last, so only non-NULL rows come before them and none after
+            return Q(**{f'{self.path}__isnull': False}) if reverse else None
+        descending = self.descending != reverse
+        condition = Q(**{f'{self.path}__{"lt" if descending else "gt"}': value})
+        if self.nullable and not reverse:
+            condition |= Q(**{f'{self.path}__isnull': True})
+        return condition
+
+    def equal(self, value):
+        if value is None:
+            return Q(**{f'{self.path}__isnull': True})
+        return Q(**{self.path: value})
+
+
+class CursorPage:
+    """A page of rows, with tokens for its neighbours"""
+
+    def __init__(self, object_list, paginator, offset, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.offset = offset
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<CursorPage {self.number}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    @property
+    def number(self):
+        return self.offset // self.paginator.per_page + 1
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def start_index(self):
+        return self.offset + 1 if self.object_list else 0
+
+    def end_index(self):
+        return self.offset + len(self.object_list)
+
+    @cached_property
+    def next_cursor(self):
+        if not self._has_next:
+            return None
+        return self.paginator.make_cursor(self.object_list[-1], 'next', self.offset + len(self.object_list))
+
+    @cached_property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return None
+        offset = max(self.offset - self.paginator.per_page, 0)
+        if offset == 0:
+            # The first page needs no cursor
+            return ''
+        return self.paginator.make_cursor(self.object_list[0], 'previous', offset)
+
+
+class CursorPaginator:
+    """
+    Paginate a queryset by keyset on its existing ordering
+
+    Args:
+        queryset: Ordered queryset; the primary key is added as a tiebreaker
+        per_page: Rows per page
+        count: 'exact' for COUNT(*), 'estimate' to stop counting at
+            ESTIMATE_LIMIT rows, or None to skip counting
+    """
+
+    def __init__(self, queryset, per_page, count='exact'):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.count_mode = count
+        ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+        if not ordering or not all(isinstance(name, str) for name in ordering):
+            raise ValueError('CursorPaginator needs a queryset ordered by field or annotation names')
+        self.keys = [SortKey(queryset.model, name) for name in ordering]
+        pk_name = queryset.model._meta.pk.name
+        if not any(key.path == pk_name for key in self.keys):
+            self.keys.append(SortKey(queryset.model, ('-' if self.keys[-1].descending else '') + pk_name))
+        self.fingerprint = ','.join(('-' if key.descending else '') + key.path for key in self.keys)
+
+    @cached_property
+    def _counted(self):
+        if self.count_mode == 'exact':
+            return self.queryset.count(), False
+        if self.count_mode == 'estimate':
+            counted = self.queryset.order_by()[:ESTIMATE_LIMIT + 1].count()
+            return min(counted, ESTIMATE_LIMIT), counted > ESTIMATE_LIMIT
+        return None, False
+
+    @property
+    def count(self):
+        """Total rows (a lower bound when count_is_estimate), or None when not counted"""
+        return self._counted[0]
+
+    @property
+    def count_is_estimate(self):
+        return self._counted[1]
+
+    @property
+    def num_pages(self):
+        if self.count is None:
+            return None
+        return max(math.ceil(self.count / self.per_page), 1)
+
+    def make_cursor(self, obj, direction, offset):
+        """Build the opaque token for the page next to obj"""
+        return signing.dumps({
+            'f': self.fingerprint,
+            'd': direction,
+            'o': offset,
+            'k': [_encode(key.value(obj)) for key in self.keys],
+        }, salt=CURSOR_SALT, compress=True)
+
+    def _read_cursor(self, cursor):
+        """Decode a token, or None if it is missing, tampered with or for another ordering"""
+        if not cursor:
+            return None
+        try:
+            payload = signing.loads(cursor, salt=CURSOR_SALT)
+        except signing.BadSignature:
+            return None
+        if payload.get('f') != self.fingerprint or len(payload.get('k', ())) != len(self.keys):
+            return None
+        try:
+            values = [key.to_python(value) for key, value in zip(self.keys, payload['k'])]
+        except Exception:
+            return None
+        return payload['d'], max(int(payload.get('o', 0)), 0), values
+
+    def _after(self, values, reverse):
+        """Q for the rows after the cursor row in scan order"""
+        condition = None
+        equal_so_far = Q()
+        for key, value in zip(self.keys, values):
+            beyond = key.beyond(value, reverse)
+            if beyond is not None:
+                term = equal_so_far & beyond
+                condition = term if condition is None else condition | term
+            equal_so_far &= key.equal(value)
+        return condition if condition is not None else Q(pk__in=[])
+
+    def get_page(self, cursor=None):
+        """
+        Get the page a cursor token points to
+
+        Unknown or invalid tokens fall back to the first page.
+        """
+        decoded = self._read_cursor(cursor)
+        if decoded is None:
+            rows = list(self.queryset.order_by(*[key.order_by() for key in self.keys])[:self.per_page + 1])
+            return CursorPage(rows[:self.per_page], self, 0, len(rows) > self.per_page, False)
+
+        direction, offset, values = decoded
+        reverse = direction == 'previous'
+        queryset = self.queryset.filter(self._after(values, reverse))
+        rows = list(queryset.order_by(*[key.order_by(reverse) for key in self.keys])[:self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not reverse:
+            return CursorPage(rows, self, offset, more, True)
+        rows.reverse()
+        return CursorPage(rows, self, offset if more else 0, True, more)
@@ -0,0 +1,165 @@
+"""
+On-demand cProfile captures of single requests
+
+Staff generate a signed profiling token for themselves or for an official
+from the admin profiling page. A request carrying the token in the ?profile=
+query parameter or the X-Profile header runs under cProfile, but only when
+it comes from the signed-in user the token was issued to and that user is
+staff or an official, so anonymous users can never trigger it. Each capture
+is a .prof file loadable with pstats or snakeviz, next to a JSON summary with
+the top cumulative functions and the request's database and template time.
+"""
+import cProfile
+import json
+import pstats
+import re
+import time
+import uuid
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.template.base import Template
+from django.utils import timezone
+
+from .instrumentation import QueryRecorder
+from .roles import resolve_user_type
+
+PROFILE_PARAM = 'profile'
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+CAPTURE_HEADER = 'X-Profile-Capture'
+SIGNING_SALT = 'app.profiling'
+TOP_FUNCTIONS = 25
+
+CAPTURE_ID = re.compile(r'^\d{8}-\d{12}-[0-9a-f]{8}$')
+
+# Top-level template renders, whose cumulative time is the request's template time
+_TEMPLATE_RENDER = Template.render.__code__
+_TEMPLATE_RENDER_KEY = (_TEMPLATE_RENDER.co_filename, _TEMPLATE_RENDER.co_firstlineno, _TEMPLATE_RENDER.co_name)
+
+
+def capture_dir():
+    return Path(getattr(settings, 'PROFILING_DIR', settings.BASE_DIR / 'profiles'))
+
+
+def can_profile(user):
+    """Whether a user may run requests under the profiler"""
+    if not user or not user.is_authenticated or not user.is_active:
+        return False
+    return user.is_staff or resolve_user_type(user) == 'official'
+
+
+def make_token(user):
+    """Sign a profiling token that only works for the given user, until it expires"""
+    return signing.dumps({'user': user.pk}, salt=SIGNING_SALT)
+
+
+def requested(request):
+    """Whether a request carries a valid profiling token of its signed-in staff or official user"""
+    token = request.GET.get(PROFILE_PARAM) or request.META.get(PROFILE_HEADER)
+    if not token or not can_profile(request.user):
+        return False
+    try:
+        data = signing.loads(token, salt=SIGNING_SALT, max_age=getattr(settings, 'PROFILING_TOKEN_MAX_AGE', 3600))
+    except signing.BadSignature:
+        return False
+    return data.get('user') == request.user.pk
+
+
+def profile_request(request, get_response):
+    """
+    Run one request under cProfile and save the capture
+
+    Returns:
+        HttpResponse: The response, with the capture id in the X-Profile-Capture header
+    """
+    profiler = cProfile.Profile()
+    recorder = QueryRecorder()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active in this thread
+            return get_response(request)
+        start = time.perf_counter()
+        try:
+            response = get_response(request)
+        finally:
+            profiler.disable()
+        total_ms = (time.perf_counter() - start) * 1000
+
+    capture = save_capture(request, response, profiler, recorder, total_ms)
+    response[CAPTURE_HEADER] = capture['id']
+    return response
+
+
+def summarize(profiler):
+    """
+    Get the template time and top cumulative functions of a profile
+
+    Returns:
+        tuple: (template ms, list of function dicts sorted by cumulative time)
+    """
+    stats = pstats.Stats(profiler).stats
+    template_ms = stats[_TEMPLATE_RENDER_KEY][3] * 1000 if _TEMPLATE_RENDER_KEY in stats else 0.0
+    top = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:TOP_FUNCTIONS]
+    functions = [
+        {
+            'function': pstats.func_std_string(key),
+            'calls': calls,
+            'own_ms': round(own * 1000, 2),
+            'cumulative_ms': round(cumulative * 1000, 2),
+        }
+        for key, (primitive_calls, calls, own, cumulative, callers) in top
+    ]
+    return template_ms, functions
+
+
+def save_capture(request, response, profiler, recorder, total_ms):
+    """Write the .prof file and JSON summary of a capture, dropping the oldest beyond PROFILING_MAX_CAPTURES"""
+    directory = capture_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    capture_id = f'{timezone.now():%Y%m%d-%H%M%S%f}-{uuid.uuid4().hex[:8]}'
+    template_ms, functions = summarize(profiler)
+    match = getattr(request, 'resolver_match', None)
+    capture = {
+        'id': capture_id,
+        'created_at': timezone.now().isoformat(),
+        'user': request.user.get_username(),
+        'method': request.method,
+        'path': request.get_full_path(),
+        'view': match.view_name if match else None,
+        'status': response.status_code,
+        'total_ms': round(total_ms, 1),
+        'db_ms': round(recorder.duration_ms, 1),
+        'queries': recorder.count,
+        'duplicates': recorder.duplicates,
+        'template_ms': round(template_ms, 1),
+        'functions': functions,
+    }
+    profiler.dump_stats(directory / f'{capture_id}.prof')
+    (directory / f'{capture_id}.json').write_text(json.dumps(capture, indent=2), encoding='utf-8')
+
+    keep = getattr(settings, 'PROFILING_MAX_CAPTURES', 100)
+    for summary in sorted(directory.glob('*.json'), reverse=True)[keep:]:
+        summary.unlink(missing_ok=True)
+        summary.with_suffix('.prof').unlink(missing_ok=True)
+    return capture
+
+
+def recent_captures(limit=50):
+    """Summaries of the newest captures first"""
+    summaries = sorted(capture_dir().glob('*.json'), reverse=True)[:limit]
+    return [json.loads(summary.read_text(encoding='utf-8')) for summary in summaries]
+
+
+def capture_file(capture_id):
+    """Path of a capture's .prof file, or None for unknown or malformed ids"""
+    if not CAPTURE_ID.match(capture_id):
+        return None
+    path = capture_dir() / f'{capture_id}.prof'
+    return path if path.exists() else None
@@ -0,0 +1,80 @@
+"""
+Caching for the pages anonymous visitors see
+
+The home page counters are four COUNT queries, so they are kept in the cache
+framework for HOME_COUNTERS_CACHE_SECONDS and dropped by signal handlers as
+soon as one of the counted rows changes. Static public pages are rendered once
+per URL for anonymous visitors and served from the cache until
+PUBLIC_PAGE_CACHE_SECONDS pass. Signed-in users see their own navbar and
+role-specific content, so their requests are never cached.
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+
+HOME_COUNTERS_KEY = 'home_counters'
+
+
+def home_counters():
+    """
+    Get the platform totals shown on the home page, querying only on a cache miss
+
+    Returns:
+        dict: total_companies, total_students, active_internships and total_positions
+    """
+    counters = cache.get(HOME_COUNTERS_KEY)
+    if counters is None:
+        from .models import Company, Internship, Position, Student
+
+        counters = {
+            'total_companies': Company.objects.filter(is_verified=True).count(),
+            'total_students': Student.objects.count(),
+            'active_internships': Internship.objects.filter(status='active').count(),
+            'total_positions': Position.objects.filter(is_active=True).count(),
+        }
+        cache.set(HOME_COUNTERS_KEY, counters, getattr(settings, 'HOME_COUNTERS_CACHE_SECONDS', 300))
+    return counters
+
+
+def forget_home_counters():
+    """Drop the cached home counters after a counted row changed"""
+    cache.delete(HOME_COUNTERS_KEY)
+
+
+def _page_key(request):
+    return f'public_page:{request.get_full_path()}'
+
+
+def is_anonymous_view(request):
+    """Whether a request sees exactly what every other anonymous visitor sees"""
+    return (
+        request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+        # len() looks at pending messages without marking them shown
+        and not len(messages.get_messages(request))
+    )
+
+
+def public_page(view):
+    """
+    Cache a view's response for anonymous visitors
+
+    Requests from signed-in users, and anonymous requests with flash messages
+    waiting to be shown, are rendered as usual. Every response varies on
+    Cookie, so shared caches never serve one visitor's page to another.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        cacheable = is_anonymous_view(request)
+        key = _page_key(request)
+        response = cache.get(key) if cacheable else None
+        if response is None:
+            response = view(request, *args, **kwargs)
+            patch_vary_headers(response, ['Cookie'])
+            if cacheable and response.status_code == 200 and not response.streaming:
+                cache.set(key, response, getattr(settings, 'PUBLIC_PAGE_CACHE_SECONDS', 600))
+        return response
+    return wrapper
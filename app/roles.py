@@ -0,0 +1,53 @@
+"""
+Role resolution for the internship management system
+
+A user's role is the first of the role groups they belong to. Resolving it
+costs a query against the user's groups, so the result is cached on the user
+instance for the rest of the request. It is deliberately not cached any
+longer: views check permissions against it, and a cache shared between
+requests would have to be invalidated in every process whenever a group
+membership changes, including from the admin and management commands.
+"""
+USER_TYPES = ('student', 'mentor', 'teacher', 'official')
+
+USER_ATTR = '_user_type'
+
+
+def resolve_user_type(user):
+    """
+    Get the role of a user from their groups, querying at most once per request
+
+    Args:
+        user: User instance (or request.user)
+
+    Returns:
+        str: 'student', 'mentor', 'teacher', 'official', or None
+    """
+    if not user or not user.is_authenticated:
+        return None
+
+    if hasattr(user, USER_ATTR):
+        return getattr(user, USER_ATTR)
+
+    user_groups = set(user.groups.filter(name__in=USER_TYPES).values_list('name', flat=True))
+    user_type = next((name for name in USER_TYPES if name in user_groups), None)
+    setattr(user, USER_ATTR, user_type)
+    return user_type
+
+
+def get_request_user_type(request):
+    """Get the role of the requesting user, resolved once per request"""
+    if not hasattr(request, 'user_type'):
+        request.user_type = resolve_user_type(request.user)
+    return request.user_type
+
+
+def invalidate_user_type(user):
+    """
+    Forget the role cached on a user instance after their group membership changed
+
+    Args:
+        user: User instance whose groups changed
+    """
+    if hasattr(user, USER_ATTR):
+        delattr(user, USER_ATTR)
@@ -0,0 +1,461 @@
+"""
+Bulk import of student and teacher rosters
+
+An institute uploads a CSV or XLSX file with one account per row. Rows are
+read as a stream, the XLSX worksheet with iterparse so only the current row is
+held, and handled a chunk at a time. Each chunk is validated (email syntax,
+the institute's email domain, profile field lengths and choices), checked
+against the addresses taken by existing accounts with one query, and written
+with bulk_create in one transaction: users, their role group, their profiles
+and verified allauth email addresses. Imported accounts get no usable
+password; people sign in by resetting it through their institute address.
+
+Bulk inserts skip the model signals, so the user statistics are adjusted here
+with each chunk and the cached home counters dropped once the import ends. A row that cannot be
+imported is recorded in the error report and the rest carry on.
+
+Uploads larger than ROSTER_IMPORT_INLINE_BYTES are queued as RosterImport
+rows for the process_roster_imports worker.
+"""
+import csv
+import io
+import logging
+import posixpath
+import re
+import zipfile
+from datetime import timedelta
+from itertools import batched
+from xml.etree import ElementTree
+
+from allauth.account.models import EmailAddress
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from . import public, stats
+from .models import RosterImport, Student, Teacher
+from .utils import extract_domain_from_email
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500
+
+# Errors kept in a report; later ones are only counted
+MAX_REPORTED_ERRORS = 1000
+
+# An import left processing by a worker that died is claimed again after this
+# long, and given up on after MAX_ATTEMPTS claims
+CLAIM_LEASE = timedelta(minutes=30)
+MAX_ATTEMPTS = 3
+
+PROFILE_MODELS = {'student': Student, 'teacher': Teacher}
+PROFILE_FIELDS = {
+    'student': ['student_id', 'major', 'semester_of_study', 'phone'],
+    'teacher': ['department', 'title', 'employee_id', 'phone'],
+}
+
+HEADER_ALIASES = {
+    'email_address': 'email',
+    'e_mail': 'email',
+    'full_name': 'name',
+    'semester': 'semester_of_study',
+    'roll_number': 'student_id',
+    'roll_no': 'student_id',
+    'phone_number': 'phone',
+}
+
+SHEET_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+RELS_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+DOC_RELS_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+CELL_REF_RE = re.compile(r'[A-Z]+')
+
+
+class RosterError(Exception):
+    """Raised when a roster file cannot be read at all"""
+
+
+class ImportReport:
+    """Counts and per-row errors of one import"""
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+
+    def error(self, row, email, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row, 'email': email, 'error': message})
+
+
+def normalize_header(name):
+    """Map a column title like 'Email Address' to a field name like 'email'"""
+    key = re.sub(r'[^a-z0-9]+', '_', str(name or '').strip().lower()).strip('_')
+    return HEADER_ALIASES.get(key, key)
+
+
+def _records(lines):
+    """
+    Turn (row number, cell list) pairs into (row number, dict) records
+
+    The first non-blank line is the header; blank lines are skipped.
+    """
+    header = None
+    for number, cells in lines:
+        cells = [str(cell).strip() for cell in cells]
+        if not any(cells):
+            continue
+        if header is None:
+            header = [normalize_header(cell) for cell in cells]
+            if 'email' not in header:
+                raise RosterError('The file needs an "email" column.')
+            continue
+        yield number, {name: value for name, value in zip(header, cells) if name and value}
+
+
+def read_csv(file):
+    """Stream the records of a UTF-8 CSV file opened in binary mode"""
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    reader = csv.reader(text)
+    try:
+        yield from _records((reader.line_num, cells) for cells in reader)
+    except UnicodeDecodeError:
+        raise RosterError('The CSV file is not UTF-8 encoded text; save it as "CSV UTF-8" and try again.')
+    except csv.Error as e:
+        raise RosterError(f'The CSV file could not be read: {e}')
+    finally:
+        text.detach()
+
+
+def _first_sheet_path(archive):
+    """Find the worksheet of a workbook's first sheet"""
+    try:
+        workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+        sheet = workbook.find(f'{SHEET_NS}sheets/{SHEET_NS}sheet')
+        rel_id = sheet.get(f'{DOC_RELS_NS}id')
+        rels = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+        for rel in rels.iter(f'{RELS_NS}Relationship'):
+            if rel.get('Id') == rel_id:
+                target = rel.get('Target')
+                return target.lstrip('/') if target.startswith('/') else posixpath.normpath(f'xl/{target}')
+    except (KeyError, AttributeError, ElementTree.ParseError):
+        pass
+    return 'xl/worksheets/sheet1.xml'
+
+
+def _shared_strings(archive):
+    """Read the workbook's shared string table"""
+    try:
+        part = archive.open('xl/sharedStrings.xml')
+    except KeyError:
+        return []
+    strings = []
+    with part:
+        for _, element in ElementTree.iterparse(part):
+            if element.tag == f'{SHEET_NS}si':
+                strings.append(''.join(text.text or '' for text in element.iter(f'{SHEET_NS}t')))
+                element.clear()
+    return strings
+
+
+def _column_index(ref):
+    index = 0
+    for letter in CELL_REF_RE.match(ref).group():
+        index = index * 26 + ord(letter) - 64
+    return index - 1
+
+
+def _cell_value(cell, shared):
+    kind = cell.get('t')
+    if kind == 'inlineStr':
+        return ''.join(text.text or '' for text in cell.iter(f'{SHEET_NS}t'))
+    value = cell.findtext(f'{SHEET_NS}v') or ''
+    if kind == 's':
+        return shared[int(value)] if value else ''
+    if kind == 'b':
+        return 'TRUE' if value == '1' else 'FALSE'
+    if kind in (None, 'n') and value:
+        # Whole numbers, like roll numbers typed as numbers, come back without a decimal part
+        try:
+            number = float(value)
+        except ValueError:
+            return value
+        return str(int(number)) if number.is_integer() else value
+    return value
+
+
+def _sheet_lines(archive):
+    shared = _shared_strings(archive)
+    try:
+        part = archive.open(_first_sheet_path(archive))
+    except KeyError:
+        raise RosterError('The workbook has no worksheet.')
+    with part:
+        sheet_data = None
+        number = 0
+        for event, element in ElementTree.iterparse(part, events=('start', 'end')):
+            if event == 'start':
+                if element.tag == f'{SHEET_NS}sheetData':
+                    sheet_data = element
+                continue
+            if element.tag != f'{SHEET_NS}row':
+                continue
+            cells = []
+            for position, cell in enumerate(element.iter(f'{SHEET_NS}c')):
+                ref = cell.get('r')
+                index = _column_index(ref) if ref else position
+                cells.extend([''] * (index - len(cells) + 1))
+                cells[index] = _cell_value(cell, shared)
+            number = int(element.get('r') or number + 1)
+            yield number, cells
+            # Drop the rows read so far, so memory stays flat however long the sheet is
+            if sheet_data is not None:
+                sheet_data.clear()
+
+
+def read_xlsx(file):
+    """Stream the records of the first worksheet of an XLSX workbook"""
+    try:
+        archive = zipfile.ZipFile(file)
+    except zipfile.BadZipFile:
+        raise RosterError('The file is not a valid XLSX workbook.')
+    with archive:
+        try:
+            yield from _records(_sheet_lines(archive))
+        except (ElementTree.ParseError, zipfile.BadZipFile, ValueError, IndexError):
+            raise RosterError('The XLSX workbook could not be read.')
+
+
+def read_rows(file, name):
+    """
+    Stream (row number, record) pairs of a roster file by its extension
+
+    Raises:
+        RosterError: For files that are neither CSV nor XLSX
+    """
+    extension = posixpath.splitext(name.lower())[1]
+    if extension == '.csv':
+        return read_csv(file)
+    if extension == '.xlsx':
+        return read_xlsx(file)
+    raise RosterError('Upload a .csv or .xlsx file.')
+
+
+def _user_fields(record):
+    first_name, last_name = record.get('first_name', ''), record.get('last_name', '')
+    if not (first_name or last_name) and record.get('name'):
+        first_name, _, last_name = record['name'].partition(' ')
+    return {'first_name': first_name, 'last_name': last_name.strip()}
+
+
+def _clean_fields(model, values):
+    """
+    Check values against the length and choices of their model fields
+
+    Returns:
+        str: The first problem found, or None
+    """
+    for name, value in values.items():
+        field = model._meta.get_field(name)
+        if field.max_length and len(value) > field.max_length:
+            return f'{field.verbose_name.capitalize()} is longer than {field.max_length} characters'
+        if value and field.choices and value not in dict(field.choices):
+            allowed = ', '.join(str(choice) for choice, _ in field.choices)
+            return f'{field.verbose_name.capitalize()} must be one of {allowed}'
+    return None
+
+
+def _validate(record, role, domain):
+    """
+    Check one record
+
+    Returns:
+        tuple: (email, user fields, profile fields, problem or None)
+    """
+    email = record.get('email', '').lower()
+    user_fields = _user_fields(record)
+    profile_fields = {name: record[name] for name in PROFILE_FIELDS[role] if name in record}
+    if not email:
+        return email, user_fields, profile_fields, 'Email is missing'
+    try:
+        validate_email(email)
+    except ValidationError:
+        return email, user_fields, profile_fields, 'Not a valid email address'
+    if extract_domain_from_email(email) != domain:
+        return email, user_fields, profile_fields, f'Email must be an @{domain} address'
+    problem = _clean_fields(User, user_fields) or _clean_fields(PROFILE_MODELS[role], profile_fields)
+    return email, user_fields, profile_fields, problem
+
+
+def taken_addresses(emails):
+    """Get which of the given lowercase addresses existing accounts already use, in one query"""
+    users = User.objects.annotate(address=Lower('email')).filter(address__in=emails).values_list('address')
+    usernames = User.objects.filter(username__in=emails).values_list('username')
+    addresses = EmailAddress.objects.annotate(address=Lower('email')).filter(address__in=emails).values_list('address')
+    return {address.lower() for (address,) in users.union(usernames, addresses)}
+
+
+def _create_accounts(institute, role, group, accounts):
+    """Create users, memberships, profiles and email addresses for validated rows"""
+    now = timezone.now()
+    users = User.objects.bulk_create([
+        User(
+            username=email, email=email, password=make_password(None), date_joined=now, **user_fields
+        )
+        for _, email, user_fields, _ in accounts
+    ])
+    User.groups.through.objects.bulk_create([
+        User.groups.through(user_id=user.pk, group_id=group.pk) for user in users
+    ])
+    PROFILE_MODELS[role].objects.bulk_create([
+        PROFILE_MODELS[role](user=user, institute=institute, **profile_fields)
+        for user, (_, _, _, profile_fields) in zip(users, accounts)
+    ])
+    EmailAddress.objects.bulk_create([
+        EmailAddress(user=user, email=user.email, verified=True, primary=True) for user in users
+    ])
+    stats.adjust(stats.USER_ENTITY, role, stats.as_day(now), len(users))
+    return len(users)
+
+
+def accepts_rosters(institute):
+    """
+    Whether accounts may be created for an institute's email domain
+
+    Imported addresses are marked verified, so the domain must be one an
+    official has checked; otherwise whoever registered the institute could
+    claim accounts for any address on a domain they typed in.
+    """
+    return institute.registration_status == 'approved' and institute.domain_verified and bool(institute.email_domain)
+
+
+def import_rows(institute, role, rows, chunk_size=CHUNK_SIZE, report=None):
+    """
+    Create accounts for the records of a roster
+
+    Args:
+        institute: Institute the accounts join; its email_domain is enforced
+        role: 'student' or 'teacher'
+        rows: Iterable of (row number, record) pairs, as from read_rows
+        report: ImportReport to add to, which keeps the counts of the chunks
+            already committed when reading the file fails part way
+
+    Returns:
+        ImportReport: Rows read, accounts created and the rows that failed
+
+    Raises:
+        RosterError: When the roster cannot be imported at all
+    """
+    if role not in PROFILE_MODELS:
+        raise RosterError(f'Unknown role "{role}".')
+    domain = (institute.email_domain or '').lower()
+    if not domain:
+        raise RosterError(f'{institute.name} has no email domain to check the roster against.')
+    if not accepts_rosters(institute):
+        raise RosterError(f'{institute.name} must be approved with a verified email domain before rosters can be imported.')
+    group, _ = Group.objects.get_or_create(name=role)
+    report = report if report is not None else ImportReport()
+    seen = set()
+
+    for chunk in batched(rows, chunk_size):
+        accounts = []
+        for number, record in chunk:
+            report.rows += 1
+            email, user_fields, profile_fields, problem = _validate(record, role, domain)
+            if problem is None and email in seen:
+                problem = 'Same email as an earlier row'
+            if problem:
+                report.error(number, email, problem)
+                continue
+            seen.add(email)
+            accounts.append((number, email, user_fields, profile_fields))
+        if not accounts:
+            continue
+
+        taken = taken_addresses([email for _, email, _, _ in accounts])
+        for number, email, _, _ in accounts:
+            if email in taken:
+                report.error(number, email, 'An account with this email already exists')
+        accounts = [account for account in accounts if account[1] not in taken]
+        if not accounts:
+            continue
+        try:
+            with transaction.atomic():
+                report.created += _create_accounts(institute, role, group, accounts)
+        except IntegrityError as e:
+            # Most likely someone signed up with one of these addresses since the check
+            logger.warning('Roster chunk for %s failed: %s', institute, e)
+            for number, email, _, _ in accounts:
+                report.error(number, email, 'Could not be created, try importing this row again')
+
+    if report.created and role == 'student':
+        public.forget_home_counters()
+    return report
+
+
+def run_import(roster_import):
+    """
+    Process a stored roster upload, saving its outcome on the RosterImport
+
+    Returns:
+        RosterImport: The same import, finished as done or failed
+    """
+    roster_import.status = 'processing'
+    roster_import.started_at = timezone.now()
+    roster_import.save(update_fields=['status', 'started_at'])
+    report = ImportReport()
+    try:
+        with roster_import.file.open('rb') as file:
+            rows = read_rows(file, roster_import.file_name)
+            import_rows(roster_import.institute, roster_import.role, rows, report=report)
+    except RosterError as e:
+        roster_import.status = 'failed'
+        roster_import.last_error = str(e)
+    except Exception as e:
+        logger.exception('Roster import %s failed', roster_import.pk)
+        roster_import.status = 'failed'
+        roster_import.last_error = f'Unexpected error: {e}'
+    else:
+        roster_import.status = 'done'
+    roster_import.total_rows = report.rows
+    roster_import.created_count = report.created
+    roster_import.error_count = report.error_count
+    roster_import.errors = report.errors
+    roster_import.finished_at = timezone.now()
+    roster_import.save()
+    return roster_import
+
+
+def claim_next():
+    """
+    Claim the oldest queued import, so concurrent workers never process the same one
+
+    An import still processing after CLAIM_LEASE was held by a worker that
+    died and is claimed again; the rows that worker committed are then
+    reported as existing accounts. After MAX_ATTEMPTS claims it is failed
+    instead, so a file that kills its worker is not retried forever.
+
+    Returns:
+        RosterImport: The claimed import, or None when nothing is due
+    """
+    now = timezone.now()
+    due = RosterImport.objects.filter(Q(status='pending') | Q(status='processing', started_at__lt=now - CLAIM_LEASE))
+    for candidate in due.order_by('created_at').values('pk', 'status', 'started_at', 'attempts')[:5]:
+        # Only claim the import in the state it was read in, in case another worker just did
+        unchanged = RosterImport.objects.filter(
+            pk=candidate['pk'], status=candidate['status'], started_at=candidate['started_at']
+        )
+        if candidate['attempts'] >= MAX_ATTEMPTS:
+            unchanged.update(
+                status='failed', finished_at=now,
+                last_error=f'The import was interrupted {candidate["attempts"]} times and was given up on.',
+            )
+        elif unchanged.update(status='processing', started_at=now, attempts=F('attempts') + 1):
+            return RosterImport.objects.select_related('institute').get(pk=candidate['pk'])
+    return None
@@ -0,0 +1,285 @@
+"""
+Full-text search for internship positions
+
+Positions are copied into a separate search index: an FTS5 virtual table on
+SQLite, or a table of weighted tsvectors with a GIN index on PostgreSQL. Signal
+handlers keep the index in sync as positions are saved and deleted, and the
+rebuild_search_index management command repopulates it from scratch. Databases
+without full-text support fall back to unranked icontains filters.
+"""
+import re
+
+from django.db import connection as default_connection, transaction
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+SEARCH_TABLE = 'app_position_search'
+
+# Snippets are marked with control characters so they can be escaped before highlighting
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+
+TOKEN_RE = re.compile(r'[^\W_]+')
+MAX_TOKENS = 10
+
+
+def search_tokens(query):
+    """Split a user query into the words matched as prefixes"""
+    return TOKEN_RE.findall((query or '').lower())[:MAX_TOKENS]
+
+
+def document_rows(positions):
+    """Get the (pk, title, company, skills, description) rows to index"""
+    rows = positions.values_list('pk', 'title', 'company__name', 'skills_required', 'description')
+    for pk, *fields in rows.iterator(chunk_size=2000):
+        yield (pk, *(value or '' for value in fields))
+
+
+def highlight(snippet):
+    """Render a search snippet as HTML with the matched words in <mark> tags"""
+    html = escape(snippet or '')
+    return mark_safe(html.replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>'))
+
+
+class FallbackBackend:
+    """Unranked icontains search for databases without a full-text index"""
+    name = 'icontains'
+
+    def install(self, cursor):
+        pass
+
+    def uninstall(self, cursor):
+        pass
+
+    def index(self, cursor, rows):
+        pass
+
+    def remove(self, cursor, ids):
+        pass
+
+    def clear(self, cursor):
+        pass
+
+    def search(self, queryset, query, tokens):
+        return queryset.filter(
+            Q(title__icontains=query) |
+            Q(company__name__icontains=query) |
+            Q(description__icontains=query)
+        ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def snippets(self, cursor, ids, tokens):
+        return {}
+
+
+class SQLiteBackend:
+    """SQLite FTS5 index ranked with bm25"""
+    name = 'fts5'
+
+    # bm25 weights for title, company, skills and description
+    WEIGHTS = '10.0, 5.0, 3.0, 1.0'
+
+    def install(self, cursor):
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5('
+            f"title, company, skills, description, tokenize='porter unicode61')"
+        )
+
+    def uninstall(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+    def index(self, cursor, rows):
+        rows = list(rows)
+        self.remove(cursor, [row[0] for row in rows])
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, title, company, skills, description) VALUES (%s, %s, %s, %s, %s)',
+            rows,
+        )
+
+    def remove(self, cursor, ids):
+        cursor.executemany(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [(pk,) for pk in ids])
+
+    def clear(self, cursor):
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+
+    def match(self, tokens):
+        # Quoted prefix terms, so user input never reaches the FTS5 query syntax
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    def search(self, queryset, query, tokens):
+        table = queryset.model._meta.db_table
+        match = self.match(tokens)
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s', (match,)),
+        ).annotate(
+            # bm25 is lower for better matches; FTS5 seeks straight to the rowid inside the match
+            search_rank=RawSQL(
+                f'SELECT -bm25({SEARCH_TABLE}, {self.WEIGHTS}) FROM {SEARCH_TABLE} '
+                f'WHERE {SEARCH_TABLE} MATCH %s AND {SEARCH_TABLE}.rowid = "{table}"."id"',
+                (match,), output_field=FloatField(),
+            ),
+        )
+
+    def snippets(self, cursor, ids, tokens):
+        placeholders = ', '.join(['%s'] * len(ids))
+        cursor.execute(
+            f"SELECT rowid, snippet({SEARCH_TABLE}, -1, %s, %s, '…', 24) FROM {SEARCH_TABLE} "
+            f'WHERE {SEARCH_TABLE} MATCH %s AND rowid IN ({placeholders})',
+            [HIGHLIGHT_START, HIGHLIGHT_END, self.match(tokens), *ids],
+        )
+        return dict(cursor.fetchall())
+
+
+class PostgresBackend:
+    """PostgreSQL tsvector index ranked with ts_rank_cd"""
+    name = 'tsvector'
+
+    DOCUMENT = (
+        "setweight(to_tsvector('english', %s), 'A') || "
+        "setweight(to_tsvector('english', %s), 'B') || "
+        "setweight(to_tsvector('english', %s), 'C') || "
+        "setweight(to_tsvector('english', %s), 'D')"
+    )
+
+    def install(self, cursor):
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ('
+            'position_id bigint PRIMARY KEY REFERENCES app_position (id) ON DELETE CASCADE, '
+            'document tsvector NOT NULL, '
+            'body text NOT NULL)'
+        )
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_idx ON {SEARCH_TABLE} USING GIN (document)')
+
+    def uninstall(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+    def index(self, cursor, rows):
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE} (position_id, document, body) VALUES (%s, {self.DOCUMENT}, %s) '
+            'ON CONFLICT (position_id) DO UPDATE SET document = EXCLUDED.document, body = EXCLUDED.body',
+            [(pk, title, company, skills, description, description)
+             for pk, title, company, skills, description in rows],
+        )
+
+    def remove(self, cursor, ids):
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE position_id = ANY(%s)', [list(ids)])
+
+    def clear(self, cursor):
+        cursor.execute(f'TRUNCATE {SEARCH_TABLE}')
+
+    def match(self, tokens):
+        return ' & '.join(f'{token}:*' for token in tokens)
+
+    def search(self, queryset, query, tokens):
+        table = queryset.model._meta.db_table
+        tsquery = self.match(tokens)
+        return queryset.filter(
+            pk__in=RawSQL(
+                f"SELECT position_id FROM {SEARCH_TABLE} WHERE document @@ to_tsquery('english', %s)", (tsquery,),
+            ),
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT ts_rank_cd(document, to_tsquery('english', %s)) FROM {SEARCH_TABLE} "
+                f'WHERE {SEARCH_TABLE}.position_id = "{table}"."id"',
+                (tsquery,), output_field=FloatField(),
+            ),
+        )
+
+    def snippets(self, cursor, ids, tokens):
+        options = f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MinWords=12, MaxWords=24'
+        cursor.execute(
+            f"SELECT position_id, ts_headline('english', body, to_tsquery('english', %s), %s) "
+            f'FROM {SEARCH_TABLE} WHERE position_id = ANY(%s)',
+            [self.match(tokens), options, list(ids)],
+        )
+        return dict(cursor.fetchall())
+
+
+_fts5_support = {}
+
+
+def _has_fts5(connection):
+    """Check once per database whether SQLite was compiled with FTS5"""
+    if connection.alias not in _fts5_support:
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA compile_options')
+            options = {row[0] for row in cursor.fetchall()}
+        _fts5_support[connection.alias] = 'ENABLE_FTS5' in options
+    return _fts5_support[connection.alias]
+
+
+def get_backend(connection=None):
+    """Get the search backend for a database connection"""
+    connection = connection or default_connection
+    if connection.vendor == 'sqlite' and _has_fts5(connection):
+        return SQLiteBackend()
+    if connection.vendor == 'postgresql':
+        return PostgresBackend()
+    return FallbackBackend()
+
+
+def index_positions(positions):
+    """Add or refresh the index entries of a queryset of positions"""
+    backend = get_backend()
+    with default_connection.cursor() as cursor:
+        backend.index(cursor, document_rows(positions))
+
+
+def remove_positions(ids):
+    """Drop the index entries of deleted positions"""
+    ids = list(ids)
+    if ids:
+        with default_connection.cursor() as cursor:
+            get_backend().remove(cursor, ids)
+
+
+@transaction.atomic
+def rebuild(positions):
+    """
+    Repopulate the search index from scratch
+
+    Args:
+        positions: Queryset of every position to index
+
+    Returns:
+        int: Number of positions indexed
+    """
+    backend = get_backend()
+    rows = list(document_rows(positions))
+    with default_connection.cursor() as cursor:
+        backend.clear(cursor)
+        backend.index(cursor, rows)
+    return len(rows)
+
+
+def search_positions(queryset, query):
+    """
+    Filter positions by a full-text query
+
+    The returned queryset is annotated with search_rank, higher for better
+    matches. Snippets are left to attach_snippets() so they are only built
+    for the page being shown.
+    """
+    tokens = search_tokens(query)
+    if not tokens:
+        return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+    return get_backend().search(queryset, query, tokens)
+
+
+def attach_snippets(positions, query):
+    """
+    Set search_snippet on each position to the text around its matches
+
+    Args:
+        positions: The positions being displayed, e.g. a page of results
+        query: The search query the positions were found with
+    """
+    positions = list(positions)
+    tokens = search_tokens(query)
+    snippets = {}
+    if positions and tokens:
+        with default_connection.cursor() as cursor:
+            snippets = get_backend().snippets(cursor, [position.pk for position in positions], tokens)
+    for position in positions:
+        position.search_snippet = snippets.get(position.pk, '')
@@ -0,0 +1,212 @@
+"""
+Signal handlers for the internship management system
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from . import inbox, matching, public, search, stats
+from .models import Institute, Company, Student, Position, Application, Internship, Notification
+from .roles import invalidate_user_type
+from .utils import invalidate_available_organizations
+
+ROLLUP_MODELS = {rollup.model for rollup in stats.ROLLUPS}
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop the role cached on a user instance when its group membership changes"""
+    if action in ('post_add', 'post_remove', 'post_clear') and not reverse:
+        invalidate_user_type(instance)
+
+
+@receiver(pre_save)
+def remember_stat_buckets(sender, instance, **kwargs):
+    """Record which statistics buckets a row was counted in before it changes"""
+    if sender in ROLLUP_MODELS:
+        instance._stat_buckets = stats.stored_buckets(sender, instance.pk) if instance.pk else {}
+
+
+@receiver(post_save)
+def update_stat_buckets(sender, instance, **kwargs):
+    """Move a saved row into its new statistics buckets"""
+    if sender not in ROLLUP_MODELS:
+        return
+    old_buckets = getattr(instance, '_stat_buckets', {})
+    for rollup in stats.rollups_for(sender):
+        stats.move(rollup.entity, old_buckets.get(rollup.entity), rollup.bucket(instance))
+
+
+@receiver(post_delete)
+def remove_stat_buckets(sender, instance, **kwargs):
+    """Stop counting a deleted row"""
+    if sender not in ROLLUP_MODELS:
+        return
+    for rollup in stats.rollups_for(sender):
+        stats.move(rollup.entity, rollup.bucket(instance), None)
+
+
+@receiver(post_save, sender=User)
+def count_new_user(sender, instance, created, **kwargs):
+    """Count new users, who have no role until they join a group"""
+    if created:
+        stats.adjust(stats.USER_ENTITY, stats.NO_STATUS, stats.as_day(instance.date_joined), 1)
+
+
+@receiver(pre_delete, sender=User)
+def remember_user_role(sender, instance, **kwargs):
+    """Record a user's role before their group memberships are deleted"""
+    instance._stat_role = stats.user_roles([instance.pk])[instance.pk]
+
+
+@receiver(post_delete, sender=User)
+def uncount_deleted_user(sender, instance, **kwargs):
+    """Stop counting a deleted user"""
+    role = getattr(instance, '_stat_role', stats.NO_STATUS)
+    stats.adjust(stats.USER_ENTITY, role, stats.as_day(instance.date_joined), -1)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def update_user_role_stats(sender, instance, action, reverse, pk_set, **kwargs):
+    """Move users between role buckets when their groups change"""
+    if action in ('pre_add', 'pre_remove', 'pre_clear'):
+        if not reverse:
+            user_ids = [instance.pk]
+        elif pk_set is not None:
+            user_ids = list(pk_set)
+        else:
+            user_ids = list(instance.user_set.values_list('pk', flat=True))
+        instance._stat_roles = stats.user_roles(user_ids)
+        return
+
+    old_roles = getattr(instance, '_stat_roles', None)
+    if not old_roles:
+        return
+    new_roles = stats.user_roles(list(old_roles))
+    changed = [user_id for user_id in old_roles if old_roles[user_id] != new_roles[user_id]]
+    if not changed:
+        return
+    if reverse:
+        joined = dict(User.objects.filter(pk__in=changed).values_list('pk', 'date_joined'))
+    else:
+        joined = {instance.pk: instance.date_joined}
+    for user_id in changed:
+        day = stats.as_day(joined[user_id])
+        stats.move(stats.USER_ENTITY, (old_roles[user_id], day), (new_roles[user_id], day))
+
+
+@receiver(pre_save, sender=Application)
+def remember_counted_application(sender, instance, **kwargs):
+    """Record the position and status an application was counted under"""
+    instance._counted_as = None
+    if instance.pk:
+        instance._counted_as = sender.objects.filter(pk=instance.pk).values_list('position_id', 'status').first()
+
+
+@receiver(post_save, sender=Application)
+def update_position_counters(sender, instance, **kwargs):
+    """Move a saved application between its positions' counters"""
+    old = getattr(instance, '_counted_as', None)
+    new = (instance.position_id, instance.status)
+    if old == new:
+        return
+    changes = [(*new, 1)]
+    if old:
+        changes.append((*old, -1))
+    Position.adjust_application_counters(changes)
+
+
+@receiver(post_delete, sender=Application)
+def uncount_deleted_application(sender, instance, **kwargs):
+    """Stop counting a deleted application against its position"""
+    Position.adjust_application_counters([(instance.position_id, instance.status, -1)])
+
+
+@receiver(post_save, sender=Position)
+def index_saved_position(sender, instance, **kwargs):
+    """Refresh the search index entry of a saved position"""
+    search.index_positions(sender.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Position)
+def unindex_deleted_position(sender, instance, **kwargs):
+    """Drop a deleted position from the search index"""
+    search.remove_positions([instance.pk])
+
+
+@receiver(post_save, sender=Position)
+@receiver(post_delete, sender=Position)
+def rematch_position(sender, instance, **kwargs):
+    """Have every process re-read a changed position into its skill matching index, once committed"""
+    pk = instance.pk
+    transaction.on_commit(lambda: matching.position_changed(pk))
+
+
+@receiver(post_save, sender=Company)
+def reindex_company_positions(sender, instance, created, **kwargs):
+    """Positions are searchable by company name, so refresh them with their company"""
+    if not created:
+        search.index_positions(Position.objects.filter(company=instance))
+
+
+@receiver(pre_delete, sender=Company)
+def remember_company_positions(sender, instance, **kwargs):
+    """Record the positions that lose their company when it is deleted"""
+    instance._search_position_ids = list(Position.objects.filter(company=instance).values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Company)
+def reindex_orphaned_positions(sender, instance, **kwargs):
+    """Drop the deleted company's name from its former positions"""
+    position_ids = getattr(instance, '_search_position_ids', [])
+    if position_ids:
+        search.index_positions(Position.objects.filter(pk__in=position_ids))
+
+
+@receiver(post_save, sender=Institute)
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Institute)
+@receiver(post_delete, sender=Company)
+def invalidate_joinable_organizations(sender, instance, **kwargs):
+    """Drop cached organization lists that may include stale names, domains or statuses"""
+    invalidate_available_organizations(sender)
+
+
+@receiver(post_save, sender=Notification)
+def update_unread_counter(sender, instance, created, **kwargs):
+    """Count new unread notifications; edits may mark them read, so recount on the next read"""
+    if not created:
+        inbox.forget_unread([instance.recipient_id])
+    elif not instance.is_read:
+        inbox.count_new_notification(instance.recipient_id)
+
+
+@receiver(post_delete, sender=Notification)
+def uncount_deleted_notification(sender, instance, **kwargs):
+    if not instance.is_read:
+        inbox.forget_unread([instance.recipient_id])
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_save, sender=Student)
+@receiver(post_save, sender=Internship)
+@receiver(post_save, sender=Position)
+@receiver(post_delete, sender=Company)
+@receiver(post_delete, sender=Student)
+@receiver(post_delete, sender=Internship)
+@receiver(post_delete, sender=Position)
+def invalidate_home_counters(sender, instance, **kwargs):
+    """Drop the cached home page totals when a counted row changes"""
+    public.forget_home_counters()
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    """Apply SQLITE_PRAGMAS to each new SQLite connection"""
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,345 @@
+"""
+Materialized statistics for the official reports
+
+Every counted row falls into one (entity, status, day) bucket of the
+DailyStatistic table. Signal handlers move rows between buckets as they are
+created, changed and deleted, and bulk updates go through update(), so reports
+are served from a few grouped reads over the rollup instead of dozens of
+COUNT(*) queries over live tables. The backfill_stats management command
+rebuilds the rollup from scratch and can diff it against live counts.
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Case, CharField, Count, F, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncDate, TruncMonth
+from django.utils import timezone
+
+from .models import Company, Institute, Position, Application, Internship, DailyStatistic
+from .roles import USER_TYPES
+
+NO_STATUS = 'none'
+
+
+def as_day(value):
+    """Convert a date or datetime to the local day it falls on"""
+    if isinstance(value, datetime):
+        return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    return value
+
+
+def _flag(field, true_status, false_status):
+    """SQL expression mapping a boolean field onto two status names"""
+    return Case(
+        When(**{field: True}, then=Value(true_status)),
+        default=Value(false_status),
+        output_field=CharField(),
+    )
+
+
+class Rollup:
+    """How the rows of one model are bucketed for one entity"""
+
+    def __init__(self, entity, model, fields, status, day, status_expr, day_expr):
+        self.entity = entity
+        self.model = model
+        self.fields = fields
+        self.status = status
+        self.day = day
+        self.status_expr = status_expr
+        self.day_expr = day_expr
+
+    def bucket(self, obj):
+        """Get the (status, day) bucket of an instance or field namespace"""
+        return (self.status(obj) or NO_STATUS, as_day(self.day(obj)))
+
+    def live_counts(self):
+        """Count live rows per bucket with a single grouped query"""
+        rows = self.model.objects.annotate(
+            rollup_status=self.status_expr,
+            rollup_day=self.day_expr,
+        ).values('rollup_status', 'rollup_day').annotate(total=Count('pk'))
+        counts = defaultdict(int)
+        for row in rows:
+            counts[(self.entity, row['rollup_status'] or NO_STATUS, row['rollup_day'])] += row['total']
+        return counts
+
+
+ROLLUPS = [
+    Rollup(
+        'company', Company, ['registration_status', 'created_at'],
+        status=lambda o: o.registration_status,
+        day=lambda o: o.created_at,
+        status_expr=F('registration_status'),
+        day_expr=TruncDate('created_at'),
+    ),
+    Rollup(
+        'company_domain', Company, ['domain_verified', 'created_at'],
+        status=lambda o: 'verified' if o.domain_verified else 'unverified',
+        day=lambda o: o.created_at,
+        status_expr=_flag('domain_verified', 'verified', 'unverified'),
+        day_expr=TruncDate('created_at'),
+    ),
+    Rollup(
+        'institute', Institute, ['registration_status', 'created_at'],
+        status=lambda o: o.registration_status,
+        day=lambda o: o.created_at,
+        status_expr=F('registration_status'),
+        day_expr=TruncDate('created_at'),
+    ),
+    Rollup(
+        'institute_domain', Institute, ['domain_verified', 'created_at'],
+        status=lambda o: 'verified' if o.domain_verified else 'unverified',
+        day=lambda o: o.created_at,
+        status_expr=_flag('domain_verified', 'verified', 'unverified'),
+        day_expr=TruncDate('created_at'),
+    ),
+    Rollup(
+        'position', Position, ['is_active', 'created_at'],
+        status=lambda o: 'active' if o.is_active else 'inactive',
+        day=lambda o: o.created_at,
+        status_expr=_flag('is_active', 'active', 'inactive'),
+        day_expr=TruncDate('created_at'),
+    ),
+    Rollup(
+        'application', Application, ['status', 'applied_at'],
+        status=lambda o: o.status,
+        day=lambda o: o.applied_at,
+        status_expr=F('status'),
+        day_expr=TruncDate('applied_at'),
+    ),
+    # Internships are bucketed by start date, falling back to creation for undated ones
+    Rollup(
+        'internship', Internship, ['status', 'start_date', 'created_at'],
+        status=lambda o: o.status,
+        day=lambda o: o.start_date or o.created_at,
+        status_expr=F('status'),
+        day_expr=Coalesce('start_date', TruncDate('created_at')),
+    ),
+]
+
+USER_ENTITY = 'user'
+
+
+def rollups_for(model):
+    """Get the rollups that count rows of a model"""
+    return [rollup for rollup in ROLLUPS if rollup.model is model]
+
+
+def adjust(entity, status, day, delta):
+    """Add delta to a single bucket, creating it on first use"""
+    if day is None or not delta:
+        return
+    updated = DailyStatistic.objects.filter(
+        entity=entity, status=status, day=day
+    ).update(count=F('count') + delta)
+    if not updated:
+        try:
+            with transaction.atomic():
+                DailyStatistic.objects.create(entity=entity, status=status, day=day, count=delta)
+        except IntegrityError:
+            # Another writer created the bucket first
+            DailyStatistic.objects.filter(
+                entity=entity, status=status, day=day
+            ).update(count=F('count') + delta)
+
+
+def move(entity, old_bucket, new_bucket):
+    """Move one counted row from its old bucket to its new one"""
+    if old_bucket == new_bucket:
+        return
+    if old_bucket:
+        adjust(entity, old_bucket[0], old_bucket[1], -1)
+    if new_bucket:
+        adjust(entity, new_bucket[0], new_bucket[1], 1)
+
+
+def stored_buckets(model, pk):
+    """Get the current buckets of a saved row, keyed by entity"""
+    rollups = rollups_for(model)
+    fields = sorted({field for rollup in rollups for field in rollup.fields})
+    values = model.objects.filter(pk=pk).values(*fields).first()
+    if values is None:
+        return {}
+    stored = SimpleNamespace(**values)
+    return {rollup.entity: rollup.bucket(stored) for rollup in rollups}
+
+
+def user_roles(user_ids):
+    """Get the role of each user in user_ids from their groups"""
+    memberships = defaultdict(set)
+    for user_id, name in User.groups.through.objects.filter(
+        user_id__in=user_ids, group__name__in=USER_TYPES
+    ).values_list('user_id', 'group__name'):
+        memberships[user_id].add(name)
+    return {
+        user_id: next((name for name in USER_TYPES if name in memberships[user_id]), NO_STATUS)
+        for user_id in user_ids
+    }
+
+
+def user_live_counts():
+    """Count live users per role and joining day"""
+    roles = {}
+    for user_id, name in User.groups.through.objects.filter(
+        group__name__in=USER_TYPES
+    ).values_list('user_id', 'group__name').iterator():
+        current = roles.get(user_id)
+        if current is None or USER_TYPES.index(name) < USER_TYPES.index(current):
+            roles[user_id] = name
+
+    counts = defaultdict(int)
+    for user_id, date_joined in User.objects.values_list('pk', 'date_joined').iterator():
+        counts[(USER_ENTITY, roles.get(user_id, NO_STATUS), as_day(date_joined))] += 1
+    return counts
+
+
+def live_counts(entities=None):
+    """Count live rows per (entity, status, day) bucket"""
+    counts = defaultdict(int)
+    for rollup in ROLLUPS:
+        if entities is None or rollup.entity in entities:
+            counts.update(rollup.live_counts())
+    if entities is None or USER_ENTITY in entities:
+        counts.update(user_live_counts())
+    return counts
+
+
+def rollup_counts(entities=None):
+    """Get the materialized count of every (entity, status, day) bucket"""
+    rows = DailyStatistic.objects.all()
+    if entities is not None:
+        rows = rows.filter(entity__in=entities)
+    return {
+        (row['entity'], row['status'], row['day']): row['count']
+        for row in rows.values('entity', 'status', 'day', 'count')
+    }
+
+
+@transaction.atomic
+def rebuild(entities=None):
+    """
+    Recompute the rollup from live tables
+
+    Args:
+        entities: Optional iterable of entity names to rebuild (default: all)
+
+    Returns:
+        int: Number of buckets written
+    """
+    entities = set(entities) if entities is not None else None
+    counts = live_counts(entities)
+    stale = DailyStatistic.objects.all()
+    if entities is not None:
+        stale = stale.filter(entity__in=entities)
+    stale.delete()
+    DailyStatistic.objects.bulk_create(
+        [
+            DailyStatistic(entity=entity, status=status, day=day, count=total)
+            for (entity, status, day), total in counts.items()
+            if total
+        ],
+        batch_size=500,
+    )
+    return len(counts)
+
+
+def update(queryset, **values):
+    """
+    Bulk update rows of a counted model and move them between their buckets
+
+    QuerySet.update() bypasses the signal handlers, so the rows' buckets are
+    read before and after the update and the differences applied with one
+    adjust() per bucket that changed, in the same transaction. Reading them
+    back lets values be expressions (F(), Case(), Now()) whose results only
+    the database knows.
+
+    Args:
+        queryset: Rows to update
+        **values: Field values or expressions, as for QuerySet.update()
+
+    Returns:
+        int: Number of rows updated
+    """
+    rollups = rollups_for(queryset.model)
+    fields = sorted({field for rollup in rollups for field in rollup.fields})
+    with transaction.atomic():
+        rows = list(queryset.select_for_update().values('pk', *fields))
+        changed = queryset.model.objects.filter(pk__in=[row['pk'] for row in rows])
+        updated = changed.update(**values)
+        if not set(values) & set(fields):
+            return updated
+        new_rows = {row['pk']: row for row in changed.values('pk', *fields)}
+        deltas = defaultdict(int)
+        for row in rows:
+            old, new = SimpleNamespace(**row), SimpleNamespace(**new_rows[row['pk']])
+            for rollup in rollups:
+                old_bucket, new_bucket = rollup.bucket(old), rollup.bucket(new)
+                if old_bucket != new_bucket:
+                    deltas[(rollup.entity, *old_bucket)] -= 1
+                    deltas[(rollup.entity, *new_bucket)] += 1
+        for (entity, status, day), delta in deltas.items():
+            adjust(entity, status, day, delta)
+    return updated
+
+
+def verify(entities=None):
+    """
+    Diff the rollup against live counts
+
+    Returns:
+        list: (entity, status, day, rollup_count, live_count) for every mismatch
+    """
+    entities = set(entities) if entities is not None else None
+    live = live_counts(entities)
+    stored = rollup_counts(entities)
+    mismatches = []
+    for key in sorted(set(live) | set(stored), key=lambda k: (k[0], k[1], k[2] or date.min)):
+        if live.get(key, 0) != stored.get(key, 0):
+            mismatches.append((*key, stored.get(key, 0), live.get(key, 0)))
+    return mismatches
+
+
+def status_totals():
+    """Get the total row count per (entity, status) with one grouped read"""
+    totals = defaultdict(int)
+    for row in DailyStatistic.objects.values('entity', 'status').annotate(total=Sum('count')):
+        totals[(row['entity'], row['status'])] = row['total']
+    return totals
+
+
+def totals_since(day):
+    """Get the number of rows per entity created on or after day"""
+    totals = defaultdict(int)
+    for row in DailyStatistic.objects.filter(day__gte=day).values('entity').annotate(total=Sum('count')):
+        totals[row['entity']] = row['total']
+    return totals
+
+
+def monthly_totals(months=6):
+    """
+    Get the number of rows per entity for each of the last few calendar months
+
+    Returns:
+        list: (month_start, {entity: count}) pairs, oldest month first
+    """
+    first_month = timezone.localdate().replace(day=1)
+    for _ in range(months - 1):
+        first_month = (first_month - timedelta(days=1)).replace(day=1)
+
+    by_month = defaultdict(lambda: defaultdict(int))
+    rows = DailyStatistic.objects.filter(day__gte=first_month).annotate(
+        month=TruncMonth('day')
+    ).values('entity', 'month').annotate(total=Sum('count'))
+    for row in rows:
+        by_month[as_day(row['month'])][row['entity']] = row['total']
+
+    result = []
+    month = first_month
+    for _ in range(months):
+        result.append((month, by_month[month]))
+        month = (month + timedelta(days=32)).replace(day=1)
+    return result
@@ -0,0 +1,14 @@
+from django import template
+from django.urls import reverse
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def export_url(context, url_name, file_format):
+    """Link to an export of the current list, keeping its filters"""
+    params = context['request'].GET.copy()
+    params.pop('page', None)
+    params.pop('cursor', None)
+    params['format'] = file_format
+    return f'{reverse(url_name)}?{params.urlencode()}'
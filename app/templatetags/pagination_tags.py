@@ -0,0 +1,16 @@
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def cursor_url(context, cursor):
+    """Link to another page of the current list, keeping its filters"""
+    params = context['request'].GET.copy()
+    params.pop('page', None)
+    if cursor:
+        params['cursor'] = cursor
+    else:
+        params.pop('cursor', None)
+    query = params.urlencode()
+    return f'?{query}' if query else '?'
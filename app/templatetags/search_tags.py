@@ -0,0 +1,11 @@
+from django import template
+
+from ..search import highlight
+
+register = template.Library()
+
+
+@register.filter
+def highlight_snippet(snippet):
+    """Render a full-text search snippet with the matched words marked"""
+    return highlight(snippet)
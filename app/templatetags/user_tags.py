@@ -1,18 +1,15 @@
 from django import template
 from django.contrib.auth.models import User
 
+from .. import inbox
+from ..roles import resolve_user_type
+
 register = template.Library()
 
 @register.filter
 def get_user_type(user):
     """Template filter to get user type from groups"""
-    if not user.is_authenticated:
-        return None
-    user_groups = user.groups.values_list('name', flat=True)
-    for group_name in ['student', 'mentor', 'teacher', 'official']:
-        if group_name in user_groups:
-            return group_name
-    return None
+    return resolve_user_type(user)
 
 @register.filter
 def has_user_type(user):
@@ -23,3 +20,8 @@ def has_user_type(user):
 def is_user_type(user, user_type):
     """Template filter to check if user has a specific user type"""
     return get_user_type(user) == user_type
+
+@register.inclusion_tag('app/partials/notification_badge.html')
+def notification_badge(user):
+    """Render the unread notification badge from the cached counter"""
+    return inbox.badge_context(inbox.unread_count(user))
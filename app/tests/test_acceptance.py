@@ -0,0 +1,138 @@
+"""
+Test cases for accepting applications.
+Tests the acceptance service, the accept_application view and parallel
+accepts racing for the last spot of a position.
+"""
+
+import threading
+import time
+
+from django.test import TestCase, TransactionTestCase, Client
+from django.db import OperationalError, connection
+from django.urls import reverse
+from django.contrib.auth.models import User, Group
+
+from .. import acceptance
+from ..models import Student, Mentor, Company, Position, Application, Internship, Notification
+
+
+class AcceptanceTestMixin:
+    """Set up a mentor with a one-spot position and three applicants"""
+
+    def setUp(self):
+        for name in ['student', 'mentor']:
+            Group.objects.get_or_create(name=name)
+        self.company = Company.objects.create(name='Acme', registration_status='approved')
+        mentor_user = User.objects.create_user(username='mentor', email='m@example.com', password='testpass123')
+        mentor_user.groups.add(Group.objects.get(name='mentor'))
+        self.mentor = Mentor.objects.create(user=mentor_user, company=self.company)
+        self.position = Position.objects.create(
+            title='Backend Intern', company=self.company, mentor=self.mentor, max_students=1, duration='2',
+        )
+        self.applications = []
+        for i in range(3):
+            user = User.objects.create_user(username=f'student{i}', email=f's{i}@example.com', password='testpass123')
+            user.groups.add(Group.objects.get(name='student'))
+            student = Student.objects.create(user=user)
+            self.applications.append(Application.objects.create(student=student, position=self.position))
+
+
+class AcceptServiceTest(AcceptanceTestMixin, TestCase):
+    """Test the acceptance service"""
+
+    def test_accept_creates_internship_and_notification(self):
+        application = self.applications[0]
+        internship = acceptance.accept(application, notes='Welcome aboard')
+        application.refresh_from_db()
+        self.assertEqual(application.status, 'approved')
+        self.assertEqual(application.reviewer_notes, 'Welcome aboard')
+        self.assertIsNotNone(application.reviewed_at)
+        self.assertEqual(internship.application, application)
+        self.assertEqual(internship.mentor, self.mentor)
+        self.assertEqual((internship.end_date - internship.start_date).days, 60)
+        self.assertEqual(Notification.objects.filter(recipient=application.student.user).count(), 1)
+        self.position.refresh_from_db()
+        self.assertEqual(self.position.approved_application_count, 1)
+
+    def test_full_position_rejects_acceptance(self):
+        acceptance.accept(self.applications[0])
+        with self.assertRaises(acceptance.PositionFull):
+            acceptance.accept(self.applications[1])
+        self.applications[1].refresh_from_db()
+        self.assertEqual(self.applications[1].status, 'pending')
+        self.assertEqual(Internship.objects.count(), 1)
+
+    def test_capacity_is_counted_live(self):
+        """Test that a stale counter does not let a second applicant in"""
+        acceptance.accept(self.applications[0])
+        Position.objects.filter(pk=self.position.pk).update(approved_application_count=0)
+        with self.assertRaises(acceptance.PositionFull):
+            acceptance.accept(self.applications[1])
+
+    def test_stale_application_is_not_accepted_twice(self):
+        Position.objects.filter(pk=self.position.pk).update(max_students=2)
+        stale = Application.objects.get(pk=self.applications[0].pk)
+        acceptance.accept(self.applications[0])
+        with self.assertRaises(acceptance.AcceptanceError):
+            acceptance.accept(stale)
+        self.assertEqual(Internship.objects.count(), 1)
+
+
+class AcceptApplicationViewTest(AcceptanceTestMixin, TestCase):
+    """Test the accept_application view"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        self.client.login(username='mentor', password='testpass123')
+
+    def test_accept_then_full(self):
+        response = self.client.post(reverse('accept_application', args=[self.applications[0].nanoid]), {'notes': 'ok'})
+        self.assertRedirects(response, reverse('mentor_applications'), fetch_redirect_response=False)
+        self.assertEqual(Internship.objects.count(), 1)
+
+        response = self.client.post(reverse('accept_application', args=[self.applications[1].nanoid]), follow=True)
+        self.assertContains(response, 'already filled')
+        self.assertEqual(Internship.objects.count(), 1)
+
+
+class ConcurrentAcceptanceTest(AcceptanceTestMixin, TransactionTestCase):
+    """Test parallel accepts for the last spot of a position"""
+
+    def accept_in_thread(self, application, barrier, outcomes):
+        try:
+            barrier.wait()
+            while True:
+                try:
+                    acceptance.accept(application)
+                    outcomes.append('accepted')
+                    return
+                except acceptance.PositionFull:
+                    outcomes.append('full')
+                    return
+                except OperationalError as e:
+                    # The shared in-memory test database reports a held write
+                    # lock at once instead of waiting out busy_timeout
+                    if 'locked' not in str(e):
+                        raise
+                    time.sleep(0.01)
+        finally:
+            connection.close()
+
+    def test_exactly_one_accept_wins(self):
+        barrier = threading.Barrier(len(self.applications))
+        outcomes = []
+        threads = [
+            threading.Thread(target=self.accept_in_thread, args=(application, barrier, outcomes))
+            for application in self.applications
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(outcomes), ['accepted', 'full', 'full'])
+        self.assertEqual(Internship.objects.count(), 1)
+        self.assertEqual(Application.objects.filter(status='approved').count(), 1)
+        self.position.refresh_from_db()
+        self.assertEqual(self.position.approved_application_count, 1)
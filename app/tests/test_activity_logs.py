@@ -0,0 +1,191 @@
+"""
+Test cases for saving weekly activity logs.
+Tests that logs and entries are written in bulk, that edits only write what
+changed, and that the week and day constraints are enforced.
+"""
+
+from datetime import date, timedelta
+from unittest import mock
+
+from django.db import IntegrityError, connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User, Group
+
+from .. import activity_logs
+from ..forms import EntryFormSet
+from ..models import Student, Mentor, Company, Internship, Log, Entry
+
+MONDAY = date(2026, 3, 2)
+
+
+def formset_data(entries, initial=0):
+    """POST data of an EntryFormSet; entries are (id or None, date, description, delete) tuples"""
+    data = {
+        'form-TOTAL_FORMS': str(len(entries)),
+        'form-INITIAL_FORMS': str(initial),
+        'form-MIN_NUM_FORMS': '1',
+        'form-MAX_NUM_FORMS': '7',
+    }
+    for index, (pk, day, description, delete) in enumerate(entries):
+        data[f'form-{index}-id'] = str(pk or '')
+        data[f'form-{index}-date'] = day.isoformat()
+        data[f'form-{index}-description'] = description
+        if delete:
+            data[f'form-{index}-DELETE'] = 'on'
+    return data
+
+
+def writes(queries):
+    """Statement types of the writes to activity log tables"""
+    statements = [query['sql'] for query in queries if '"app_log"' in query['sql'] or '"app_entry"' in query['sql']]
+    return [sql.split()[0] for sql in statements if sql.split()[0] in ('INSERT', 'UPDATE', 'DELETE')]
+
+
+class ActivityLogTestMixin:
+    """Set up a student with an active internship"""
+
+    def setUp(self):
+        for name in ['student', 'mentor']:
+            Group.objects.get_or_create(name=name)
+        company = Company.objects.create(name='Acme', registration_status='approved')
+        mentor_user = User.objects.create_user(username='mentor', email='m@example.com', password='testpass123')
+        mentor_user.groups.add(Group.objects.get(name='mentor'))
+        mentor = Mentor.objects.create(user=mentor_user, company=company)
+        student_user = User.objects.create_user(username='amina', email='a@example.com', password='testpass123')
+        student_user.groups.add(Group.objects.get(name='student'))
+        self.student = Student.objects.create(user=student_user)
+        self.internship = Internship.objects.create(student=self.student, mentor=mentor, status='active')
+        self.client = Client()
+        self.client.login(username='amina', password='testpass123')
+
+    def week(self, count=7):
+        return [(None, MONDAY + timedelta(days=day), f'Day {day + 1}', False) for day in range(count)]
+
+    def create_log(self, entries):
+        log = Log.objects.create(internship=self.internship, week_starting=MONDAY)
+        return log, Entry.objects.bulk_create(
+            Entry(log=log, date=day, description=description) for _, day, description, _ in entries
+        )
+
+    def edit_formset(self, log, entries, initial):
+        return EntryFormSet(formset_data(entries, initial), queryset=Entry.objects.filter(log=log).order_by('date'))
+
+
+class CreateLogTest(ActivityLogTestMixin, TestCase):
+    """Test creating a log with its entries"""
+
+    def test_week_is_two_inserts(self):
+        formset = EntryFormSet(formset_data(self.week()), queryset=Entry.objects.none())
+        self.assertTrue(formset.is_valid())
+        with self.assertNumQueries(4):  # Savepoint, log, entries, release
+            log, created = activity_logs.create_log(self.internship, MONDAY, formset)
+        self.assertEqual(created, 7)
+        self.assertEqual([entry.description for entry in log.entries.all()], [f'Day {day}' for day in range(1, 8)])
+
+    def test_view(self):
+        data = {'week_starting': MONDAY.isoformat(), **formset_data(self.week())}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('create_activity_log'), data)
+        self.assertRedirects(response, reverse('student_activities'), fetch_redirect_response=False)
+        self.assertEqual(writes(queries), ['INSERT', 'INSERT'])
+        self.assertEqual(Entry.objects.filter(log__internship=self.internship).count(), 7)
+
+    def test_duplicate_week_is_caught_by_the_constraint(self):
+        self.create_log(self.week(1))
+        data = {'week_starting': MONDAY.isoformat(), **formset_data(self.week(2))}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('create_activity_log'), data)
+        statements = [query['sql'] for query in queries]
+        insert = next(index for index, sql in enumerate(statements) if sql.startswith('INSERT INTO "app_log"'))
+        self.assertFalse([sql for sql in statements[:insert] if sql.startswith('SELECT') and 'FROM "app_log"' in sql])
+        self.assertEqual(Entry.objects.count(), 1)
+        response = self.client.get(response.url)
+        self.assertContains(response, 'An activity log already exists for the week starting 2026-03-02.')
+
+    def test_other_integrity_errors_are_raised(self):
+        """Test that only a taken week becomes DuplicateLog"""
+        formset = EntryFormSet(formset_data(self.week(2)), queryset=Entry.objects.none())
+        self.assertTrue(formset.is_valid())
+        error = IntegrityError('NOT NULL constraint failed: app_entry.description')
+        with mock.patch.object(Entry.objects, 'bulk_create', side_effect=error):
+            with self.assertRaisesMessage(IntegrityError, 'app_entry.description'):
+                activity_logs.create_log(self.internship, MONDAY, formset)
+        self.assertFalse(Log.objects.exists())
+
+    def test_new_log_form_starts_empty(self):
+        self.create_log(self.week(3))
+        response = self.client.get(reverse('create_activity_log'))
+        self.assertEqual(response.context['entry_formset'].initial_form_count(), 0)
+
+    def test_one_entry_per_day(self):
+        entries = self.week(2) + [(None, MONDAY, 'Again', False)]
+        formset = EntryFormSet(formset_data(entries), queryset=Entry.objects.none())
+        self.assertFalse(formset.is_valid())
+        self.assertIn('more than one entry', formset.non_form_errors()[0])
+
+
+class UpdateLogTest(ActivityLogTestMixin, TestCase):
+    """Test that editing a log only writes what changed"""
+
+    def setUp(self):
+        super().setUp()
+        self.log, self.entries = self.create_log(self.week(3))
+        self.submitted = [(entry.pk, entry.date, entry.description, False) for entry in self.entries]
+
+    def update(self, entries):
+        formset = self.edit_formset(self.log, entries, len(self.entries))
+        self.assertTrue(formset.is_valid(), formset.errors)
+        with CaptureQueriesContext(connection) as queries:
+            activity_logs.update_log(self.log, formset)
+        return writes(queries)
+
+    def stored(self):
+        return list(Entry.objects.filter(log=self.log).order_by('date').values_list('date', 'description'))
+
+    def test_validation_is_one_query(self):
+        with self.assertNumQueries(1):
+            self.assertTrue(self.edit_formset(self.log, self.submitted, 3).is_valid())
+
+    def test_unchanged_entries_are_not_written(self):
+        self.assertEqual(self.update(self.submitted), ['UPDATE'])  # The log's updated_at
+
+    def test_changes_are_batched(self):
+        first, second, third = self.submitted
+        entries = [
+            (first[0], first[1], 'Rewritten', False),
+            second,
+            (third[0], third[1], third[2], True),
+            (None, MONDAY + timedelta(days=4), 'Friday', False),
+        ]
+        self.assertEqual(self.update(entries), ['UPDATE', 'DELETE', 'UPDATE', 'INSERT'])
+        self.assertEqual(self.stored(), [
+            (MONDAY, 'Rewritten'), (MONDAY + timedelta(days=1), 'Day 2'), (MONDAY + timedelta(days=4), 'Friday'),
+        ])
+
+    def test_days_can_be_swapped(self):
+        first, second, third = self.submitted
+        entries = [(first[0], second[1], first[2], False), (second[0], first[1], second[2], False), third]
+        self.update(entries)
+        self.assertEqual(self.stored(), [
+            (MONDAY, 'Day 2'), (MONDAY + timedelta(days=1), 'Day 1'), (MONDAY + timedelta(days=2), 'Day 3'),
+        ])
+
+    def test_entries_of_other_logs_are_rejected(self):
+        other = Log.objects.create(internship=self.internship, week_starting=MONDAY + timedelta(days=7))
+        stranger = Entry.objects.create(log=other, date=MONDAY + timedelta(days=7), description='Not mine')
+        entries = self.submitted + [(stranger.pk, stranger.date, 'Taken over', False)]
+        formset = EntryFormSet(formset_data(entries, initial=4), queryset=Entry.objects.filter(log=self.log))
+        self.assertFalse(formset.is_valid())
+        stranger.refresh_from_db()
+        self.assertEqual(stranger.description, 'Not mine')
+
+    def test_moving_to_a_taken_week(self):
+        Log.objects.create(internship=self.internship, week_starting=MONDAY + timedelta(days=7))
+        data = {'week_starting': (MONDAY + timedelta(days=7)).isoformat(), **formset_data(self.submitted, initial=3)}
+        response = self.client.post(reverse('edit_activity_log', args=[self.log.nanoid]), data)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('already exists', response.context['log_form'].errors['week_starting'][0])
+        self.log.refresh_from_db()
+        self.assertEqual(self.log.week_starting, MONDAY)
@@ -0,0 +1,167 @@
+"""
+Test cases for the annotated querysets.
+Tests that with_progress, with_total_score, with_average_rating and
+with_completion match the model methods, and the list views sorted by them.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.contrib.auth.models import User, Group
+
+from ..models import (
+    Student, Mentor, Teacher, Company, Institute, Internship, Report, Assessment
+)
+
+
+class AnnotationTestMixin:
+    """Set up an institute with a teacher, a mentor and students"""
+
+    def setUp(self):
+        for name in ['student', 'mentor', 'teacher']:
+            Group.objects.get_or_create(name=name)
+        self.institute = Institute.objects.create(name='GPGC', registration_status='approved')
+        self.company = Company.objects.create(name='Acme', registration_status='approved')
+
+        teacher_user = User.objects.create_user(username='teacher', email='t@example.com', password='testpass123')
+        teacher_user.groups.add(Group.objects.get(name='teacher'))
+        self.teacher = Teacher.objects.create(user=teacher_user, institute=self.institute)
+
+        mentor_user = User.objects.create_user(username='mentor', email='m@example.com', password='testpass123')
+        mentor_user.groups.add(Group.objects.get(name='mentor'))
+        self.mentor = Mentor.objects.create(user=mentor_user, company=self.company)
+
+        self.students = []
+        for i in range(4):
+            user = User.objects.create_user(
+                username=f'student{i}', email=f's{i}@example.com', password='testpass123', first_name=f'Student{i}',
+            )
+            user.groups.add(Group.objects.get(name='student'))
+            self.students.append(Student.objects.create(user=user, institute=self.institute))
+
+    def internship(self, student, start_date, end_date):
+        return Internship.objects.create(
+            student=student, mentor=self.mentor, teacher=self.teacher, start_date=start_date, end_date=end_date,
+        )
+
+
+class AnnotationMatchesMethodTest(AnnotationTestMixin, TestCase):
+    """Test that each annotation equals what its model method computes in Python"""
+
+    def test_progress(self):
+        today = date.today()
+        cases = [
+            (None, None),
+            (today + timedelta(days=5), today + timedelta(days=60)),
+            (today - timedelta(days=90), today - timedelta(days=1)),
+            (today - timedelta(days=10), today + timedelta(days=30)),
+            (today - timedelta(days=1), today + timedelta(days=2)),
+            (today, today),
+        ]
+        for start_date, end_date in cases:
+            internship = self.internship(self.students[0], start_date, end_date)
+            annotated = Internship.objects.with_progress().get(pk=internship.pk)
+            with self.subTest(start_date=start_date, end_date=end_date):
+                self.assertAlmostEqual(annotated.progress, Internship.objects.get(pk=internship.pk).get_progress_percentage())
+                self.assertEqual(annotated.get_progress_percentage(), annotated.progress)
+
+    def test_total_score(self):
+        internship = self.internship(self.students[0], None, None)
+        report = Report.objects.create(
+            internship=internship, report_month=date(2026, 1, 1), tasks_performed='t', tasks_performed_score=7,
+            learning_experience='l', learning_experience_score=9, challenges='c', challenges_score=4,
+        )
+        annotated = Report.objects.with_total_score().get(pk=report.pk)
+        self.assertEqual(annotated.total_score, 20)
+        self.assertEqual(annotated.get_total_score(), report.get_total_score())
+
+    def test_average_rating(self):
+        internship = self.internship(self.students[0], None, None)
+        assessment = Assessment.objects.create(
+            internship=internship, mentor=self.mentor, technical_skills=4, work_quality=3, problem_solving=2,
+            teamwork=4, professionalism=4, performance_benefits='b', observed_development='d', intern_strengths='s',
+            areas_for_improvement='a', intern_rating='good', program_rating='good',
+            program_improvement_suggestions='p', would_recommend=True,
+        )
+        annotated = Assessment.objects.with_average_rating().get(pk=assessment.pk)
+        self.assertAlmostEqual(annotated.average_rating, 3.4)
+        self.assertAlmostEqual(annotated.get_average_rating(), assessment.get_average_rating())
+
+    def test_completion(self):
+        """Test empty, partly and fully filled profiles, including falsy values like a 0.00 GPA"""
+        empty = self.students[0]
+        empty.institute = None
+        empty.user.email = ''
+        empty.user.save()
+        empty.save()
+
+        partial = self.students[1]
+        partial.gpa = Decimal('0.00')
+        partial.major = 'CS'
+        partial.phone = ''
+        partial.save()
+
+        full = self.students[2]
+        full.user.last_name = 'Khan'
+        full.user.save()
+        Student.objects.filter(pk=full.pk).update(
+            semester_of_study='6', major='CS', gpa=Decimal('3.50'), skills='Python', expected_graduation=date(2027, 6, 1),
+            student_id='S-1', portfolio_url='https://example.com', resume='resumes/cv.pdf', phone='0300',
+        )
+
+        completions = dict(Student.objects.with_completion().values_list('pk', 'profile_completion'))
+        for student in Student.objects.select_related('user'):
+            with self.subTest(student=student.user.username):
+                self.assertEqual(completions[student.pk], student.get_profile_completion())
+        self.assertEqual(completions[full.pk], 100)
+
+
+class SortedListViewTest(AnnotationTestMixin, TestCase):
+    """Test the list views sorted by an annotation"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        today = date.today()
+        self.internships = [
+            self.internship(student, today - timedelta(days=days_in), today - timedelta(days=days_in) + timedelta(days=100))
+            for student, days_in in zip(self.students, [30, 90, 10, 60])
+        ]
+        for internship, score in zip(self.internships, [5, 9, 1, 7]):
+            Report.objects.create(
+                internship=internship, report_month=date(2026, 1, 1), tasks_performed='t', tasks_performed_score=score,
+                learning_experience='l', learning_experience_score=score, challenges='c', challenges_score=score,
+            )
+
+    def test_teacher_reports_by_score(self):
+        self.client.login(username='teacher', password='testpass123')
+        response = self.client.get(reverse('teacher_reports'), {'sort': 'score'})
+        self.assertEqual(response.status_code, 200)
+        scores = [report.total_score for report in response.context['page_obj']]
+        self.assertEqual(scores, [27, 21, 15, 3])
+
+        response = self.client.get(reverse('teacher_reports'), {'sort': 'score_low'})
+        self.assertEqual([report.total_score for report in response.context['page_obj']], [3, 15, 21, 27])
+
+    def test_mentor_interns_by_progress(self):
+        self.client.login(username='mentor', password='testpass123')
+        response = self.client.get(reverse('mentor_interns'), {'sort': 'progress'})
+        self.assertEqual(response.status_code, 200)
+        page = list(response.context['page_obj'])
+        self.assertEqual([internship.student for internship in page], [self.students[i] for i in [1, 3, 0, 2]])
+
+    def test_teacher_internships_by_progress_without_per_row_queries(self):
+        """Test that the progress column is read from the annotation"""
+        self.client.login(username='teacher', password='testpass123')
+        response = self.client.get(reverse('teacher_internships'), {'sort': 'progress_low'})
+        self.assertEqual(response.status_code, 200)
+        page = list(response.context['page_obj'])
+        self.assertEqual([internship.student for internship in page], [self.students[i] for i in [2, 0, 3, 1]])
+        with CaptureQueriesContext(connection) as context:
+            progress = [internship.get_progress_percentage() for internship in page]
+        self.assertEqual(len(context), 0)
+        self.assertEqual(progress, sorted(progress))
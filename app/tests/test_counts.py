@@ -0,0 +1,77 @@
+"""
+Test cases for single-pass conditional counts.
+Tests the counts_by/status_breakdown querysets and the dashboards built on them.
+"""
+
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.db.models import Q
+from django.urls import reverse
+from django.contrib.auth.models import User, Group
+
+from ..models import Official, Company, Institute
+
+
+class CountsQuerySetTest(TestCase):
+    """Test that several filtered counts come back from one query"""
+
+    def setUp(self):
+        """Set up organizations across registration statuses"""
+        for i, status in enumerate(['pending', 'pending', 'approved', 'rejected', 'suspended']):
+            Company.objects.create(
+                name=f'Company {i}', registration_status=status, domain_verified=i % 2 == 0, is_verified=i < 2
+            )
+        Institute.objects.create(name='GPGC', registration_status='approved')
+
+    def test_counts_by_single_query(self):
+        """Test that every bucket is computed in one aggregate"""
+        with CaptureQueriesContext(connection) as context:
+            counts = Company.objects.counts_by(total=None, verified=Q(is_verified=True))
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertEqual(counts, {'total': 5, 'verified': 2})
+
+    def test_status_breakdown_matches_separate_counts(self):
+        """Test that the breakdown agrees with one count per status"""
+        with CaptureQueriesContext(connection) as context:
+            counts = Company.objects.status_breakdown()
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertEqual(counts['total'], Company.objects.count())
+        for status in ['pending', 'approved', 'rejected', 'suspended']:
+            self.assertEqual(counts[status], Company.objects.filter(registration_status=status).count())
+        self.assertEqual(counts['domain_verified'], Company.objects.filter(domain_verified=True).count())
+
+    def test_breakdown_respects_filters(self):
+        """Test that counts are taken over the filtered queryset"""
+        counts = Company.objects.filter(registration_status='pending').status_breakdown()
+        self.assertEqual(counts['total'], 2)
+        self.assertEqual(counts['approved'], 0)
+
+
+class ManagementPageCountsTest(TestCase):
+    """Test that management pages build their stat blocks in one query"""
+
+    def setUp(self):
+        Group.objects.get_or_create(name='official')
+        self.user = User.objects.create_user(username='official', email='o@example.com', password='testpass123')
+        self.user.groups.add(Group.objects.get(name='official'))
+        Official.objects.create(user=self.user)
+        for i in range(4):
+            Company.objects.create(name=f'Company {i}', registration_status='approved' if i % 2 else 'pending')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_manage_companies_stats(self):
+        """Test the company stat block and filtered count"""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('manage_companies'))
+        self.assertEqual(response.status_code, 200)
+        company_counts = [
+            q for q in context.captured_queries
+            if 'COUNT(' in q['sql'] and '"app_company"' in q['sql']
+        ]
+        # One for the stat block, one for the paginator
+        self.assertEqual(len(company_counts), 2)
+        self.assertEqual(response.context['stats']['total'], 4)
+        self.assertEqual(response.context['stats']['approved'], 2)
+        self.assertEqual(response.context['filtered_count'], 4)
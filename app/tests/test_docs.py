@@ -0,0 +1,85 @@
+"""
+Test cases for the pre-rendered documentation bundle.
+Tests build_docs and how the documentation views serve the prebuilt pages.
+"""
+
+import gzip
+import shutil
+import tempfile
+from io import StringIO
+
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.core.cache import cache
+from django.core.management import call_command
+from django.contrib.auth.models import User, Group
+
+from .. import docs
+from ..models import Student
+
+
+class DocumentationBundleTest(TestCase):
+    """Test that anonymous visitors get the prebuilt pages"""
+
+    def setUp(self):
+        cache.clear()
+        self.static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_root, ignore_errors=True)
+        settings_override = override_settings(STATIC_ROOT=self.static_root, DEBUG=False)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(docs.load_manifest.cache_clear)
+        call_command('build_docs', stdout=StringIO())
+        self.client = Client()
+
+    def live(self, url):
+        """Render a page live, as without a bundle"""
+        with override_settings(DEBUG=True):
+            cache.clear()
+            return Client().get(url).content
+
+    def test_every_page_is_built(self):
+        manifest = docs.load_manifest(str(docs.bundle_root()))
+        self.assertEqual(len(manifest), 1 + sum(len(topics) for topics in docs.GUIDES.values()))
+        self.assertRegex(manifest['students/dashboard'], r'^students/dashboard\.[0-9a-f]{12}\.html$')
+        self.assertTrue((docs.bundle_root() / (manifest['index'] + '.gz')).is_file())
+
+    def test_prebuilt_pages_match_live_rendering(self):
+        for url in [reverse('documentation_index'), reverse('documentation_guide', args=['mentors', 'dashboard'])]:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.streaming)
+                self.assertEqual(b''.join(response.streaming_content), self.live(url))
+
+    def test_compressed_variant_is_negotiated(self):
+        url = reverse('documentation_guide', args=['students', 'dashboard'])
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), self.live(url))
+
+    def test_signed_in_users_get_live_pages(self):
+        """Test that signed-in users keep their role-specific sidebar"""
+        Group.objects.get_or_create(name='student')
+        user = User.objects.create_user(username='amina', email='a@example.com', password='testpass123', first_name='Amina')
+        user.groups.add(Group.objects.get(name='student'))
+        Student.objects.create(user=user)
+        self.client.login(username='amina', password='testpass123')
+        response = self.client.get(reverse('documentation_guide', args=['students', 'dashboard']))
+        self.assertFalse(response.streaming)
+        self.assertContains(response, 'Amina')
+
+    def test_debug_and_missing_bundle_render_live(self):
+        url = reverse('documentation_guide', args=['teachers', 'dashboard'])
+        with override_settings(DEBUG=True):
+            self.assertFalse(self.client.get(url).streaming)
+        shutil.rmtree(docs.bundle_root())
+        docs.load_manifest.cache_clear()
+        cache.clear()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.streaming)
+
+    def test_unknown_guides_are_not_found(self):
+        self.assertEqual(self.client.get(reverse('documentation_guide', args=['students', 'nope'])).status_code, 404)
@@ -0,0 +1,155 @@
+"""
+Test cases for the email outbox.
+Tests queueing, batched delivery, retries with backoff and dead letters.
+"""
+
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPException
+
+from django.test import TestCase, override_settings
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend as LocmemBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from ..models import OutgoingEmail
+from ..email_utils import EmailService, OutboxWorker, send_welcome_email
+
+
+class FailingBackend(BaseEmailBackend):
+    """Email backend whose server is always down"""
+
+    def send_messages(self, email_messages):
+        raise SMTPException('Connection refused')
+
+
+class CountingBackend(LocmemBackend):
+    """Locmem backend that counts how many connections are opened"""
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+
+class FailingSendGridClient:
+    """SendGrid client whose API rejects every message"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def send(self, message):
+        self.calls += 1
+        raise ConnectionError('SendGrid unavailable')
+
+
+def queue(count):
+    service = EmailService()
+    for i in range(count):
+        service.send_email([f'user{i}@example.com'], f'Message {i}', html_content=f'<p>Hello {i}</p>')
+
+
+class EmailOutboxTest(TestCase):
+    """Test that emails are queued during requests and delivered by the worker"""
+
+    def run_worker(self, **kwargs):
+        with OutboxWorker(service=EmailService(), **kwargs) as worker:
+            return worker.run_batch()
+
+    def test_send_helpers_only_queue(self):
+        """Test that the send_* helpers return before anything is sent"""
+        self.assertTrue(send_welcome_email('new@example.com', 'New User'))
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.to_emails, ['new@example.com'])
+        self.assertEqual(email.status, 'pending')
+        self.assertIn('New User', email.html_content)
+        self.assertNotIn('<', email.plain_content)
+
+    def test_worker_delivers_batch(self):
+        """Test that a batch is sent with HTML alternatives and marked sent"""
+        queue(3)
+        self.assertEqual(self.run_worker(batch_size=2), {'sent': 2, 'retrying': 0, 'dead': 0})
+        self.assertEqual(self.run_worker(batch_size=2), {'sent': 1, 'retrying': 0, 'dead': 0})
+        self.assertEqual(self.run_worker(), {'sent': 0, 'retrying': 0, 'dead': 0})
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        self.assertFalse(OutgoingEmail.objects.exclude(status='sent').exists())
+        self.assertEqual(set(OutgoingEmail.objects.values_list('provider', 'attempts')), {('django', 1)})
+
+    @override_settings(EMAIL_BACKEND='app.tests.test_email_outbox.CountingBackend')
+    def test_connection_is_reused(self):
+        """Test that a single send slot delivers a whole batch over one pooled connection"""
+        CountingBackend.opened = 0
+        queue(5)
+        self.assertEqual(self.run_worker(concurrency={'django': 1})['sent'], 5)
+        self.assertEqual(CountingBackend.opened, 1)
+
+    @override_settings(EMAIL_BACKEND='app.tests.test_email_outbox.FailingBackend')
+    def test_failures_back_off_then_dead_letter(self):
+        """Test exponential retry delays and the dead letter status"""
+        queue(1)
+        email = OutgoingEmail.objects.get()
+        delays = []
+        for attempt in range(1, 4):
+            before = timezone.now()
+            results = self.run_worker(max_attempts=3)
+            email.refresh_from_db()
+            self.assertEqual(email.attempts, attempt)
+            self.assertIn('Connection refused', email.last_error)
+            if attempt < 3:
+                self.assertEqual(results['retrying'], 1)
+                self.assertEqual(email.status, 'pending')
+                delays.append(email.next_attempt_at - before)
+                # Not due yet, so the next run leaves it alone
+                self.assertEqual(self.run_worker(max_attempts=3)['retrying'], 0)
+                OutgoingEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(results['dead'], 1)
+        self.assertEqual(email.status, 'dead')
+        self.assertGreaterEqual(delays[0], timedelta(minutes=1))
+        self.assertGreaterEqual(delays[1], timedelta(minutes=2))
+
+    def test_sendgrid_failure_falls_back(self):
+        """Test that the Django backend delivers when SendGrid rejects a message"""
+        queue(2)
+        service = EmailService()
+        service.sendgrid_client = FailingSendGridClient()
+        with OutboxWorker(service=service) as worker:
+            self.assertEqual(worker.run_batch()['sent'], 2)
+        self.assertEqual(service.sendgrid_client.calls, 2)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_expired_claims_are_retried(self):
+        """Test that emails claimed by a worker that died are picked up again"""
+        queue(2)
+        OutgoingEmail.objects.update(status='sending', next_attempt_at=timezone.now() + timedelta(minutes=5))
+        self.assertEqual(self.run_worker()['sent'], 0)
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.run_worker()['sent'], 2)
+        self.assertEqual(set(OutgoingEmail.objects.values_list('attempts', flat=True)), {1})
+
+    def test_abandoned_claims_are_dead_lettered(self):
+        """Test that an email whose send keeps killing the worker is given up after max_attempts claims"""
+        queue(1)
+        with OutboxWorker(service=EmailService(), max_attempts=2) as worker:
+            for attempt in range(1, 3):
+                self.assertEqual(len(worker.claim()), 1)
+                self.assertEqual(OutgoingEmail.objects.get().attempts, attempt)
+                # The worker dies mid-send and the lease runs out
+                OutgoingEmail.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+            self.assertEqual(worker.run_batch(), {'sent': 0, 'retrying': 0, 'dead': 1})
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.status, 'dead')
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_command_drains_outbox(self):
+        """Test that the worker command sends everything due and exits with --once"""
+        queue(3)
+        out = StringIO()
+        call_command('send_queued_email', once=True, batch_size=2, stdout=out)
+        self.assertIn('✓ Sent 2 emails', out.getvalue())
+        self.assertIn('✓ Sent 1 emails', out.getvalue())
+        self.assertEqual(len(mail.outbox), 3)
@@ -0,0 +1,167 @@
+"""
+Test cases for the CSV and XLSX exports.
+Tests that the exports follow each list view's filters, write valid files and
+stream in bounded memory.
+"""
+
+import csv
+import io
+import tracemalloc
+import zipfile
+from datetime import date
+from unittest import mock
+from xml.etree import ElementTree
+
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User, Group
+
+from .. import exports
+from ..models import Student, Mentor, Teacher, Official, Company, Institute, Internship, Report
+
+SHEET_NS = {'s': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+
+def read_csv(response):
+    content = b''.join(response.streaming_content).decode('utf-8-sig')
+    return list(csv.reader(io.StringIO(content)))
+
+
+def read_xlsx(response):
+    """Read an XLSX export back as rows of cell texts"""
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+    sheet = ElementTree.fromstring(archive.read(exports.SHEET_PATH))
+    rows = []
+    for row in sheet.iterfind('.//s:row', SHEET_NS):
+        rows.append([''.join(cell.itertext()) for cell in row.iterfind('s:c', SHEET_NS)])
+    return rows
+
+
+class ExportTestMixin:
+    """Set up an official and a teacher with students and reports"""
+
+    def setUp(self):
+        for name in ['student', 'mentor', 'teacher', 'official']:
+            Group.objects.get_or_create(name=name)
+        official_user = User.objects.create_user(username='official', email='o@example.com', password='testpass123')
+        official_user.groups.add(Group.objects.get(name='official'))
+        Official.objects.create(user=official_user)
+
+        self.institute = Institute.objects.create(name='GPGC', registration_status='approved')
+        teacher_user = User.objects.create_user(username='teacher', email='t@example.com', password='testpass123')
+        teacher_user.groups.add(Group.objects.get(name='teacher'))
+        self.teacher = Teacher.objects.create(user=teacher_user, institute=self.institute)
+
+        self.company = Company.objects.create(name='Acme', industry='Software', registration_status='approved')
+        Company.objects.create(name='=HYPERLINK("evil")', industry='Retail', registration_status='pending')
+        mentor_user = User.objects.create_user(username='mentor', email='m@example.com', password='testpass123')
+        mentor_user.groups.add(Group.objects.get(name='mentor'))
+        self.mentor = Mentor.objects.create(user=mentor_user, company=self.company)
+
+        for i, first_name in enumerate(['Amina', 'Bilal']):
+            user = User.objects.create_user(
+                username=f'student{i}', email=f's{i}@example.com', password='testpass123', first_name=first_name,
+                last_name='Khan',
+            )
+            user.groups.add(Group.objects.get(name='student'))
+            student = Student.objects.create(user=user, institute=self.institute, student_id=f'S-{i}', major='CS')
+            if i == 0:
+                internship = Internship.objects.create(student=student, mentor=self.mentor, status='active')
+                Report.objects.create(
+                    internship=internship, teacher=self.teacher, report_month=date(2026, 1, 1),
+                    tasks_performed='t', tasks_performed_score=7, learning_experience='l',
+                    learning_experience_score=8, challenges='c', challenges_score=9,
+                )
+        self.client = Client()
+
+
+class ExportViewTest(ExportTestMixin, TestCase):
+    """Test the export endpoints"""
+
+    def test_company_csv_follows_filters(self):
+        self.client.login(username='official', password='testpass123')
+        response = self.client.get(reverse('export_companies'), {'search': 'Acme'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="companies-', response['Content-Disposition'])
+        rows = read_csv(response)
+        self.assertEqual(rows[0][:2], ['Name', 'Industry'])
+        self.assertEqual([row[0] for row in rows[1:]], ['Acme'])
+
+    def test_csv_cells_are_not_formulas(self):
+        self.client.login(username='official', password='testpass123')
+        rows = read_csv(self.client.get(reverse('export_companies'), {'status': 'pending'}))
+        self.assertEqual(rows[1][0], '\'=HYPERLINK("evil")')
+
+    def test_company_xlsx(self):
+        self.client.login(username='official', password='testpass123')
+        response = self.client.get(reverse('export_companies'), {'format': 'xlsx'})
+        self.assertEqual(response['Content-Type'], exports.CONTENT_TYPES['xlsx'])
+        rows = read_xlsx(response)
+        self.assertEqual(rows[0][0], 'Name')
+        self.assertCountEqual([row[0] for row in rows[1:]], ['Acme', '=HYPERLINK("evil")'])
+
+    def test_teacher_exports(self):
+        self.client.login(username='teacher', password='testpass123')
+        rows = read_csv(self.client.get(reverse('export_students'), {'internship_status': 'active'}))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][:3], ['Amina Khan', 's0@example.com', 'S-0'])
+        self.assertEqual(rows[1][-1], 'active')
+
+        rows = read_xlsx(self.client.get(reverse('export_reports'), {'format': 'xlsx'}))
+        self.assertEqual(rows[1][:4], ['Amina Khan', 'S-0', 'Acme', '2026-01-01'])
+        self.assertEqual(rows[1][7], '24')
+
+    def test_statistics_export(self):
+        self.client.login(username='official', password='testpass123')
+        rows = read_csv(self.client.get(reverse('export_statistics')))
+        self.assertEqual(rows[0], ['Day', 'Entity', 'Status', 'Count'])
+        self.assertIn(['company', 'approved'], [row[1:3] for row in rows[1:]])
+
+    def test_access_and_unknown_formats(self):
+        self.client.login(username='teacher', password='testpass123')
+        self.assertRedirects(self.client.get(reverse('export_companies')), reverse('home'), fetch_redirect_response=False)
+        self.assertEqual(self.client.get(reverse('export_students'), {'format': 'pdf'}).status_code, 404)
+
+
+# Small chunks keep the exports short; tracemalloc slows every allocation down
+@mock.patch.object(exports, 'CHUNK_SIZE', 50)
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ExportMemoryTest(ExportTestMixin, TestCase):
+    """Test that an export's memory does not grow with its number of rows"""
+
+    def peak_memory(self):
+        tracemalloc.start()
+        try:
+            response = self.client.get(reverse('export_companies'), {'format': self.file_format})
+            size = sum(len(chunk) for chunk in response.streaming_content)
+            return tracemalloc.get_traced_memory()[1], size
+        finally:
+            tracemalloc.stop()
+
+    def seed(self, count):
+        Company.objects.bulk_create(
+            Company(name=f'Company {i}', industry='Software', contact_email=f'c{i}@example.com',
+                    registration_status='approved')
+            for i in range(count)
+        )
+
+    def assert_bounded(self):
+        """Compare what an export spanning two chunks adds to an empty export's peak with one spanning ten"""
+        self.client.login(username='official', password='testpass123')
+        self.peak_memory()  # Warm up, so one-time allocations are not counted
+        empty_peak, empty_size = self.peak_memory()
+        self.seed(exports.CHUNK_SIZE * 2)
+        small_peak, small_size = self.peak_memory()
+        self.seed(exports.CHUNK_SIZE * 8)
+        large_peak, large_size = self.peak_memory()
+        self.assertGreater(large_size - empty_size, (small_size - empty_size) * 4)
+        self.assertLess(large_peak - empty_peak, (small_peak - empty_peak) * 2)
+
+    def test_csv(self):
+        self.file_format = 'csv'
+        self.assert_bounded()
+
+    def test_xlsx(self):
+        self.file_format = 'xlsx'
+        self.assert_bounded()
@@ -0,0 +1,119 @@
+"""
+Test cases for unread notification counters.
+Tests the cached counter, mark-all-read and the long-polling badge endpoint.
+"""
+
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.core.cache import cache
+from django.contrib.auth.models import User
+
+from ..models import Notification
+from .. import inbox
+
+
+class UnreadCounterTest(TestCase):
+    """Test that the cached unread counter follows notification changes"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='student')
+        self.other = User.objects.create(username='other')
+
+    def notify(self, user, **kwargs):
+        return Notification.objects.create(recipient=user, title='Hello', notification_type='general', **kwargs)
+
+    def test_counter_is_cached_and_follows_creates(self):
+        """Test that reads after the first skip the database while creates keep the count exact"""
+        self.notify(self.user)
+        self.assertEqual(inbox.unread_count(self.user), 1)
+        self.notify(self.user)
+        self.notify(self.user, is_read=True)
+        self.notify(self.other)
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(inbox.unread_count(self.user), 2)
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_bulk_changes_recount(self):
+        """Test that fan_out, mark_read and deletes refresh the counter"""
+        self.assertEqual(inbox.unread_count(self.user), 0)
+        Notification.objects.fan_out([self.user, self.other], 'student_welcome')
+        self.assertEqual(inbox.unread_count(self.user), 1)
+
+        notification = self.notify(self.user)
+        self.assertEqual(inbox.unread_count(self.user), 2)
+        Notification.objects.filter(pk=notification.pk).mark_read()
+        self.assertEqual(inbox.unread_count(self.user), 1)
+
+        Notification.objects.filter(recipient=self.user).delete()
+        self.assertEqual(inbox.unread_count(self.user), 0)
+        self.assertEqual(inbox.unread_count(self.other), 1)
+
+    @override_settings(NOTIFICATION_COUNT_CACHE_SECONDS=0)
+    def test_counter_expires_for_changes_made_by_other_processes(self):
+        """Test that a counter is only trusted for NOTIFICATION_COUNT_CACHE_SECONDS"""
+        notification = self.notify(self.user, is_read=True)
+        self.assertEqual(inbox.unread_count(self.user), 0)
+        # As another process would, leaving this process's cache untouched
+        Notification.objects.filter(pk=notification.pk).update(is_read=False)
+        self.assertEqual(inbox.unread_count(self.user), 1)
+
+
+class NotificationViewsTest(TestCase):
+    """Test the inbox, mark-all-read and badge endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='student')
+        for i in range(3):
+            Notification.objects.create(recipient=self.user, title=f'Update {i}', notification_type='general')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_mark_all_read_is_one_update(self):
+        """Test that every unread notification is marked read with a single UPDATE"""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(reverse('mark_all_notifications_read'))
+        updates = [query for query in context.captured_queries if 'UPDATE "app_notification"' in query['sql']]
+        self.assertEqual(len(updates), 1)
+        self.assertRedirects(response, reverse('notification_inbox'))
+        self.assertFalse(Notification.objects.filter(is_read=False).exists())
+        self.assertEqual(inbox.unread_count(self.user), 0)
+
+    def test_badge_answers_304_until_count_changes(self):
+        """Test that revalidating with the badge's ETag gets 304 until a notification arrives"""
+        response = self.client.get(reverse('notification_badge'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '3')
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('notification_badge'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([query for query in context.captured_queries if 'app_notification' in query['sql']])
+
+        Notification.objects.create(recipient=self.user, title='New', notification_type='general')
+        response = self.client.get(reverse('notification_badge'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '4')
+        self.assertNotEqual(response['ETag'], etag)
+
+    @override_settings(NOTIFICATION_LONG_POLL_SECONDS=1)
+    def test_long_poll_waits_then_answers_304(self):
+        """Test that a long-poll without changes is held open and then answered 304"""
+        etag = self.client.get(reverse('notification_badge'))['ETag']
+        response = self.client.get(reverse('notification_badge'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_navbar_badge_adds_no_queries_once_cached(self):
+        """Test that pages render the badge from the cached counter"""
+        url = reverse('notification_inbox')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertContains(response, 'id="notification-badge"')
+        counts = [query for query in context.captured_queries
+                  if 'COUNT(' in query['sql'] and 'app_notification' in query['sql'] and 'is_read' in query['sql']]
+        self.assertEqual(counts, [])
@@ -0,0 +1,116 @@
+"""
+Test cases for the internship pages of mentors, teachers and students.
+Tests the supervisor evaluation, internship status and monthly report forms,
+and who may edit an institute.
+"""
+
+from datetime import date
+
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth.models import User, Group
+
+from ..models import (
+    Student, Mentor, Teacher, Company, Institute, Position, Application, Internship, Assessment, Report,
+)
+
+EVALUATION = {
+    'technical_skills': 4, 'work_quality': 3, 'problem_solving': 3, 'teamwork': 4, 'professionalism': 4,
+    'performance_benefits': 'Shipped the billing export', 'observed_development': 'Writes tests first',
+    'intern_strengths': 'Careful', 'areas_for_improvement': 'Estimates', 'intern_rating': 'excellent',
+    'program_rating': 'good', 'program_improvement_suggestions': 'Longer placements', 'would_recommend': 'on',
+}
+
+
+class InternshipViewTestMixin:
+    """Set up an active internship with its mentor, teacher and student"""
+
+    def setUp(self):
+        for name in ['student', 'mentor', 'teacher']:
+            Group.objects.get_or_create(name=name)
+        self.institute = Institute.objects.create(name='GPGC', registration_status='approved')
+        self.teacher = Teacher.objects.create(user=self.create_user('teacher', 'teacher'), institute=self.institute)
+        self.institute.registered_by = self.teacher
+        self.institute.save()
+        company = Company.objects.create(name='Acme', registration_status='approved')
+        self.mentor = Mentor.objects.create(user=self.create_user('mentor', 'mentor'), company=company)
+        self.student = Student.objects.create(user=self.create_user('amina', 'student'), institute=self.institute)
+        position = Position.objects.create(title='Backend Intern', company=company, mentor=self.mentor)
+        application = Application.objects.create(student=self.student, position=position, status='approved')
+        self.internship = Internship.objects.create(
+            application=application, student=self.student, mentor=self.mentor, teacher=self.teacher, status='active',
+        )
+        self.client = Client()
+
+    def create_user(self, username, group):
+        user = User.objects.create(username=username, email=f'{username}@example.com')
+        user.groups.add(Group.objects.get(name=group))
+        return user
+
+    def login(self, username):
+        self.client.force_login(User.objects.get(username=username))
+
+
+class SupervisorEvaluationTest(InternshipViewTestMixin, TestCase):
+    """Test the mentor's final evaluation of an intern"""
+
+    def test_mentor_submits_evaluation(self):
+        self.login('mentor')
+        url = reverse('create_supervisor_evaluation', args=[self.internship.nanoid])
+        self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.post(url, {**EVALUATION, 'additional_comments': 'Would hire'})
+        self.assertRedirects(response, reverse('mentor_dashboard'), fetch_redirect_response=False)
+        evaluation = Assessment.objects.get(internship=self.internship)
+        self.assertEqual(evaluation.mentor, self.mentor)
+        self.assertTrue(evaluation.would_recommend)
+        self.assertEqual(evaluation.additional_comments, 'Would hire')
+
+    def test_would_recommend_defaults_to_no(self):
+        """Test that the progress report form saves without the would_recommend box"""
+        self.login('mentor')
+        fields = {key: value for key, value in EVALUATION.items() if key != 'would_recommend'}
+        self.client.post(reverse('create_progress_report', args=[self.internship.nanoid]), fields)
+        self.assertFalse(Assessment.objects.get(internship=self.internship).would_recommend)
+
+
+class InternshipStatusTest(InternshipViewTestMixin, TestCase):
+    """Test editing an internship's status as its mentor or teacher"""
+
+    def test_mentor_and_teacher_edit_status(self):
+        url = reverse('edit_internship_status', args=[self.internship.nanoid])
+        for username, status in [('mentor', 'completed'), ('teacher', 'active')]:
+            with self.subTest(username=username):
+                self.login(username)
+                self.assertContains(self.client.get(url), 'Backend Intern')
+                self.client.post(url, {'status': status, 'start_date': '2026-01-05', 'end_date': '2026-03-27'})
+                self.internship.refresh_from_db()
+                self.assertEqual(self.internship.status, status)
+                self.assertEqual(self.internship.end_date, date(2026, 3, 27))
+
+
+class StudentReportTest(InternshipViewTestMixin, TestCase):
+    """Test the student's monthly report"""
+
+    def test_student_submits_one_report_per_month(self):
+        self.login('amina')
+        url = reverse('submit_student_report', args=[self.internship.nanoid])
+        self.assertContains(self.client.get(url), 'Backend Intern')
+        report = {
+            'report_month': '2026-02-01', 'tasks_performed': 'APIs', 'tasks_performed_score': 8,
+            'learning_experience': 'Django', 'learning_experience_score': 9, 'challenges': 'Deadlines',
+            'challenges_score': 7,
+        }
+        self.assertRedirects(self.client.post(url, report), reverse('student_internship'), fetch_redirect_response=False)
+        self.assertEqual(self.client.post(url, report).status_code, 200)
+        self.assertEqual(Report.objects.filter(internship=self.internship).count(), 1)
+
+
+class EditInstituteTest(InternshipViewTestMixin, TestCase):
+    """Test that only the teacher who registered an institute may edit it"""
+
+    def test_registering_teacher_only(self):
+        self.login('teacher')
+        self.assertEqual(self.client.get(reverse('edit_institute')).status_code, 200)
+        Teacher.objects.create(user=self.create_user('bilal', 'teacher'), institute=self.institute)
+        self.login('bilal')
+        self.assertEqual(self.client.get(reverse('edit_institute')).status_code, 302)
@@ -0,0 +1,184 @@
+"""
+Test cases for skill matching.
+Tests the TF-IDF index, keeping it current as positions change, and the best
+matches and top candidates panels.
+"""
+
+from datetime import date, timedelta
+from collections import Counter
+
+from django.contrib import admin
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.core.cache import cache
+from django.contrib.auth.models import User, Group
+
+from .. import matching
+from ..admin import PositionAdmin
+from ..models import Student, Mentor, Company, Position, Application
+
+
+class MatchIndexTest(TestCase):
+    """Test the index on its own"""
+
+    def setUp(self):
+        self.index = matching.MatchIndex()
+        self.index.add(1, Counter(python=2, django=2, sql=1))
+        self.index.add(2, Counter(java=2, spring=2, sql=1))
+        self.index.add(3, Counter(python=1, pandas=2, statistics=2))
+
+    def test_skill_tokens(self):
+        self.assertEqual(
+            matching.skill_tokens('Python, Django & C++; experience with Node.js and C#.'),
+            ['python', 'django', 'c++', 'node.js', 'c#'],
+        )
+
+    def test_scores_are_cosine_similarities(self):
+        student = Counter(python=2, sql=2)
+        pks, rows, _ = self.index.matrix
+        scores = self.index.scores(student)
+        for pk in pks:
+            with self.subTest(pk=pk):
+                self.assertAlmostEqual(scores[rows[pk]], self.index.similarity(student, self.index.documents[pk]))
+
+    def test_applicant_scores_are_cosine_similarities(self):
+        applicants = [Counter(python=2, sql=2), Counter(), Counter(java=1), Counter(python=1, django=3, cobol=1)]
+        position = self.index.documents[1]
+        scores = self.index.applicant_scores(applicants, position)
+        for row, applicant in enumerate(applicants):
+            with self.subTest(row=row):
+                self.assertAlmostEqual(scores[row], self.index.similarity(applicant, position))
+
+    def test_top_ranks_and_excludes(self):
+        student = Counter(python=2, django=1)
+        self.assertEqual([pk for pk, _ in self.index.top(student, 5)], [1, 3])
+        self.assertEqual([pk for pk, _ in self.index.top(student, 1)], [1])
+        self.assertEqual([pk for pk, _ in self.index.top(student, 5, exclude={1})], [3])
+        self.assertEqual(self.index.top(Counter(cobol=1), 5), [])
+
+    def test_changes_match_a_fresh_index(self):
+        self.index.add(2, Counter(python=1, fastapi=2))
+        self.index.remove(3)
+        fresh = matching.MatchIndex()
+        fresh.add(1, Counter(python=2, django=2, sql=1))
+        fresh.add(2, Counter(python=1, fastapi=2))
+        student = Counter(python=1, fastapi=1, sql=1)
+        self.assertEqual(self.index.top(student, 5), fresh.top(student, 5))
+        self.assertNotIn('pandas', self.index.postings)
+
+
+class MatchingTestMixin:
+    """Set up a company with positions, a mentor and a student"""
+
+    def setUp(self):
+        cache.clear()
+        matching._local.update(index=None, generation=None)
+        for name in ['student', 'mentor']:
+            Group.objects.get_or_create(name=name)
+        self.company = Company.objects.create(name='Acme', registration_status='approved')
+        mentor_user = User.objects.create_user(username='mentor', email='m@example.com', password='testpass123')
+        mentor_user.groups.add(Group.objects.get(name='mentor'))
+        self.mentor = Mentor.objects.create(user=mentor_user, company=self.company)
+        start_date = date.today() + timedelta(days=30)
+        self.backend = Position.objects.create(
+            title='Backend Intern', company=self.company, mentor=self.mentor, start_date=start_date,
+            skills_required='Python, Django, PostgreSQL',
+        )
+        self.mobile = Position.objects.create(
+            title='Mobile Intern', company=self.company, mentor=self.mentor, start_date=start_date,
+            skills_required='Kotlin, Android',
+        )
+        self.data = Position.objects.create(
+            title='Data Intern', company=self.company, mentor=self.mentor, start_date=start_date,
+            skills_required='Python, pandas, statistics',
+        )
+        self.student = self.create_student('amina', 'Python, Django, SQL')
+
+    def create_student(self, username, skills, major='Computer Science'):
+        user = User.objects.create_user(username=username, email=f'{username}@example.com', password='testpass123')
+        user.groups.add(Group.objects.get(name='student'))
+        return Student.objects.create(user=user, skills=skills, major=major)
+
+
+class IndexFreshnessTest(MatchingTestMixin, TestCase):
+    """Test that the shared index follows position changes"""
+
+    def recommended(self):
+        return [position.pk for position in matching.recommend_positions(self.student)]
+
+    def test_changes_are_replayed(self):
+        self.assertEqual(self.recommended()[:2], [self.backend.pk, self.data.pk])
+        index = matching.get_index()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mobile.skills_required = 'Python, Django, SQL, REST'
+            self.mobile.save()
+            self.data.is_active = False
+            self.data.save()
+        self.assertEqual(self.recommended(), [self.mobile.pk, self.backend.pk])
+        self.assertIs(matching.get_index(), index)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mobile.delete()
+        self.assertEqual(self.recommended(), [self.backend.pk])
+
+    def test_admin_bulk_activation_is_replayed(self):
+        """Test that the admin's bulk (de)activation reaches an index built before it"""
+        self.assertEqual(self.recommended()[:2], [self.backend.pk, self.data.pk])
+        position_admin = PositionAdmin(Position, admin.site)
+        with self.captureOnCommitCallbacks(execute=True):
+            position_admin.set_active(Position.objects.filter(pk=self.data.pk), False)
+        self.assertEqual(self.recommended(), [self.backend.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            position_admin.set_active(Position.objects.filter(pk=self.data.pk), True)
+        self.assertEqual(self.recommended()[:2], [self.backend.pk, self.data.pk])
+
+    def test_lost_change_log_rebuilds(self):
+        index = matching.get_index()
+        cache.clear()
+        self.assertIsNot(matching.get_index(), index)
+
+    def test_applied_and_started_positions_are_left_out(self):
+        Application.objects.create(student=self.student, position=self.backend)
+        Position.objects.filter(pk=self.data.pk).update(start_date=date.today() - timedelta(days=1))
+        self.assertEqual(self.recommended(), [])
+
+    def test_no_skills_no_matches(self):
+        student = self.create_student('bilal', '', major='')
+        self.assertEqual(matching.recommend_positions(student), [])
+
+
+class MatchingPanelsTest(MatchingTestMixin, TestCase):
+    """Test the best matches and top candidates panels"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+
+    def test_student_dashboard_best_matches(self):
+        self.client.login(username='amina', password='testpass123')
+        response = self.client.get(reverse('student_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['best_matches'][0], self.backend)
+        self.assertContains(response, 'Best Matches')
+        self.assertContains(response, '% skill match')
+
+    def test_mentor_top_candidates(self):
+        android = self.create_student('bilal', 'Kotlin, Android, Java')
+        Application.objects.create(student=self.student, position=self.mobile)
+        Application.objects.create(student=android, position=self.mobile)
+        Application.objects.create(student=self.create_student('sana', 'Painting'), position=self.mobile)
+        self.client.login(username='mentor', password='testpass123')
+        response = self.client.get(reverse('mentor_applications'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([application.student for application in response.context['top_candidates']], [android])
+        self.assertContains(response, 'Top Candidates')
+
+    def test_every_open_application_is_ranked(self):
+        """Test that a strong applicant behind many newer ones is still found"""
+        Application.objects.create(student=self.create_student('bilal', 'Kotlin, Android'), position=self.mobile)
+        for i in range(5):
+            Application.objects.create(student=self.create_student(f'student{i}', 'Painting'), position=self.mobile)
+        ranked = matching.rank_applications(Application.objects.filter(position__mentor=self.mentor), limit=3)
+        self.assertEqual([application.student.user.username for application in ranked], ['bilal'])
+        self.assertEqual(ranked[0].position, self.mobile)
@@ -0,0 +1,158 @@
+"""
+Test cases for protected media delivery.
+Tests who may download resumes and organization documents, and the range,
+conditional and offloaded responses they are served with.
+"""
+
+import shutil
+import tempfile
+
+from django.test import TestCase, Client, override_settings
+from django.core.files.base import ContentFile
+from django.contrib.auth.models import User, Group
+
+from .. import media
+from ..models import Student, Mentor, Teacher, Official, Company, Institute, Position, Application
+
+RESUME = bytes(range(256)) * 4
+
+
+class MediaTestMixin:
+    """Set up a student with a resume, a company with a certificate and an official"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root, PROTECTED_MEDIA_OFFLOAD='')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        for name in ['student', 'mentor', 'teacher', 'official']:
+            Group.objects.get_or_create(name=name)
+        self.institute = Institute.objects.create(name='GPGC', registration_status='approved')
+        self.student = Student.objects.create(user=self.create_user('amina', 'student'), institute=self.institute)
+        self.student.resume.save('amina.pdf', ContentFile(RESUME))
+        self.resume_url = self.student.resume.url
+
+        self.mentor = Mentor.objects.create(user=self.create_user('mentor', 'mentor'))
+        self.company = Company.objects.create(name='Acme', registration_status='approved', registered_by=self.mentor)
+        self.company.registration_certificate.save('acme.pdf', ContentFile(b'%PDF certificate'))
+        self.mentor.company = self.company
+        self.mentor.save()
+        self.position = Position.objects.create(title='Intern', company=self.company, mentor=self.mentor, duration='2')
+
+        Official.objects.create(user=self.create_user('official', 'official'))
+        self.client = Client()
+
+    def create_user(self, username, group):
+        user = User.objects.create_user(username=username, email=f'{username}@example.com', password='testpass123')
+        user.groups.add(Group.objects.get(name=group))
+        return user
+
+    def login(self, username):
+        self.client.login(username=username, password='testpass123')
+
+
+class PermissionTest(MediaTestMixin, TestCase):
+    """Test who may download which files"""
+
+    def status(self, username, url):
+        self.client.logout()
+        self.login(username)
+        return self.client.get(url).status_code
+
+    def test_resume(self):
+        self.assertEqual(self.status('amina', self.resume_url), 200)
+        self.assertEqual(self.status('mentor', self.resume_url), 404)
+        self.assertEqual(self.status('official', self.resume_url), 404)
+
+        Application.objects.create(student=self.student, position=self.position)
+        self.assertEqual(self.status('mentor', self.resume_url), 200)
+
+        Teacher.objects.create(user=self.create_user('teacher', 'teacher'), institute=self.institute)
+        self.assertEqual(self.status('teacher', self.resume_url), 200)
+        Student.objects.create(user=self.create_user('bilal', 'student'), institute=self.institute)
+        self.assertEqual(self.status('bilal', self.resume_url), 404)
+
+    def test_org_documents(self):
+        url = self.company.registration_certificate.url
+        self.assertEqual(self.status('official', url), 200)
+        self.assertEqual(self.status('mentor', url), 200)
+        self.assertEqual(self.status('amina', url), 404)
+
+    def test_anonymous_users_are_sent_to_login(self):
+        response = self.client.get(self.resume_url)
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('next=' + self.resume_url, response.url)
+
+    def test_unknown_paths(self):
+        self.login('amina')
+        for path in ['/media/resumes/missing.pdf', '/media/resumes/../resumes/amina.pdf', '/media/settings.py']:
+            self.assertEqual(self.client.get(path).status_code, 404, path)
+        self.assertEqual(self.client.post(self.resume_url).status_code, 405)
+
+
+class DeliveryTest(MediaTestMixin, TestCase):
+    """Test range, conditional and offloaded responses"""
+
+    def setUp(self):
+        super().setUp()
+        self.login('amina')
+
+    def test_whole_file(self):
+        response = self.client.get(self.resume_url)
+        self.assertEqual(b''.join(response.streaming_content), RESUME)
+        self.assertEqual(response['Content-Length'], str(len(RESUME)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_range(self):
+        response = self.client.get(self.resume_url, headers={'Range': 'bytes=100-299'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-299/{len(RESUME)}')
+        self.assertEqual(response['Content-Length'], '200')
+        self.assertEqual(b''.join(response.streaming_content), RESUME[100:300])
+
+        response = self.client.get(self.resume_url, headers={'Range': 'bytes=-24'})
+        self.assertEqual(b''.join(response.streaming_content), RESUME[-24:])
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.resume_url, headers={'Range': f'bytes={len(RESUME)}-'})
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(RESUME)}')
+
+    def test_byte_range(self):
+        self.assertEqual(media.byte_range('bytes=0-', 10), (0, 9))
+        self.assertEqual(media.byte_range('bytes=5-50', 10), (5, 9))
+        self.assertEqual(media.byte_range('bytes=-50', 10), (0, 9))
+        self.assertIsNone(media.byte_range('bytes=0-1,4-5', 10))
+        self.assertIsNone(media.byte_range('bytes=5-2', 10))
+        self.assertIsNone(media.byte_range('items=0-1', 10))
+        with self.assertRaises(media.RangeNotSatisfiable):
+            media.byte_range('bytes=-0', 10)
+
+    def test_conditional_requests(self):
+        first = self.client.get(self.resume_url)
+        response = self.client.get(self.resume_url, headers={'If-None-Match': first['ETag']})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(self.resume_url, headers={'If-Modified-Since': first['Last-Modified']})
+        self.assertEqual(response.status_code, 304)
+
+        stale = self.client.get(self.resume_url, headers={'Range': 'bytes=0-9', 'If-Range': '"stale"'})
+        self.assertEqual(stale.status_code, 200)
+        fresh = self.client.get(self.resume_url, headers={'Range': 'bytes=0-9', 'If-Range': first['ETag']})
+        self.assertEqual(fresh.status_code, 206)
+
+    @override_settings(PROTECTED_MEDIA_OFFLOAD='nginx', PROTECTED_MEDIA_INTERNAL_URL='/protected-media/')
+    def test_nginx_offload(self):
+        response = self.client.get(self.resume_url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + self.student.resume.name)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response.content, b'')
+
+    @override_settings(PROTECTED_MEDIA_OFFLOAD='sendfile')
+    def test_sendfile_offload(self):
+        response = self.client.get(self.resume_url)
+        self.assertEqual(response['X-Sendfile'], self.student.resume.path)
+        self.assertIn('amina.pdf', response['Content-Disposition'])
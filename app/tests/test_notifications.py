@@ -0,0 +1,106 @@
+"""
+Test cases for sending notifications to many users.
+Tests fan_out rendering and batching, and the admin actions built on it.
+"""
+
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.auth.models import User
+
+from ..models import Student, Company, Position, Application, Notification
+
+
+class NotificationFanOutTest(TestCase):
+    """Test bulk creation of rendered notifications"""
+
+    def setUp(self):
+        self.users = [
+            User.objects.create(username=f'user{i}', first_name=f'First{i}' if i % 2 else '')
+            for i in range(5)
+        ]
+
+    def test_renders_shared_and_recipient_context(self):
+        """Test that templates are filled from both contexts and blanks stay empty"""
+        created = Notification.objects.fan_out(
+            [(user, {'company': f'Company {i}'}) for i, user in enumerate(self.users)],
+            'application_rejected', {'position': 'Intern'},
+        )
+        self.assertEqual(created, 5)
+        notification = Notification.objects.get(recipient=self.users[3])
+        self.assertEqual(notification.notification_type, 'application_status')
+        self.assertEqual(notification.title, 'Application Status Update')
+        self.assertEqual(
+            notification.message,
+            'Thank you for your interest in Intern at Company 3. '
+            'Unfortunately, your application was not selected at this time.',
+        )
+
+    def test_recipient_context_overrides_shared_values(self):
+        """Test that a key in both contexts, or a given recipient_name, is not an error"""
+        Notification.objects.fan_out(
+            [(self.users[0], {'recipient_name': 'Amina', 'position': 'Backend Intern'}), self.users[1]],
+            'application_rejected', {'position': 'Intern', 'company': 'Acme'},
+        )
+        messages = dict(Notification.objects.values_list('recipient__username', 'message'))
+        self.assertIn('Backend Intern at Acme', messages['user0'])
+        self.assertIn('in Intern at Acme', messages['user1'])
+
+    def test_recipient_name_falls_back_to_username(self):
+        """Test that recipient_name uses the full name, or the username without one"""
+        Notification.objects.fan_out(self.users[:2], 'student_welcome')
+        messages = dict(Notification.objects.values_list('recipient__username', 'message'))
+        self.assertTrue(messages['user0'].startswith('Welcome user0!'))
+        self.assertTrue(messages['user1'].startswith('Welcome First1!'))
+
+    def test_bulk_inserts_in_batches(self):
+        """Test that recipients are written with one INSERT per batch"""
+        with CaptureQueriesContext(connection) as context:
+            created = Notification.objects.fan_out(self.users + [None], 'student_welcome', batch_size=2)
+        self.assertEqual(created, 5)
+        self.assertEqual(len(context.captured_queries), 3)
+        self.assertEqual(Notification.objects.values('nanoid').distinct().count(), 5)
+
+
+class ApplicationAdminNotificationTest(TestCase):
+    """Test notifications sent by the application admin actions"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='x')
+        company = Company.objects.create(name='Acme', registration_status='approved')
+        self.position = Position.objects.create(title='Data Intern', company=company, max_students=50)
+        self.applications = []
+        for i in range(20):
+            user = User.objects.create(username=f'student{i}', first_name=f'Student{i}')
+            student = Student.objects.create(user=user)
+            self.applications.append(Application.objects.create(student=student, position=self.position))
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def run_action(self, action, applications, filters=''):
+        url = reverse('admin:app_application_changelist') + filters
+        return self.client.post(url, {
+            'action': action,
+            ACTION_CHECKBOX_NAME: [application.pk for application in applications],
+        })
+
+    def test_approve_from_status_filtered_changelist(self):
+        """Test that applicants are notified even though the filter no longer matches them"""
+        self.run_action('approve_applications', self.applications[:10], '?status__exact=pending')
+        self.assertEqual(Application.objects.filter(status='approved').count(), 10)
+        notifications = Notification.objects.filter(title='Application Approved!')
+        self.assertEqual(notifications.count(), 10)
+        self.assertIn('Data Intern at Acme', notifications.first().message)
+        self.position.refresh_from_db()
+        self.assertEqual(self.position.approved_application_count, 10)
+
+    def test_reject_query_count_is_independent_of_selection(self):
+        """Test that notifying more applicants does not add queries per row"""
+        with CaptureQueriesContext(connection) as small:
+            self.run_action('reject_applications', self.applications[:3])
+        with CaptureQueriesContext(connection) as large:
+            self.run_action('reject_applications', self.applications[3:20])
+        self.assertEqual(Notification.objects.count(), 20)
+        self.assertLessEqual(len(large.captured_queries), len(small.captured_queries) + 2)
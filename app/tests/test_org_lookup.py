@@ -0,0 +1,98 @@
+"""
+Test cases for looking up the organizations a user can join.
+Tests domain normalization, the single-query lookup and its per-domain cache.
+"""
+
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.contrib.auth.models import User
+
+from ..models import Institute, Company
+from ..utils import (
+    get_available_institutes_for_user, get_available_companies_for_user,
+    invalidate_available_organizations, suggest_organization_by_domain,
+)
+
+
+class AvailableOrganizationsTest(TestCase):
+    """Test that users see open organizations and those of their own domain"""
+
+    def setUp(self):
+        """Set up open, domain-verified and unapproved institutes"""
+        self.open = Institute.objects.create(name='Open College', registration_status='approved')
+        self.own = Institute.objects.create(
+            name='Own University', registration_status='approved', email_domain='uni.edu.pk', domain_verified=True,
+        )
+        self.other = Institute.objects.create(
+            name='Other University', registration_status='approved', email_domain='other.edu.pk', domain_verified=True,
+        )
+        self.pending = Institute.objects.create(name='Pending College', registration_status='pending')
+        self.student = User.objects.create_user(username='student', email='Student@UNI.edu.pk', password='x')
+        self.outsider = User.objects.create_user(username='outsider', email='someone@gmail.com', password='x')
+
+    def test_domain_is_normalized_on_save(self):
+        """Test that stored domains are lower-cased and stripped of @ and spaces"""
+        company = Company.objects.create(name='Acme', email_domain=' @Acme.COM ')
+        self.assertEqual(company.email_domain, 'acme.com')
+        company.email_domain = '  '
+        company.save()
+        company.refresh_from_db()
+        self.assertIsNone(company.email_domain)
+
+    def test_user_sees_open_and_own_domain(self):
+        """Test eligibility for users inside and outside a verified domain"""
+        self.assertEqual(set(get_available_institutes_for_user(self.student)), {self.open, self.own})
+        self.assertEqual(set(get_available_institutes_for_user(self.outsider)), {self.open})
+        self.assertEqual(set(get_available_institutes_for_user(None)), {self.open})
+
+    def test_lookup_is_one_query_then_cached(self):
+        """Test that a domain is looked up with one query and then served from the cache"""
+        invalidate_available_organizations(Institute)
+        with CaptureQueriesContext(connection) as context:
+            institutes = list(get_available_institutes_for_user(self.student))
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertEqual(len(institutes), 2)
+
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(list(get_available_institutes_for_user(self.student)), institutes)
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_domain_changes_invalidate_cache(self):
+        """Test that saving an organization's domain or verification refreshes cached lists"""
+        self.assertNotIn(self.other, get_available_institutes_for_user(self.student))
+        self.other.email_domain = 'UNI.edu.pk'
+        self.other.save()
+        self.assertIn(self.other, get_available_institutes_for_user(self.student))
+
+        self.own.domain_verified = False
+        self.own.save()
+        self.assertIn(self.own, get_available_institutes_for_user(self.outsider))
+
+        self.open.delete()
+        self.assertNotIn(self.open, get_available_institutes_for_user(self.outsider))
+
+    def test_bulk_update_with_invalidation(self):
+        """Test that bulk updates are picked up once the cache is invalidated"""
+        self.assertNotIn(self.pending, get_available_institutes_for_user(self.outsider))
+        Institute.objects.filter(pk=self.pending.pk).update(registration_status='approved')
+        invalidate_available_organizations(Institute)
+        self.assertIn(self.pending, get_available_institutes_for_user(self.outsider))
+
+    @override_settings(ORGANIZATION_LIST_CACHE_SECONDS=0)
+    def test_lists_expire_for_changes_made_by_other_processes(self):
+        """Test that a cached list is only kept for ORGANIZATION_LIST_CACHE_SECONDS"""
+        self.assertNotIn(self.pending, get_available_institutes_for_user(self.outsider))
+        # Approved elsewhere, without invalidating this process's cache
+        Institute.objects.filter(pk=self.pending.pk).update(registration_status='approved')
+        self.assertIn(self.pending, get_available_institutes_for_user(self.outsider))
+
+    def test_companies_cached_separately(self):
+        """Test that company lists do not share cache entries with institutes"""
+        self.assertEqual(list(get_available_companies_for_user(self.student)), [])
+        company = Company.objects.create(
+            name='Uni Labs', registration_status='approved', email_domain='uni.edu.pk', domain_verified=True,
+        )
+        self.assertEqual(list(get_available_companies_for_user(self.student)), [company])
+        self.assertEqual(list(get_available_companies_for_user(self.outsider)), [])
+        self.assertEqual(list(suggest_organization_by_domain(self.student, 'company')), [company])
@@ -0,0 +1,136 @@
+"""
+Test cases for keyset (cursor) pagination.
+Tests walking pages both ways, NULL sort keys, tokens and the list views.
+"""
+
+from datetime import date, timedelta
+
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth.models import User, Group
+
+from ..models import Official, Company, Position, Internship
+from ..pagination import CursorPaginator, ESTIMATE_LIMIT
+
+
+def walk_forward(paginator):
+    """Follow next cursors from the first page, collecting every page"""
+    pages = [paginator.get_page()]
+    while pages[-1].has_next():
+        pages.append(paginator.get_page(pages[-1].next_cursor))
+    return pages
+
+
+class CursorPaginatorTest(TestCase):
+    """Test that cursor pages cover every row exactly once"""
+
+    def setUp(self):
+        """Set up positions with some identical creation times"""
+        company = Company.objects.create(name='Acme', registration_status='approved')
+        now = timezone.now()
+        for i in range(23):
+            position = Position.objects.create(title=f'Position {i}', company=company)
+            # Groups of three share a timestamp, so ordering needs the pk tiebreaker
+            Position.objects.filter(pk=position.pk).update(created_at=now - timedelta(minutes=i // 3))
+        self.expected = list(Position.objects.order_by('-created_at', '-pk'))
+
+    def test_forward_walk_matches_offset_ordering(self):
+        """Test that following next cursors visits each row once, in order"""
+        pages = walk_forward(CursorPaginator(Position.objects.order_by('-created_at'), 5))
+        self.assertEqual([len(page) for page in pages], [5, 5, 5, 5, 3])
+        self.assertEqual([position for page in pages for position in page], self.expected)
+        self.assertEqual([page.number for page in pages], [1, 2, 3, 4, 5])
+        self.assertEqual(pages[2].start_index(), 11)
+        self.assertEqual(pages[-1].end_index(), 23)
+
+    def test_backward_walk(self):
+        """Test that previous cursors return to the earlier pages"""
+        paginator = CursorPaginator(Position.objects.order_by('-created_at'), 5)
+        pages = walk_forward(paginator)
+        page = pages[-1]
+        for expected in reversed(pages[:-1]):
+            self.assertTrue(page.has_previous())
+            page = paginator.get_page(page.previous_cursor)
+            self.assertEqual(list(page), list(expected))
+            self.assertEqual(page.number, expected.number)
+        self.assertFalse(page.has_previous())
+
+    def test_deep_page_has_no_offset(self):
+        """Test that deep pages seek past the cursor instead of skipping rows"""
+        paginator = CursorPaginator(Position.objects.order_by('-created_at'), 5, count=None)
+        pages = walk_forward(paginator)
+        with CaptureQueriesContext(connection) as context:
+            paginator.get_page(pages[-2].next_cursor)
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertNotIn('OFFSET', context.captured_queries[0]['sql'])
+        self.assertNotIn('COUNT(', context.captured_queries[0]['sql'])
+
+    def test_invalid_or_foreign_tokens_start_over(self):
+        """Test that tampered tokens and tokens from another ordering give the first page"""
+        paginator = CursorPaginator(Position.objects.order_by('-created_at'), 5)
+        second = paginator.get_page(paginator.get_page().next_cursor)
+        other = CursorPaginator(Position.objects.order_by('title'), 5)
+
+        self.assertEqual(paginator.get_page('garbage').number, 1)
+        self.assertEqual(paginator.get_page(second.next_cursor[:-2] + 'xx').number, 1)
+        self.assertEqual(list(other.get_page(second.next_cursor)), list(other.get_page()))
+
+    def test_count_modes(self):
+        """Test exact, estimated and skipped counts"""
+        queryset = Position.objects.order_by('-created_at')
+        self.assertEqual(CursorPaginator(queryset, 5).count, 23)
+        self.assertEqual(CursorPaginator(queryset, 5).num_pages, 5)
+        estimated = CursorPaginator(queryset, 5, count='estimate')
+        self.assertEqual((estimated.count, estimated.count_is_estimate), (23, False))
+        self.assertIsNone(CursorPaginator(queryset, 5, count=None).count)
+        self.assertGreater(ESTIMATE_LIMIT, 23)
+
+    def test_nullable_sort_key(self):
+        """Test that rows with a NULL sort key are paged after the others"""
+        for i in range(7):
+            Internship.objects.create(status='active', start_date=date(2025, 1, 1) + timedelta(days=i % 4) if i % 3 else None)
+        expected_dated = list(Internship.objects.filter(start_date__isnull=False).order_by('-start_date', '-pk'))
+        expected_undated = list(Internship.objects.filter(start_date__isnull=True).order_by('-pk'))
+
+        paginator = CursorPaginator(Internship.objects.order_by('-start_date'), 2)
+        pages = walk_forward(paginator)
+        self.assertEqual([row for page in pages for row in page], expected_dated + expected_undated)
+
+        page = pages[-1]
+        while page.has_previous():
+            previous = paginator.get_page(page.previous_cursor)
+            self.assertEqual(list(previous), list(pages[previous.number - 1]))
+            page = previous
+
+
+class CursorPaginatedViewTest(TestCase):
+    """Test cursor links on a paginated list view"""
+
+    def setUp(self):
+        Group.objects.get_or_create(name='official')
+        self.user = User.objects.create_user(username='official', email='o@example.com', password='testpass123')
+        self.user.groups.add(Group.objects.get(name='official'))
+        Official.objects.create(user=self.user)
+        for i in range(45):
+            Company.objects.create(name=f'Company {i}', registration_status='pending' if i % 2 else 'approved')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_manage_companies_pages_keep_filters(self):
+        """Test walking filtered pages through the next links"""
+        url = reverse('manage_companies')
+        response = self.client.get(url, {'status': 'pending'})
+        seen = list(response.context['page_obj'])
+        self.assertEqual(response.context['filtered_count'], 22)
+        while response.context['page_obj'].has_next():
+            next_link = f"{url}?status=pending&cursor={response.context['page_obj'].next_cursor}"
+            self.assertContains(response, 'cursor=')
+            response = self.client.get(next_link)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(response.context['page_obj'])
+        self.assertEqual(len(seen), 22)
+        self.assertEqual(len({company.pk for company in seen}), 22)
+        self.assertTrue(all(company.registration_status == 'pending' for company in seen))
@@ -0,0 +1,149 @@
+"""
+Test cases for the denormalized application counters on Position.
+Tests signal-maintained counters, drift and the reconcile command.
+"""
+
+import re
+from io import StringIO
+
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.contrib.auth.models import User, Group
+
+from ..models import Student, Mentor, Company, Position, Application
+
+
+class PositionCountersTest(TestCase):
+    """Test that counters follow application changes"""
+
+    def setUp(self):
+        """Set up a position and a few students"""
+        for name in ['student', 'mentor']:
+            Group.objects.get_or_create(name=name)
+        company = Company.objects.create(name='Acme', registration_status='approved')
+        mentor_user = User.objects.create_user(username='mentor', email='m@example.com', password='testpass123')
+        mentor_user.groups.add(Group.objects.get(name='mentor'))
+        self.mentor = Mentor.objects.create(user=mentor_user, company=company)
+        self.position = Position.objects.create(title='Intern', company=company, mentor=self.mentor, max_students=2)
+        self.other_position = Position.objects.create(title='Other', company=company, mentor=self.mentor)
+        self.students = []
+        for i in range(3):
+            user = User.objects.create_user(username=f'student{i}', email=f's{i}@example.com', password='testpass123')
+            user.groups.add(Group.objects.get(name='student'))
+            self.students.append(Student.objects.create(user=user))
+
+    def refresh(self):
+        self.position.refresh_from_db()
+        return self.position
+
+    def test_counters_follow_create_status_change_and_delete(self):
+        """Test that counters are updated on every application write"""
+        applications = [
+            Application.objects.create(student=student, position=self.position) for student in self.students
+        ]
+        position = self.refresh()
+        self.assertEqual(position.application_count, 3)
+        self.assertEqual(position.pending_application_count, 3)
+        self.assertEqual(position.approved_application_count, 0)
+
+        applications[0].status = 'approved'
+        applications[0].save()
+        position = self.refresh()
+        self.assertEqual(position.pending_application_count, 2)
+        self.assertEqual(position.approved_application_count, 1)
+        self.assertEqual(position.available_spots, 1)
+
+        applications[1].delete()
+        position = self.refresh()
+        self.assertEqual(position.application_count, 2)
+        self.assertEqual(position.pending_application_count, 1)
+        self.assertFalse(Position.objects.drifted().exists())
+
+    def test_moving_application_between_positions(self):
+        """Test that reassigning an application moves it between counters"""
+        application = Application.objects.create(student=self.students[0], position=self.position)
+        application.position = self.other_position
+        application.save()
+        self.assertEqual(self.refresh().application_count, 0)
+        self.other_position.refresh_from_db()
+        self.assertEqual(self.other_position.application_count, 1)
+
+    def test_saving_a_stale_position_keeps_new_counts(self):
+        """Test that a full save of a position loaded earlier does not overwrite its counters"""
+        stale = Position.objects.get(pk=self.position.pk)
+        Application.objects.create(student=self.students[0], position=self.position)
+        stale.title = 'Renamed'
+        stale.save()
+        position = self.refresh()
+        self.assertEqual((position.title, position.application_count, position.pending_application_count), ('Renamed', 1, 1))
+        self.assertFalse(Position.objects.drifted().exists())
+
+    def test_properties_read_counters_without_queries(self):
+        """Test that the count properties do not hit the database"""
+        Application.objects.create(student=self.students[0], position=self.position)
+        position = self.refresh()
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(position.total_applications_count, 1)
+            self.assertEqual(position.pending_applications_count, 1)
+            self.assertEqual(position.available_spots, 2)
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_drifted_counter_does_not_block_writes(self):
+        """Test that decrementing a counter that drifted to zero stops there"""
+        application = Application.objects.create(student=self.students[0], position=self.position)
+        Position.objects.filter(pk=self.position.pk).update(application_count=0, pending_application_count=0)
+
+        application.status = 'approved'
+        application.save()
+        application.delete()
+        position = self.refresh()
+        self.assertEqual((position.application_count, position.pending_application_count), (0, 0))
+        self.assertEqual(position.approved_application_count, 0)
+        self.assertFalse(Position.objects.drifted().exists())
+
+    def test_reconcile_command(self):
+        """Test that drift is reported and repaired"""
+        Application.objects.create(student=self.students[0], position=self.position)
+        Application.objects.filter(position=self.position).update(status='approved')
+
+        with self.assertRaises(CommandError):
+            call_command('reconcile_position_counters', '--check', stdout=StringIO())
+
+        out = StringIO()
+        call_command('reconcile_position_counters', stdout=out)
+        self.assertIn('Reconciled counters on 1 positions', out.getvalue())
+        self.assertEqual(self.refresh().approved_application_count, 1)
+
+        out = StringIO()
+        call_command('reconcile_position_counters', '--check', stdout=out)
+        self.assertIn('match live application counts', out.getvalue())
+
+
+class PositionPageQueriesTest(TestCase):
+    """Test that position pages no longer count applications per position"""
+
+    def setUp(self):
+        Group.objects.get_or_create(name='mentor')
+        company = Company.objects.create(name='Acme', registration_status='approved')
+        self.user = User.objects.create_user(username='mentor', email='m@example.com', password='testpass123')
+        self.user.groups.add(Group.objects.get(name='mentor'))
+        mentor = Mentor.objects.create(user=self.user, company=company)
+        for i in range(5):
+            Position.objects.create(title=f'Position {i}', company=company, mentor=mentor)
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_mentor_dashboard_has_no_per_position_counts(self):
+        """Test that the dashboard position list reads counters"""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('mentor_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        per_position = [
+            q for q in context.captured_queries
+            if 'COUNT(' in q['sql'] and re.search(r'"app_application"\."position_id" = \d', q['sql'])
+        ]
+        self.assertEqual(per_position, [])
@@ -0,0 +1,109 @@
+"""
+Test cases for on-demand request profiling.
+Tests who can trigger a capture, what it records and the staff captures page.
+"""
+
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.contrib.auth.models import User, Group
+
+from .. import profiling
+
+
+class ProfilingTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.directory = Path(directory)
+        settings_override = override_settings(PROFILING_DIR=directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.staff = User.objects.create(username='staff', is_staff=True, is_superuser=True)
+        self.official = User.objects.create(username='official')
+        self.official.groups.add(Group.objects.create(name='official'))
+        self.student = User.objects.create(username='student')
+        self.student.groups.add(Group.objects.create(name='student'))
+        self.client = Client()
+        self.url = reverse('notification_inbox')
+
+    def captures(self):
+        return sorted(path.name for path in self.directory.iterdir())
+
+
+class ProfilingTriggerTest(ProfilingTestCase):
+    """Test that only a signed-in staff or official user with their own token is profiled"""
+
+    def test_anonymous_users_are_never_profiled(self):
+        response = self.client.get('/', {'profile': profiling.make_token(self.staff)})
+        self.assertNotIn(profiling.CAPTURE_HEADER, response)
+        self.assertEqual(self.captures(), [])
+
+    def test_students_are_not_profiled(self):
+        self.client.force_login(self.student)
+        response = self.client.get(self.url, {'profile': profiling.make_token(self.student)})
+        self.assertNotIn(profiling.CAPTURE_HEADER, response)
+        self.assertEqual(self.captures(), [])
+
+    def test_tokens_only_work_for_their_user(self):
+        """Test that a leaked token does nothing for another account, and forged or expired tokens are ignored"""
+        self.client.force_login(self.official)
+        self.assertNotIn(profiling.CAPTURE_HEADER, self.client.get(self.url, {'profile': profiling.make_token(self.staff)}))
+        self.assertNotIn(profiling.CAPTURE_HEADER, self.client.get(self.url, {'profile': 'forged'}))
+        with override_settings(PROFILING_TOKEN_MAX_AGE=-1):
+            self.assertNotIn(profiling.CAPTURE_HEADER, self.client.get(self.url, {'profile': profiling.make_token(self.official)}))
+        self.assertEqual(self.captures(), [])
+
+    def test_official_request_is_captured(self):
+        """Test that a header token saves a .prof file and a summary naming the view"""
+        self.client.force_login(self.official)
+        response = self.client.get(self.url, HTTP_X_PROFILE=profiling.make_token(self.official))
+        self.assertEqual(response.status_code, 200)
+        capture_id = response[profiling.CAPTURE_HEADER]
+        self.assertEqual(self.captures(), [f'{capture_id}.json', f'{capture_id}.prof'])
+
+        capture = json.loads((self.directory / f'{capture_id}.json').read_text())
+        self.assertEqual(capture['user'], 'official')
+        self.assertEqual(capture['view'], 'notification_inbox')
+        self.assertGreater(capture['queries'], 0)
+        self.assertGreater(capture['template_ms'], 0)
+        self.assertLessEqual(len(capture['functions']), profiling.TOP_FUNCTIONS)
+
+    @override_settings(PROFILING_MAX_CAPTURES=2)
+    def test_old_captures_are_pruned(self):
+        self.client.force_login(self.staff)
+        token = profiling.make_token(self.staff)
+        for _ in range(3):
+            self.client.get(self.url, {'profile': token})
+        self.assertEqual(len(self.captures()), 4)
+
+
+class ProfilingCapturesPageTest(ProfilingTestCase):
+    """Test the staff page listing captures"""
+
+    def test_page_is_staff_only(self):
+        page = reverse('profiling_captures')
+        self.assertEqual(self.client.get(page).status_code, 302)
+        self.client.force_login(self.official)
+        self.assertEqual(self.client.get(page).status_code, 302)
+
+    def test_lists_captures_and_issues_links(self):
+        self.client.force_login(self.staff)
+        capture_id = self.client.get(self.url, {'profile': profiling.make_token(self.staff)})[profiling.CAPTURE_HEADER]
+
+        response = self.client.get(reverse('profiling_captures'), {'username': 'official', 'path': self.url})
+        self.assertContains(response, capture_id)
+        self.assertContains(response, f'{self.url}?profile=')
+        self.assertEqual(response.context['link_user'], self.official)
+
+        response = self.client.get(reverse('profiling_captures'), {'username': 'student'})
+        self.assertNotIn('link', response.context)
+
+        download = self.client.get(reverse('profiling_capture_download', args=[capture_id]))
+        self.assertEqual(download.status_code, 200)
+        self.assertEqual(self.client.get(reverse('profiling_capture_download', args=['missing'])).status_code, 404)
@@ -0,0 +1,97 @@
+"""
+Test cases for the cached public pages.
+Tests the anonymous page cache, the home page counters and the health checks.
+"""
+
+from unittest import mock
+
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.db import DatabaseError, connection
+from django.urls import reverse
+from django.core.cache import cache
+from django.contrib.auth.models import User, Group
+
+from ..models import Student, Company, Position
+
+
+class PublicPageCacheTest(TestCase):
+    """Test that public pages are cached for anonymous visitors only"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_anonymous_pages_are_served_from_cache(self):
+        for name in ['about', 'contact', 'privacy_policy', 'terms_of_service', 'anti_harassment_policy', 'documentation_index']:
+            with self.subTest(page=name):
+                first = self.client.get(reverse(name))
+                self.assertEqual(first.status_code, 200)
+                self.assertIn('Cookie', first['Vary'])
+                with mock.patch('app.views.render') as render:
+                    second = self.client.get(reverse(name))
+                render.assert_not_called()
+                self.assertEqual(second.content, first.content)
+
+    def test_signed_in_users_are_not_cached(self):
+        """Test that the navbar of a signed-in user is never cached or shown to others"""
+        Group.objects.get_or_create(name='student')
+        user = User.objects.create_user(username='amina', email='a@example.com', password='testpass123', first_name='Amina')
+        user.groups.add(Group.objects.get(name='student'))
+        Student.objects.create(user=user)
+        self.client.login(username='amina', password='testpass123')
+        self.assertContains(self.client.get(reverse('about')), 'Amina')
+
+        anonymous = Client().get(reverse('about'))
+        self.assertNotContains(anonymous, 'Amina')
+        self.assertContains(self.client.get(reverse('about')), 'Amina')
+
+    def test_guides_are_cached_per_url(self):
+        overview = self.client.get(reverse('documentation_guide', args=['getting-started', 'overview']))
+        self.assertEqual(overview.status_code, 200)
+        self.assertEqual(self.client.get(reverse('documentation_guide', args=['students', 'nope'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('documentation_guide', args=['students', 'nope'])).status_code, 404)
+
+
+class HomeCountersTest(TestCase):
+    """Test the cached home page totals"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.company = Company.objects.create(name='Acme', registration_status='approved', is_verified=True)
+        Position.objects.create(title='Intern', company=self.company)
+
+    def test_counters_are_cached(self):
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response.context['total_positions'], 1)
+        self.assertEqual(response.context['total_companies'], 1)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(reverse('home'))
+        self.assertEqual(len(context), 0)
+
+    def test_counters_refresh_after_changes(self):
+        self.client.get(reverse('home'))
+        Position.objects.create(title='Second', company=self.company)
+        self.assertEqual(self.client.get(reverse('home')).context['total_positions'], 2)
+
+
+class HealthCheckTest(TestCase):
+    """Test the liveness and readiness probes"""
+
+    def test_healthz_does_not_touch_the_database(self):
+        with CaptureQueriesContext(connection) as context:
+            response = Client().get('/healthz')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(context), 0)
+
+    def test_readyz_runs_one_query(self):
+        with CaptureQueriesContext(connection) as context:
+            response = Client().get('/readyz')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(context), 1)
+
+    def test_readyz_reports_database_errors(self):
+        with mock.patch('app.views.connection.cursor', side_effect=DatabaseError('down')):
+            response = Client().get('/readyz')
+        self.assertEqual(response.status_code, 503)
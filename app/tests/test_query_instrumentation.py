@@ -0,0 +1,76 @@
+"""
+Test cases for query instrumentation.
+Tests SQL fingerprints, the query recorder and the Server-Timing middleware.
+"""
+
+from django.test import TestCase, Client, override_settings
+from django.db import connection
+from django.urls import reverse
+from django.contrib.auth.models import User, Group
+
+from ..instrumentation import QueryRecorder, fingerprint
+
+
+class FingerprintTest(TestCase):
+    """Test how SQL is normalized into fingerprints"""
+
+    def test_values_are_normalized(self):
+        """Test that literals, placeholders and IN lists do not split fingerprints"""
+        self.assertEqual(
+            fingerprint("SELECT *  FROM app_position\n WHERE id = 42 AND title = 'It''s' AND company_id IN (%s, %s, %s)"),
+            'SELECT * FROM app_position WHERE id = ? AND title = ? AND company_id IN (...)',
+        )
+        self.assertEqual(
+            fingerprint('SELECT "T3"."id" FROM app_position "T3" WHERE "T3"."id" IN (%s)'),
+            'SELECT "T3"."id" FROM app_position "T3" WHERE "T3"."id" IN (...)',
+        )
+
+
+class QueryRecorderTest(TestCase):
+    """Test that the recorder counts queries, duplicates and repeated fingerprints"""
+
+    def test_detects_repeated_queries(self):
+        users = [User.objects.create(username=f'user{i}') for i in range(5)]
+        recorder = QueryRecorder(slow_query_ms=0)
+        with connection.execute_wrapper(recorder):
+            for user in users:
+                User.objects.filter(pk=user.pk).exists()
+            User.objects.filter(pk=users[0].pk).exists()
+            User.objects.count()
+
+        self.assertEqual(recorder.count, 7)
+        self.assertEqual(recorder.duplicates, 1)
+        self.assertEqual(len(recorder.slow_queries), 7)
+        [(normalized, count, duration)] = recorder.repeated(threshold=3)
+        self.assertEqual(count, 6)
+        self.assertIn('FROM "auth_user" WHERE "auth_user"."id" = ?', normalized)
+        self.assertTrue(recorder.server_timing(12.5).startswith('db;dur='))
+        self.assertIn('7 queries, 1 duplicated', recorder.server_timing(12.5))
+
+
+class QueryInstrumentationMiddlewareTest(TestCase):
+    """Test the Server-Timing header, sampling and the slow request log"""
+
+    def setUp(self):
+        user = User.objects.create(username='official')
+        user.groups.add(Group.objects.create(name='official'))
+        self.client = Client()
+        self.client.force_login(user)
+        self.url = reverse('notification_inbox')
+
+    def test_disabled_by_default(self):
+        self.assertNotIn('Server-Timing', self.client.get(self.url))
+
+    @override_settings(QUERY_INSTRUMENTATION=True, SLOW_REQUEST_MS=0, SLOW_QUERY_MS=10000)
+    def test_adds_server_timing_and_logs_slow_requests(self):
+        """Test that a sampled request gets a header and a JSON slow request line naming its view"""
+        with self.assertLogs('app.queries', 'WARNING') as logs:
+            response = self.client.get(self.url)
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries, \d+ duplicated", total;dur=[\d.]+$')
+        [line] = logs.output
+        self.assertIn('slow_request {', line)
+        self.assertIn('"view": "notification_inbox"', line)
+
+    @override_settings(QUERY_INSTRUMENTATION=True, QUERY_INSTRUMENTATION_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_untouched(self):
+        self.assertNotIn('Server-Timing', self.client.get(self.url))
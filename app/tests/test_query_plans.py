@@ -0,0 +1,83 @@
+"""
+Test cases for query plans of the dashboards.
+Runs EXPLAIN QUERY PLAN on the canonical queries of each dashboard and fails
+when one of them falls back to a full table scan.
+"""
+
+import re
+from datetime import date
+
+from django.db import connection
+from django.test import TestCase
+
+from ..models import Application, Internship, Log, Notification, Position, Report
+
+# "SCAN app_position" reads the whole table, "SCAN app_position USING INDEX ..."
+# only walks an index (e.g. a partial one) and "SEARCH" looks rows up
+FULL_SCAN = re.compile(r'\bSCAN (\S+)$')
+
+STUDENT_ID = MENTOR_ID = INSTITUTE_ID = INTERNSHIP_ID = USER_ID = 1
+
+# Copies of the filters in app/views.py and app/inbox.py, by dashboard
+CANONICAL_QUERIES = {
+    'student_dashboard': {
+        'applications': lambda: Application.objects.filter(student_id=STUDENT_ID).order_by('-applied_at'),
+        'available_positions': lambda: Position.objects.filter(
+            is_active=True, start_date__gte=date.today(),
+        ).exclude(applications__student_id=STUDENT_ID).order_by('start_date')[:5],
+        'current_internship': lambda: Internship.objects.filter(student_id=STUDENT_ID, status='active'),
+        'active_application': lambda: Application.objects.filter(
+            student_id=STUDENT_ID, position_id=1, status__in=['pending', 'under_review', 'interview_scheduled', 'approved'],
+        ),
+    },
+    'student_internship': {
+        'recent_activities': lambda: Log.objects.filter(internship_id=INTERNSHIP_ID).order_by('-week_starting')[:5],
+        'reports': lambda: Report.objects.filter(internship_id=INTERNSHIP_ID).order_by('-report_month'),
+    },
+    'mentor_dashboard': {
+        'positions': lambda: Position.objects.filter(mentor_id=MENTOR_ID, is_active=True),
+        'pending_applications': lambda: Application.objects.filter(
+            position__mentor_id=MENTOR_ID, status__in=['pending', 'under_review'],
+        ).order_by('-applied_at'),
+        'active_internships': lambda: Internship.objects.filter(mentor_id=MENTOR_ID, status='active'),
+    },
+    'teacher_dashboard': {
+        'active_internships': lambda: Internship.objects.filter(student__institute_id=INSTITUTE_ID, status='active'),
+    },
+    'browse_positions': {
+        'positions': lambda: Position.objects.filter(is_active=True).order_by('-created_at')[:20],
+    },
+    'notifications': {
+        'inbox': lambda: Notification.objects.filter(recipient_id=USER_ID).order_by('-created_at')[:20],
+        'unread': lambda: Notification.objects.filter(recipient_id=USER_ID, is_read=False),
+        'unread_count': lambda: Notification.objects.filter(recipient_id=USER_ID, is_read=False).order_by(),
+    },
+}
+
+
+def full_scans(queryset):
+    """Tables the SQLite plan of a queryset reads in full"""
+    scans = []
+    for line in queryset.explain().splitlines():
+        match = FULL_SCAN.search(line.strip())
+        if match:
+            scans.append(match.group(1))
+    return scans
+
+
+class DashboardQueryPlanTest(TestCase):
+    """Test that the dashboard queries are served by indexes"""
+
+    def test_no_full_table_scans(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Plans are checked with SQLite EXPLAIN QUERY PLAN')
+        for dashboard, queries in CANONICAL_QUERIES.items():
+            for name, query in queries.items():
+                with self.subTest(dashboard=dashboard, query=name):
+                    self.assertEqual(full_scans(query()), [], query().explain())
+
+    def test_detects_full_table_scans(self):
+        """Test that the guard itself catches an unindexed filter"""
+        if connection.vendor != 'sqlite':
+            self.skipTest('Plans are checked with SQLite EXPLAIN QUERY PLAN')
+        self.assertEqual(full_scans(Application.objects.filter(cover_letter='x')), ['app_application'])
@@ -0,0 +1,104 @@
+"""
+Test cases for per-request role resolution.
+Tests that each page resolves the user's role with a single groups query, and
+that the role is not kept from one request to the next.
+"""
+
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.contrib.auth.models import User, Group
+
+from ..models import Student, Mentor, Official, Company, Position
+from ..roles import resolve_user_type
+
+
+def count_group_queries(queries):
+    """Count captured queries that read a single user's group membership"""
+    return sum(1 for query in queries if '"auth_user_groups"."user_id" =' in query['sql'])
+
+
+class RoleResolutionTest(TestCase):
+    """Test that roles are resolved once per request"""
+
+    def setUp(self):
+        """Set up users for each role"""
+        self.client = Client()
+        for name in ['student', 'mentor', 'teacher', 'official']:
+            Group.objects.get_or_create(name=name)
+
+        self.student_user = User.objects.create_user(
+            username='student', email='student@example.com', password='testpass123'
+        )
+        self.student_user.groups.add(Group.objects.get(name='student'))
+        Student.objects.create(user=self.student_user, semester_of_study='6')
+
+        self.mentor_user = User.objects.create_user(
+            username='mentor', email='mentor@example.com', password='testpass123'
+        )
+        self.mentor_user.groups.add(Group.objects.get(name='mentor'))
+        company = Company.objects.create(name='Test Company', registration_status='approved')
+        mentor = Mentor.objects.create(user=self.mentor_user, company=company)
+
+        self.official_user = User.objects.create_user(
+            username='official', email='official@example.com', password='testpass123'
+        )
+        self.official_user.groups.add(Group.objects.get(name='official'))
+        Official.objects.create(user=self.official_user)
+
+        self.position = Position.objects.create(
+            title='Backend Intern', company=company, mentor=mentor, is_active=True
+        )
+
+    def test_each_page_resolves_role_once(self):
+        """Test that every page issues exactly one groups query"""
+        pages = [
+            (self.student_user, reverse('student_dashboard')),
+            (self.student_user, reverse('browse_positions')),
+            (self.student_user, reverse('position_detail', args=[self.position.nanoid])),
+            (self.student_user, reverse('student_applications')),
+            (self.student_user, reverse('documentation_index')),
+            (self.mentor_user, reverse('mentor_dashboard')),
+            (self.mentor_user, reverse('mentor_applications')),
+            (self.official_user, reverse('official_dashboard')),
+            (self.official_user, reverse('official_reports')),
+        ]
+
+        for user, url in pages:
+            with self.subTest(url=url, user=user.username):
+                self.client.force_login(user)
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(count_group_queries(context.captured_queries), 1)
+
+    def test_role_is_not_kept_between_requests(self):
+        """Test that every request resolves the role again"""
+        self.client.force_login(self.student_user)
+        url = reverse('student_dashboard')
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as context:
+                self.client.get(url)
+            self.assertEqual(count_group_queries(context.captured_queries), 1)
+
+    def test_revoked_role_takes_effect_on_the_next_request(self):
+        """Test that a group change made elsewhere applies at once, without any cache to invalidate"""
+        self.client.force_login(self.student_user)
+        self.assertEqual(self.client.get(reverse('student_internship')).status_code, 200)
+
+        # As the admin or another process would, through the reverse relation
+        Group.objects.get(name='student').user_set.remove(self.student_user)
+        Group.objects.get(name='mentor').user_set.add(self.student_user)
+
+        response = self.client.get(reverse('student_internship'))
+        self.assertRedirects(response, reverse('home'), fetch_redirect_response=False)
+
+    def test_users_without_role_are_not_cached(self):
+        """Test that a missing role is looked up again once the user picks one"""
+        user = User.objects.create_user(username='norole', password='testpass123')
+        self.assertIsNone(resolve_user_type(user))
+
+        fresh_user = User.objects.get(pk=user.pk)
+        fresh_user.groups.add(Group.objects.get(name='teacher'))
+        self.assertEqual(resolve_user_type(fresh_user), 'teacher')
@@ -0,0 +1,263 @@
+"""
+Test cases for roster imports.
+Tests reading CSV and XLSX rosters, validating and deduplicating their rows,
+the accounts they create, and the upload views and worker.
+"""
+
+import io
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+from pathlib import Path
+
+from allauth.account.models import EmailAddress
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.contrib.auth.models import User, Group
+from django.utils import timezone
+
+from .. import exports, rosters
+from ..models import Student, Teacher, Official, Institute, DailyStatistic, RosterImport
+
+ROSTER_CSV = (
+    'Email Address,First Name,Last Name,Roll Number,Major,Semester\n'
+    'amina@gpgc.edu.pk,Amina,Khan,S-1,CS,5\n'
+    'BILAL@gpgc.edu.pk,Bilal,Ahmed,S-2,CS,6\n'
+    'sana@gmail.com,Sana,Ali,S-3,CS,5\n'
+    'not an email,,,S-4,,\n'
+    'amina@gpgc.edu.pk,Amina,Again,S-5,CS,5\n'
+    '\n'
+    'taken@gpgc.edu.pk,Taken,User,S-6,CS,5\n'
+    'hina@gpgc.edu.pk,Hina,Shah,S-7,CS,9\n'
+)
+
+
+def csv_rows(content):
+    return rosters.read_rows(io.BytesIO(content.encode('utf-8')), 'roster.csv')
+
+
+def xlsx_bytes(rows):
+    return b''.join(exports.xlsx_chunks(rows))
+
+
+class RosterTestMixin:
+    """Set up an institute with an email domain, an existing account and a teacher"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        for name in ['student', 'teacher', 'official']:
+            Group.objects.get_or_create(name=name)
+        self.institute = Institute.objects.create(
+            name='GPGC', email_domain='gpgc.edu.pk', registration_status='approved', domain_verified=True
+        )
+        User.objects.create_user(username='taken', email='Taken@gpgc.edu.pk', password='testpass123')
+        teacher_user = User.objects.create_user(username='teacher', email='t@gpgc.edu.pk', password='testpass123')
+        teacher_user.groups.add(Group.objects.get(name='teacher'))
+        self.teacher = Teacher.objects.create(user=teacher_user, institute=self.institute)
+
+
+class ReadRowsTest(TestCase):
+    """Test reading roster files"""
+
+    def test_csv_headers_and_row_numbers(self):
+        rows = list(csv_rows('﻿E-mail, Full Name ,Semester\n\na@x.pk,Amina Khan,5\n'))
+        self.assertEqual(rows, [(3, {'email': 'a@x.pk', 'name': 'Amina Khan', 'semester_of_study': '5'})])
+
+    def test_xlsx_inline_strings_and_numbers(self):
+        content = xlsx_bytes([['Email', 'Student ID', 'Semester'], ['a@x.pk', 12345, 5], [None, None, None], ['b@x.pk', 'S-2', 4.5]])
+        rows = list(rosters.read_rows(io.BytesIO(content), 'Roster.XLSX'))
+        self.assertEqual(rows, [
+            (2, {'email': 'a@x.pk', 'student_id': '12345', 'semester_of_study': '5'}),
+            (4, {'email': 'b@x.pk', 'student_id': 'S-2', 'semester_of_study': '4.5'}),
+        ])
+
+    def test_xlsx_shared_strings_and_gaps(self):
+        buffer = io.BytesIO()
+        namespace = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('xl/sharedStrings.xml', f'<sst {namespace}><si><t>email</t></si><si><r><t>a@</t></r><r><t>x.pk</t></r></si></sst>')
+            archive.writestr('xl/worksheets/sheet1.xml', (
+                f'<worksheet {namespace}><sheetData>'
+                '<row r="1"><c r="A1" t="s"><v>0</v></c><c r="C1" t="inlineStr"><is><t>Major</t></is></c></row>'
+                '<row r="2"><c r="A2" t="s"><v>1</v></c><c r="C2" t="inlineStr"><is><t>CS</t></is></c></row>'
+                '</sheetData></worksheet>'
+            ))
+        rows = list(rosters.read_rows(buffer, 'roster.xlsx'))
+        self.assertEqual(rows, [(2, {'email': 'a@x.pk', 'major': 'CS'})])
+
+    def test_unreadable_files(self):
+        with self.assertRaisesMessage(rosters.RosterError, 'email'):
+            list(csv_rows('name,major\nAmina,CS\n'))
+        with self.assertRaisesMessage(rosters.RosterError, 'UTF-8'):
+            list(rosters.read_rows(io.BytesIO('email\nnaïve@x.pk\n'.encode('latin-1')), 'roster.csv'))
+        with self.assertRaisesMessage(rosters.RosterError, 'XLSX'):
+            list(rosters.read_rows(io.BytesIO(b'not a zip'), 'roster.xlsx'))
+        with self.assertRaisesMessage(rosters.RosterError, '.csv or .xlsx'):
+            rosters.read_rows(io.BytesIO(b''), 'roster.xls')
+
+
+class ImportRowsTest(RosterTestMixin, TestCase):
+    """Test validating rows and creating accounts"""
+
+    def test_creates_accounts_and_reports_rows(self):
+        report = rosters.import_rows(self.institute, 'student', csv_rows(ROSTER_CSV), chunk_size=3)
+        self.assertEqual((report.rows, report.created, report.error_count), (7, 2, 5))
+        self.assertEqual([(error['row'], error['error']) for error in report.errors], [
+            (4, 'Email must be an @gpgc.edu.pk address'),
+            (5, 'Not a valid email address'),
+            (6, 'Same email as an earlier row'),
+            (8, 'An account with this email already exists'),
+            (9, 'Semester of study must be one of 4, 5, 6, 7, 8'),
+        ])
+
+        bilal = Student.objects.select_related('user').get(user__email='bilal@gpgc.edu.pk')
+        self.assertEqual((bilal.institute, bilal.student_id, bilal.semester_of_study), (self.institute, 'S-2', '6'))
+        self.assertEqual(bilal.user.username, 'bilal@gpgc.edu.pk')
+        self.assertEqual(bilal.user.get_full_name(), 'Bilal Ahmed')
+        self.assertFalse(bilal.user.has_usable_password())
+        self.assertTrue(bilal.user.groups.filter(name='student').exists())
+        address = EmailAddress.objects.get(user=bilal.user)
+        self.assertTrue(address.verified and address.primary)
+
+        bucket = DailyStatistic.objects.get(entity='user', status='student', day=timezone.localdate())
+        self.assertEqual(bucket.count, 2)
+
+    def test_importing_again_creates_nothing(self):
+        rosters.import_rows(self.institute, 'student', csv_rows(ROSTER_CSV))
+        report = rosters.import_rows(self.institute, 'student', csv_rows(ROSTER_CSV))
+        self.assertEqual(report.created, 0)
+        self.assertEqual(Student.objects.count(), 2)
+
+    def test_teachers(self):
+        report = rosters.import_rows(self.institute, 'teacher', csv_rows(
+            'email,name,department,title\nzara@gpgc.edu.pk,Zara Iqbal,Physics,Lecturer\n'
+        ))
+        self.assertEqual(report.created, 1)
+        teacher = Teacher.objects.get(user__email='zara@gpgc.edu.pk')
+        self.assertEqual((teacher.department, teacher.title, teacher.user.last_name), ('Physics', 'Lecturer', 'Iqbal'))
+
+    def test_taken_addresses_is_one_query(self):
+        EmailAddress.objects.create(user=self.teacher.user, email='Second@gpgc.edu.pk')
+        with self.assertNumQueries(1):
+            taken = rosters.taken_addresses(['taken@gpgc.edu.pk', 'second@gpgc.edu.pk', 'new@gpgc.edu.pk'])
+        self.assertEqual(taken, {'taken@gpgc.edu.pk', 'second@gpgc.edu.pk'})
+
+    def test_unverified_institute(self):
+        self.institute.domain_verified = False
+        with self.assertRaisesMessage(rosters.RosterError, 'verified email domain'):
+            rosters.import_rows(self.institute, 'student', csv_rows(ROSTER_CSV))
+        self.assertFalse(Student.objects.exists())
+
+    def test_institute_without_domain(self):
+        self.institute.email_domain = ''
+        with self.assertRaisesMessage(rosters.RosterError, 'no email domain'):
+            rosters.import_rows(self.institute, 'student', csv_rows(ROSTER_CSV))
+
+
+class RosterImportViewTest(RosterTestMixin, TestCase):
+    """Test the upload views and the worker"""
+
+    def setUp(self):
+        super().setUp()
+        official_user = User.objects.create_user(username='official', email='o@example.com', password='testpass123')
+        official_user.groups.add(Group.objects.get(name='official'))
+        Official.objects.create(user=official_user)
+        self.client = Client()
+
+    def upload(self, **data):
+        data.setdefault('role', 'student')
+        data['file'] = SimpleUploadedFile('students.csv', ROSTER_CSV.encode('utf-8'), content_type='text/csv')
+        return self.client.post(reverse('import_roster'), data)
+
+    def test_teacher_upload_is_imported_inline(self):
+        self.client.login(username='teacher', password='testpass123')
+        self.assertEqual(self.client.get(reverse('import_roster')).status_code, 200)
+        response = self.upload()
+        roster_import = RosterImport.objects.get()
+        self.assertRedirects(response, reverse('roster_import_detail', args=[roster_import.nanoid]))
+        self.assertEqual((roster_import.status, roster_import.created_count, roster_import.error_count), ('done', 2, 5))
+        self.assertEqual(roster_import.uploaded_by, self.teacher.user)
+
+        response = self.client.get(reverse('roster_import_detail', args=[roster_import.nanoid]))
+        self.assertContains(response, 'Same email as an earlier row')
+
+    def test_teacher_cannot_import_teachers_or_other_institutes(self):
+        self.client.login(username='teacher', password='testpass123')
+        response = self.upload(role='teacher')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(RosterImport.objects.exists())
+
+        other = Institute.objects.create(name='Other', email_domain='other.edu.pk', registration_status='approved')
+        roster_import = RosterImport.objects.create(institute=other, file='roster_imports/x.csv', file_name='x.csv')
+        self.assertEqual(self.client.get(reverse('roster_import_detail', args=[roster_import.nanoid])).status_code, 404)
+
+    @override_settings(ROSTER_IMPORT_INLINE_BYTES=0)
+    def test_large_uploads_are_queued_for_the_worker(self):
+        self.client.login(username='official', password='testpass123')
+        self.upload(institute=self.institute.pk)
+        roster_import = RosterImport.objects.get()
+        self.assertEqual(roster_import.status, 'pending')
+        self.assertFalse(Student.objects.exists())
+
+        out = io.StringIO()
+        call_command('process_roster_imports', '--once', stdout=out)
+        roster_import.refresh_from_db()
+        self.assertEqual((roster_import.status, roster_import.created_count), ('done', 2))
+        self.assertIn('created 2 of 7 accounts', out.getvalue())
+        self.assertIsNone(rosters.claim_next())
+
+    def test_unapproved_institute_gets_no_scope(self):
+        Institute.objects.filter(pk=self.institute.pk).update(registration_status='pending', email_domain='gmail.com')
+        self.client.login(username='teacher', password='testpass123')
+        self.assertRedirects(self.client.get(reverse('import_roster')), reverse('home'), fetch_redirect_response=False)
+        self.assertRedirects(self.upload(), reverse('home'), fetch_redirect_response=False)
+        self.assertFalse(RosterImport.objects.exists())
+
+        self.client.login(username='official', password='testpass123')
+        response = self.upload(institute=self.institute.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('institute', response.context['form'].errors)
+
+    def test_imports_of_dead_workers_are_claimed_again(self):
+        roster_import = RosterImport.objects.create(institute=self.institute, file='roster_imports/x.csv', file_name='x.csv')
+        self.assertEqual(rosters.claim_next(), roster_import)
+        self.assertIsNone(rosters.claim_next())
+
+        expired = timezone.now() - rosters.CLAIM_LEASE - timedelta(minutes=1)
+        RosterImport.objects.filter(pk=roster_import.pk).update(started_at=expired)
+        self.assertEqual(rosters.claim_next().attempts, 2)
+
+        RosterImport.objects.filter(pk=roster_import.pk).update(started_at=expired, attempts=rosters.MAX_ATTEMPTS)
+        self.assertIsNone(rosters.claim_next())
+        roster_import.refresh_from_db()
+        self.assertEqual(roster_import.status, 'failed')
+        self.assertIn('interrupted 3 times', roster_import.last_error)
+
+    def test_access(self):
+        student_user = User.objects.create_user(username='student', email='s@example.com', password='testpass123')
+        student_user.groups.add(Group.objects.get(name='student'))
+        self.client.login(username='student', password='testpass123')
+        self.assertRedirects(self.client.get(reverse('import_roster')), reverse('home'), fetch_redirect_response=False)
+
+
+class ImportRosterCommandTest(RosterTestMixin, TestCase):
+    """Test the import_roster management command"""
+
+    def test_import(self):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = directory / 'roster.xlsx'
+        path.write_bytes(xlsx_bytes([['email', 'first_name'], ['amina@gpgc.edu.pk', 'Amina'], ['sana@gmail.com', 'Sana']]))
+        out = io.StringIO()
+        call_command('import_roster', str(path), '--institute', self.institute.nanoid, stdout=out)
+        self.assertIn('Created 1 of 2 student accounts for GPGC', out.getvalue())
+        self.assertIn('row 3: sana@gmail.com: Email must be an @gpgc.edu.pk address', out.getvalue())
+        self.assertTrue(Student.objects.filter(user__first_name='Amina').exists())
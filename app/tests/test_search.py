@@ -0,0 +1,121 @@
+"""
+Test cases for full-text position search.
+Tests index sync, relevance ranking, snippets and the browse_positions view.
+"""
+
+from io import StringIO
+
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.core.management import call_command
+
+from ..models import Company, Position
+from .. import search
+
+
+class PositionSearchTest(TestCase):
+    """Test searching positions through the full-text index"""
+
+    def setUp(self):
+        """Set up positions that match 'python' to different degrees"""
+        self.company = Company.objects.create(name='Acme Software', registration_status='approved')
+        self.title_match = Position.objects.create(
+            title='Python Developer', company=self.company,
+            description='Build internal tools for our <b>finance</b> team.',
+        )
+        self.description_match = Position.objects.create(
+            title='Operations Intern', company=self.company,
+            description='Automate spreadsheets with a little python scripting.',
+        )
+        self.no_match = Position.objects.create(
+            title='Graphic Designer', company=self.company, description='Design posters and banners.',
+        )
+
+    def search(self, query):
+        return list(search.search_positions(Position.objects.all(), query).order_by('-search_rank'))
+
+    def test_results_ranked_by_relevance(self):
+        """Test that title matches rank above description matches"""
+        self.assertEqual(self.search('python'), [self.title_match, self.description_match])
+
+    def test_prefix_and_stemmed_matches(self):
+        """Test that partial words and word forms match"""
+        self.assertEqual(self.search('pyth'), [self.title_match, self.description_match])
+        self.assertEqual(self.search('automating spreadsheet'), [self.description_match])
+
+    def test_company_name_is_searchable(self):
+        """Test that renaming a company reindexes its positions"""
+        self.company.name = 'Globex'
+        self.company.save()
+        self.assertEqual(len(self.search('globex')), 3)
+        self.assertEqual(self.search('acme'), [])
+
+    def test_index_follows_save_and_delete(self):
+        """Test that edits and deletions are reflected in the index"""
+        self.no_match.description = 'Design posters using Python scripts.'
+        self.no_match.save()
+        self.assertIn(self.no_match, self.search('python'))
+
+        self.title_match.delete()
+        self.assertNotIn(self.title_match.pk, [position.pk for position in self.search('python')])
+
+    def test_query_syntax_is_not_interpreted(self):
+        """Test that FTS operators and quotes in user input are treated as words"""
+        for query in ['"python', 'python*)', '(python', 'python^']:
+            with self.subTest(query=query):
+                self.assertIn(self.title_match, self.search(query))
+        for query in ['python AND NOT', 'title:python', 'NEAR(python', '!!!']:
+            with self.subTest(query=query):
+                self.assertEqual(self.search(query), [])
+
+    def test_snippets_are_escaped_and_highlighted(self):
+        """Test that snippets mark matches without trusting position text"""
+        positions = self.search('finance')
+        search.attach_snippets(positions, 'finance')
+        html = search.highlight(positions[0].search_snippet)
+        self.assertIn('<mark>finance</mark>', html)
+        self.assertIn('&lt;b&gt;', html)
+        self.assertNotIn('<b>', html)
+
+    def test_rebuild_command(self):
+        """Test that the index can be rebuilt from scratch"""
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Indexed 3 positions', out.getvalue())
+        self.assertEqual(self.search('python'), [self.title_match, self.description_match])
+
+
+class BrowsePositionsSearchTest(TestCase):
+    """Test the search form on browse_positions"""
+
+    def setUp(self):
+        company = Company.objects.create(name='Acme', registration_status='approved')
+        self.older = Position.objects.create(title='Python Developer', company=company, description='Python APIs')
+        self.newer = Position.objects.create(title='Support Intern', company=company, description='Some python')
+        self.client = Client()
+
+    def test_relevance_sort_is_default_when_searching(self):
+        """Test that search results are ordered by relevance"""
+        response = self.client.get(reverse('browse_positions'), {'search': 'python'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['page_obj']), [self.older, self.newer])
+        self.assertContains(response, '<mark>')
+
+    def test_newest_sort(self):
+        """Test that search results can still be ordered by date"""
+        response = self.client.get(reverse('browse_positions'), {'search': 'python', 'sort': 'newest'})
+        self.assertEqual(list(response.context['page_obj']), [self.newer, self.older])
+        self.assertEqual(response.context['total_positions'], 2)
+
+    def test_relevance_pages_follow_cursor(self):
+        """Test that ranked results can be paged through with cursors"""
+        company = Company.objects.get(name='Acme')
+        for i in range(14):
+            Position.objects.create(title=f'Intern {i}', company=company, description='python ' * (i % 4 + 1))
+        url = reverse('browse_positions')
+        first = self.client.get(url, {'search': 'python'}).context['page_obj']
+        second = self.client.get(url, {'search': 'python', 'cursor': first.next_cursor}).context['page_obj']
+        seen = [position.pk for position in first] + [position.pk for position in second]
+        self.assertEqual(len(seen), 16)
+        self.assertEqual(len(set(seen)), 16)
+        self.assertFalse(second.has_next())
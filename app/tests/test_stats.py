@@ -0,0 +1,165 @@
+"""
+Test cases for the materialized statistics rollup.
+Tests signal-driven bucket updates, bulk updates, rebuild/verify, and the official reports page.
+"""
+
+from io import StringIO
+
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.db.models import Case, Q, Value, When
+from django.urls import reverse
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.contrib.auth.models import User, Group
+
+from ..models import (
+    Student, Mentor, Official, Company, Institute, Position,
+    Application, Internship, DailyStatistic
+)
+from .. import stats
+
+
+class StatisticsRollupTest(TestCase):
+    """Test that the rollup tracks live counts"""
+
+    def setUp(self):
+        """Set up groups and a few organizations"""
+        for name in ['student', 'mentor', 'teacher', 'official']:
+            Group.objects.get_or_create(name=name)
+
+        self.company = Company.objects.create(name='Acme', registration_status='pending')
+        self.institute = Institute.objects.create(name='GPGC', registration_status='approved', domain_verified=True)
+
+        student_user = User.objects.create_user(username='student', email='s@example.com', password='testpass123')
+        student_user.groups.add(Group.objects.get(name='student'))
+        self.student = Student.objects.create(user=student_user, institute=self.institute)
+
+        mentor_user = User.objects.create_user(username='mentor', email='m@example.com', password='testpass123')
+        mentor_user.groups.add(Group.objects.get(name='mentor'))
+        self.mentor = Mentor.objects.create(user=mentor_user, company=self.company)
+
+        self.position = Position.objects.create(title='Intern', company=self.company, mentor=self.mentor)
+
+    def totals(self):
+        return stats.status_totals()
+
+    def test_creation_is_counted(self):
+        """Test that new rows land in their status buckets"""
+        totals = self.totals()
+        self.assertEqual(totals[('company', 'pending')], 1)
+        self.assertEqual(totals[('institute', 'approved')], 1)
+        self.assertEqual(totals[('institute_domain', 'verified')], 1)
+        self.assertEqual(totals[('position', 'active')], 1)
+        self.assertEqual(totals[('user', 'student')], 1)
+        self.assertEqual(totals[('user', 'mentor')], 1)
+        self.assertEqual(stats.verify(), [])
+
+    def test_status_change_moves_bucket(self):
+        """Test that saving a new status moves the row between buckets"""
+        application = Application.objects.create(student=self.student, position=self.position)
+        self.assertEqual(self.totals()[('application', 'pending')], 1)
+
+        application.status = 'approved'
+        application.save()
+        totals = self.totals()
+        self.assertEqual(totals[('application', 'pending')], 0)
+        self.assertEqual(totals[('application', 'approved')], 1)
+
+        self.company.registration_status = 'approved'
+        self.company.save()
+        self.assertEqual(self.totals()[('company', 'approved')], 1)
+        self.assertEqual(stats.verify(), [])
+
+    def test_delete_is_uncounted(self):
+        """Test that deleted rows are removed from the rollup"""
+        internship = Internship.objects.create(student=self.student, mentor=self.mentor, status='active')
+        self.assertEqual(self.totals()[('internship', 'active')], 1)
+
+        internship.delete()
+        self.assertEqual(self.totals()[('internship', 'active')], 0)
+
+        self.student.user.delete()
+        self.assertEqual(self.totals()[('user', 'student')], 0)
+        self.assertEqual(stats.verify(), [])
+
+    def test_bulk_update_drift_is_detected_and_repaired(self):
+        """Test that verify reports drift and rebuild repairs it"""
+        Company.objects.update(registration_status='approved')
+        mismatches = stats.verify(['company'])
+        self.assertEqual(len(mismatches), 2)
+
+        stats.rebuild(['company'])
+        self.assertEqual(stats.verify(), [])
+        self.assertEqual(self.totals()[('company', 'approved')], 1)
+
+    def test_bulk_update_applies_deltas(self):
+        """Test that stats.update moves the updated rows between buckets without rebuilding"""
+        Company.objects.create(name='Globex', registration_status='pending', domain_verified=True)
+        other_bucket = DailyStatistic.objects.get(entity='institute', status='approved')
+        with CaptureQueriesContext(connection) as queries:
+            updated = stats.update(Company.objects.all(), registration_status='approved', domain_verified=True)
+        self.assertEqual(updated, 2)
+        self.assertFalse([query for query in queries if query['sql'].startswith('DELETE')])
+        self.assertEqual(stats.verify(), [])
+        self.assertEqual(self.totals()[('company', 'approved')], 2)
+        self.assertEqual(self.totals()[('company_domain', 'verified')], 2)
+        self.assertEqual(DailyStatistic.objects.get(pk=other_bucket.pk).count, 1)
+
+    def test_bulk_update_with_expressions(self):
+        """Test that stats.update buckets rows by what expressions evaluated to in the database"""
+        Company.objects.create(name='Globex', registration_status='approved')
+        stats.update(
+            Company.objects.all(),
+            registration_status=Case(When(registration_status='pending', then=Value('approved')), default=Value('rejected')),
+            domain_verified=~Q(name='Acme'),
+        )
+        self.assertEqual(stats.verify(), [])
+        self.assertEqual(self.totals()[('company', 'approved')], 1)
+        self.assertEqual(self.totals()[('company', 'rejected')], 1)
+        self.assertEqual(self.totals()[('company_domain', 'verified')], 1)
+
+    def test_backfill_command(self):
+        """Test backfilling from scratch and verifying"""
+        DailyStatistic.objects.all().delete()
+        with self.assertRaises(CommandError):
+            call_command('backfill_stats', '--verify', stdout=StringIO())
+
+        out = StringIO()
+        call_command('backfill_stats', stdout=out)
+        self.assertIn('Rebuilt', out.getvalue())
+
+        out = StringIO()
+        call_command('backfill_stats', '--verify', stdout=out)
+        self.assertIn('matches live counts', out.getvalue())
+
+
+class OfficialReportsTest(TestCase):
+    """Test that official reports are served from the rollup"""
+
+    def setUp(self):
+        Group.objects.get_or_create(name='official')
+        self.user = User.objects.create_user(username='official', email='o@example.com', password='testpass123')
+        self.user.groups.add(Group.objects.get(name='official'))
+        Official.objects.create(user=self.user)
+        for i in range(5):
+            Company.objects.create(name=f'Company {i}', registration_status='approved' if i % 2 else 'pending')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_report_uses_few_queries(self):
+        """Test the report page no longer issues per-metric counts"""
+        # Fill the per-user caches (unread notifications) so only the report's own queries are captured
+        self.client.get(reverse('official_reports'))
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('official_reports'))
+        self.assertEqual(response.status_code, 200)
+        count_queries = [q for q in context.captured_queries if 'COUNT(' in q['sql']]
+        self.assertEqual(count_queries, [])
+
+        entity_counts = response.context['entity_counts']
+        self.assertEqual(entity_counts['total_companies'], 5)
+        self.assertEqual(entity_counts['approved_companies'], 2)
+        self.assertEqual(entity_counts['officials'], 1)
+        self.assertEqual(len(response.context['monthly_trends']), 6)
@@ -0,0 +1,83 @@
+"""
+Test cases for the URL benchmark suite.
+Replays the recorded baseline and fails when an endpoint regresses past its budget.
+"""
+
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+
+from .. import benchmarks
+
+
+class URLBenchmarkBudgetTest(TestCase):
+    """Test every URL against the status, query and duplicate budget of the baseline"""
+
+    def test_endpoints_stay_within_budget(self):
+        """Test that no endpoint regressed since the baseline was recorded"""
+        baseline = benchmarks.load_baseline()
+        call_command('generate_load_data', scale=baseline['scale'], seed=baseline['seed'], stdout=StringIO())
+        cache.clear()
+        results = benchmarks.run(repeat=1)
+
+        self.assertEqual(
+            sorted(set(results) ^ set(baseline['endpoints'])), [],
+            'Endpoints changed, record a new baseline with: python manage.py benchmark_urls --update-baseline',
+        )
+        breaches = benchmarks.regressions(results, baseline)
+        self.assertEqual(breaches, [], '\n'.join(
+            f'{key}: {metric} {actual} (baseline {expected}, budget {limit})'
+            for key, metric, expected, limit, actual in breaches
+        ))
+
+
+class RegressionCheckTest(TestCase):
+    """Test how results are compared with a baseline"""
+
+    def setUp(self):
+        self.baseline = {
+            'budget': {'queries': 2},
+            'endpoints': {
+                'student home': {'status': 200, 'queries': 5, 'duplicates': 0},
+            },
+        }
+
+    def result(self, **changes):
+        return {'student home': {**self.baseline['endpoints']['student home'], **changes}}
+
+    def test_within_budget(self):
+        """Test that drift inside the budget passes"""
+        self.assertEqual(benchmarks.regressions(self.result(queries=7, duplicates=2), self.baseline), [])
+
+    def test_breaches_are_reported(self):
+        """Test that extra queries and status changes are reported with their limits"""
+        breaches = benchmarks.regressions(self.result(status=500, queries=8, duplicates=3), self.baseline)
+        self.assertEqual(breaches, [
+            ('student home', 'status', 200, 200, 500),
+            ('student home', 'queries', 5, 7, 8),
+            ('student home', 'duplicates', 0, 2, 3),
+        ])
+
+    def test_server_errors_always_breach(self):
+        """Test that a crash is reported even when the baseline recorded it"""
+        self.baseline['endpoints']['student home']['status'] = 500
+        breaches = benchmarks.regressions(self.result(), self.baseline)
+        self.assertEqual(breaches, [('student home', 'status', 500, 500, 500)])
+
+    def test_baseline_keeps_deterministic_metrics(self):
+        """Test that latency, size and URLs are left out of a recorded baseline"""
+        path = Path(self.enterContext(tempfile.TemporaryDirectory())) / 'baseline.json'
+        result = {'url': '/', 'status': 200, 'queries': 5, 'duplicates': 0, 'p50_ms': 10, 'p95_ms': 12, 'bytes': 1000}
+        benchmarks.save_baseline({'student home': result}, 200, 42, path)
+        self.assertEqual(benchmarks.load_baseline(path), {
+            'scale': 200, 'seed': 42, 'budget': benchmarks.DEFAULT_BUDGET,
+            'endpoints': {'student home': {'status': 200, 'queries': 5, 'duplicates': 0}},
+        })
+
+    def test_percentile_uses_nearest_rank(self):
+        self.assertEqual(benchmarks.percentile([5, 1, 3, 2, 4], 50), 3)
+        self.assertEqual(benchmarks.percentile([5, 1, 3, 2, 4], 95), 5)
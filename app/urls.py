@@ -12,6 +12,10 @@ urlpatterns = [
     path('harassment/', views.anti_harassment_policy, name='anti_harassment_policy'),
     path('dashboard/', views.dashboard_redirect, name='dashboard'),
     
+    # Health checks
+    path('healthz', views.healthz, name='healthz'),
+    path('readyz', views.readyz, name='readyz'),
+    
     # Mentor URLs
     path('mentor/', views.mentor_dashboard_view, name='mentor_dashboard'),
     path('mentor/positions/', views.mentor_positions, name='mentor_positions'),
@@ -37,20 +41,32 @@ urlpatterns = [
     # Teacher URLs
     path('teacher/', views.teacher_dashboard_view, name='teacher_dashboard'),
     path('teacher/students/', views.teacher_students, name='teacher_students'),
+    path('teacher/students/export/', views.export_students, name='export_students'),
     path('teacher/internships/', views.teacher_internships, name='teacher_internships'),
     path('teacher/internship/<str:internship_nanoid>/', views.teacher_internship_detail, name='teacher_internship_detail'),
     path('teacher/reports/', views.teacher_reports, name='teacher_reports'),
+    path('teacher/reports/export/', views.export_reports, name='export_reports'),
     path('teacher/reports/<str:report_nanoid>/', views.teacher_report_detail, name='teacher_report_detail'),
     
     # Official URLs
     path('official/', views.official_dashboard_view, name='official_dashboard'),
     path('official/companies/', views.manage_companies, name='manage_companies'),
+    path('official/companies/export/', views.export_companies, name='export_companies'),
     path('official/companies/mass-verify/', views.mass_verify_companies, name='mass_verify_companies'),
     path('official/companies/<str:company_nanoid>/', views.company_detail_official, name='company_detail_official'),
     path('official/institutes/', views.manage_institutes, name='manage_institutes'),
+    path('official/institutes/export/', views.export_institutes, name='export_institutes'),
     path('official/institutes/mass-verify/', views.mass_verify_institutes, name='mass_verify_institutes'),
     path('official/institutes/<str:institute_nanoid>/', views.institute_detail_official, name='institute_detail_official'),
     path('official/reports/', views.official_reports, name='official_reports'),
+    path('official/reports/export/', views.export_statistics, name='export_statistics'),
+    path('rosters/import/', views.import_roster, name='import_roster'),
+    path('rosters/<str:import_nanoid>/', views.roster_import_detail, name='roster_import_detail'),
+    
+    # Notification URLs
+    path('notifications/', views.notification_inbox, name='notification_inbox'),
+    path('notifications/mark-all-read/', views.mark_all_notifications_read, name='mark_all_notifications_read'),
+    path('notifications/badge/', views.notification_badge, name='notification_badge'),
     
     # Shared URLs
     path('students/<str:student_nanoid>/', views.student_profile_detail, name='student_profile_detail'),
@@ -1,6 +1,8 @@
 """
 Utility functions for the internship management system
 """
+from django.conf import settings
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.contrib import messages
 from .models import Institute, Company
@@ -49,6 +51,47 @@ def validate_user_organization_membership(user, organization_type, organization_
     return False, "Invalid organization type."
 
 
+# Fields loaded for the organization pickers; the rest are deferred to keep cached lists small
+AVAILABLE_ORGANIZATION_FIELDS = ('nanoid', 'name', 'email_domain', 'domain_verified', 'registration_status')
+
+
+def _available_version_key(model):
+    return f'available_organizations_version:{model._meta.model_name}'
+
+
+def invalidate_available_organizations(model):
+    """
+    Forget the cached joinable organizations of every email domain
+
+    Called whenever an institute or company is saved or deleted, and after
+    bulk updates that bypass those signals. Only the cache of the calling
+    process sees the new version unless the cache is shared, so other
+    processes keep their lists until ORGANIZATION_LIST_CACHE_SECONDS pass.
+
+    Args:
+        model: Institute or Company
+    """
+    key = _available_version_key(model)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def _available_organizations(model, user):
+    """Get the organizations of a model that a user can join, cached per email domain"""
+    domain = extract_domain_from_email(getattr(user, 'email', None)) or ''
+    version = cache.get(_available_version_key(model), 0)
+    key = f'available_organizations:{model._meta.model_name}:{version}:{domain}'
+    organizations = cache.get(key)
+    if organizations is None:
+        organizations = model.objects.available_to(domain).only(*AVAILABLE_ORGANIZATION_FIELDS)
+        # Pickling a queryset stores its results, so later hits skip the query
+        cache.set(key, organizations, getattr(settings, 'ORGANIZATION_LIST_CACHE_SECONDS', 60))
+    return organizations
+
+
 def get_available_institutes_for_user(user):
     """
     Get institutes that the user can join based on email domain
@@ -57,16 +100,10 @@ def get_available_institutes_for_user(user):
         user: User instance
     
     Returns:
-        QuerySet: Available institutes
+        QuerySet: Approved institutes without domain verification or with
+        the user's email domain
     """
-    # Get all approved institutes without domain verification or with matching domain
-    available_institutes = []
-    
-    for institute in Institute.objects.filter(registration_status='approved'):
-        if not institute.domain_verified or institute.is_email_from_institute(user.email):
-            available_institutes.append(institute.pk)
-    
-    return Institute.objects.filter(pk__in=available_institutes)
+    return _available_organizations(Institute, user)
 
 
 def get_available_companies_for_user(user):
@@ -77,16 +114,10 @@ def get_available_companies_for_user(user):
         user: User instance
     
     Returns:
-        QuerySet: Available companies
+        QuerySet: Approved companies without domain verification or with
+        the user's email domain
     """
-    # Get all approved companies without domain verification or with matching domain
-    available_companies = []
-    
-    for company in Company.objects.filter(registration_status='approved'):
-        if not company.domain_verified or company.is_email_from_company(user.email):
-            available_companies.append(company.pk)
-    
-    return Company.objects.filter(pk__in=available_companies)
+    return _available_organizations(Company, user)
 
 
 def extract_domain_from_email(email):
@@ -138,12 +169,12 @@ def suggest_organization_by_domain(user, organization_type):
     
     if organization_type == 'institute':
         return Institute.objects.filter(
-            email_domain__iexact=user_domain,
+            email_domain=user_domain,
             domain_verified=True
         )
     elif organization_type == 'company':
         return Company.objects.filter(
-            email_domain__iexact=user_domain,
+            email_domain=user_domain,
             domain_verified=True
         )
     
@@ -3,18 +3,21 @@ from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User, Group
 from django.contrib import messages
-from django.http import JsonResponse, Http404, HttpResponse
+from django.http import JsonResponse, Http404, HttpResponse, HttpResponseNotModified
 from django.core.paginator import Paginator
-from django.db.models import Q, Count
+from django.db import DatabaseError, connection
+from django.db.models import OuterRef, Q, Subquery
+from django.views.decorators.cache import never_cache
 from django.utils import timezone
 from datetime import date, timedelta
 from decimal import Decimal
 import os
+import time
 from django.conf import settings
 from .models import (
     Student, Mentor, Teacher, Official,
     Position, Application, Internship, Company, Institute, 
-    Notification, Evaluation, Report, Log, Entry, Assessment
+    Notification, Evaluation, Report, Log, Entry, Assessment, DailyStatistic, RosterImport
 )
 from .forms import (
     LogForm, EntryFormSet, EntryForm, ProfileCompletionForm,
@@ -22,14 +25,19 @@ from .forms import (
     TeacherForm, OfficialForm, PositionForm,
     ApplicationForm, ReportForm,
     AssessmentForm, InternshipForm, EvaluationForm,
-    PositionSearchForm, CompanyAdminForm, InstituteAdminForm
+    PositionSearchForm, CompanyAdminForm, InstituteAdminForm, RosterImportForm
 )
 from django import forms
 from .utils import (
     validate_user_organization_membership, 
     get_available_institutes_for_user, 
-    get_available_companies_for_user
+    get_available_companies_for_user,
+    invalidate_available_organizations,
 )
+from .roles import resolve_user_type, invalidate_user_type
+from . import acceptance, activity_logs, docs, exports, inbox, matching, public, rosters, search, stats
+from .public import public_page
+from .pagination import CursorPaginator
 
 def redirect_to_role_dashboard(user):
     """Helper function to redirect users to their role-specific dashboard"""
@@ -57,11 +65,7 @@ def get_user_type(user):
     if user.is_superuser:
         return 'admin'
         
-    user_groups = user.groups.values_list('name', flat=True)
-    for group_name in ['student', 'mentor', 'teacher', 'official']:
-        if group_name in user_groups:
-            return group_name
-    return None
+    return resolve_user_type(user)
 
 def home(request):
     """Homepage with different views for different user types"""
@@ -76,13 +80,7 @@ def home(request):
         elif user_type in ['student', 'mentor', 'teacher', 'official']:
             return redirect_to_role_dashboard(request.user)
     
-    context = {
-        'total_companies': Company.objects.filter(is_verified=True).count(),
-        'total_students': Student.objects.count(),
-        'active_internships': Internship.objects.filter(status='active').count(),
-        'total_positions': Position.objects.filter(is_active=True).count(),
-    }
-    return render(request, 'app/home.html', context)
+    return render(request, 'app/home.html', public.home_counters())
 
 @login_required
 def dashboard(request):
@@ -137,6 +135,7 @@ def student_dashboard_view(request):
         'student_profile': student_profile,
         'applications': applications[:5],
         'available_positions': available_positions,
+        'best_matches': matching.recommend_positions(student_profile),
         'current_internship': current_internship,
         'total_applications': applications.count(),
         'profile_completion': student_profile.get_profile_completion(),
@@ -211,18 +210,24 @@ def teacher_dashboard_view(request):
 
 def official_dashboard_view(request):
     """Official dashboard with system overview and statistics"""
-    # System statistics
-    stats = {
+    # System statistics, one aggregate query per table
+    company_counts = Company.objects.counts_by(total=None, verified=Q(is_verified=True))
+    position_counts = Position.objects.counts_by(total=None, active=Q(is_active=True))
+    application_counts = Application.objects.counts_by(total=None, pending=Q(status='pending'))
+    internship_counts = Internship.objects.counts_by(
+        active=Q(status='active'), completed=Q(status='completed')
+    )
+    system_stats = {
         'total_students': Student.objects.count(),
         'total_mentors': Mentor.objects.count(),
-        'total_companies': Company.objects.count(),
-        'verified_companies': Company.objects.filter(is_verified=True).count(),
-        'total_positions': Position.objects.count(),
-        'active_positions': Position.objects.filter(is_active=True).count(),
-        'total_applications': Application.objects.count(),
-        'pending_applications': Application.objects.filter(status='pending').count(),
-        'active_internships': Internship.objects.filter(status='active').count(),
-        'completed_internships': Internship.objects.filter(status='completed').count(),
+        'total_companies': company_counts['total'],
+        'verified_companies': company_counts['verified'],
+        'total_positions': position_counts['total'],
+        'active_positions': position_counts['active'],
+        'total_applications': application_counts['total'],
+        'pending_applications': application_counts['pending'],
+        'active_internships': internship_counts['active'],
+        'completed_internships': internship_counts['completed'],
     }
     
     # Recent activity
@@ -230,33 +235,21 @@ def official_dashboard_view(request):
     recent_internships = Internship.objects.order_by('-created_at')[:10]
     
     context = {
-        'stats': stats,
+        'stats': system_stats,
         'recent_applications': recent_applications,
         'recent_internships': recent_internships,
     }
     return render(request, 'app/official_dashboard.html', context)
 
-@login_required
-def teacher_students(request):
-    """View all students from teacher's institute"""
-    user_type = get_user_type(request.user)
-    if user_type != 'teacher':
-        messages.error(request, 'Access denied. Teacher account required.')
-        return redirect('home')
-    
-    try:
-        teacher_profile = request.user.teacher
-    except Teacher.DoesNotExist:
-        messages.error(request, 'Please create your teacher profile first.')
-        return redirect('create_profile')
-    
+def filtered_students(teacher_profile, params):
+    """Students of a teacher's institute, narrowed by the teacher_students search and filters"""
     # Get students from the same institute
     students = Student.objects.filter(
         institute=teacher_profile.institute
     ).select_related('user').order_by('user__last_name', 'user__first_name')
     
     # Search functionality
-    search_query = request.GET.get('search')
+    search_query = params.get('search')
     if search_query:
         students = students.filter(
             Q(user__first_name__icontains=search_query) |
@@ -267,12 +260,12 @@ def teacher_students(request):
         )
     
     # Filter by semester of study
-    year_filter = request.GET.get('year')
+    year_filter = params.get('year')
     if year_filter:
         students = students.filter(semester_of_study=year_filter)
     
     # Filter by internship status
-    internship_filter = request.GET.get('internship_status')
+    internship_filter = params.get('internship_status')
     if internship_filter == 'active':
         students = students.filter(
             internship__status='active'
@@ -286,10 +279,30 @@ def teacher_students(request):
             internship__isnull=True
         )
     
+    return students
+
+@login_required
+def teacher_students(request):
+    """View all students from teacher's institute"""
+    user_type = get_user_type(request.user)
+    if user_type != 'teacher':
+        messages.error(request, 'Access denied. Teacher account required.')
+        return redirect('home')
+    
+    try:
+        teacher_profile = request.user.teacher
+    except Teacher.DoesNotExist:
+        messages.error(request, 'Please create your teacher profile first.')
+        return redirect('create_profile')
+    
+    students = filtered_students(teacher_profile, request.GET)
+    search_query = request.GET.get('search')
+    year_filter = request.GET.get('year')
+    internship_filter = request.GET.get('internship_status')
+    
     # Pagination
-    paginator = Paginator(students, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = CursorPaginator(students, 20)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'teacher_profile': teacher_profile,
@@ -301,6 +314,28 @@ def teacher_students(request):
     }
     return render(request, 'app/teacher_students.html', context)
 
+@login_required
+def export_students(request):
+    """Download the filtered student list as CSV or XLSX (teacher only)"""
+    user_type = get_user_type(request.user)
+    if user_type != 'teacher':
+        messages.error(request, 'Access denied. Teacher account required.')
+        return redirect('home')
+    
+    try:
+        teacher_profile = request.user.teacher
+    except Teacher.DoesNotExist:
+        messages.error(request, 'Please complete your teacher profile first.')
+        return redirect('complete_profile')
+    
+    latest_internship = Internship.objects.filter(student=OuterRef('pk')).order_by('-created_at')
+    students = filtered_students(teacher_profile, request.GET).annotate(
+        latest_internship_status=Subquery(latest_internship.values('status')[:1])
+    )
+    return exports.export_response(
+        students, exports.STUDENT_COLUMNS, 'students', request.GET.get('format', 'csv'), title='Students'
+    )
+
 @login_required
 def teacher_internships(request):
     """View all internships for students from teacher's institute"""
@@ -337,6 +372,14 @@ def teacher_internships(request):
             Q(mentor__company__name__icontains=search_query)
         )
     
+    # Sort by progress, computed in the query so it orders every page
+    sort = request.GET.get('sort', '')
+    internships = internships.with_progress()
+    if sort == 'progress':
+        internships = internships.order_by('-progress', '-created_at')
+    elif sort == 'progress_low':
+        internships = internships.order_by('progress', '-created_at')
+    
     # Pagination
     paginator = Paginator(internships, 15)
     page_number = request.GET.get('page')
@@ -348,6 +391,7 @@ def teacher_internships(request):
         'search_query': search_query,
         'status_filter': status_filter,
         'status_choices': Internship.STATUS_CHOICES,
+        'sort': sort,
     }
     return render(request, 'app/teacher_internships.html', context)
 
@@ -393,20 +437,8 @@ def teacher_internship_detail(request, internship_nanoid):
     }
     return render(request, 'app/teacher_internship_detail.html', context)
 
-@login_required
-def teacher_reports(request):
-    """View all reports from students in teacher's institute"""
-    user_type = get_user_type(request.user)
-    if user_type != 'teacher':
-        messages.error(request, 'Access denied. Teacher account required.')
-        return redirect('home')
-    
-    try:
-        teacher_profile = request.user.teacher
-    except Teacher.DoesNotExist:
-        messages.error(request, 'Please complete your teacher profile first.')
-        return redirect('complete_profile')
-    
+def filtered_reports(teacher_profile, params):
+    """Reports of a teacher's institute, narrowed and sorted like teacher_reports"""
     # Get all reports for students from teacher's institute
     reports = Report.objects.filter(
         internship__student__institute=teacher_profile.institute
@@ -415,12 +447,12 @@ def teacher_reports(request):
     ).order_by('-report_month')
     
     # Filter by report type or student
-    student_filter = request.GET.get('student', '')
+    student_filter = params.get('student', '')
     if student_filter:
         reports = reports.filter(internship__student__nanoid=student_filter)
     
     # Search functionality
-    search_query = request.GET.get('search', '')
+    search_query = params.get('search', '')
     if search_query:
         reports = reports.filter(
             Q(internship__student__user__first_name__icontains=search_query) |
@@ -428,10 +460,38 @@ def teacher_reports(request):
             Q(internship__student__student_id__icontains=search_query)
         )
     
+    # Sort by total score, computed in the query so it orders every page
+    sort = params.get('sort', '')
+    reports = reports.with_total_score()
+    if sort == 'score':
+        reports = reports.order_by('-total_score', '-report_month')
+    elif sort == 'score_low':
+        reports = reports.order_by('total_score', '-report_month')
+    
+    return reports
+
+@login_required
+def teacher_reports(request):
+    """View all reports from students in teacher's institute"""
+    user_type = get_user_type(request.user)
+    if user_type != 'teacher':
+        messages.error(request, 'Access denied. Teacher account required.')
+        return redirect('home')
+    
+    try:
+        teacher_profile = request.user.teacher
+    except Teacher.DoesNotExist:
+        messages.error(request, 'Please complete your teacher profile first.')
+        return redirect('complete_profile')
+    
+    reports = filtered_reports(teacher_profile, request.GET)
+    student_filter = request.GET.get('student', '')
+    search_query = request.GET.get('search', '')
+    sort = request.GET.get('sort', '')
+    
     # Pagination
-    paginator = Paginator(reports, 15)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = CursorPaginator(reports, 15)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     # Get students for filter dropdown
     students = Student.objects.filter(
@@ -445,9 +505,29 @@ def teacher_reports(request):
         'search_query': search_query,
         'student_filter': student_filter,
         'students': students,
+        'sort': sort,
     }
     return render(request, 'app/teacher_reports.html', context)
 
+@login_required
+def export_reports(request):
+    """Download the filtered report list as CSV or XLSX (teacher only)"""
+    user_type = get_user_type(request.user)
+    if user_type != 'teacher':
+        messages.error(request, 'Access denied. Teacher account required.')
+        return redirect('home')
+    
+    try:
+        teacher_profile = request.user.teacher
+    except Teacher.DoesNotExist:
+        messages.error(request, 'Please complete your teacher profile first.')
+        return redirect('complete_profile')
+    
+    reports = filtered_reports(teacher_profile, request.GET)
+    return exports.export_response(
+        reports, exports.REPORT_COLUMNS, 'reports', request.GET.get('format', 'csv'), title='Reports'
+    )
+
 @login_required
 def teacher_report_detail(request, report_nanoid):
     """View detailed information about a specific report"""
@@ -496,8 +576,8 @@ def edit_institute(request):
         messages.error(request, 'Please create your teacher profile first.')
         return redirect('create_profile')
     
-    if not (teacher_profile.can_edit_institute() or teacher_profile.can_manage_institute()):
-        messages.error(request, 'You can only edit institutes that you registered or manage as an administrative contact.')
+    if not teacher_profile.can_edit_institute():
+        messages.error(request, 'You can only edit institutes that you registered.')
         return redirect_to_role_dashboard(request.user)
     
     institute = teacher_profile.institute
@@ -520,19 +600,18 @@ def edit_institute(request):
     }
     return render(request, 'app/edit_institute.html', context)
 
-@login_required
-def manage_companies(request):
-    """Official view to manage companies with search and filtering"""
-    user_type = get_user_type(request.user)
-    if user_type != 'official':
-        messages.error(request, 'Access denied. Official account required.')
-        return redirect('home')
+def filtered_companies(params):
+    """
+    Companies narrowed by the manage_companies filters
     
+    Returns:
+        tuple: (CompanyAdminForm bound to the params, filtered companies)
+    """
     # Get all companies with filtering
     companies = Company.objects.all().order_by('-created_at')
     
     # Process admin filter form
-    form = CompanyAdminForm(request.GET or None)
+    form = CompanyAdminForm(params or None)
     if form.is_valid():
         # Search functionality
         search_query = form.cleaned_data.get('search')
@@ -563,28 +642,47 @@ def manage_companies(request):
         if created_after:
             companies = companies.filter(created_at__date__gte=created_after)
     
+    return form, companies
+
+@login_required
+def manage_companies(request):
+    """Official view to manage companies with search and filtering"""
+    user_type = get_user_type(request.user)
+    if user_type != 'official':
+        messages.error(request, 'Access denied. Official account required.')
+        return redirect('home')
+    
+    form, companies = filtered_companies(request.GET)
+    
     # Pagination
-    paginator = Paginator(companies, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = CursorPaginator(companies, 20)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     # Get statistics
-    stats = {
-        'total': Company.objects.count(),
-        'pending': Company.objects.filter(registration_status='pending').count(),
-        'approved': Company.objects.filter(registration_status='approved').count(),
-        'rejected': Company.objects.filter(registration_status='rejected').count(),
-        'domain_verified': Company.objects.filter(domain_verified=True).count(),
-    }
+    status_counts = Company.objects.status_breakdown()
     
     context = {
         'form': form,
         'page_obj': page_obj,
-        'stats': stats,
-        'filtered_count': companies.count(),
+        'stats': status_counts,
+        'filtered_count': paginator.count,
     }
     return render(request, 'app/manage_companies.html', context)
 
+@login_required
+def export_companies(request):
+    """Download the filtered company list as CSV or XLSX (official only)"""
+    user_type = get_user_type(request.user)
+    if user_type != 'official':
+        messages.error(request, 'Access denied. Official account required.')
+        return redirect('home')
+    
+    _, companies = filtered_companies(request.GET)
+    return exports.export_response(
+        companies.select_related('approved_by__user'), exports.COMPANY_COLUMNS, 'companies',
+        request.GET.get('format', 'csv'), title='Companies'
+    )
+
 @login_required
 def mass_verify_companies(request):
     """Official view to mass verify companies"""
@@ -614,7 +712,8 @@ def mass_verify_companies(request):
         
         if action == 'approve':
             # Approve selected companies
-            updated_count = companies.update(
+            updated_count = stats.update(
+                companies,
                 registration_status='approved',
                 approved_at=timezone.now(),
                 approved_by=official_profile
@@ -623,7 +722,8 @@ def mass_verify_companies(request):
             
         elif action == 'reject':
             # Reject selected companies
-            updated_count = companies.update(
+            updated_count = stats.update(
+                companies,
                 registration_status='rejected',
                 approved_at=timezone.now(),
                 approved_by=official_profile
@@ -632,35 +732,38 @@ def mass_verify_companies(request):
             
         elif action == 'verify_domain':
             # Verify domain for selected companies
-            updated_count = companies.update(domain_verified=True)
+            updated_count = stats.update(companies, domain_verified=True)
             messages.success(request, f'Successfully verified domain for {updated_count} companies.')
             
         elif action == 'unverify_domain':
             # Unverify domain for selected companies
-            updated_count = companies.update(domain_verified=False)
+            updated_count = stats.update(companies, domain_verified=False)
             messages.success(request, f'Successfully unverified domain for {updated_count} companies.')
             
         else:
             messages.error(request, 'Invalid action selected.')
         
+        # Bulk updates bypass model signals, so refresh the cached lists of
+        # joinable organizations
+        invalidate_available_organizations(Company)
+        
         return redirect('manage_companies')
     
     # If GET request, redirect to manage companies
     return redirect('manage_companies')
 
-@login_required
-def manage_institutes(request):
-    """Official view to manage institutes with search and filtering"""
-    user_type = get_user_type(request.user)
-    if user_type != 'official':
-        messages.error(request, 'Access denied. Official account required.')
-        return redirect('home')
+def filtered_institutes(params):
+    """
+    Institutes narrowed by the manage_institutes filters
     
+    Returns:
+        tuple: (InstituteAdminForm bound to the params, filtered institutes)
+    """
     # Get all institutes with filtering
     institutes = Institute.objects.all().order_by('-created_at')
     
     # Process admin filter form
-    form = InstituteAdminForm(request.GET or None)
+    form = InstituteAdminForm(params or None)
     if form.is_valid():
         # Search functionality
         search_query = form.cleaned_data.get('search')
@@ -694,28 +797,47 @@ def manage_institutes(request):
                 Q(address__icontains=city_filter)
             )
     
+    return form, institutes
+
+@login_required
+def manage_institutes(request):
+    """Official view to manage institutes with search and filtering"""
+    user_type = get_user_type(request.user)
+    if user_type != 'official':
+        messages.error(request, 'Access denied. Official account required.')
+        return redirect('home')
+    
+    form, institutes = filtered_institutes(request.GET)
+    
     # Pagination
-    paginator = Paginator(institutes, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = CursorPaginator(institutes, 20)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     # Get statistics
-    stats = {
-        'total': Institute.objects.count(),
-        'pending': Institute.objects.filter(registration_status='pending').count(),
-        'approved': Institute.objects.filter(registration_status='approved').count(),
-        'rejected': Institute.objects.filter(registration_status='rejected').count(),
-        'domain_verified': Institute.objects.filter(domain_verified=True).count(),
-    }
+    status_counts = Institute.objects.status_breakdown()
     
     context = {
         'form': form,
         'page_obj': page_obj,
-        'stats': stats,
-        'filtered_count': institutes.count(),
+        'stats': status_counts,
+        'filtered_count': paginator.count,
     }
     return render(request, 'app/manage_institutes.html', context)
 
+@login_required
+def export_institutes(request):
+    """Download the filtered institute list as CSV or XLSX (official only)"""
+    user_type = get_user_type(request.user)
+    if user_type != 'official':
+        messages.error(request, 'Access denied. Official account required.')
+        return redirect('home')
+    
+    _, institutes = filtered_institutes(request.GET)
+    return exports.export_response(
+        institutes.select_related('approved_by__user'), exports.INSTITUTE_COLUMNS, 'institutes',
+        request.GET.get('format', 'csv'), title='Institutes'
+    )
+
 @login_required
 def mass_verify_institutes(request):
     """Official view to mass verify institutes"""
@@ -745,7 +867,8 @@ def mass_verify_institutes(request):
         
         if action == 'approve':
             # Approve selected institutes
-            updated_count = institutes.update(
+            updated_count = stats.update(
+                institutes,
                 registration_status='approved',
                 approved_at=timezone.now(),
                 approved_by=official_profile
@@ -754,7 +877,8 @@ def mass_verify_institutes(request):
             
         elif action == 'reject':
             # Reject selected institutes
-            updated_count = institutes.update(
+            updated_count = stats.update(
+                institutes,
                 registration_status='rejected',
                 approved_at=timezone.now(),
                 approved_by=official_profile
@@ -763,17 +887,21 @@ def mass_verify_institutes(request):
             
         elif action == 'verify_domain':
             # Verify domain for selected institutes
-            updated_count = institutes.update(domain_verified=True)
+            updated_count = stats.update(institutes, domain_verified=True)
             messages.success(request, f'Successfully verified domain for {updated_count} institutes.')
             
         elif action == 'unverify_domain':
             # Unverify domain for selected institutes
-            updated_count = institutes.update(domain_verified=False)
+            updated_count = stats.update(institutes, domain_verified=False)
             messages.success(request, f'Successfully unverified domain for {updated_count} institutes.')
             
         else:
             messages.error(request, 'Invalid action selected.')
         
+        # Bulk updates bypass model signals, so refresh the cached lists of
+        # joinable organizations
+        invalidate_available_organizations(Institute)
+        
         return redirect('manage_institutes')
     
     # If GET request, redirect to manage institutes
@@ -787,98 +915,81 @@ def official_reports(request):
         messages.error(request, 'Access denied. Official account required.')
         return redirect('home')
     
-    # Entity Counts
+    # Entity Counts, served from the daily statistics rollup
+    totals = stats.status_totals()
+    
+    def entity_total(entity):
+        return sum(count for (name, status), count in totals.items() if name == entity)
+    
     entity_counts = {
         # User Counts
-        'total_users': User.objects.count(),
-        'students': User.objects.filter(groups__name='student').count(),
-        'mentors': User.objects.filter(groups__name='mentor').count(),
-        'teachers': User.objects.filter(groups__name='teacher').count(),
-        'officials': User.objects.filter(groups__name='official').count(),
+        'total_users': entity_total('user'),
+        'students': totals[('user', 'student')],
+        'mentors': totals[('user', 'mentor')],
+        'teachers': totals[('user', 'teacher')],
+        'officials': totals[('user', 'official')],
         
         # Organization Counts
-        'total_companies': Company.objects.count(),
-        'approved_companies': Company.objects.filter(registration_status='approved').count(),
-        'pending_companies': Company.objects.filter(registration_status='pending').count(),
-        'rejected_companies': Company.objects.filter(registration_status='rejected').count(),
-        'verified_companies': Company.objects.filter(domain_verified=True).count(),
-        
-        'total_institutes': Institute.objects.count(),
-        'approved_institutes': Institute.objects.filter(registration_status='approved').count(),
-        'pending_institutes': Institute.objects.filter(registration_status='pending').count(),
-        'rejected_institutes': Institute.objects.filter(registration_status='rejected').count(),
-        'verified_institutes': Institute.objects.filter(domain_verified=True).count(),
+        'total_companies': entity_total('company'),
+        'approved_companies': totals[('company', 'approved')],
+        'pending_companies': totals[('company', 'pending')],
+        'rejected_companies': totals[('company', 'rejected')],
+        'verified_companies': totals[('company_domain', 'verified')],
+        
+        'total_institutes': entity_total('institute'),
+        'approved_institutes': totals[('institute', 'approved')],
+        'pending_institutes': totals[('institute', 'pending')],
+        'rejected_institutes': totals[('institute', 'rejected')],
+        'verified_institutes': totals[('institute_domain', 'verified')],
         
         # Position and Application Counts
-        'total_positions': Position.objects.count(),
-        'active_positions': Position.objects.filter(is_active=True).count(),
-        'total_applications': Application.objects.count(),
-        'pending_applications': Application.objects.filter(status='pending').count(),
-        'accepted_applications': Application.objects.filter(status='accepted').count(),
-        'rejected_applications': Application.objects.filter(status='rejected').count(),
+        'total_positions': entity_total('position'),
+        'active_positions': totals[('position', 'active')],
+        'total_applications': entity_total('application'),
+        'pending_applications': totals[('application', 'pending')],
+        'accepted_applications': totals[('application', 'approved')],
+        'rejected_applications': totals[('application', 'rejected')],
         
         # Internship Counts
-        'total_internships': Internship.objects.count(),
-        'active_internships': Internship.objects.filter(status='active').count(),
-        'completed_internships': Internship.objects.filter(status='completed').count(),
-        'terminated_internships': Internship.objects.filter(status='terminated').count(),
+        'total_internships': entity_total('internship'),
+        'active_internships': totals[('internship', 'active')],
+        'completed_internships': totals[('internship', 'completed')],
+        'terminated_internships': totals[('internship', 'terminated')],
     }
     
     # Recent Activity (last 30 days)
-    thirty_days_ago = timezone.now() - timedelta(days=30)
+    recent = stats.totals_since(timezone.localdate() - timedelta(days=30))
     recent_activity = {
-        'new_users': User.objects.filter(date_joined__gte=thirty_days_ago).count(),
-        'new_companies': Company.objects.filter(created_at__gte=thirty_days_ago).count(),
-        'new_institutes': Institute.objects.filter(created_at__gte=thirty_days_ago).count(),
-        'new_applications': Application.objects.filter(applied_at__gte=thirty_days_ago).count(),
-        'new_internships': Internship.objects.filter(start_date__gte=thirty_days_ago).count(),
+        'new_users': recent['user'],
+        'new_companies': recent['company'],
+        'new_institutes': recent['institute'],
+        'new_applications': recent['application'],
+        'new_internships': recent['internship'],
     }
     
-    # Monthly Trends (last 6 months)
-    monthly_trends = []
-    for i in range(6):
-        month_start = timezone.now().replace(day=1) - timedelta(days=30*i)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        
-        monthly_trends.append({
+    # Monthly Trends (last 6 calendar months, oldest first)
+    monthly_trends = [
+        {
             'month': month_start.strftime('%B %Y'),
-            'users': User.objects.filter(date_joined__range=[month_start, month_end]).count(),
-            'companies': Company.objects.filter(created_at__range=[month_start, month_end]).count(),
-            'applications': Application.objects.filter(applied_at__range=[month_start, month_end]).count(),
-            'internships': Internship.objects.filter(start_date__range=[month_start, month_end]).count(),
-        })
-    
-    monthly_trends.reverse()  # Show oldest first
+            'users': month_totals['user'],
+            'companies': month_totals['company'],
+            'applications': month_totals['application'],
+            'internships': month_totals['internship'],
+        }
+        for month_start, month_totals in stats.monthly_totals(6)
+    ]
     
     # Success Metrics
+    def rate(part, whole):
+        return round((part / whole) * 100, 1) if whole > 0 else 0
+    
     success_metrics = {
-        'application_success_rate': 0,
-        'company_approval_rate': 0,
-        'institute_approval_rate': 0,
-        'internship_completion_rate': 0,
+        'application_success_rate': rate(entity_counts['accepted_applications'], entity_counts['total_applications']),
+        'company_approval_rate': rate(entity_counts['approved_companies'], entity_counts['total_companies']),
+        'institute_approval_rate': rate(entity_counts['approved_institutes'], entity_counts['total_institutes']),
+        'internship_completion_rate': rate(entity_counts['completed_internships'], entity_counts['total_internships']),
     }
     
-    # Calculate success rates
-    total_apps = Application.objects.count()
-    if total_apps > 0:
-        accepted_apps = Application.objects.filter(status='accepted').count()
-        success_metrics['application_success_rate'] = round((accepted_apps / total_apps) * 100, 1)
-    
-    total_companies = Company.objects.count()
-    if total_companies > 0:
-        approved_companies = Company.objects.filter(registration_status='approved').count()
-        success_metrics['company_approval_rate'] = round((approved_companies / total_companies) * 100, 1)
-    
-    total_institutes = Institute.objects.count()
-    if total_institutes > 0:
-        approved_institutes = Institute.objects.filter(registration_status='approved').count()
-        success_metrics['institute_approval_rate'] = round((approved_institutes / total_institutes) * 100, 1)
-    
-    total_internships = Internship.objects.count()
-    if total_internships > 0:
-        completed_internships = Internship.objects.filter(status='completed').count()
-        success_metrics['internship_completion_rate'] = round((completed_internships / total_internships) * 100, 1)
-    
     context = {
         'entity_counts': entity_counts,
         'recent_activity': recent_activity,
@@ -889,6 +1000,97 @@ def official_reports(request):
     
     return render(request, 'app/official_reports.html', context)
 
+@login_required
+def export_statistics(request):
+    """Download the daily statistics behind the official reports as CSV or XLSX (official only)"""
+    user_type = get_user_type(request.user)
+    if user_type != 'official':
+        messages.error(request, 'Access denied. Official account required.')
+        return redirect('home')
+    
+    statistics = DailyStatistic.objects.order_by('day', 'entity', 'status')
+    return exports.export_response(
+        statistics, exports.STATISTIC_COLUMNS, 'daily-statistics', request.GET.get('format', 'csv'), title='Daily statistics'
+    )
+
+def roster_import_scope(user):
+    """
+    Work out which rosters a user may import
+
+    Officials import students or teachers into any institute. Teachers import
+    students into their own institute, and teachers too if they registered it,
+    once it is approved with a verified email domain.
+
+    Returns:
+        tuple: (institute, or None for any, and the roles allowed), or None when
+        the user may not import rosters
+    """
+    user_type = get_user_type(user)
+    if user_type == 'official':
+        return None, None
+    if user_type == 'teacher':
+        teacher_profile = getattr(user, 'teacher', None)
+        if teacher_profile is not None and teacher_profile.institute is not None and rosters.accepts_rosters(teacher_profile.institute):
+            roles = ['student', 'teacher'] if teacher_profile.can_edit_institute() else ['student']
+            return teacher_profile.institute, roles
+    return None
+
+@login_required
+def import_roster(request):
+    """Upload a student or teacher roster for an institute (teacher or official)"""
+    scope = roster_import_scope(request.user)
+    if scope is None:
+        messages.error(request, 'Access denied. A teacher of an approved institute with a verified email domain, or an official account, is required.')
+        return redirect('home')
+    institute, roles = scope
+    
+    form = RosterImportForm(request.POST or None, request.FILES or None, institute=institute, roles=roles)
+    if request.method == 'POST' and form.is_valid():
+        target = institute or form.cleaned_data['institute']
+        upload = form.cleaned_data['file']
+        roster_import = RosterImport.objects.create(
+            institute=target,
+            role=form.cleaned_data['role'],
+            file=upload,
+            file_name=upload.name[:255],
+            uploaded_by=request.user,
+        )
+        if upload.size <= settings.ROSTER_IMPORT_INLINE_BYTES:
+            rosters.run_import(roster_import)
+        else:
+            messages.info(request, 'The roster was queued for import. This page shows the results once it is done.')
+        return redirect('roster_import_detail', import_nanoid=roster_import.nanoid)
+    
+    imports = RosterImport.objects.select_related('institute', 'uploaded_by')
+    if institute is not None:
+        imports = imports.filter(institute=institute)
+    context = {
+        'form': form,
+        'institute': institute,
+        'imports': imports[:20],
+        'user_type': get_user_type(request.user),
+    }
+    return render(request, 'app/import_roster.html', context)
+
+@login_required
+def roster_import_detail(request, import_nanoid):
+    """Status and error report of a roster import (teacher or official)"""
+    scope = roster_import_scope(request.user)
+    if scope is None:
+        messages.error(request, 'Access denied. A teacher of an approved institute with a verified email domain, or an official account, is required.')
+        return redirect('home')
+    institute, _ = scope
+    
+    imports = RosterImport.objects.select_related('institute', 'uploaded_by')
+    if institute is not None:
+        imports = imports.filter(institute=institute)
+    roster_import = get_object_or_404(imports, nanoid=import_nanoid)
+    context = {
+        'roster_import': roster_import,
+        'user_type': get_user_type(request.user),
+    }
+    return render(request, 'app/roster_import_detail.html', context)
+
 @login_required
 def company_detail_official(request, company_nanoid):
     """Official view to manage a specific company"""
@@ -1013,15 +1215,14 @@ def browse_positions(request):
     
     # Process search form
     form = PositionSearchForm(request.GET or None)
+    search_query = None
     if form.is_valid():
-        # Search functionality
+        # Full-text search, ranked by relevance unless another order is picked
         search_query = form.cleaned_data.get('search')
         if search_query:
-            positions = positions.filter(
-                Q(title__icontains=search_query) |
-                Q(company__name__icontains=search_query) |
-                Q(description__icontains=search_query)
-            )
+            positions = search.search_positions(positions, search_query)
+            if form.cleaned_data.get('sort') != 'newest':
+                positions = positions.order_by('-search_rank', '-created_at')
         
         # Filter by company
         company_filter = form.cleaned_data.get('company')
@@ -1051,14 +1252,15 @@ def browse_positions(request):
             positions = positions.filter(stipend__gte=min_stipend)
     
     # Pagination
-    paginator = Paginator(positions, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = CursorPaginator(positions, 12, count='estimate')
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+    if search_query:
+        search.attach_snippets(page_obj, search_query)
     
     context = {
         'form': form,
         'page_obj': page_obj,
-        'total_positions': positions.count(),
+        'total_positions': paginator.count,
     }
     return render(request, 'app/browse_positions.html', context)
 
@@ -1111,6 +1313,7 @@ def complete_profile(request):
             # Add user to the appropriate group
             group, created = Group.objects.get_or_create(name=user_type)
             user.groups.add(group)
+            invalidate_user_type(request.user)
             
             # Clear the session
             del request.session['incomplete_profile_user_id']
@@ -1856,10 +2059,10 @@ def edit_position(request, position_nanoid):
 def apply_position(request, position_nanoid):
     """Handle student applications for internship positions"""
     # Get the position
-    position = get_object_or_404(Position, nanoid=position_nanoid)
+    position = get_object_or_404(Position.objects.select_related('company', 'mentor__user'), nanoid=position_nanoid)
     
     # Check if user is a student
-    if not request.user.groups.filter(name='student').exists():
+    if resolve_user_type(request.user) != 'student':
         messages.error(request, 'Only students can apply for positions.')
         return redirect('position_detail', position_nanoid=position_nanoid)
     
@@ -1906,12 +2109,10 @@ def apply_position(request, position_nanoid):
             # Create notification for mentor
             mentor_profile = position.mentor
             if mentor_profile and mentor_profile.user:
-                Notification.objects.create(
-                    recipient=mentor_profile.user,
-                    title="New Application Received",
-                    message=f"New application received for {position.title} from {student_profile.user.get_full_name() or student_profile.user.username}",
-                    notification_type='general'
-                )
+                Notification.objects.fan_out([mentor_profile.user], 'application_received', {
+                    'position': position.title,
+                    'student': student_profile.user.get_full_name() or student_profile.user.username,
+                })
             
             messages.success(request, 'Your application has been submitted successfully!')
             return redirect('position_detail', position_nanoid=position_nanoid)
@@ -1939,7 +2140,7 @@ def apply_position(request, position_nanoid):
 def student_applications(request):
     """Display all applications for the current student"""
     # Check if user is a student
-    if not request.user.groups.filter(name='student').exists():
+    if resolve_user_type(request.user) != 'student':
         messages.error(request, 'Only students can view applications.')
         return redirect('home')
     
@@ -1962,9 +2163,8 @@ def student_applications(request):
     ).first()
     
     # Pagination
-    paginator = Paginator(applications, 10)  # Show 10 applications per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = CursorPaginator(applications, 10)  # Show 10 applications per page
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'applications': page_obj,
@@ -1977,7 +2177,7 @@ def student_applications(request):
 def withdraw_application(request, application_id):
     """Allow students to withdraw their applications"""
     # Check if user is a student
-    if not request.user.groups.filter(name='student').exists():
+    if resolve_user_type(request.user) != 'student':
         messages.error(request, 'Only students can withdraw applications.')
         return redirect('home')
     
@@ -2074,7 +2274,7 @@ def student_internship(request):
 def student_activities(request):
     """Display all activity logs for the current student"""
     # Check if user is a student
-    if not request.user.groups.filter(name='student').exists():
+    if resolve_user_type(request.user) != 'student':
         messages.error(request, 'Only students can view activity logs.')
         return redirect('home')
     
@@ -2111,7 +2311,7 @@ def student_activities(request):
 def create_activity_log(request):
     """Create a new activity log"""
     # Check if user is a student
-    if not request.user.groups.filter(name='student').exists():
+    if resolve_user_type(request.user) != 'student':
         messages.error(request, 'Only students can create activity logs.')
         return redirect('home')
     
@@ -2134,41 +2334,24 @@ def create_activity_log(request):
     
     if request.method == 'POST':
         log_form = LogForm(request.POST)
-        entry_formset = EntryFormSet(request.POST)
+        entry_formset = EntryFormSet(request.POST, queryset=Entry.objects.none())
         
         if log_form.is_valid() and entry_formset.is_valid():
-            # Check if a log already exists for this period
-            week_starting = log_form.cleaned_data['week_starting']
-            existing_log = Log.objects.filter(
-                internship=current_internship,
-                week_starting=week_starting
-            ).first()
-            
-            if existing_log:
-                messages.error(request, f'An activity log already exists for the week starting {week_starting.strftime("%Y-%m-%d")}.')
+            try:
+                _, activities_created = activity_logs.create_log(
+                    current_internship, log_form.cleaned_data['week_starting'], entry_formset
+                )
+            except activity_logs.DuplicateLog as e:
+                messages.error(request, str(e))
                 return redirect('student_activities')
             
-            # Create the activity log
-            activity_log = log_form.save(commit=False)
-            activity_log.internship = current_internship
-            activity_log.save()
-            
-            # Create the activities
-            activities_created = 0
-            for entry_form in entry_formset:
-                if entry_form.cleaned_data and not entry_form.cleaned_data.get('DELETE', False):
-                    entry = entry_form.save(commit=False)
-                    entry.log = activity_log
-                    entry.save()
-                    activities_created += 1
-            
             messages.success(request, f'Activity log created successfully with {activities_created} entries.')
             return redirect('student_activities')
         else:
             messages.error(request, 'Please correct the errors below.')
     else:
         log_form = LogForm()
-        entry_formset = EntryFormSet()
+        entry_formset = EntryFormSet(queryset=Entry.objects.none())
     
     context = {
         'log_form': log_form,
@@ -2182,7 +2365,7 @@ def create_activity_log(request):
 def edit_activity_log(request, log_nanoid):
     """Edit an existing activity log"""
     # Check if user is a student
-    if not request.user.groups.filter(name='student').exists():
+    if resolve_user_type(request.user) != 'student':
         messages.error(request, 'Only students can edit activity logs.')
         return redirect('home')
     
@@ -2203,32 +2386,22 @@ def edit_activity_log(request, log_nanoid):
         messages.error(request, 'Activity log not found or access denied.')
         return redirect('student_activities')
     
+    existing_activities = Entry.objects.filter(log=activity_log).order_by('date')
     if request.method == 'POST':
         log_form = LogForm(request.POST, instance=activity_log)
-        
-        # Get existing activities and create formset with instances
-        existing_activities = Entry.objects.filter(log=activity_log).order_by('date')
-        
-        activity_formset = EntryFormSet(
-            request.POST,
-            queryset=existing_activities
-        )
+        activity_formset = EntryFormSet(request.POST, queryset=existing_activities)
         
         if log_form.is_valid() and activity_formset.is_valid():
-            # Save the activity log
-            log_form.save()
-            
-            # Save the formset which will handle create/update/delete automatically
-            activity_formset.save()
-            
-            messages.success(request, 'Activity log updated successfully.')
-            return redirect('student_activities')
-        else:
-            messages.error(request, 'Please correct the errors below.')
+            try:
+                activity_logs.update_log(log_form.instance, activity_formset)
+            except activity_logs.DuplicateLog as e:
+                log_form.add_error('week_starting', str(e))
+            else:
+                messages.success(request, 'Activity log updated successfully.')
+                return redirect('student_activities')
+        messages.error(request, 'Please correct the errors below.')
     else:
         log_form = LogForm(instance=activity_log)
-        existing_activities = Entry.objects.filter(log=activity_log).order_by('date')
-        
         activity_formset = EntryFormSet(queryset=existing_activities)
     
     context = {
@@ -2244,7 +2417,7 @@ def edit_activity_log(request, log_nanoid):
 def view_activity_log(request, log_nanoid):
     """View details of a specific activity log"""
     # Check if user is a student
-    if not request.user.groups.filter(name='student').exists():
+    if resolve_user_type(request.user) != 'student':
         messages.error(request, 'Only students can view activity logs.')
         return redirect('home')
     
@@ -2285,7 +2458,7 @@ def view_activity_log(request, log_nanoid):
 @login_required
 def add_entry_form(request):
     """HTMX endpoint to add a new entry form"""
-    if not request.user.groups.filter(name='student').exists():
+    if resolve_user_type(request.user) != 'student':
         return HttpResponse("Unauthorized", status=403)
     
     # Get the form index from the request
@@ -2305,6 +2478,62 @@ def add_entry_form(request):
     }
     return render(request, 'app/partials/entry_form.html', context)
 
+@login_required
+def notification_inbox(request):
+    """List the user's notifications, newest first"""
+    notifications = request.user.notifications.order_by('-created_at')
+    paginator = CursorPaginator(notifications, 20)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+    
+    context = {
+        'page_obj': page_obj,
+        'notifications': page_obj,
+        'unread_count': inbox.unread_count(request.user),
+    }
+    return render(request, 'app/notifications.html', context)
+
+@login_required
+def mark_all_notifications_read(request):
+    """Mark every unread notification of the user as read with a single UPDATE"""
+    if request.method != 'POST':
+        return redirect('notification_inbox')
+    
+    updated = request.user.notifications.mark_read()
+    
+    if request.headers.get('HX-Request'):
+        return render(request, 'app/partials/notification_badge.html', inbox.badge_context(0))
+    messages.success(request, f'Marked {updated} notifications as read.')
+    return redirect('notification_inbox')
+
+@login_required
+def notification_badge(request):
+    """
+    HTMX endpoint for the navbar's unread notification badge
+    
+    The response's ETag carries the unread count. When the browser revalidates
+    with a matching If-None-Match, the request waits up to
+    NOTIFICATION_LONG_POLL_SECONDS for the cached count to change, without
+    querying the database, and answers 304 Not Modified if it does not.
+    """
+    count = inbox.unread_count(request.user)
+    if inbox.badge_etag(request.user.pk, count) in request.headers.get('If-None-Match', ''):
+        deadline = time.monotonic() + inbox.long_poll_seconds()
+        while time.monotonic() < deadline and inbox.cached_unread_count(request.user.pk) == count:
+            time.sleep(inbox.LONG_POLL_STEP)
+        # A dropped counter is recounted here, once per change
+        changed = inbox.unread_count(request.user)
+        if changed == count:
+            response = HttpResponseNotModified()
+            response['ETag'] = inbox.badge_etag(request.user.pk, count)
+            response['Cache-Control'] = 'private, no-cache'
+            return response
+        count = changed
+    
+    response = render(request, 'app/partials/notification_badge.html', inbox.badge_context(count))
+    response['ETag'] = inbox.badge_etag(request.user.pk, count)
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
 @login_required
 def register_organization(request):
     """Register a new organization (company or institute)"""
@@ -2513,9 +2742,7 @@ def mentor_positions(request):
         return redirect('create_profile')
     
     # Get all positions with related data
-    positions = Position.objects.filter(mentor=mentor_profile).annotate(
-        application_count=Count('applications')
-    ).order_by('-created_at')
+    positions = Position.objects.filter(mentor=mentor_profile).order_by('-created_at')
     
     # Search functionality
     search_query = request.GET.get('search', '')
@@ -2607,13 +2834,15 @@ def mentor_applications(request):
             position_filter = ''
     
     # Pagination
-    paginator = Paginator(applications, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = CursorPaginator(applications, 20)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     # Get mentor's positions for filter dropdown
     mentor_positions = Position.objects.filter(mentor=mentor_profile)
     
+    # Best matching applicants among every open application
+    top_candidates = matching.rank_applications(applications.filter(status__in=['pending', 'under_review']))
+    
     context = {
         'mentor_profile': mentor_profile,
         'page_obj': page_obj,
@@ -2622,7 +2851,8 @@ def mentor_applications(request):
         'position_filter': position_filter,
         'position_filter_name': position_filter_name,
         'mentor_positions': mentor_positions,
-        'total_applications': applications.count(),
+        'top_candidates': top_candidates,
+        'total_applications': paginator.count,
     }
     
     return render(request, 'app/mentor_applications.html', context)
@@ -2659,78 +2889,11 @@ def accept_application(request, application_nanoid):
         return redirect('mentor_applications')
     
     if request.method == 'POST':
-        # Update application status
-        application.status = 'approved'
-        application.reviewed_at = timezone.now()
-        application.reviewer_notes = request.POST.get('notes', '')
-        application.save()
-        
-        # Create internship record
-        try:
-            from datetime import datetime
-            
-            # Calculate start and end dates (start today, duration from position)
-            start_date = datetime.now().date()
-            duration_months = 3  # Default duration
-            if application.position and hasattr(application.position, 'duration') and application.position.duration:
-                try:
-                    duration_months = int(application.position.duration)
-                except (ValueError, TypeError):
-                    duration_months = 3
-            
-            end_date = start_date + timedelta(days=duration_months * 30)  # Approximate months to days
-            
-            # Get mentor from position
-            mentor = application.position.mentor if application.position else None
-            
-            # Use InternshipForm for structured creation
-            internship_data = {
-                'start_date': start_date,
-                'end_date': end_date,
-                'status': 'active',
-                'final_grade': ''  # Will be filled later
-            }
-            
-            form = InternshipForm(internship_data)
-            if form.is_valid():
-                internship = form.save(commit=False)
-                internship.application = application
-                internship.student = application.student
-                internship.mentor = mentor
-                internship.teacher = None  # Teacher assignment can be done separately
-                internship.save()
-            else:
-                # Fallback to manual creation if form validation fails
-                internship = Internship.objects.create(
-                    application=application,
-                    student=application.student,
-                    mentor=mentor,
-                    teacher=None,
-                    start_date=start_date,
-                    end_date=end_date,
-                    status='active'
-                )
-            
-        except Exception as e:
-            # Log error but continue - internship can be created manually later
-            pass
-        
-        # Create notification for student
         try:
-            from .models import Notification
-            student_name = application.student.user.get_full_name() if application.student and application.student.user else 'Student'
-            position_title = application.position.title if application.position else 'Position'
-            company_name = application.position.company.name if application.position and application.position.company else 'Company'
-            
-            Notification.objects.create(
-                recipient=application.student.user,
-                title="Application Approved!",
-                message=f"Congratulations! Your application for {position_title} at {company_name} has been approved. Check your email for next steps.",
-                notification_type='application_status'
-            )
-        except Exception as e:
-            # Continue even if notification creation fails
-            pass
+            acceptance.accept(application, notes=request.POST.get('notes', ''))
+        except acceptance.AcceptanceError as e:
+            messages.error(request, str(e))
+            return redirect('mentor_applications')
         
         student_name = application.student.user.get_full_name() if application.student and application.student.user else 'Student'
         messages.success(request, f'Application from {student_name} has been approved!')
@@ -2782,20 +2945,10 @@ def reject_application(request, application_nanoid):
         
         # Create notification for student
         try:
-            from .models import Notification
             feedback_message = request.POST.get('feedback', '')
-            position_title = application.position.title if application.position else 'Position'
-            company_name = application.position.company.name if application.position and application.position.company else 'Company'
-            
-            notification_message = f"Thank you for your interest in {position_title} at {company_name}. Unfortunately, your application was not selected at this time."
-            if feedback_message:
-                notification_message += f"\n\nFeedback: {feedback_message}"
-            
-            Notification.objects.create(
-                recipient=application.student.user,
-                title="Application Status Update",
-                message=notification_message,
-                notification_type='application_status'
+            Notification.objects.fan_out(
+                [application.notification_recipient()], 'application_rejected',
+                {'feedback': f"\n\nFeedback: {feedback_message}" if feedback_message else ''}
             )
         except Exception as e:
             # Continue even if notification creation fails
@@ -2878,23 +3031,30 @@ def mentor_interns(request):
     if status_filter:
         internships = internships.filter(status=status_filter)
     
-    # Pagination
-    paginator = Paginator(internships, 15)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
     # Get statistics
-    active_interns = internships.filter(status='active').count()
-    completed_interns = internships.filter(status='completed').count()
+    intern_counts = internships.status_breakdown()
+    
+    # Sort by progress, computed in the query so it orders every page
+    sort = request.GET.get('sort', '')
+    internships = internships.with_progress()
+    if sort == 'progress':
+        internships = internships.order_by('-progress', '-start_date')
+    elif sort == 'progress_low':
+        internships = internships.order_by('progress', '-start_date')
+    
+    # Pagination
+    paginator = CursorPaginator(internships, 15)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'mentor_profile': mentor_profile,
         'page_obj': page_obj,
         'search_query': search_query,
         'status_filter': status_filter,
-        'total_interns': internships.count(),
-        'active_interns': active_interns,
-        'completed_interns': completed_interns,
+        'sort': sort,
+        'total_interns': intern_counts['total'],
+        'active_interns': intern_counts['active'],
+        'completed_interns': intern_counts['completed'],
     }
     
     return render(request, 'app/mentor_interns.html', context)
@@ -3079,74 +3239,61 @@ def component_demo(request):
     """Demo page showing custom CSS components"""
     return render(request, 'app/component_demo.html')
 
+@public_page
 def documentation_index(request):
     """Documentation homepage with available guides"""
-    return render(request, 'docs/index.html')
+    return docs.prebuilt_response(request, 'index') or render(request, docs.INDEX_TEMPLATE)
 
+@public_page
 def documentation_guide(request, user_type, topic):
-    """Render a specific documentation guide"""
-    # Define available guide templates organized by user type
-    guide_templates = {
-        'getting-started': {
-            'overview': 'docs/getting-started/overview.html',
-            'account-setup': 'docs/getting-started/account-setup.html',
-        },
-        'students': {
-            'dashboard': 'docs/students/dashboard.html',
-            'profile-management': 'docs/students/profile-management.html',
-            'finding-internships': 'docs/students/finding-internships.html',
-            'applying-positions': 'docs/students/applying-positions.html',
-            'managing-applications': 'docs/students/managing-applications.html',
-            'application-progress': 'docs/students/application-progress.html',
-        },
-        'mentors': {
-            'dashboard': 'docs/mentors/dashboard.html',
-            'creating-positions': 'docs/mentors/creating-positions.html',
-            'managing-applications': 'docs/mentors/managing-applications.html',
-            'intern-supervision': 'docs/mentors/intern-supervision.html',
-            'company-registration': 'docs/mentors/company-registration.html',
-        },
-        'teachers': {
-            'dashboard': 'docs/teachers/dashboard.html',
-            'student-supervision': 'docs/teachers/student-supervision.html',
-            'progress-monitoring': 'docs/teachers/progress-monitoring.html',
-            'institute-registration': 'docs/teachers/institute-registration.html',
-        },
-        'officials': {
-            'dashboard': 'docs/officials/dashboard.html',
-            'managing-organizations': 'docs/officials/managing-organizations.html',
-            'system-administration': 'docs/officials/system-administration.html',
-        },
-    }
-    
-    # Check if the requested guide exists
-    if user_type in guide_templates and topic in guide_templates[user_type]:
-        template_name = guide_templates[user_type][topic]
-        return render(request, template_name)
-    else:
+    """Render a specific documentation guide, from the prebuilt bundle when there is one"""
+    template_name = docs.GUIDES.get(user_type, {}).get(topic)
+    if template_name is None:
         raise Http404("Documentation page not found")
+    return docs.prebuilt_response(request, f'{user_type}/{topic}') or render(request, template_name)
 
 # Public pages
+@public_page
 def about(request):
     """About page"""
     return render(request, 'app/about.html')
 
+@public_page
 def contact(request):
     """Contact page"""
     return render(request, 'app/contact.html')
 
+@public_page
 def privacy_policy(request):
     """Privacy policy page"""
     return render(request, 'app/privacy_policy.html')
 
+@public_page
 def terms_of_service(request):
     """Terms of service page"""
     return render(request, 'app/terms_of_service.html')
 
+@public_page
 def anti_harassment_policy(request):
     """Anti-sexual harassment policy page"""
     return render(request, 'app/anti_harassment_policy.html')
 
+# Health checks
+@never_cache
+def healthz(request):
+    """Liveness probe: the process answers requests, without touching the database"""
+    return HttpResponse('ok', content_type='text/plain')
+
+@never_cache
+def readyz(request):
+    """Readiness probe: the database answers a single cheap query"""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except DatabaseError:
+        return HttpResponse('database unavailable', content_type='text/plain', status=503)
+    return HttpResponse('ok', content_type='text/plain')
+
 @login_required
 def submit_student_report(request, internship_nanoid):
     """Student submits monthly internship report"""
@@ -3236,7 +3383,7 @@ def create_supervisor_evaluation(request, internship_nanoid):
         return redirect('mentor_dashboard')
     
     # Check if evaluation already exists
-    existing_evaluation = InternshipSupervisorEvaluation.objects.filter(
+    existing_evaluation = Assessment.objects.filter(
         internship=internship
     ).first()
     
@@ -3245,11 +3392,11 @@ def create_supervisor_evaluation(request, internship_nanoid):
         return redirect('mentor_dashboard')
     
     if request.method == 'POST':
-        form = InternshipSupervisorEvaluationForm(request.POST)
+        form = AssessmentForm(request.POST)
         if form.is_valid():
             evaluation = form.save(commit=False)
             evaluation.internship = internship
-            evaluation.supervisor = mentor_profile
+            evaluation.mentor = mentor_profile
             evaluation.save()
             
             messages.success(request, 'Supervisor evaluation submitted successfully!')
@@ -3257,7 +3404,7 @@ def create_supervisor_evaluation(request, internship_nanoid):
         else:
             messages.error(request, 'Please correct the errors below.')
     else:
-        form = InternshipSupervisorEvaluationForm()
+        form = AssessmentForm()
     
     context = {
         'form': form,
@@ -17,16 +17,24 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+
+from app.admin import profiling_captures, profiling_capture_download
+from app.media import protected_media
 
 urlpatterns = [
+    path('admin/profiling/', admin.site.admin_view(profiling_captures), name='profiling_captures'),
+    path(
+        'admin/profiling/<str:capture_id>.prof',
+        admin.site.admin_view(profiling_capture_download),
+        name='profiling_capture_download',
+    ),
     path('admin/', admin.site.urls),
     path('accounts/', include('allauth.urls')),
+    path(settings.MEDIA_URL.lstrip('/') + '<path:path>', protected_media, name='protected_media'),
     path('', include('app.urls')),
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += [
         path('__reload__/', include('django_browser_reload.urls')),
     ]